@@ -1,22 +1,211 @@
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request
 from flask_cors import CORS
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+from concurrent.futures import ThreadPoolExecutor
+from functools import wraps
 import os
 import requests
 from dotenv import load_dotenv
-import numpy as np
-from sklearn.linear_model import LinearRegression
-from sklearn.preprocessing import PolynomialFeatures
-from ml_models.disaster_risk_predictor import DisasterRiskPredictor
+from services.ttl_cache import TTLCache
+from services.response_cache import ResponseCache
+from services.elevation_store import ElevationStore
+from services.upstream import UpstreamClient
+from services.location_resolver import LocationResolver
+from services.streaming import RowStream, chunked, ndjson, json_document
+from services.startup import Startup
+from services.alert_system import AlertScheduler, TokenBucket
+from services.push_hub import PushHub, sse_frame
+
+# NumPy, SciPy and the ml_models / data-store modules are imported by the
+# startup steps below, off the import path, so /api/status answers while the
+# models and datasets are still loading
 
 load_dotenv()
 
 app = Flask(__name__)
 CORS(app)
 
+# background (default): init on a worker thread; eager: before import returns;
+# manual: the embedding server calls startup.start() itself
+STARTUP_MODE = os.getenv('STARTUP_MODE', 'background')
+STARTUP_RETRY_AFTER = int(os.getenv('STARTUP_RETRY_AFTER', 1))
+startup = Startup()
+
+
+def requires(*components):
+    """Answer 503 with Retry-After until the named startup components are ready"""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            pending = [name for name in components if not startup.is_ready(name)]
+            if pending:
+                failed = [name for name in pending if startup.state(name) == 'failed']
+                message = f'Failed to load: {", ".join(failed)}' if failed else f'Starting up: {", ".join(pending)} loading'
+                response = jsonify({'status': 'error', 'message': message})
+                response.status_code = 503
+                response.headers['Retry-After'] = str(STARTUP_RETRY_AFTER)
+                return response
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def check_token(token, action):
+    """
+    Error response unless the request carries 'Authorization: Bearer <token>';
+    403 while token is unset (action disabled), None when it matches
+    """
+    import hmac
+    if not token:
+        return jsonify({'status': 'error', 'message': f'{action} are not enabled'}), 403
+    supplied = request.headers.get('Authorization', '')
+    if not hmac.compare_digest(supplied.encode(), f'Bearer {token}'.encode()):
+        return jsonify({'status': 'error', 'message': 'Invalid token'}), 401
+    return None
+
 OPENWEATHER_API_KEY = os.getenv('OPENWEATHER_API_KEY')
 MAPBOX_TOKEN = os.getenv('MAPBOX_TOKEN')
-WEATHER_BASE_URL = "http://api.openweathermap.org/data/2.5"
+WEATHER_BASE_URL = os.getenv('WEATHER_BASE_URL', "http://api.openweathermap.org/data/2.5")
+
+# Every outbound call goes through this client: pooled keep-alive sessions per host plus retries
+upstream = UpstreamClient(
+    pool_maxsize=int(os.getenv('UPSTREAM_POOL_SIZE', 20)),
+    retries=int(os.getenv('UPSTREAM_RETRIES', 2)),
+    backoff_factor=float(os.getenv('UPSTREAM_BACKOFF', 0.3))
+)
+
+# Shared OpenWeatherMap cache: city names and rounded coordinates map to the raw upstream reply
+weather_cache = TTLCache(
+    maxsize=int(os.getenv('WEATHER_CACHE_SIZE', 1024)),
+    ttl=float(os.getenv('WEATHER_CACHE_TTL', 300))
+)
+WEATHER_CACHE_COORD_DECIMALS = int(os.getenv('WEATHER_CACHE_COORD_DECIMALS', 2))
+
+
+def normalize_city_name(city):
+    return ' '.join(city.split()).casefold()
+
+
+def fetch_weather(city=None, lat=None, lon=None):
+    """
+    Current weather from OpenWeatherMap as (status_code, json), served from
+    weather_cache when possible. Successful and not-found replies are cached.
+    """
+    if city is not None:
+        key = ('city', normalize_city_name(city))
+        params = {'q': city}
+    else:
+        lat = round(lat, WEATHER_CACHE_COORD_DECIMALS)
+        lon = round(lon, WEATHER_CACHE_COORD_DECIMALS)
+        key = ('coords', lat, lon)
+        params = {'lat': lat, 'lon': lon}
+    
+    cached = weather_cache.get(key)
+    if cached is not None:
+        return cached
+    
+    response = upstream.get(
+        'openweathermap',
+        f"{WEATHER_BASE_URL}/weather",
+        params={**params, 'appid': OPENWEATHER_API_KEY, 'units': 'metric'},
+        timeout=10
+    )
+    
+    if response.status_code not in (200, 404):
+        return response.status_code, None
+    
+    result = (response.status_code, response.json())
+    weather_cache.set(key, result)
+    return result
+
+
+# Terrain elevation never changes: every point is fetched from Open-Meteo once and kept on disk
+ELEVATION_BASE_URL = os.getenv('ELEVATION_BASE_URL', "https://api.open-meteo.com/v1")
+DEFAULT_ELEVATION = 50
+elevation_store = ElevationStore(
+    os.getenv('ELEVATION_DB_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'elevation.sqlite3'))
+)
+
+
+def fetch_elevation(lat, lon):
+    """Elevation in meters from Open-Meteo, or None if the call fails"""
+    try:
+        response = upstream.get(
+            'open-meteo',
+            f"{ELEVATION_BASE_URL}/elevation",
+            params={'latitude': lat, 'longitude': lon},
+            timeout=5
+        )
+        if response.status_code == 200:
+            data = response.json()
+            if data.get('elevation'):
+                return round(data['elevation'][0], 1)
+    except (requests.RequestException, ValueError):
+        pass
+    return None
+
+
+def get_elevation(lat, lon):
+    elevation = elevation_store.get(lat, lon, fetch_elevation)
+    return DEFAULT_ELEVATION if elevation is None else elevation
+
+
+GEOCODING_BASE_URL = os.getenv('GEOCODING_BASE_URL', "https://geocoding-api.open-meteo.com/v1")
+
+
+def fetch_place(city):
+    """Best Open-Meteo geocoding match for a city name as {'lat', 'lon', 'elevation'}, or None"""
+    try:
+        response = upstream.get(
+            'open-meteo-geocoding',
+            f"{GEOCODING_BASE_URL}/search",
+            params={'name': city, 'count': 1},
+            timeout=5
+        )
+        if response.status_code == 200:
+            results = response.json().get('results')
+            if results and results[0].get('elevation') is not None:
+                place = results[0]
+                return {
+                    'lat': place['latitude'],
+                    'lon': place['longitude'],
+                    'elevation': round(place['elevation'], 1)
+                }
+    except (requests.RequestException, ValueError):
+        pass
+    return None
+
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+GAZETTEER_PATH = os.getenv('GAZETTEER_PATH', os.path.join(DATA_DIR, 'gazetteer.csv.gz'))
+GAZETTEER_INDEX_DIR = os.getenv('GAZETTEER_INDEX_DIR', os.path.join(DATA_DIR, 'gazetteer'))
+GAZETTEER_MAX_RESULTS = 50
+
+# Compiled to memory-mapped arrays on first start, reused afterwards; until the
+# 'gazetteer' step finishes, known cities resolve over the network like any other
+gazetteer = None
+
+def init_gazetteer():
+    global gazetteer
+    from services.gazetteer import Gazetteer
+    if os.path.exists(GAZETTEER_PATH):
+        gazetteer = Gazetteer.open(GAZETTEER_PATH, GAZETTEER_INDEX_DIR)
+        location_resolver.gazetteer = gazetteer
+
+
+# Resolves a prediction's weather and elevation under one deadline, geocoding only when it can help
+location_resolver = LocationResolver(
+    lambda city: fetch_weather(city=city),
+    fetch_place,
+    elevation_store,
+    fetch_elevation=fetch_elevation,
+    deadline=float(os.getenv('PREDICTION_DEADLINE', 6)),
+    default_elevation=DEFAULT_ELEVATION,
+    max_workers=int(os.getenv('UPSTREAM_WORKERS', 16)),
+    max_place_km=float(os.getenv('PLACE_MATCH_KM', 5)),
+    hedge_after=float(os.getenv('PREDICTION_HEDGE_AFTER', 0.25))
+)
+
 
 # BASIC ENDPOINTS
 @app.route('/')
@@ -29,8 +218,25 @@ def home():
             '/api/weather/<city>': 'Get current weather',
             '/api/sealevel/current': 'Get sea level data',
             '/api/climate/co2/current': 'Get CO2 data',
+            '/api/timeseries/<name>?start=&end=&points=': 'Historical series range / downsample query',
             '/api/ml/sealevel/predict/any/<city>': 'Predict sea level for any city',
-            '/api/risk/assess/<city>': 'Assess disaster risks'
+            '/api/ml/sealevel/predict/global': 'Global projection (format=json|ndjson|stream|columnar)',
+            '/api/ml/sealevel/predict/ensemble': 'Monte Carlo percentiles of the global projection',
+            '/api/ml/sealevel/predict/batch': 'Predict sea level for many cities (POST)',
+            '/api/ml/sealevel/sweep': 'Multiplier x acceleration pathway sweep with reductions (POST)',
+            '/api/ml/sealevel/crossing': 'First year cities reach a sea level or flooding risk threshold (POST)',
+            '/api/ml/sealevel/observations': 'Add sea level observations to the incremental model (POST)',
+            '/api/risk/assess/<city>': 'Assess disaster risks',
+            '/api/risk/raster': 'Gridded flood/landslide risk over a bbox (.npy or .png)',
+            '/api/alerts': 'Risk level changes of watched cities',
+            '/api/alerts/watchlist': 'Watched cities (GET) or watch more (POST cities, with ALERT_WATCHLIST_TOKEN)',
+            '/api/stream?cities=<a,b>&sealevel=true': 'Server-Sent Events: weather/risk snapshots, then merge patches',
+            '/api/stream/stats': 'Open streams and subscribers per topic',
+            '/api/gazetteer/search?q=<prefix>': 'Offline city autocomplete',
+            '/api/status': 'Liveness (answers while models are still loading)',
+            '/api/ready': 'Readiness of the models and datasets (503 until loaded)',
+            '/api/cache/stats': 'Upstream cache hit/miss counters',
+            '/api/upstream/stats': 'Upstream latency histograms'
         }
     })
 
@@ -38,15 +244,56 @@ def home():
 def api_status():
     return jsonify({
         'status': 'healthy',
+        'ready': startup.is_ready(),
         'timestamp': datetime.now().isoformat()
     })
 
+@app.route('/api/ready')
+def api_ready():
+    status = startup.status()
+    response = jsonify(dict(status, status='ready' if status['ready'] else 'starting'))
+    if not status['ready']:
+        response.status_code = 503
+        response.headers['Retry-After'] = str(STARTUP_RETRY_AFTER)
+    return response
+
 @app.route('/api/mapbox-token')
 def get_mapbox_token():
     if not MAPBOX_TOKEN:
         return jsonify({'status': 'error', 'message': 'Mapbox token not configured'}), 500
     return jsonify({'status': 'success', 'token': MAPBOX_TOKEN})
 
+@app.route('/api/cache/stats')
+def get_cache_stats():
+    return jsonify({
+        'status': 'success',
+        'caches': {
+            'weather': weather_cache.stats(),
+            'responses': response_cache.stats(),
+            'sweeps': sweep_cache.stats()
+        }
+    })
+
+@app.route('/api/upstream/stats')
+def get_upstream_stats():
+    return jsonify({'status': 'success', 'upstreams': upstream.stats()})
+
+@app.route('/api/gazetteer/search')
+@requires('gazetteer')
+def search_gazetteer():
+    try:
+        if gazetteer is None:
+            return jsonify({'status': 'error', 'message': 'Gazetteer not available'}), 503
+        
+        query = request.args.get('q', '').strip()
+        limit = min(request.args.get('limit', 10, type=int), GAZETTEER_MAX_RESULTS)
+        country = request.args.get('country')
+        
+        results = gazetteer.search(query, limit=limit, country=country)
+        return jsonify({'status': 'success', 'query': query, 'count': len(results), 'results': results})
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
 
 # WEATHER ENDPOINTS
 @app.route('/api/weather/<city>')
@@ -54,49 +301,45 @@ def get_weather(city):
     try:
         if not OPENWEATHER_API_KEY:
             return jsonify({'status': 'error', 'message': 'API key not configured'}), 500
-
-        response = requests.get(
-            f"{WEATHER_BASE_URL}/weather",
-            params={'q': city, 'appid': OPENWEATHER_API_KEY, 'units': 'metric'},
-            timeout=10
-        )
         
-        if response.status_code == 404:
-            return jsonify({'status': 'error', 'message': f'City "{city}" not found'}), 404
+        status_code, data = fetch_weather(city=city)
         
-        if response.status_code != 200:
-            return jsonify({'status': 'error', 'message': 'Failed to fetch weather'}), response.status_code
+        if status_code == 404:
+            return jsonify({'status': 'error', 'message': f'City "{city}" not found'}), 404
         
-        data = response.json()
-        
-        return jsonify({
-            'status': 'success',
-            'city': data['name'],
-            'country': data['sys']['country'],
-            'coordinates': {'lat': data['coord']['lat'], 'lon': data['coord']['lon']},
-            'weather': {
-                'description': data['weather'][0]['description'].capitalize(),
-                'icon': data['weather'][0]['icon'],
-                'icon_url': f"http://openweathermap.org/img/wn/{data['weather'][0]['icon']}@2x.png"
-            },
-            'temperature': {
-                'current': round(data['main']['temp'], 1),
-                'feels_like': round(data['main']['feels_like'], 1),
-                'min': round(data['main']['temp_min'], 1),
-                'max': round(data['main']['temp_max'], 1)
-            },
-            'humidity': data['main']['humidity'],
-            'pressure': data['main']['pressure'],
-            'wind': {'speed': round(data['wind']['speed'] * 3.6, 1)},
-            'visibility': data.get('visibility', 0) / 1000,
-            'sunrise': datetime.fromtimestamp(data['sys']['sunrise']).strftime('%H:%M'),
-            'sunset': datetime.fromtimestamp(data['sys']['sunset']).strftime('%H:%M'),
-            'timestamp': datetime.now().isoformat()
-        })
+        if status_code != 200:
+            return jsonify({'status': 'error', 'message': 'Failed to fetch weather'}), status_code
         
+        return jsonify({'status': 'success', **weather_payload(data), 'timestamp': datetime.now().isoformat()})
+    
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
+def weather_payload(data):
+    """The /api/weather/<city> fields of an OpenWeatherMap reply"""
+    return {
+        'city': data['name'],
+        'country': data['sys']['country'],
+        'coordinates': {'lat': data['coord']['lat'], 'lon': data['coord']['lon']},
+        'weather': {
+            'description': data['weather'][0]['description'].capitalize(),
+            'icon': data['weather'][0]['icon'],
+            'icon_url': f"http://openweathermap.org/img/wn/{data['weather'][0]['icon']}@2x.png"
+        },
+        'temperature': {
+            'current': round(data['main']['temp'], 1),
+            'feels_like': round(data['main']['feels_like'], 1),
+            'min': round(data['main']['temp_min'], 1),
+            'max': round(data['main']['temp_max'], 1)
+        },
+        'humidity': data['main']['humidity'],
+        'pressure': data['main']['pressure'],
+        'wind': {'speed': round(data['wind']['speed'] * 3.6, 1)},
+        'visibility': data.get('visibility', 0) / 1000,
+        'sunrise': datetime.fromtimestamp(data['sys']['sunrise']).strftime('%H:%M'),
+        'sunset': datetime.fromtimestamp(data['sys']['sunset']).strftime('%H:%M')
+    }
+
 @app.route('/api/weather/coords')
 def get_weather_by_coords():
     try:
@@ -106,16 +349,10 @@ def get_weather_by_coords():
         if lat is None or lon is None:
             return jsonify({'status': 'error', 'message': 'Lat/lon required'}), 400
         
-        response = requests.get(
-            f"{WEATHER_BASE_URL}/weather",
-            params={'lat': lat, 'lon': lon, 'appid': OPENWEATHER_API_KEY, 'units': 'metric'},
-            timeout=10
-        )
-        
-        if response.status_code != 200:
-            return jsonify({'status': 'error', 'message': 'Failed to fetch weather'}), response.status_code
+        status_code, data = fetch_weather(lat=lat, lon=lon)
         
-        data = response.json()
+        if status_code != 200:
+            return jsonify({'status': 'error', 'message': 'Failed to fetch weather'}), status_code
         
         return jsonify({
             'status': 'success',
@@ -125,288 +362,1270 @@ def get_weather_by_coords():
             'humidity': data['main']['humidity'],
             'weather': {'description': data['weather'][0]['description'].capitalize()}
         })
-        
+    
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
 
 # SEA LEVEL & CO2 DATA ENDPOINTS
+# Bodies of the dataset endpoints are serialized once per dataset version and
+# revalidated by ETag, so dashboard polling mostly gets 304s
+RESPONSE_MAX_AGE = int(os.getenv('RESPONSE_MAX_AGE', 60))
+response_cache = ResponseCache(app.json.dumps)
+
+def cached_json_response(key, version, build):
+    """JSON response for build(built_at) at version, or 304 if the client already has it"""
+    entry = response_cache.get(key, version, build)
+    if request.if_none_match.contains_weak(entry.etag):
+        response_cache.record_not_modified()
+        response = Response(status=304)
+    else:
+        response = Response(entry.body, mimetype='application/json')
+    response.set_etag(entry.etag)
+    response.last_modified = entry.built_at
+    response.headers['Cache-Control'] = f'public, max-age={RESPONSE_MAX_AGE}, must-revalidate'
+    return response
+
+# Historical series are served from the columnar store; the bundled CSVs are
+# ingested on first start and operators can load fuller datasets with
+# `python -m services.timeseries_store ingest ...`
+TIMESERIES_DIR = os.getenv('TIMESERIES_DIR', os.path.join(DATA_DIR, 'timeseries'))
+TIMESERIES_MAX_POINTS = 5000
+SEA_LEVEL_WINDOW = 125
+CO2_WINDOW = 52
+# The bundled Mauna Loa record ends in 2001: when it has to stand in for the
+# live reading, the CO2 payload says how old it is instead of passing it off as current
+CO2_STALE_DAYS = int(os.getenv('CO2_STALE_DAYS', 30))
+
+timeseries = None
+
+def init_timeseries():
+    global timeseries
+    from services.timeseries_store import TimeSeriesStore
+    store = TimeSeriesStore(TIMESERIES_DIR)
+    store.ensure(
+        'sea_level', os.path.join(DATA_DIR, 'series', 'sea_level_gmsl.csv'),
+        time_column='year', value_column='level', uncertainty_column='uncertainty',
+        units='mm', source='IPCC AR6 Report Data'
+    )
+    store.ensure(
+        'co2', os.path.join(DATA_DIR, 'series', 'co2_mauna_loa_weekly.csv'),
+        time_column='date', value_column='co2',
+        units='ppm', source='Mauna Loa Observatory weekly CO2 (Keeling & Whorf, SIO)'
+    )
+    timeseries = store
+
+def parse_range_args(default_last):
+    """(start, end, last, points) query arguments shared by the series endpoints"""
+    from services.timeseries_store import parse_times
+    start = request.args.get('start')
+    end = request.args.get('end')
+    points = request.args.get('points', type=int)
+    start = int(parse_times([start])[0]) if start else None
+    end = int(parse_times([end])[0]) if end else None
+    last = default_last if start is None and end is None else None
+    if points is not None and points <= 0:
+        raise ValueError('points must be positive')
+    return start, end, last, min(points or TIMESERIES_MAX_POINTS, TIMESERIES_MAX_POINTS)
+
+def build_sea_level_payload(series, columns, built_at):
+    import numpy as np
+    from services.timeseries_store import decimal_years
+    years = decimal_years(columns['time'])
+    levels = columns['value']
+    recent_data = [
+        {'year': round(year, 2), 'level': round(level, 2), 'uncertainty': round(uncertainty, 2)}
+        for year, level, uncertainty in zip(years.tolist(), levels.tolist(), columns['uncertainty'].tolist())
+    ]
+    rate = np.polyfit(years, levels, 1)[0] if len(years) > 1 else 0.0
+    
+    latest = recent_data[-1] if recent_data else {'level': None, 'year': None}
+    
+    return {
+        'status': 'success',
+        'data': {
+            'current_level': latest['level'],
+            'year': latest['year'],
+            'rate_per_year': round(float(rate), 2),
+            'recent_data': recent_data,
+            'units': series.meta['units'],
+            'source': series.meta['source'],
+            'last_updated': datetime.fromtimestamp(built_at).isoformat()
+        }
+    }
+
 @app.route('/api/sealevel/current')
+@requires('timeseries')
 def get_current_sea_level():
     try:
-        # Generate fallback data (IPCC-based)
-        recent_data = []
-        base_year = 1993.0
-        
-        for i in range(125):
-            year = base_year + (i * 0.25)
-            level = i * 0.925  # 3.7mm/year
-            recent_data.append({
-                'year': round(year, 2),
-                'level': round(level, 2),
-                'uncertainty': 4.0
-            })
+        series = timeseries.series('sea_level')
+        if series is None:
+            return jsonify({'status': 'error', 'message': 'Sea level series not loaded'}), 503
         
-        latest = recent_data[-1]
-        
-        return jsonify({
-            'status': 'success',
-            'data': {
-                'current_level': latest['level'],
-                'year': latest['year'],
-                'rate_per_year': 3.7,
-                'recent_data': recent_data,
-                'source': 'IPCC AR6 Report Data',
-                'last_updated': datetime.now().isoformat()
-            }
-        })
+        if not request.args:
+            # Queried only when the cached body is rebuilt, never for a hit or a 304
+            return cached_json_response('sealevel/current', series.version, lambda built_at: build_sea_level_payload(
+                series, series.query(last=SEA_LEVEL_WINDOW), built_at
+            ))
         
+        start, end, last, points = parse_range_args(SEA_LEVEL_WINDOW)
+        columns = series.query(start, end, last, points)
+        return jsonify(build_sea_level_payload(series, columns, datetime.now().timestamp()))
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
+def build_co2_payload(dates, values, latest_time, units, source, built_at):
+    """CO2 payload for ISO dates and ppm values; latest_time (unix seconds) dates the newest reading"""
+    recent_data = [{'date': date, 'co2': round(co2, 2)} for date, co2 in zip(dates, values)]
+    age_days = int((built_at - latest_time) // 86400) if latest_time is not None else None
+    
+    return {
+        'status': 'success',
+        'data': {
+            'current_co2': recent_data[-1]['co2'] if recent_data else None,
+            'date': dates[-1] if dates else None,
+            'data_age_days': age_days,
+            'stale': age_days is None or age_days > CO2_STALE_DAYS,
+            'recent_data': recent_data,
+            'units': units,
+            'source': source,
+            'last_updated': datetime.fromtimestamp(built_at).isoformat()
+        }
+    }
+
+def bundled_co2_payload(series, columns, built_at):
+    from services.timeseries_store import iso_dates
+    # Age of the series' latest reading, whatever range was asked for
+    latest_time = int(series.time[-1]) if len(series.time) else None
+    return build_co2_payload(iso_dates(columns['time']).tolist(), columns['value'].tolist(), latest_time,
+                             series.meta['units'], series.meta['source'], built_at)
+
+# The current reading comes from NOAA GML's weekly Mauna Loa file, refreshed
+# every CO2_LIVE_TTL seconds; the bundled record is only the fallback while
+# it is unreachable (retried after CO2_RETRY_SECONDS)
+CO2_BASE_URL = os.getenv('CO2_BASE_URL', "https://gml.noaa.gov/webdata/ccgg/trends/co2")
+CO2_SOURCE = 'NOAA GML Mauna Loa weekly CO2'
+co2_cache = TTLCache(maxsize=1, ttl=float(os.getenv('CO2_LIVE_TTL', 6 * 3600)))
+co2_failures = TTLCache(maxsize=1, ttl=float(os.getenv('CO2_RETRY_SECONDS', 300)))
+
+
+def parse_co2_weekly(text, window=CO2_WINDOW):
+    """The last `window` valid (date, ppm) rows of co2_weekly_mlo.csv; missing weeks are -999.99"""
+    rows = []
+    for line in text.splitlines():
+        if not line or line.startswith('#'):
+            continue
+        fields = line.split(',')
+        try:
+            year, month, day, value = int(fields[0]), int(fields[1]), int(fields[2]), float(fields[4])
+        except (IndexError, ValueError):
+            continue  # header row
+        if value > 0:
+            rows.append((f'{year:04d}-{month:02d}-{day:02d}', value))
+    return rows[-window:]
+
+
+def fetch_co2_weekly():
+    """Recent weekly (date, ppm) rows from NOAA GML, or None while it is unreachable"""
+    rows = co2_cache.get('weekly')
+    if rows is not None or co2_failures.get('weekly') is not None:
+        return rows
+    
+    try:
+        response = upstream.get('noaa-gml', f"{CO2_BASE_URL}/co2_weekly_mlo.csv", timeout=5)
+        if response.status_code == 200:
+            rows = parse_co2_weekly(response.text)
+    except requests.RequestException:
+        rows = None
+    
+    if rows:
+        co2_cache.set('weekly', rows)
+        return rows
+    co2_failures.set('weekly', True)
+    return None
+
+
+def live_co2_payload(rows, built_at):
+    dates = [date for date, _ in rows]
+    latest = datetime.strptime(dates[-1], '%Y-%m-%d').replace(tzinfo=timezone.utc).timestamp()
+    return build_co2_payload(dates, [value for _, value in rows], latest, 'ppm', CO2_SOURCE, built_at)
+
 @app.route('/api/climate/co2/current')
+@requires('timeseries')
 def get_current_co2():
     try:
-        recent_data = []
-        base_co2 = 420.0
-        
-        for i in range(52):
-            week_date = datetime.now() - timedelta(weeks=(52-i))
-            co2_value = base_co2 + (i * 0.05) + (2 * (i % 26 - 13) / 26)
-            recent_data.append({
-                'date': week_date.strftime('%Y-%m-%d'),
-                'co2': round(co2_value, 2)
+        series = timeseries.series('co2')
+        if series is None:
+            return jsonify({'status': 'error', 'message': 'CO2 series not loaded'}), 503
+        
+        if not request.args:
+            # Rebuilt daily as well, so the age and staleness flag stay true
+            rows = fetch_co2_weekly()
+            if rows is not None:
+                return cached_json_response('co2/current', ('live', tuple(rows[-1]), datetime.now().date()),
+                                            lambda built_at: live_co2_payload(rows, built_at))
+            return cached_json_response('co2/current', (series.version, datetime.now().date()),
+                                        lambda built_at: bundled_co2_payload(series, series.query(last=CO2_WINDOW),
+                                                                             built_at))
+        
+        # Date ranges are answered from the stored record
+        start, end, last, points = parse_range_args(CO2_WINDOW)
+        columns = series.query(start, end, last, points)
+        return jsonify(bundled_co2_payload(series, columns, datetime.now().timestamp()))
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+@app.route('/api/timeseries')
+@requires('timeseries')
+def list_timeseries():
+    from services.timeseries_store import iso_dates
+    try:
+        result = []
+        for name in timeseries.names():
+            series = timeseries.series(name)
+            first, last = iso_dates([series.time[0], series.time[-1]]).tolist() if len(series) else (None, None)
+            result.append({
+                'name': name,
+                'rows': len(series),
+                'start': first,
+                'end': last,
+                'units': series.meta['units'],
+                'source': series.meta['source']
             })
+        return jsonify({'status': 'success', 'series': result})
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+@app.route('/api/timeseries/<name>')
+@requires('timeseries')
+def query_timeseries(name):
+    import numpy as np
+    from services.timeseries_store import iso_dates
+    try:
+        series = timeseries.series(name)
+        if series is None:
+            return jsonify({'status': 'error', 'message': f'Series "{name}" not found'}), 404
+        
+        start, end, last, points = parse_range_args(None)
+        last = request.args.get('last', type=int)
+        columns = series.query(start, end, last, points)
         
+        # Columnar so a few thousand points stay a few small arrays
         return jsonify({
             'status': 'success',
-            'data': {
-                'current_co2': 424.5,
-                'date': datetime.now().strftime('%Y-%m-%d'),
-                'recent_data': recent_data,
-                'source': 'Based on Mauna Loa trends',
-                'last_updated': datetime.now().isoformat()
-            }
+            'name': name,
+            'units': series.meta['units'],
+            'count': len(columns['time']),
+            'time': iso_dates(columns['time']).tolist(),
+            'values': {column: np.round(values, 4).tolist() for column, values in columns.items() if column != 'time'}
         })
-        
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)}), 500
 # ML SEA LEVEL PREDICTION
-class SeaLevelPredictor:
-    def __init__(self):
-        self.poly_model = None
-        self.poly_features = PolynomialFeatures(degree=2)
-        self.is_trained = False
-        
-        self.historical_years = np.array([
-            1900, 1910, 1920, 1930, 1940, 1950, 1960, 1970, 1980, 1990,
-            2000, 2005, 2010, 2015, 2020, 2021, 2022, 2023, 2024
-        ])
-        
-        self.historical_levels = np.array([
-            0, 10, 15, 25, 40, 50, 70, 95, 120, 155,
-            205, 225, 245, 270, 282, 287, 291, 298, 305
-        ])
-        
-        self.city_factors = {
-            'Miami': {'factor': 1.8, 'elevation': 2, 'vulnerability': 'critical'},
-            'Venice': {'factor': 2.0, 'elevation': 1, 'vulnerability': 'critical'},
-            'Amsterdam': {'factor': 1.6, 'elevation': -2, 'vulnerability': 'critical'},
-            'Mumbai': {'factor': 1.5, 'elevation': 14, 'vulnerability': 'critical'},
-            'Shanghai': {'factor': 1.7, 'elevation': 4, 'vulnerability': 'critical'},
-            'Jakarta': {'factor': 1.9, 'elevation': 8, 'vulnerability': 'critical'},
-            'Bangkok': {'factor': 1.7, 'elevation': 1.5, 'vulnerability': 'critical'},
-            'New York': {'factor': 1.4, 'elevation': 10, 'vulnerability': 'high'},
-            'London': {'factor': 1.3, 'elevation': 11, 'vulnerability': 'high'},
-            'Tokyo': {'factor': 1.2, 'elevation': 40, 'vulnerability': 'moderate'},
-            'Sydney': {'factor': 1.1, 'elevation': 58, 'vulnerability': 'moderate'},
-            'Delhi': {'factor': 1.0, 'elevation': 216, 'vulnerability': 'low'},
-        }
+COASTLINE_PATH = os.getenv('COASTLINE_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'coastline.npy'))
+MODEL_ARTIFACT_PATH = os.getenv('MODEL_ARTIFACT_PATH', os.path.join(DATA_DIR, 'sea_level_model.json'))
+PROJECTION_TABLE_PATH = os.getenv('PROJECTION_TABLE_PATH', os.path.join(DATA_DIR, 'projection_table.npz'))
+# incremental: new observations (POST /api/ml/sealevel/observations) refit the
+# trend in place; artifact: the coefficients only change with a retrain
+MODEL_MODE = os.getenv('MODEL_MODE', 'artifact')
+MODEL_UPDATE_TOKEN = os.getenv('MODEL_UPDATE_TOKEN')
+OBSERVATIONS_MAX_ITEMS = int(os.getenv('OBSERVATIONS_MAX_ITEMS', 10000))
+# Observations are logged here and replayed on start; every worker picks up
+# batches logged by the others within OBSERVATIONS_SYNC_SECONDS
+OBSERVATIONS_DB_PATH = os.getenv('OBSERVATIONS_DB_PATH', os.path.join(DATA_DIR, 'observations.sqlite3'))
+OBSERVATIONS_SYNC_SECONDS = float(os.getenv('OBSERVATIONS_SYNC_SECONDS', 5))
+
+coastal_index = None
+ml_predictor = None
+observation_log = None
+
+def init_models():
+    global coastal_index, ml_predictor, observation_log
+    from ml_models.coastal_index import CoastalIndex
+    from ml_models.sea_level_predictor import SeaLevelPredictor
+    
+    coastal_index = CoastalIndex.load(COASTLINE_PATH) if os.path.exists(COASTLINE_PATH) else None
     
-    def train(self):
-        X = self.historical_years.reshape(-1, 1)
-        y = self.historical_levels
-        X_poly = self.poly_features.fit_transform(X)
-        self.poly_model = LinearRegression()
-        self.poly_model.fit(X_poly, y)
-        self.is_trained = True
+    backend = None
+    if MODEL_MODE == 'incremental':
+        from ml_models.online import IncrementalBackend
+        from services.observation_log import ObservationLog
+        backend = IncrementalBackend(MODEL_ARTIFACT_PATH)
+        observation_log = ObservationLog(OBSERVATIONS_DB_PATH)
+    
+    # One engine serves city, batch and global projections (with uncertainty
+    # bands from the precomputed table)
+    predictor = SeaLevelPredictor(table_path=PROJECTION_TABLE_PATH, artifact_path=MODEL_ARTIFACT_PATH,
+                                  coastal_index=coastal_index, backend=backend, observation_log=observation_log)
+    predictor.train()
+    if predictor.backend.trained:
         print("✅ ML Model trained successfully!")
+    else:
+        print(f"✅ ML Model loaded (trained {predictor.backend.trained_at})")
     
-    def predict_any_city(self, city_name, coordinates, target_years, scenario='moderate'):
-        if not self.is_trained:
-            self.train()
-        
-        lat = coordinates.get('lat', 0)
-        lon = coordinates.get('lon', 0)
-        elevation = coordinates.get('elevation', 50)
-        
-        coastal_distance = self._estimate_coastal_distance(lat, lon)
-        
-        if elevation <= 5 or coastal_distance < 10:
-            vulnerability = 'critical'
-            factor = 1.8
-        elif elevation <= 15 or coastal_distance < 50:
-            vulnerability = 'high'
-            factor = 1.5
-        elif elevation <= 30 or coastal_distance < 100:
-            vulnerability = 'moderate'
-            factor = 1.2
-        else:
-            vulnerability = 'low'
-            factor = 0.9
-        
-        predictions = []
-        scenario_mult = {'optimistic': 0.85, 'moderate': 1.0, 'pessimistic': 1.35}
-        multiplier = scenario_mult.get(scenario, 1.0)
-        
-        for year in target_years:
-            X_pred = np.array([[year]])
-            X_poly = self.poly_features.transform(X_pred)
-            global_rise = self.poly_model.predict(X_poly)[0] * multiplier
-            local_rise = global_rise * factor
-            
-            flooding_risk = min(100, (local_rise / (elevation * 1000)) * 100) if elevation > 0 else min(100, 80 + (local_rise / 10))
-            
-            if coastal_distance > 100:
-                flooding_risk *= 0.5
-            
-            predictions.append({
-                'year': year,
-                'global_rise': round(global_rise, 2),
-                'local_rise': round(local_rise, 2),
-                'elevation': elevation,
-                'flooding_risk': round(flooding_risk, 2),
-                'vulnerability': vulnerability
-            })
-        
-        return {
-            'city': city_name,
-            'predictions': predictions,
-            'city_factor': round(factor, 2),
-            'elevation': elevation,
-            'vulnerability': vulnerability
+    # Sweep results are keyed by the coefficients, so a new model leaves
+    # nothing reusable; other caches don't depend on the model
+    predictor.on_model_swap(lambda model: sweep_cache.clear())
+    ml_predictor = predictor
+
+# Long horizons can be streamed (ndjson / stream) or returned column-wise
+# (columnar) instead of as one list of row dicts
+PREDICTION_FORMATS = ('json', 'ndjson', 'stream', 'columnar')
+MAX_PREDICTION_YEARS = int(os.getenv('MAX_PREDICTION_YEARS', 100000))
+
+def parse_prediction_args():
+    """(target_years, format) from ?years=2030,2050 or ?start=&end=[&step=], and ?format="""
+    output_format = request.args.get('format', 'json')
+    if output_format not in PREDICTION_FORMATS:
+        raise ValueError(f'format must be one of {", ".join(PREDICTION_FORMATS)}')
+    return parse_year_args(), output_format
+
+def parse_year_args():
+    """Target years from ?years=2030,2050 or ?start=&end=[&step=]"""
+    start = request.args.get('start', type=int)
+    if start is None:
+        years = request.args.get('years', '2030,2050,2100')
+        target_years = [int(y.strip()) for y in years.split(',')]
+    else:
+        end = request.args.get('end', type=int)
+        step = request.args.get('step', 1, type=int)
+        if end is None or end < start or step <= 0:
+            raise ValueError('start, end and step must describe an increasing year range')
+        target_years = range(start, end + 1, step)
+    
+    if len(target_years) > MAX_PREDICTION_YEARS:
+        raise ValueError(f'At most {MAX_PREDICTION_YEARS} years per request')
+    return target_years
+
+def city_prediction_response(output_format, location, target_years, scenarios):
+    """ndjson / stream / columnar response for predict_any_city_sea_level"""
+    import numpy as np
+    coordinates = location['coordinates']
+    coastal_distance, vulnerability, factor = ml_predictor.classify(coordinates)
+    elevation = coordinates.get('elevation', 50)
+    meta = {
+        'city': location['name'],
+        'city_factor': round(factor, 2),
+        'elevation': elevation,
+        'vulnerability': vulnerability,
+        'elevation_source': location['elevation_source']
+    }
+    constants = {'elevation': elevation, 'vulnerability': vulnerability}
+    
+    def scenario_chunks(scenario, tag=False):
+        for columns in ml_predictor.iter_scenario_columns(coordinates, target_years, scenario, factor, coastal_distance):
+            if tag:
+                columns['scenario'] = [scenario] * len(columns['year'])
+            yield columns
+    
+    if output_format == 'columnar':
+        columns = ml_predictor.predict_columns(coordinates, target_years, scenarios, factor=factor,
+                                               coastal_distance=coastal_distance)
+        series = {
+            scenario: {
+                name: np.round(columns[name][i], 2).tolist()
+                for name in ('global_rise', 'local_rise', 'flooding_risk')
+            }
+            for i, scenario in enumerate(scenarios)
         }
+        data = dict(meta, year=columns['years'].tolist())
+        if len(scenarios) == 1:
+            data.update(series[scenarios[0]])
+        else:
+            data['scenarios'] = series
+        return jsonify({'status': 'success', 'data': data})
     
-    def _estimate_coastal_distance(self, lat, lon):
-        coastal_regions = [
-            {'lat_range': (25, 45), 'lon_range': (-80, -70), 'distance': 5},
-            {'lat_range': (25, 50), 'lon_range': (-125, -115), 'distance': 5},
-            {'lat_range': (35, 60), 'lon_range': (-10, 30), 'distance': 10},
-            {'lat_range': (0, 40), 'lon_range': (100, 140), 'distance': 10},
-            {'lat_range': (-20, 25), 'lon_range': (40, 100), 'distance': 10},
-        ]
-        
-        for region in coastal_regions:
-            if (region['lat_range'][0] <= lat <= region['lat_range'][1] and
-                region['lon_range'][0] <= lon <= region['lon_range'][1]):
-                return region['distance']
-        return 200
+    if output_format == 'ndjson':
+        # Header line with the city metadata, then one row per (scenario, year)
+        header = dict(meta, status='success', scenarios=scenarios)
+        tag = len(scenarios) > 1
+        stream = RowStream((columns for scenario in scenarios for columns in scenario_chunks(scenario, tag)), constants)
+        return Response(ndjson(stream, header), mimetype='application/x-ndjson')
     
-    def get_available_cities(self):
-        return sorted(list(self.city_factors.keys()))
-
-ml_predictor = SeaLevelPredictor()
-ml_predictor.train()
+    # stream: the same document as format=json, written out chunk by chunk
+    if len(scenarios) == 1:
+        data = dict(meta, predictions=RowStream(scenario_chunks(scenarios[0]), constants))
+    else:
+        data = dict(meta, scenarios={scenario: RowStream(scenario_chunks(scenario), constants) for scenario in scenarios})
+    return Response(json_document({'status': 'success', 'data': data}), mimetype='application/json')
 
 @app.route('/api/ml/sealevel/predict/any/<city>')
+@requires('models')
 def predict_any_city_sea_level(city):
     try:
         scenario = request.args.get('scenario', 'moderate')
-        years = request.args.get('years', '2030,2050,2100')
-        target_years = [int(y.strip()) for y in years.split(',')]
+        scenarios = request.args.get('scenarios')
+        target_years, output_format = parse_prediction_args()
         
-        response = requests.get(
-            "http://api.openweathermap.org/data/2.5/weather",
-            params={'q': city, 'appid': OPENWEATHER_API_KEY, 'units': 'metric'},
-            timeout=10
-        )
+        status_code, location = location_resolver.resolve(city)
         
-        if response.status_code == 404:
+        if status_code == 404:
             return jsonify({'status': 'error', 'message': f'City "{city}" not found'}), 404
         
-        weather_data = response.json()
+        if status_code != 200:
+            return jsonify({'status': 'error', 'message': 'Failed to fetch weather'}), status_code
         
-        coordinates = {
-            'lat': weather_data['coord']['lat'],
-            'lon': weather_data['coord']['lon'],
-            'elevation': 50
-        }
+        coordinates = location['coordinates']
         
+        if output_format != 'json':
+            scenario_list = [s.strip() for s in scenarios.split(',')] if scenarios else [scenario]
+            return city_prediction_response(output_format, location, target_years, scenario_list)
+        
+        if scenarios:
+            result = ml_predictor.predict_any_city_scenarios(
+                location['name'], coordinates, target_years, [s.strip() for s in scenarios.split(',')]
+            )
+        else:
+            result = ml_predictor.predict_any_city(location['name'], coordinates, target_years, scenario)
+        result['elevation_source'] = location['elevation_source']
+        
+        return jsonify({'status': 'success', 'data': result})
+    
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+def iter_global_columns(target_years, scenario):
+    for years in chunked(target_years):
+        yield ml_predictor.predict_global_columns(years, scenario)
+
+@app.route('/api/ml/sealevel/predict/global')
+@requires('models')
+def predict_global_sea_level():
+    try:
+        scenario = request.args.get('scenario', 'moderate')
+        target_years, output_format = parse_prediction_args()
+        
+        if output_format == 'json':
+            return jsonify({
+                'status': 'success',
+                'data': {'scenario': scenario, 'predictions': ml_predictor.predict_global(target_years, scenario)}
+            })
+        
+        if output_format == 'columnar':
+            columns = ml_predictor.predict_global_columns(target_years, scenario)
+            data = {name: column.tolist() for name, column in columns.items()}
+            data['scenario'] = scenario
+            return jsonify({'status': 'success', 'data': data})
+        
+        stream = RowStream(iter_global_columns(target_years, scenario))
+        if output_format == 'ndjson':
+            return Response(ndjson(stream, {'status': 'success', 'scenario': scenario}),
+                            mimetype='application/x-ndjson')
+        return Response(json_document({'status': 'success', 'data': {'scenario': scenario, 'predictions': stream}}),
+                        mimetype='application/json')
+    
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+# Monte Carlo percentiles, bounded in draws and in draws x years
+ENSEMBLE_MAX_DRAWS = int(os.getenv('ENSEMBLE_MAX_DRAWS', 100000))
+ENSEMBLE_MAX_CELLS = int(os.getenv('ENSEMBLE_MAX_CELLS', 50_000_000))
+
+@app.route('/api/ml/sealevel/predict/ensemble')
+@requires('models')
+def predict_ensemble_sea_level():
+    from ml_models.ensemble import DEFAULT_DRAWS, DEFAULT_PERCENTILES
+    try:
+        scenario = request.args.get('scenario', 'moderate')
+        target_years = parse_year_args()
+        draws = request.args.get('draws', DEFAULT_DRAWS, type=int)
+        seed = request.args.get('seed', 0, type=int)
+        percentiles = request.args.get('percentiles')
+        percentiles = [float(p) for p in percentiles.split(',')] if percentiles else list(DEFAULT_PERCENTILES)
+        
+        if not 0 < draws <= ENSEMBLE_MAX_DRAWS:
+            raise ValueError(f'draws must be 1-{ENSEMBLE_MAX_DRAWS}')
+        if draws * len(target_years) > ENSEMBLE_MAX_CELLS:
+            raise ValueError(f'draws x years must be at most {ENSEMBLE_MAX_CELLS}')
+        if not percentiles or not all(0 <= p <= 100 for p in percentiles):
+            raise ValueError('percentiles must be between 0 and 100')
+        
+        columns = ml_predictor.predict_global_ensemble(target_years, scenario, draws, seed, percentiles)
+        
+        return jsonify({
+            'status': 'success',
+            'data': {
+                'scenario': scenario,
+                'draws': draws,
+                'seed': seed,
+                'year': columns['year'].tolist(),
+                'mean': columns['mean'].tolist(),
+                'percentiles': {f'{p:g}': values.tolist() for p, values in columns['percentiles'].items()}
+            }
+        })
+    
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+# Bounded pool for resolving the distinct locations of a batch request
+batch_executor = ThreadPoolExecutor(max_workers=int(os.getenv('BATCH_WORKERS', 8)), thread_name_prefix='batch')
+BATCH_MAX_ITEMS = int(os.getenv('BATCH_MAX_ITEMS', 100))
+BATCH_MAX_CELLS = int(os.getenv('BATCH_MAX_CELLS', 1_000_000))
+
+
+def batch_location_key(item):
+    """Deduplication key for a batch item, or None if the item is malformed"""
+    if isinstance(item, str) and item.strip():
+        return ('city', normalize_city_name(item))
+    if isinstance(item, dict) and item.get('lat') is not None and item.get('lon') is not None:
         try:
-            elev_response = requests.get(
-                "https://api.open-meteo.com/v1/elevation",
-                params={'latitude': coordinates['lat'], 'longitude': coordinates['lon']},
-                timeout=5
+            return (
+                'coords',
+                round(float(item['lat']), WEATHER_CACHE_COORD_DECIMALS),
+                round(float(item['lon']), WEATHER_CACHE_COORD_DECIMALS),
+                item.get('elevation')
             )
-            if elev_response.status_code == 200:
-                elev_data = elev_response.json()
-                if 'elevation' in elev_data and elev_data['elevation']:
-                    coordinates['elevation'] = round(elev_data['elevation'][0], 1)
-        except:
-            pass
+        except (TypeError, ValueError):
+            return None
+    return None
+
+
+def resolve_batch_location(item):
+    """(status_code, location) for a city name or a {'lat', 'lon'[, 'name', 'elevation']} object"""
+    if isinstance(item, str):
+        return location_resolver.resolve(item)
+    
+    lat = float(item['lat'])
+    lon = float(item['lon'])
+    if item.get('elevation') is not None:
+        elevation, source = float(item['elevation']), 'request'
+    else:
+        elevation, source = get_elevation(lat, lon), 'store'
+    return 200, {
+        'name': item.get('name') or f'{lat:.4f},{lon:.4f}',
+        'coordinates': {'lat': lat, 'lon': lon, 'elevation': elevation},
+        'elevation_source': source
+    }
+
+
+@app.route('/api/ml/sealevel/predict/batch', methods=['POST'])
+@requires('models')
+def predict_batch_sea_level():
+    try:
+        body = request.get_json(silent=True)
+        if body is None:
+            body = {}
+        if not isinstance(body, dict):
+            return jsonify({'status': 'error', 'message': 'Request body must be a JSON object'}), 400
+        items = body.get('cities')
+        scenarios = body.get('scenarios') or ['moderate']
+        years = body.get('years', [2030, 2050, 2100])
         
-        result = ml_predictor.predict_any_city(weather_data['name'], coordinates, target_years, scenario)
+        if not isinstance(items, list) or not items:
+            return jsonify({'status': 'error', 'message': 'cities must be a non-empty list'}), 400
+        if len(items) > BATCH_MAX_ITEMS:
+            return jsonify({'status': 'error', 'message': f'At most {BATCH_MAX_ITEMS} cities per request'}), 400
         
-        return jsonify({'status': 'success', 'data': result})
+        known = ml_predictor.scenario_multipliers
+        if (not isinstance(scenarios, list) or not scenarios
+                or not all(isinstance(scenario, str) and scenario in known for scenario in scenarios)):
+            return jsonify({'status': 'error',
+                            'message': f'scenarios must be a non-empty list of {", ".join(known)}'}), 400
+        
+        if not isinstance(years, list) or not years:
+            return jsonify({'status': 'error', 'message': 'years must be a non-empty list of integers'}), 400
+        if len(years) > MAX_PREDICTION_YEARS:
+            return jsonify({'status': 'error', 'message': f'At most {MAX_PREDICTION_YEARS} years per request'}), 400
+        try:
+            target_years = [int(y) for y in years]
+        except (TypeError, ValueError):
+            return jsonify({'status': 'error', 'message': 'years must be a non-empty list of integers'}), 400
+        if len(items) * len(target_years) * len(scenarios) > BATCH_MAX_CELLS:
+            return jsonify({'status': 'error',
+                            'message': f'cities x years x scenarios must be at most {BATCH_MAX_CELLS}'}), 400
+        
+        keys = [batch_location_key(item) for item in items]
+        unique = {}
+        for key, item in zip(keys, items):
+            if key is not None:
+                unique.setdefault(key, item)
+        
+        resolved = dict(zip(unique, batch_executor.map(resolve_batch_location, unique.values())))
+        ok_keys = [key for key, (status_code, _) in resolved.items() if status_code == 200]
+        grid = ml_predictor.predict_grid(
+            [resolved[key][1]['coordinates'] for key in ok_keys], target_years, scenarios
+        )
+        grid_index = {key: i for i, key in enumerate(ok_keys)}
+        
+        results = []
+        for item, key in zip(items, keys):
+            if key is None:
+                results.append({'input': item, 'status': 'error',
+                                'message': 'Each city must be a name or an object with lat and lon'})
+                continue
+            
+            status_code, location = resolved[key]
+            if status_code == 404:
+                results.append({'input': item, 'status': 'error', 'message': f'City "{item}" not found'})
+            elif status_code != 200:
+                results.append({'input': item, 'status': 'error', 'message': 'Failed to resolve location'})
+            else:
+                data = ml_predictor.grid_city_result(grid, grid_index[key], location['name'])
+                data['elevation_source'] = location['elevation_source']
+                results.append({'input': item, 'status': 'success', 'data': data})
+        
+        failed = sum(1 for result in results if result['status'] == 'error')
+        return jsonify({
+            'status': 'success',
+            'count': len(results),
+            'failed': failed,
+            'unique_locations': len(unique),
+            'results': results
+        })
+    
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+
+# Pathway sweeps: results are cached under the hash of every input they depend
+# on (including the model coefficients); big sweeps are chunked under
+# SWEEP_MEMORY_CAP
+SWEEP_MAX_VALUES = int(os.getenv('SWEEP_MAX_VALUES', 500))
+SWEEP_MAX_CELLS = int(os.getenv('SWEEP_MAX_CELLS', 500_000_000))
+SWEEP_MAX_RESULT_CELLS = int(os.getenv('SWEEP_MAX_RESULT_CELLS', 2_000_000))
+SWEEP_MEMORY_CAP = int(os.getenv('SWEEP_MEMORY_CAP', 256 * 1024 * 1024))
+sweep_cache = TTLCache(
+    maxsize=int(os.getenv('SWEEP_CACHE_SIZE', 32)),
+    ttl=float(os.getenv('SWEEP_CACHE_TTL', 3600))
+)
+
+
+def sweep_years(spec):
+    """Years from a list or {'start', 'end'[, 'step']}"""
+    if isinstance(spec, dict):
+        try:
+            start, end, step = int(spec['start']), int(spec['end']), int(spec.get('step', 1))
+        except (KeyError, TypeError, ValueError):
+            raise ValueError('years must be a list of integers or {"start", "end", "step"}')
+        if end < start or step <= 0:
+            raise ValueError('start, end and step must describe an increasing year range')
+        return list(range(start, end + 1, step))
+    try:
+        return [int(y) for y in spec]
+    except (TypeError, ValueError):
+        raise ValueError('years must be a list of integers or {"start", "end", "step"}')
+
+
+def sweep_payload(sweep, result):
+    """Response data for a sweep result: years stay integers and NaN becomes null"""
+    import numpy as np
+    missing = np.isnan(result)
+    if sweep.reduction == 'first_year_over':
+        values = np.where(missing, 0, result).astype(np.int64).astype(object)
+    else:
+        values = np.round(result, 2).astype(object)
+    values[missing] = None
+    
+    data = {
+        'key': sweep.key(),
+        'quantity': sweep.quantity,
+        'reduction': sweep.reduction,
+        'axes': list(sweep.result_axes),
+        'shape': list(sweep.result_shape),
+        'cities': sweep.city_names,
+        'multipliers': sweep.multipliers.tolist(),
+        'accelerations': sweep.accelerations.tolist(),
+        'years': sweep.years.tolist(),
+        'values': values.tolist()
+    }
+    if sweep.reduction == 'first_year_over':
+        data['threshold'] = sweep.threshold
+    if sweep.reduction == 'percentile':
+        data['percentiles'] = sweep.percentiles
+    return data
+
+
+@app.route('/api/ml/sealevel/sweep', methods=['POST'])
+@requires('models')
+def sweep_sea_level():
+    import numpy as np
+    from ml_models.projection_table import ACCELERATION
+    from ml_models.sweep import parameter_values
+    try:
+        body = request.get_json(silent=True) or {}
+        multipliers = parameter_values(body.get('multipliers', list(ml_predictor.scenario_multipliers.values())), 'multipliers')
+        accelerations = parameter_values(body.get('accelerations', [ACCELERATION]), 'accelerations')
+        target_years = sweep_years(body.get('years', [2030, 2050, 2100]))
+        items = body.get('cities') or []
+        
+        if not (0 < len(multipliers) <= SWEEP_MAX_VALUES and 0 < len(accelerations) <= SWEEP_MAX_VALUES):
+            raise ValueError(f'multipliers and accelerations need 1-{SWEEP_MAX_VALUES} values')
+        if not 0 < len(target_years) <= MAX_PREDICTION_YEARS:
+            raise ValueError(f'years needs 1-{MAX_PREDICTION_YEARS} values')
+        if not isinstance(items, list) or len(items) > BATCH_MAX_ITEMS:
+            raise ValueError(f'cities must be a list of at most {BATCH_MAX_ITEMS}')
         
+        keys = [batch_location_key(item) for item in items]
+        if None in keys:
+            raise ValueError('Each city must be a name or an object with lat and lon')
+        unique = dict(zip(keys, items))
+        resolved = dict(zip(unique, batch_executor.map(resolve_batch_location, unique.values())))
+        failed = [unique[key] for key, (status_code, _) in resolved.items() if status_code != 200]
+        if failed:
+            return jsonify({'status': 'error', 'message': 'Could not resolve cities', 'cities': failed}), 404
+        locations = [resolved[key][1] for key in unique]
+        
+        sweep = ml_predictor.build_sweep(
+            multipliers, accelerations, target_years,
+            locations=[location['coordinates'] for location in locations],
+            names=[location['name'] for location in locations],
+            quantity=body.get('quantity', 'global_rise'),
+            reduction=body.get('reduction', 'max'),
+            threshold=body.get('threshold'),
+            percentiles=body.get('percentiles')
+        )
+        if sweep.cells > SWEEP_MAX_CELLS:
+            raise ValueError(f'Sweep has {sweep.cells} cells; the limit is {SWEEP_MAX_CELLS}')
+        if int(np.prod(sweep.result_shape)) > SWEEP_MAX_RESULT_CELLS:
+            raise ValueError(f'Result would have more than {SWEEP_MAX_RESULT_CELLS} values; add a reduction')
+        
+        key = sweep.key()
+        data = sweep_cache.get(key)
+        cached = data is not None
+        if not cached:
+            data = sweep_payload(sweep, sweep.run(memory_cap=SWEEP_MEMORY_CAP))
+            sweep_cache.set(key, data)
+        
+        return jsonify({'status': 'success', 'cached': cached, 'data': data})
+    
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
+
+def crossing_entry(crossing, year, start):
+    """{'year', 'crossing', 'reached_at_start'} with NaN (not reached) as null"""
+    import math
+    if math.isnan(year):
+        return {'year': None, 'crossing': None, 'reached_at_start': False}
+    return {'year': int(year), 'crossing': round(float(crossing), 2), 'reached_at_start': int(year) == start}
+
+
+@app.route('/api/ml/sealevel/crossing', methods=['POST'])
+@requires('models')
+def sea_level_crossing():
+    """
+    Inverse query: the first year each city (or, without cities, the global
+    projection) reaches a threshold, per scenario
+    """
+    try:
+        body = request.get_json(silent=True) or {}
+        items = body.get('cities') or []
+        scenarios = body.get('scenarios') or ['moderate']
+        quantity = body.get('quantity', 'flooding_risk' if items else 'global_rise')
+        try:
+            threshold = float(body['threshold'])
+            start = int(body.get('start', datetime.now().year))
+            end = int(body.get('end', max(start, 2300)))
+        except (KeyError, TypeError, ValueError):
+            raise ValueError('threshold (number), start and end (years) are required as numbers')
+        
+        if end < start or end - start >= MAX_PREDICTION_YEARS:
+            raise ValueError(f'end must be within {MAX_PREDICTION_YEARS} years after start')
+        if not isinstance(items, list) or len(items) > BATCH_MAX_ITEMS:
+            raise ValueError(f'cities must be a list of at most {BATCH_MAX_ITEMS}')
+        
+        data = {'threshold': threshold, 'quantity': quantity, 'start': start, 'end': end, 'scenarios': scenarios}
+        if not items:
+            if quantity != 'global_rise':
+                raise ValueError(f'{quantity} needs cities')
+            crossings = ml_predictor.predict_global_crossing(threshold, scenarios, start, end)
+            data['crossings'] = {
+                scenario: crossing_entry(crossing, year, start) for scenario, (crossing, year) in crossings.items()
+            }
+            return jsonify({'status': 'success', 'data': data})
+        
+        keys = [batch_location_key(item) for item in items]
+        unique = {}
+        for key, item in zip(keys, items):
+            if key is not None:
+                unique.setdefault(key, item)
+        
+        resolved = dict(zip(unique, batch_executor.map(resolve_batch_location, unique.values())))
+        ok_keys = [key for key, (status_code, _) in resolved.items() if status_code == 200]
+        crossings = ml_predictor.predict_crossings(
+            [resolved[key][1]['coordinates'] for key in ok_keys], threshold, scenarios, quantity, start, end
+        )
+        index = {key: i for i, key in enumerate(ok_keys)}
+        
+        results = []
+        for item, key in zip(items, keys):
+            if key is None:
+                results.append({'input': item, 'status': 'error',
+                                'message': 'Each city must be a name or an object with lat and lon'})
+                continue
+            
+            status_code, location = resolved[key]
+            if status_code == 404:
+                results.append({'input': item, 'status': 'error', 'message': f'City "{item}" not found'})
+            elif status_code != 200:
+                results.append({'input': item, 'status': 'error', 'message': 'Failed to resolve location'})
+            else:
+                i = index[key]
+                results.append({'input': item, 'status': 'success', 'data': {
+                    'city': location['name'],
+                    'city_factor': round(crossings['factors'][i], 2),
+                    'elevation': crossings['elevations'][i],
+                    'vulnerability': crossings['vulnerabilities'][i],
+                    'elevation_source': location['elevation_source'],
+                    'crossings': {
+                        scenario: crossing_entry(crossings['crossing'][i, j], crossings['year'][i, j], start)
+                        for j, scenario in enumerate(scenarios)
+                    }
+                }})
+        
+        # order=earliest ranks cities by when they cross in the first scenario
+        if body.get('order') == 'earliest':
+            def rank(result):
+                if result['status'] != 'success':
+                    return (2, 0)
+                entry = result['data']['crossings'][scenarios[0]]
+                return (entry['year'] is None, entry['crossing'] or 0)
+            results.sort(key=rank)
+        
+        data['results'] = results
+        data['failed'] = sum(1 for result in results if result['status'] == 'error')
+        return jsonify({'status': 'success', 'data': data})
+    
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+
+@app.before_request
+def sync_observations():
+    """Apply observations other workers logged, at most every OBSERVATIONS_SYNC_SECONDS and never blocking"""
+    if observation_log is not None and ml_predictor is not None:
+        ml_predictor.sync(OBSERVATIONS_SYNC_SECONDS)
+
+
+# The batch is logged before it is applied, so it survives restarts and
+# reaches every worker (see sync_observations)
+@app.route('/api/ml/sealevel/observations', methods=['POST'])
+@requires('models')
+def add_sea_level_observations():
+    denied = check_token(MODEL_UPDATE_TOKEN, 'Model updates')
+    if denied:
+        return denied
+    
+    try:
+        observations = (request.get_json(silent=True) or {}).get('observations')
+        if not isinstance(observations, list) or not 0 < len(observations) <= OBSERVATIONS_MAX_ITEMS:
+            raise ValueError(f'observations must be a list of 1-{OBSERVATIONS_MAX_ITEMS} {{"year", "level"}} objects')
+        try:
+            years = [float(item['year']) for item in observations]
+            levels = [float(item['level']) for item in observations]
+        except (KeyError, TypeError, ValueError):
+            raise ValueError('Each observation needs a numeric year and level (mm)')
+        
+        version = ml_predictor.observe(years, levels)
+        return jsonify({'status': 'success', 'model_version': version, 'model': ml_predictor.get_model_info()})
+    
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+
 @app.route('/api/ml/sealevel/cities')
+@requires('models')
 def get_available_cities():
     try:
-        return jsonify({
+        cities = ml_predictor.get_available_cities()
+        return cached_json_response('ml/sealevel/cities', tuple(cities), lambda built_at: {
             'status': 'success',
-            'cities': ml_predictor.get_available_cities(),
-            'count': len(ml_predictor.get_available_cities())
+            'cities': cities,
+            'count': len(cities)
         })
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
 # DISASTER RISK ASSESSMENT
-disaster_predictor = DisasterRiskPredictor()
+disaster_predictor = None
+
+def assess_city(city):
+    """Fresh weather + DisasterRiskPredictor assessment for a city, or None without weather data"""
+    weather_result = get_weather_data_internal(city)
+    
+    if not weather_result:
+        return None
+    
+    elevation = weather_result.get('elevation', 50)
+    humidity = weather_result.get('humidity', 70)
+    rainfall = weather_result.get('rainfall', humidity / 2)
+    
+    current_weather = {
+        'rainfall': rainfall,
+        'humidity': humidity,
+        'temperature': weather_result.get('temperature', 25)
+    }
+    
+    return disaster_predictor.assess_city_risk(weather_result.get('city', city), elevation, current_weather)
+
+def refresh_city(city):
+    """Weather payload and risk assessment of a city as the alert scheduler stores them, or None without weather"""
+    status_code, data = fetch_weather(city=city)
+    if status_code != 200:
+        return None
+    risk = assess_city(city)
+    if risk is None:
+        return None
+    return {'weather': weather_payload(data), 'risk': risk}
 
 @app.route('/api/risk/assess/<city>')
+@requires('risk')
 def assess_disaster_risk(city):
     try:
-        weather_result = get_weather_data_internal(city)
+        # Watched cities are answered from the scheduler's store while the result is recent enough
+        snapshot = alert_scheduler.get(city, max_age=ALERT_MAX_AGE)
+        if snapshot is not None:
+            response = jsonify({'status': 'success', 'data': snapshot['data']['risk']})
+            response.headers['Age'] = str(int(alert_scheduler.age(snapshot)))
+            return response
         
-        if not weather_result:
+        assessment = assess_city(city)
+        
+        if assessment is None:
             return jsonify({'status': 'error', 'message': 'Could not fetch weather data'}), 404
         
-        elevation = weather_result.get('elevation', 50)
-        humidity = weather_result.get('humidity', 70)
-        rainfall = weather_result.get('rainfall', humidity / 2)
+        return jsonify({'status': 'success', 'data': assessment})
+    
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+
+# WATCHED CITIES & ALERTS
+# A background scheduler keeps weather and risk of the watched cities fresh, so
+# /api/risk/assess reads them from memory, and records an alert whenever a
+# city's risk level changes. Each process runs its own scheduler: the rate
+# limit (upstream refreshes per second) applies per worker. A preloading
+# gunicorn master stops its scheduler before forking (before_fork) and every
+# worker restarts it (after_fork). Changing the watch-list takes
+# 'Authorization: Bearer <ALERT_WATCHLIST_TOKEN>', as every watched city
+# costs upstream calls; without the token only ALERT_WATCHLIST is watched.
+ALERT_WATCHLIST = [city.strip() for city in os.getenv('ALERT_WATCHLIST', '').split(',') if city.strip()]
+ALERT_WATCHLIST_TOKEN = os.getenv('ALERT_WATCHLIST_TOKEN')
+ALERT_INTERVAL = float(os.getenv('ALERT_INTERVAL', 600))
+ALERT_MAX_AGE = float(os.getenv('ALERT_MAX_AGE', 2 * ALERT_INTERVAL))
+
+
+def publish_refresh(key, snapshot):
+    """Push a refreshed city to its stream subscribers (see LIVE UPDATES)"""
+    push_hub.publish(f'city:{key}', city_state(snapshot))
+
+
+def publish_alert(alert):
+    push_hub.send(f"city:{alert['key']}", 'alert', alert)
+
+
+alert_scheduler = AlertScheduler(
+    refresh_city,
+    interval=ALERT_INTERVAL,
+    jitter=float(os.getenv('ALERT_JITTER', 0.1)),
+    rate=float(os.getenv('ALERT_RATE', 1)),
+    burst=int(os.getenv('ALERT_BURST', 5)),
+    max_watched=int(os.getenv('ALERT_MAX_WATCHED', 200)),
+    history=int(os.getenv('ALERT_HISTORY', 500)),
+    key=normalize_city_name,
+    on_refresh=publish_refresh,
+    on_alert=publish_alert
+)
+
+
+def init_alerts():
+    for city in ALERT_WATCHLIST:
+        alert_scheduler.watch(city)
+    alert_scheduler.start()
+
+
+@app.route('/api/alerts')
+def get_alerts():
+    limit = request.args.get('limit', 50, type=int)
+    alerts = alert_scheduler.alerts(city=request.args.get('city'), limit=max(limit, 0))
+    return jsonify({'status': 'success', 'alerts': alerts, 'count': len(alerts)})
+
+
+@app.route('/api/alerts/watchlist', methods=['GET', 'POST'])
+def alert_watchlist():
+    try:
+        if request.method == 'POST':
+            denied = check_token(ALERT_WATCHLIST_TOKEN, 'Watch-list changes')
+            if denied:
+                return denied
+            cities = (request.get_json(silent=True) or {}).get('cities')
+            if not isinstance(cities, list) or not all(isinstance(city, str) and city.strip() for city in cities):
+                return jsonify({'status': 'error', 'message': 'cities must be a list of city names'}), 400
+            added = []
+            for city in cities:
+                if alert_scheduler.watch(city.strip()):
+                    added.append(city.strip())
+                else:
+                    # Watched on purpose now: keep it when its stream subscribers leave
+                    stream_watched.discard(normalize_city_name(city))
+            return jsonify({'status': 'success', 'added': added, 'watched': alert_scheduler.watched()})
         
-        current_weather = {
-            'rainfall': rainfall,
-            'humidity': humidity,
-            'temperature': weather_result.get('temperature', 25)
-        }
+        cities = [
+            {key: snapshot[key] for key in ('city', 'level', 'refreshed_at', 'error')}
+            for snapshot in alert_scheduler.snapshots()
+        ]
+        return jsonify({'status': 'success', 'cities': cities, 'scheduler': alert_scheduler.stats()})
+    
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+
+@app.route('/api/alerts/watchlist/<city>', methods=['DELETE'])
+def unwatch_city(city):
+    denied = check_token(ALERT_WATCHLIST_TOKEN, 'Watch-list changes')
+    if denied:
+        return denied
+    if not alert_scheduler.unwatch(city):
+        return jsonify({'status': 'error', 'message': f'{city} is not watched'}), 404
+    return jsonify({'status': 'success', 'watched': alert_scheduler.watched()})
+
+
+# LIVE UPDATES
+# Clients subscribe to cities (and the sea level / CO2 summary) over one
+# Server-Sent Events request and are pushed merge patches when weather or risk
+# changes. A subscribed city is put on the alert scheduler's watch-list, so it
+# is refreshed once per ALERT_INTERVAL however many clients follow it; note
+# each worker keeps its own watch-list.
+#
+# Every open stream holds a server thread, so a worker accepts at most
+# STREAM_MAX_OPEN streams (gunicorn.conf.py derives it from GUNICORN_THREADS,
+# keeping threads free for ordinary requests) and answers 503 + Retry-After
+# beyond that. Cities a stream adds to the watch-list cost upstream calls, so
+# each client (by remote address) may add STREAM_WATCH_RATE per second in
+# bursts of STREAM_WATCH_BURST, and streams hold at most STREAM_MAX_WATCHED
+# of the scheduler's ALERT_MAX_WATCHED slots.
+STREAM_MAX_CITIES = int(os.getenv('STREAM_MAX_CITIES', 10))
+STREAM_MAX_OPEN = int(os.getenv('STREAM_MAX_OPEN', 56))
+STREAM_RETRY_AFTER = int(os.getenv('STREAM_RETRY_AFTER', 30))
+STREAM_WATCH_RATE = float(os.getenv('STREAM_WATCH_RATE', 0.05))
+STREAM_WATCH_BURST = int(os.getenv('STREAM_WATCH_BURST', STREAM_MAX_CITIES))
+STREAM_MAX_WATCHED = int(os.getenv('STREAM_MAX_WATCHED', 100))
+STREAM_KEEPALIVE = float(os.getenv('STREAM_KEEPALIVE', 15))
+STREAM_RETRY_MS = int(os.getenv('STREAM_RETRY_MS', 5000))  # client reconnect delay
+SEA_LEVEL_TOPIC = 'sealevel'
+stream_watched = set()  # cities the streams added to the watch-list, dropped with their last subscriber
+
+# Per-client token buckets; an idle client's entry expires once its bucket would be full again
+stream_clients = TTLCache(maxsize=int(os.getenv('STREAM_CLIENTS', 10000)), ttl=STREAM_WATCH_BURST / STREAM_WATCH_RATE)
+
+
+def city_topic(city):
+    return f'city:{normalize_city_name(city)}'
+
+
+def city_state(snapshot):
+    data = snapshot['data'] or {}
+    return {
+        'city': snapshot['city'],
+        'weather': data.get('weather'),
+        'risk': data.get('risk'),
+        'level': snapshot['level'],
+        'error': snapshot['error']
+    }
+
+
+def sea_level_state():
+    sea_level, co2 = timeseries.series('sea_level'), timeseries.series('co2')
+    built_at = datetime.now().timestamp()
+    rows = fetch_co2_weekly()
+    if rows is not None:
+        co2_payload = live_co2_payload(rows, built_at)
+    else:
+        co2_payload = bundled_co2_payload(co2, co2.query(last=CO2_WINDOW), built_at)
+    return {
+        'sea_level': build_sea_level_payload(sea_level, sea_level.query(last=SEA_LEVEL_WINDOW), built_at)['data'],
+        'co2': co2_payload['data']
+    }
+
+
+def open_topic(topic):
+    if topic == SEA_LEVEL_TOPIC:
+        if push_hub.state(topic) is None:
+            push_hub.publish(topic, sea_level_state())
+        return
+    
+    city = topic.split(':', 1)[1]
+    if city not in {normalize_city_name(watched) for watched in alert_scheduler.watched()}:
+        if len(stream_watched) >= STREAM_MAX_WATCHED:
+            raise ValueError(f'Streams already follow {STREAM_MAX_WATCHED} cities')
+    if alert_scheduler.watch(city):
+        stream_watched.add(city)
+    else:
+        snapshot = alert_scheduler.get(city)
+        if snapshot is not None:
+            push_hub.publish(topic, city_state(snapshot))
+
+
+def close_topic(topic):
+    city = topic.split(':', 1)[-1]
+    if city in stream_watched:
+        stream_watched.discard(city)
+        alert_scheduler.unwatch(city)
+        push_hub.discard(topic)
+
+
+push_hub = PushHub(
+    max_queue=int(os.getenv('STREAM_QUEUE_SIZE', 64)),
+    max_subscribers=STREAM_MAX_OPEN,
+    on_first=open_topic,
+    on_last=close_topic
+)
+
+
+@app.route('/api/stream')
+@requires('timeseries', 'risk', 'alerts')
+def stream_updates():
+    import math
+    cities = list(dict.fromkeys(city.strip() for city in request.args.get('cities', '').split(',') if city.strip()))
+    sea_level = request.args.get('sealevel', 'false').lower() in ('1', 'true', 'yes')
+    if not cities and not sea_level:
+        return jsonify({'status': 'error', 'message': 'Subscribe to cities=<a,b,...> and/or sealevel=true'}), 400
+    if len(cities) > STREAM_MAX_CITIES:
+        return jsonify({'status': 'error', 'message': f'At most {STREAM_MAX_CITIES} cities per stream'}), 400
+    
+    topics = {city: city_topic(city) for city in cities}
+    if sea_level:
+        topics['sealevel'] = SEA_LEVEL_TOPIC
+    
+    watched = {normalize_city_name(city) for city in alert_scheduler.watched()}
+    adding = sum(normalize_city_name(city) not in watched for city in cities)
+    if adding:
+        bucket = stream_clients.get(request.remote_addr)
+        if bucket is None:
+            bucket = TokenBucket(STREAM_WATCH_RATE, STREAM_WATCH_BURST)
+        wait = bucket.take(min(adding, bucket.burst))
+        stream_clients.set(request.remote_addr, bucket)
+        if wait:
+            response = jsonify({'status': 'error', 'message': 'Too many new cities subscribed, try again later'})
+            response.status_code = 429
+            response.headers['Retry-After'] = str(math.ceil(wait))
+            return response
+    
+    try:
+        subscription = push_hub.subscribe(topics.values(), prelude=sse_frame('subscribed', {'topics': topics}))
+    except ValueError as e:
+        # This worker's streams or the watch-list are full
+        response = jsonify({'status': 'error', 'message': str(e)})
+        response.status_code = 503
+        response.headers['Retry-After'] = str(STREAM_RETRY_AFTER)
+        return response
+    
+    def events():
+        yield f'retry: {STREAM_RETRY_MS}\n\n'.encode()
+        yield from subscription.frames(STREAM_KEEPALIVE)
+    
+    response = Response(events(), mimetype='text/event-stream')
+    # The server closes the response even if the client left before the first frame
+    response.call_on_close(subscription.close)
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+
+@app.route('/api/stream/stats')
+def get_stream_stats():
+    return jsonify({'status': 'success', 'stream': push_hub.stats()})
+
+# Gridded risk is sampled from local elevation tiles, never from the network
+ELEVATION_TILE_DIR = os.getenv('ELEVATION_TILE_DIR', os.path.join(DATA_DIR, 'elevation_tiles'))
+elevation_tiles = None
+
+def init_risk():
+    global disaster_predictor, elevation_tiles
+    from ml_models.disaster_risk_predictor import DisasterRiskPredictor
+    from services.elevation_tiles import ElevationTileStore
+    import services.risk_raster  # imported here so the first /api/risk/raster doesn't pay for it
+    
+    disaster_predictor = DisasterRiskPredictor()
+    elevation_tiles = ElevationTileStore(ELEVATION_TILE_DIR)
+RASTER_MAX_SIZE = int(os.getenv('RASTER_MAX_SIZE', 2048))
+RASTER_MEMORY_BUDGET = int(os.getenv('RASTER_MEMORY_BUDGET', 16 * 1024 * 1024))
+
+@app.route('/api/risk/raster')
+@requires('risk')
+def get_risk_raster():
+    from services.risk_raster import HAZARDS, iter_risk_chunks, encode_npy, encode_png
+    try:
+        try:
+            bbox = tuple(float(v) for v in request.args.get('bbox', '').split(','))
+        except ValueError:
+            bbox = ()
+        if len(bbox) != 4 or not (bbox[0] < bbox[2] and bbox[1] < bbox[3]):
+            return jsonify({'status': 'error', 'message': 'bbox must be min_lon,min_lat,max_lon,max_lat'}), 400
+        if not (-180 <= bbox[0] and bbox[2] <= 180 and -90 <= bbox[1] and bbox[3] <= 90):
+            return jsonify({'status': 'error', 'message': 'bbox is outside valid coordinates'}), 400
         
-        assessment = disaster_predictor.assess_city_risk(weather_result.get('city', city), elevation, current_weather)
+        width = request.args.get('width', 256, type=int)
+        height = request.args.get('height', 256, type=int)
+        if not (0 < width <= RASTER_MAX_SIZE and 0 < height <= RASTER_MAX_SIZE):
+            return jsonify({'status': 'error', 'message': f'width and height must be 1-{RASTER_MAX_SIZE}'}), 400
         
-        return jsonify({'status': 'success', 'data': assessment})
+        hazard = request.args.get('hazard', 'flood')
+        if hazard not in HAZARDS:
+            return jsonify({'status': 'error', 'message': f'hazard must be one of {", ".join(HAZARDS)}'}), 400
+        
+        output = request.args.get('format', 'npy')
+        if output not in ('npy', 'png'):
+            return jsonify({'status': 'error', 'message': 'format must be npy or png'}), 400
+        
+        # Without tiles every pixel would be NaN: say so instead of sending an empty raster
+        coverage = elevation_tiles.coverage(bbox)
+        if coverage == 0:
+            return jsonify({'status': 'error', 'message': 'No elevation tiles cover this bbox', 'coverage': 0}), 404
+        
+        chunks = iter_risk_chunks(
+            elevation_tiles, disaster_predictor, bbox, width, height, hazard,
+            rainfall=request.args.get('rainfall', 0.0, type=float),
+            humidity=request.args.get('humidity', 70.0, type=float),
+            memory_budget=RASTER_MEMORY_BUDGET
+        )
         
+        if output == 'png':
+            body, mimetype = encode_png(chunks, width, height), 'image/png'
+        else:
+            body, mimetype = encode_npy(chunks, width, height), 'application/octet-stream'
+        
+        response = Response(body, mimetype=mimetype)
+        response.headers['X-Raster-Bbox'] = ','.join(str(v) for v in bbox)
+        response.headers['X-Raster-Shape'] = f'{height},{width}'
+        response.headers['X-Raster-Coverage'] = f'{coverage:.4f}'
+        response.headers['Content-Disposition'] = f'inline; filename="{hazard}_risk.{output}"'
+        return response
+    
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
 def get_weather_data_internal(city):
     try:
-        response = requests.get(
-            f"{WEATHER_BASE_URL}/weather",
-            params={'q': city, 'appid': OPENWEATHER_API_KEY, 'units': 'metric'},
-            timeout=10
-        )
+        status_code, data = fetch_weather(city=city)
         
-        if response.status_code == 200:
-            data = response.json()
+        if status_code == 200:
             return {
                 'city': data['name'],
                 'temperature': data['main']['temp'],
                 'humidity': data['main']['humidity'],
                 'rainfall': data.get('rain', {}).get('1h', 0) * 24,
-                'elevation': 50
+                'elevation': get_elevation(data['coord']['lat'], data['coord']['lon'])
             }
     except:
         pass
@@ -421,6 +1640,31 @@ def not_found(error):
 def internal_error(error):
     return jsonify({'status': 'error', 'message': 'Internal server error'}), 500
 
+# STARTUP
+# Models first: they back the most endpoints; the gazetteer index is only an
+# accelerator for city lookups, so it loads last
+startup.add('models', init_models)
+startup.add('timeseries', init_timeseries)
+startup.add('risk', init_risk)
+startup.add('alerts', init_alerts)
+startup.add('gazetteer', init_gazetteer)
+
+if STARTUP_MODE != 'manual':
+    startup.start(background=STARTUP_MODE != 'eager')
+
+def before_fork():
+    """Stop threads of a preloading parent: only the workers refresh watched cities"""
+    alert_scheduler.stop()
+
+def after_fork():
+    """Per-process resources a forked worker must not inherit from a preloading parent"""
+    elevation_store.reopen()
+    if observation_log is not None:
+        observation_log.reopen()
+    upstream.close()
+    if startup.is_ready('alerts'):
+        alert_scheduler.restart()
+
 # START SERVER
 if __name__ == '__main__':
     print("=" * 60)
@@ -0,0 +1,152 @@
+"""
+Benchmark: background risk refresh for watched cities, on a fake clock
+
+Drives AlertScheduler.run_pending() through simulated hours with a stub
+upstream whose risk drifts along a per-city sine wave, and checks that:
+- no window of w seconds holds more than burst + rate * w upstream calls,
+- each city's refresh intervals stay within interval * (1 +/- jitter), and
+  what the jitter costs in rate-limit waits,
+- alerts are recorded exactly when a city's level changes between refreshes,
+then times request-time reads from the store against assessing on demand.
+
+Run from the backend folder:
+    python -m benchmarks.bench_alerts
+"""
+
+import math
+import random
+import time
+
+import numpy as np
+
+from ml_models.disaster_risk_predictor import DisasterRiskPredictor
+from services.alert_system import AlertScheduler, risk_level
+
+CITIES = 500
+INTERVAL = 300
+RATE, BURST = 2.0, 5
+HOURS = 6
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+    
+    def __call__(self):
+        return self.now
+    
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class StubUpstream:
+    """Records every call; a city's combined risk follows its own slow sine wave"""
+    def __init__(self, clock):
+        self.clock = clock
+        self.calls = []
+        self.levels = {}
+    
+    def refresh(self, city):
+        index = int(city.split('-')[1])
+        now = self.clock()
+        risk = 45 + 40 * math.sin(2 * math.pi * now / (3600 + 60 * index) + index)
+        data = {'risk': {'city': city, 'combined_risk': round(risk, 1)}}
+        self.calls.append((now, city))
+        self.levels.setdefault(city, []).append(risk_level(data))
+        return data
+
+
+def simulate(jitter, seconds=HOURS * 3600, seed=0):
+    clock = FakeClock()
+    upstream = StubUpstream(clock)
+    scheduler = AlertScheduler(upstream.refresh, interval=INTERVAL, jitter=jitter, rate=RATE, burst=BURST,
+                               max_watched=CITIES, history=10 ** 6, clock=clock, sleep=clock.sleep,
+                               rng=random.Random(seed))
+    for i in range(CITIES):
+        scheduler.watch(f'city-{i}')
+    
+    while clock.now < seconds:
+        scheduler.run_pending()
+        clock.now = max(clock.now, scheduler.next_due())
+    return scheduler, upstream
+
+
+def max_in_window(times, window):
+    """Most calls inside any half-open window [t, t + window)"""
+    times = np.sort(times)
+    return int((np.searchsorted(times, times + window, side='left') - np.arange(len(times))).max())
+
+
+def report_rate_limit(upstream):
+    times = np.array([at for at, _ in upstream.calls])
+    print(f"{'window s':>9} {'max calls':>10} {'allowed':>8}")
+    for window in (1, 10, 60, 600):
+        allowed = BURST + RATE * window
+        print(f'{window:>9} {max_in_window(times, window):>10} {allowed:>8.0f}')
+
+
+def report_jitter():
+    print(f"\n{'jitter':>7} {'refreshes':>10} {'interval p5-p95 s':>18} {'throttled s/refresh':>20}")
+    for jitter in (0.0, 0.1, 0.3):
+        scheduler, upstream = simulate(jitter)
+        by_city = {}
+        for at, city in upstream.calls:
+            by_city.setdefault(city, []).append(at)
+        gaps = np.concatenate([np.diff(times) for times in by_city.values()])
+        low, high = np.percentile(gaps, [5, 95])
+        print(f'{jitter:>7} {scheduler.refreshes:>10} {f"{low:.0f}-{high:.0f}":>18} '
+              f'{scheduler.throttled_seconds / scheduler.refreshes:>20.3f}')
+
+
+def report_alerts():
+    scheduler, upstream = simulate(0.1)
+    expected = 0
+    for levels in upstream.levels.values():
+        expected += levels[0] != 'low'
+        expected += sum(previous != level for previous, level in zip(levels, levels[1:]))
+    alerts = scheduler.alerts()
+    consistent = all(alert['previous_level'] != alert['level'] for alert in alerts)
+    print(f'\nalerts recorded {len(alerts)}, level changes seen by the upstream stub {expected}, '
+          f'every alert is a change: {consistent}')
+    print(f'refreshes {scheduler.refreshes}, refreshes without an alert {scheduler.refreshes - len(alerts)}')
+
+
+def report_reads():
+    predictor = DisasterRiskPredictor()
+    weather = {'rainfall': 40.0, 'humidity': 85, 'temperature': 27}
+    on_demand = lambda: predictor.assess_city_risk('Mumbai', 14, weather)
+    
+    print(f"\n{'watched':>8} {'store read us':>14}")
+    for watched in (10, 1000, 100000):
+        clock = FakeClock()
+        scheduler = AlertScheduler(lambda city: {'risk': {'city': city, 'combined_risk': 50.0}}, max_watched=watched,
+                                   rate=10 ** 9, burst=watched, clock=clock, sleep=clock.sleep)
+        for i in range(watched):
+            scheduler.watch(f'City {i}')
+        scheduler.run_pending()
+        
+        reads = 100000
+        start = time.perf_counter()
+        for _ in range(reads):
+            scheduler.get('City 7', max_age=INTERVAL)
+        print(f'{watched:>8} {(time.perf_counter() - start) / reads * 1e6:>14.3f}')
+    
+    reads = 10000
+    start = time.perf_counter()
+    for _ in range(reads):
+        on_demand()
+    print(f'on demand: assess_city_risk alone {(time.perf_counter() - start) / reads * 1e6:.1f} us, '
+          f'before any weather or elevation call to the upstream')
+
+
+def main():
+    print(f'{CITIES} cities every {INTERVAL} s, {RATE:g} calls/s (burst {BURST}), {HOURS} simulated hours\n')
+    _, upstream = simulate(0.1)
+    report_rate_limit(upstream)
+    report_jitter()
+    report_alerts()
+    report_reads()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,40 @@
+"""
+Benchmark: coastline index load time, single and batched nearest-coast queries
+
+Run from the backend folder:
+    python -m benchmarks.bench_coastal_index
+"""
+
+import os
+import time
+import timeit
+
+import numpy as np
+
+COASTLINE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'coastline.npy')
+
+
+def main():
+    start = time.perf_counter()
+    from ml_models.coastal_index import CoastalIndex
+    import_ms = (time.perf_counter() - start) * 1000
+    
+    start = time.perf_counter()
+    index = CoastalIndex.load(COASTLINE_PATH)
+    load_ms = (time.perf_counter() - start) * 1000
+    print(f'{index.size:,} coastline points; import {import_ms:.1f} ms, load + build {load_ms:.1f} ms')
+    
+    single_us = min(timeit.repeat(lambda: index.distance_km(25.77, -80.19), number=2000, repeat=5)) / 2000 * 1e6
+    print(f'single lookup: {single_us:.1f} us')
+    
+    rng = np.random.default_rng(0)
+    print(f"{'batch':>8} {'ms/call':>9} {'us/point':>9}")
+    for n in (1000, 10000, 100000):
+        lats = rng.uniform(-60, 70, n)
+        lons = rng.uniform(-180, 180, n)
+        ms = min(timeit.repeat(lambda: index.distances_km(lats, lons), number=3, repeat=3)) / 3 * 1000
+        print(f'{n:>8} {ms:>9.2f} {ms * 1000 / n:>9.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""
+Benchmark: worker cold start with and without a saved model artifact
+
+Each run imports app in a fresh interpreter, the way a new gunicorn worker
+would, and waits for the background startup steps to finish. "fit at boot"
+points MODEL_ARTIFACT_PATH at a new empty location so the model is fitted
+with sklearn (the old behaviour); "artifact" loads the JSON written by
+python -m ml_models.train_model.
+
+Run from the backend folder:
+    python -m benchmarks.bench_cold_start
+"""
+
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+RUNS = 5
+
+CHILD = '''
+import json, sys, time
+start = time.perf_counter()
+import app
+imported = time.perf_counter() - start
+app.startup.wait()
+print(json.dumps({'import': imported, 'seconds': time.perf_counter() - start, 'sklearn': 'sklearn' in sys.modules}))
+'''
+
+
+def cold_start(artifact_path):
+    env = dict(os.environ, MODEL_ARTIFACT_PATH=artifact_path)
+    out = subprocess.run([sys.executable, '-c', CHILD], env=env, capture_output=True, text=True, check=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    tmp_dir = tempfile.mkdtemp()
+    artifact_path = os.path.join(tmp_dir, 'sea_level_model.json')
+    
+    cases = {
+        'fit at boot': lambda i: cold_start(os.path.join(tmp_dir, f'fresh-{i}.json')),
+        'artifact': lambda i: cold_start(artifact_path)
+    }
+    cold_start(artifact_path)  # writes the artifact the second case loads
+    
+    print(f"{'case':<12} {'import ms':>10} {'ready ms':>10} {'min ms':>8} {'sklearn imported':>17}")
+    try:
+        for name, run in cases.items():
+            results = [run(i) for i in range(RUNS)]
+            imported = statistics.median(r['import'] * 1000 for r in results)
+            seconds = [r['seconds'] * 1000 for r in results]
+            print(f"{name:<12} {imported:>10.0f} {statistics.median(seconds):>10.0f} {min(seconds):>8.0f} "
+                  f"{str(results[0]['sklearn']):>17}")
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
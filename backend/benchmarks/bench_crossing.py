@@ -0,0 +1,85 @@
+"""
+Benchmark: threshold crossings solved directly vs fetched and scanned
+
+The scan is what clients do today: evaluate every year from start to end
+(predict_grid for coordinate cities, predict_cities for the named ones) and
+take the first year at or above the threshold. predict_crossings and
+rank_cities_by_crossing solve for that year instead. Both must agree on
+every city and scenario.
+
+Run from the backend folder:
+    python -m benchmarks.bench_crossing
+"""
+
+import time
+
+import numpy as np
+
+from ml_models.sea_level_predictor import SeaLevelPredictor
+
+SCENARIOS = ['optimistic', 'moderate', 'pessimistic']
+START, END = 2026, 2300
+THRESHOLDS = (('flooding_risk', 20), ('flooding_risk', 60), ('local_rise', 1500), ('global_rise', 900))
+
+
+def best_ms(fn, repeat=7):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000, float(np.median(times)) * 1000
+
+
+def first_year(values, years, threshold):
+    reached = values >= threshold
+    return np.where(reached.any(axis=-1), years[reached.argmax(axis=-1)], np.nan)
+
+
+def scan(predictor, locations, quantity, threshold):
+    years = np.arange(START, END + 1)
+    grid = predictor.predict_grid(locations, years, SCENARIOS)
+    values = grid[quantity] if quantity != 'global_rise' else np.broadcast_to(
+        grid['global_rise'], (len(locations),) + grid['global_rise'].shape
+    )
+    return first_year(values, years, threshold)
+
+
+def main():
+    predictor = SeaLevelPredictor()
+    predictor.train()
+    
+    rng = np.random.default_rng(0)
+    print(f"{'cities':>7} {'quantity':<14} {'threshold':>9} {'scan ms':>9} {'solve ms':>9} {'agree':>6}")
+    for cities in (1, 100, 1000):
+        locations = [{'lat': float(lat), 'lon': float(lon), 'elevation': float(elevation)}
+                     for lat, lon, elevation in zip(rng.uniform(-60, 70, cities), rng.uniform(-180, 180, cities),
+                                                    rng.choice([-3, 0, 1, 2, 5, 12, 40, 300], cities))]
+        for quantity, threshold in THRESHOLDS:
+            scanned = scan(predictor, locations, quantity, threshold)
+            solved = predictor.predict_crossings(locations, threshold, SCENARIOS, quantity, START, END)['year']
+            agree = np.array_equal(np.nan_to_num(scanned, nan=-1), np.nan_to_num(solved, nan=-1))
+            
+            scan_ms, _ = best_ms(lambda: scan(predictor, locations, quantity, threshold))
+            solve_ms, _ = best_ms(lambda: predictor.predict_crossings(locations, threshold, SCENARIOS, quantity,
+                                                                      START, END))
+            print(f'{cities:>7} {quantity:<14} {threshold:>9} {scan_ms:>9.2f} {solve_ms:>9.2f} {str(agree):>6}')
+    
+    names = predictor.get_available_cities()
+    years = np.arange(START, END + 1)
+    for quantity, threshold in (('flooding_risk', 5), ('local_rise', 1000)):
+        ranking = predictor.rank_cities_by_crossing(names, threshold, 'moderate', quantity, START, END)
+        values = predictor.predict_cities(names, years, 'moderate')[quantity]
+        scanned = dict(zip(names, first_year(values, years, threshold)))
+        agree = all(
+            (entry['year'] is None and np.isnan(scanned[entry['city']])) or entry['year'] == scanned[entry['city']]
+            for entry in ranking
+        )
+        rank_ms, _ = best_ms(lambda: predictor.rank_cities_by_crossing(names, threshold, 'moderate', quantity,
+                                                                       START, END))
+        print(f"\nrank_cities_by_crossing {quantity} >= {threshold}: {rank_ms:.2f} ms, agrees with scan: {agree}")
+        print('  ' + ', '.join(f"{entry['city']} {entry['year']}" for entry in ranking[:5]))
+
+
+if __name__ == '__main__':
+    main()
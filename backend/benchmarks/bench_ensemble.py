@@ -0,0 +1,93 @@
+"""
+Benchmark: Monte Carlo ensemble percentiles (10k draws x 300 years, one core)
+
+Compares EnsembleDraws.summarize (one matrix product per block of years,
+one sort, interpolated order statistics) with the direct formula followed
+by np.percentile, checks that a seed reproduces the same percentiles, and
+times a larger ensemble.
+
+Run from the backend folder:
+    python -m benchmarks.bench_ensemble
+"""
+
+import os
+
+# One core: keep BLAS from spreading the matrix products over threads
+for name in ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS'):
+    os.environ.setdefault(name, '1')
+
+import time  # noqa: E402
+
+import numpy as np  # noqa: E402
+
+from ml_models.ensemble import DEFAULT_PERCENTILES, EnsembleDraws  # noqa: E402
+from ml_models.projection_table import BASE_YEAR  # noqa: E402
+from ml_models.sea_level_predictor import SeaLevelPredictor  # noqa: E402
+
+YEARS = np.arange(2025, 2325)
+DRAWS = 10000
+BUDGET_MS = 100
+
+
+def best_ms(fn, repeat=7):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000, float(np.median(times)) * 1000
+
+
+def naive(ensemble, years, percentiles):
+    """The formula spelled out over the whole (years, draws) matrix, then np.percentile"""
+    years = years.astype(float)
+    t = (years - ensemble.center) / ensemble.scale
+    base = np.vander(t, ensemble.coefficients.shape[1], increasing=True) @ ensemble.coefficients.T
+    years_from_now = years - BASE_YEAR
+    ramp = np.maximum(years_from_now, 0) ** 1.5
+    paths = np.where(
+        (years_from_now > 0)[:, None],
+        base * ensemble.multiplier + ramp[:, None] * ensemble.acceleration * ensemble.multiplier,
+        base
+    )
+    return paths.mean(axis=1), np.percentile(paths, percentiles, axis=1)
+
+
+def main():
+    predictor = SeaLevelPredictor()
+    predictor.train()
+    sample = lambda draws, seed=0: EnsembleDraws.sample(
+        predictor.historical_years, predictor.historical_levels, predictor.poly_evaluator, 1.0, draws, seed
+    )
+    
+    ensemble = sample(DRAWS)
+    mean, values = ensemble.summarize(YEARS)
+    naive_mean, naive_values = naive(ensemble, YEARS, DEFAULT_PERCENTILES)
+    error = max(np.abs(values - naive_values).max(), np.abs(mean - naive_mean).max())
+    print(f'max |summarize - np.percentile|: {error:.3g} mm')
+    
+    print(f"\n{DRAWS} draws x {len(YEARS)} years     {'min ms':>8} {'median ms':>10}")
+    for label, fn in (
+        ('sample parameters', lambda: sample(DRAWS)),
+        ('naive + np.percentile', lambda: naive(ensemble, YEARS, DEFAULT_PERCENTILES)),
+        ('summarize', lambda: ensemble.summarize(YEARS)),
+        ('sample + summarize', lambda: sample(DRAWS).summarize(YEARS)),
+    ):
+        low, median = best_ms(fn)
+        print(f'{label:<28} {low:>8.1f} {median:>10.1f}')
+    
+    _, total = best_ms(lambda: sample(DRAWS).summarize(YEARS))
+    print(f"{'within' if total < BUDGET_MS else 'OVER'} the {BUDGET_MS} ms budget")
+    
+    again = sample(DRAWS).summarize(YEARS)
+    reproducible = all(np.array_equal(a, b) for a, b in zip(again, (mean, values)))
+    print(f'same seed reproduces: {reproducible}')
+    
+    large = sample(200000)
+    start = time.perf_counter()
+    large.summarize(YEARS)
+    print(f"\n200000 draws x {len(YEARS)} years  {time.perf_counter() - start:>8.2f} s")
+
+
+if __name__ == '__main__':
+    main()
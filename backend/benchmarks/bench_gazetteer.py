@@ -0,0 +1,89 @@
+"""
+Benchmark: gazetteer build, open and lookup times at the bundled size and at 100k+ entries
+
+The large run appends synthetic cities (random syllable names with aliases)
+to the bundled table so both sizes are measured on the same code path.
+
+Run from the backend folder:
+    python -m benchmarks.bench_gazetteer
+"""
+
+import csv
+import gzip
+import os
+import shutil
+import tempfile
+import time
+import timeit
+
+import numpy as np
+
+from services.gazetteer import Gazetteer, read_source
+
+SOURCE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'gazetteer.csv.gz')
+SYLLABLES = ['ka', 'lo', 'mi', 'san', 'to', 'ri', 'ber', 'gen', 'dor', 'vil', 'ha', 'ne', 'port', 'ma', 'sé', 'ün']
+
+
+def write_synthetic(path, extra, seed=0):
+    """Bundled rows plus `extra` synthetic cities"""
+    rng = np.random.default_rng(seed)
+    rows = list(read_source(SOURCE_PATH))
+    fields = list(rows[0])
+    with gzip.open(path, 'wt', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        writer.writerows(rows)
+        for i in range(extra):
+            parts = rng.choice(SYLLABLES, size=rng.integers(2, 5))
+            name = ''.join(parts).capitalize()
+            writer.writerow({
+                'name': name,
+                'aliases': f'{name} {i}|{name}ville',
+                'country': 'XX',
+                'state': '',
+                'lat': round(rng.uniform(-60, 70), 5),
+                'lon': round(rng.uniform(-180, 180), 5),
+                'elevation': round(rng.uniform(0, 500), 1),
+                'population': int(rng.integers(1000, 15000)),
+                'geonameid': 10_000_000 + i
+            })
+    return len(rows) + extra
+
+
+def bench(label, source_path):
+    index_root = tempfile.mkdtemp()
+    try:
+        start = time.perf_counter()
+        gazetteer = Gazetteer.open(source_path, index_root)
+        build_ms = (time.perf_counter() - start) * 1000
+        
+        start = time.perf_counter()
+        gazetteer = Gazetteer.open(source_path, index_root)
+        open_ms = (time.perf_counter() - start) * 1000
+        
+        names = ['Miami', 'sao paulo', 'BOMBAY', 'Ho-Chi-Minh City', 'Rotterdam', 'Nowhereville']
+        exact_us = min(timeit.repeat(lambda: [gazetteer.lookup(n) for n in names], number=500, repeat=5)) / (500 * len(names)) * 1e6
+        
+        prefixes = ['mu', 'san f', 'ber', 'kalo', 'ro', 'lond']
+        prefix_us = min(timeit.repeat(lambda: [gazetteer.search(p, limit=10) for p in prefixes], number=200, repeat=5)) / (200 * len(prefixes)) * 1e6
+        
+        print(f'{label:>10} {len(gazetteer):>9,} {len(gazetteer.keys):>9,} {build_ms:>9.0f} {open_ms:>8.2f} {exact_us:>9.1f} {prefix_us:>10.1f}')
+    finally:
+        shutil.rmtree(index_root, ignore_errors=True)
+
+
+def main():
+    print(f"{'':>10} {'cities':>9} {'keys':>9} {'build ms':>9} {'open ms':>8} {'exact us':>9} {'prefix us':>10}")
+    bench('bundled', SOURCE_PATH)
+    
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(tmp_dir, 'gazetteer.csv.gz')
+        write_synthetic(path, 120_000)
+        bench('synthetic', path)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
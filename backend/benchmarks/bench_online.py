@@ -0,0 +1,148 @@
+"""
+Benchmark: incremental refits as monthly observations arrive
+
+Feeds synthetic monthly gauge readings after the bundled history and
+compares, per new observation:
+- a full refit (ModelArtifact.fit with sklearn, fingerprint, table build),
+- IncrementalBackend.update (normal-equation update and solve),
+- SeaLevelPredictor.observe (update, in-memory table rebuild and swap),
+at growing history sizes. It checks the incremental coefficients against a
+full sklearn fit of the same data, then runs reader threads while a writer
+publishes models and reports their latency and whether every read came
+from exactly one published model.
+
+Run from the backend folder:
+    python -m benchmarks.bench_online
+"""
+
+import os
+
+# One core: keep BLAS from spreading work over threads
+for name in ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS'):
+    os.environ.setdefault(name, '1')
+
+import threading  # noqa: E402
+import time  # noqa: E402
+
+import numpy as np  # noqa: E402
+
+from ml_models.model_artifact import ModelArtifact  # noqa: E402
+from ml_models.online import IncrementalBackend  # noqa: E402
+from ml_models.projection_table import ProjectionTable, fingerprint, project  # noqa: E402
+from ml_models.sea_level_predictor import SeaLevelPredictor  # noqa: E402
+
+HISTORY_SIZES = (0, 1000, 10000)
+CHECK_YEARS = np.arange(1900, 2301)
+
+
+def monthly(predictor, months, seed=0):
+    """Synthetic monthly readings continuing the fitted trend with gauge noise"""
+    rng = np.random.default_rng(seed)
+    years = predictor.historical_years[-1] + np.arange(1, months + 1) / 12
+    return years, predictor.poly_evaluator(years) + rng.normal(0, 3, months)
+
+
+def incremental_predictor(history):
+    predictor = SeaLevelPredictor(backend=IncrementalBackend())
+    predictor.train()
+    if history:
+        predictor.observe(*monthly(predictor, history))
+    return predictor
+
+
+def per_update_ms(fn, count=20):
+    start = time.perf_counter()
+    for i in range(count):
+        fn(i)
+    return (time.perf_counter() - start) / count * 1000
+
+
+def full_refit(predictor, year, level):
+    years = np.append(predictor.historical_years, year)
+    levels = np.append(predictor.historical_levels, level)
+    artifact = ModelArtifact.fit(years, levels)
+    key = fingerprint(years, levels, artifact.evaluator, predictor.scenario_multipliers)
+    return ProjectionTable.build(artifact.evaluator, predictor.scenario_multipliers, key)
+
+
+def accuracy():
+    predictor = incremental_predictor(0)
+    years, levels = monthly(predictor, 600)
+    for year, level in zip(years, levels):
+        predictor.observe(year, level)
+    
+    artifact = ModelArtifact.fit(predictor.historical_years, predictor.historical_levels)
+    error = np.abs(predictor.poly_evaluator(CHECK_YEARS) - artifact.evaluator(CHECK_YEARS)).max()
+    metrics = predictor.backend.metrics
+    print(f'600 single updates vs full sklearn fit: max |difference| {error:.2e} mm '
+          f'over {CHECK_YEARS[0]}-{CHECK_YEARS[-1]}')
+    print(f"  poly_rmse {metrics['poly_rmse']} vs {artifact.metrics['poly_rmse']}, "
+          f"linear_r2 {metrics['linear_r2']} vs {artifact.metrics['linear_r2']}")
+
+
+def update_costs():
+    print(f"\n{'history':>8} {'full refit ms':>14} {'update ms':>10} {'observe ms':>11}")
+    for history in HISTORY_SIZES:
+        predictor = incremental_predictor(history)
+        years, levels = monthly(predictor, 20, seed=1)
+        
+        refit_ms = per_update_ms(lambda i: full_refit(predictor, years[i], levels[i]))
+        backend = IncrementalBackend()
+        backend.load(predictor.historical_years, predictor.historical_levels)
+        update_ms = per_update_ms(lambda i: backend.update(years[i], levels[i]))
+        observe_ms = per_update_ms(lambda i: predictor.observe(years[i], levels[i]))
+        print(f'{len(predictor.historical_years):>8} {refit_ms:>14.2f} {update_ms:>10.3f} {observe_ms:>11.3f}')
+
+
+def hot_swap(readers=4, updates=240, seconds=2.0):
+    predictor = incremental_predictor(0)
+    published = {predictor.model_version: predictor.poly_evaluator}
+    predictor.on_model_swap(lambda model: published.setdefault(model.version, model.evaluator))
+    years, levels = monthly(predictor, updates, seed=2)
+    
+    def expected(evaluator):
+        return np.round(project(evaluator, np.array([2050, 2100]), 1.0)[:, 0], 2)
+    
+    def read(latencies, mismatches, stop):
+        while not stop.is_set():
+            start = time.perf_counter()
+            version = predictor.model_version
+            values = predictor.predict_global_columns([2050, 2100])['prediction']
+            latencies.append(time.perf_counter() - start)
+            # The answer must equal what one published model (this one or a later one) gives
+            if not any(np.array_equal(values, expected(published[v])) for v in list(published) if v >= version):
+                mismatches.append(version)
+    
+    def run(writer):
+        stop = threading.Event()
+        latencies, mismatches = [], []
+        threads = [threading.Thread(target=read, args=(latencies, mismatches, stop)) for _ in range(readers)]
+        for thread in threads:
+            thread.start()
+        if writer:
+            for year, level in zip(years, levels):
+                predictor.observe(year, level)
+                time.sleep(seconds / updates)
+        else:
+            time.sleep(seconds)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        return np.array(latencies) * 1000, len(mismatches)
+    
+    print(f"\n{readers} reader threads {'reads':>8} {'p50 ms':>8} {'p99 ms':>8} {'inconsistent':>13}")
+    for label, writer in (('no updates', False), (f'{updates} swaps', True)):
+        latencies, mismatches = run(writer)
+        print(f'{label:<16} {len(latencies):>8} {np.percentile(latencies, 50):>8.3f} '
+              f'{np.percentile(latencies, 99):>8.3f} {mismatches:>13}')
+    print(f'models published: {predictor.model_version}')
+
+
+def main():
+    accuracy()
+    update_costs()
+    hot_swap()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""
+Benchmark: sklearn PolynomialFeatures + LinearRegression vs PolynomialEvaluator
+
+Run from the backend folder:
+    python -m benchmarks.bench_polynomial
+"""
+
+import timeit
+import numpy as np
+
+from ml_models.model_artifact import fit_sklearn
+from ml_models.polynomial import TOLERANCE_MM, EXPORT_CHECK_YEARS
+from ml_models.sea_level_predictor import SeaLevelPredictor
+
+
+def per_call_us(stmt, number):
+    return min(timeit.repeat(stmt, number=number, repeat=5)) / number * 1e6
+
+
+def main():
+    predictor = SeaLevelPredictor()
+    predictor.train()
+    evaluator = predictor.poly_evaluator
+    _, poly_features, poly_model = fit_sklearn(predictor.historical_years, predictor.historical_levels)
+    
+    error = evaluator.compare(poly_features, poly_model, EXPORT_CHECK_YEARS)
+    print(f'max |evaluator - sklearn| over {EXPORT_CHECK_YEARS[0]:.0f}-{EXPORT_CHECK_YEARS[-1]:.0f}: '
+          f'{error:.3g} mm (tolerance {TOLERANCE_MM} mm)')
+    
+    single = np.array([[2050.0]])
+    sklearn_us = per_call_us(
+        lambda: poly_model.predict(poly_features.transform(single)), 2000
+    )
+    horner_us = per_call_us(lambda: evaluator.predict_one(2050), 200000)
+    horner_np_us = per_call_us(lambda: evaluator(single.ravel()), 50000)
+    
+    print(f"{'path':<34} {'us / prediction':>16}")
+    print(f"{'sklearn transform + predict':<34} {sklearn_us:>16.3f}")
+    print(f"{'PolynomialEvaluator.predict_one':<34} {horner_us:>16.3f}")
+    print(f"{'PolynomialEvaluator (1-elem array)':<34} {horner_np_us:>16.3f}")
+    
+    years = np.arange(2025, 3025, dtype=float)
+    batch_sklearn = per_call_us(
+        lambda: poly_model.predict(poly_features.transform(years.reshape(-1, 1))), 500
+    ) / len(years)
+    batch_horner = per_call_us(lambda: evaluator(years), 5000) / len(years)
+    print(f"{'sklearn, 1000-year batch':<34} {batch_sklearn:>16.4f}")
+    print(f"{'PolynomialEvaluator, 1000-year batch':<34} {batch_horner:>16.4f}")
+
+
+if __name__ == '__main__':
+    main()
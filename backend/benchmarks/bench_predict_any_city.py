@@ -0,0 +1,79 @@
+"""
+Benchmark: per-year loop vs vectorized SeaLevelPredictor.predict_any_city
+
+Run from the backend folder:
+    python -m benchmarks.bench_predict_any_city
+"""
+
+import time
+import numpy as np
+
+from ml_models.sea_level_predictor import SeaLevelPredictor
+from ml_models.model_artifact import fit_sklearn
+from ml_models.projection_table import ACCELERATION, BASE_YEAR
+
+
+def legacy_predict_any_city(predictor, poly_features, poly_model, coordinates, target_years, scenario='moderate'):
+    """The original implementation (one sklearn round trip per target year), with project()'s acceleration"""
+    elevation = coordinates.get('elevation', 50)
+    coastal_distance = predictor._estimate_coastal_distance(coordinates['lat'], coordinates['lon'])
+    vulnerability, factor = predictor._classify_location(elevation, coastal_distance)
+    multiplier = predictor.scenario_multipliers.get(scenario, 1.0)
+    
+    predictions = []
+    for year in target_years:
+        X_poly = poly_features.transform(np.array([[year]]))
+        global_rise = poly_model.predict(X_poly)[0]
+        if year > BASE_YEAR:
+            global_rise = global_rise * multiplier + (year - BASE_YEAR) ** 1.5 * ACCELERATION * multiplier
+        local_rise = global_rise * factor
+        flooding_risk = min(100, (local_rise / (elevation * 1000)) * 100) if elevation > 0 else min(100, 80 + (local_rise / 10))
+        if coastal_distance > 100:
+            flooding_risk *= 0.5
+        predictions.append({
+            'year': year,
+            'global_rise': round(global_rise, 2),
+            'local_rise': round(local_rise, 2),
+            'elevation': elevation,
+            'flooding_risk': round(flooding_risk, 2),
+            'vulnerability': vulnerability
+        })
+    return predictions
+
+
+def requests_per_second(fn, min_time=0.5):
+    calls = 0
+    start = time.perf_counter()
+    while True:
+        fn()
+        calls += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            return calls / elapsed
+
+
+def main():
+    predictor = SeaLevelPredictor()
+    predictor.train()
+    _, poly_features, poly_model = fit_sklearn(predictor.historical_years, predictor.historical_levels)
+    legacy = lambda years: legacy_predict_any_city(predictor, poly_features, poly_model, coordinates, years)
+    coordinates = {'lat': 25.77, 'lon': -80.19, 'elevation': 2}
+    
+    print(f"{'years':>6} {'before req/s':>14} {'after req/s':>14} {'speedup':>8}")
+    for n in (10, 100, 1000):
+        years = list(range(2025, 2025 + n))
+        
+        before = legacy(years)
+        after = predictor.predict_any_city('Miami', coordinates, years)['predictions']
+        assert [r['year'] for r in before] == [r['year'] for r in after]
+        for key in ('global_rise', 'local_rise', 'flooding_risk'):
+            # Rounded to 2 dp on both sides, so allow one unit in the last place
+            assert np.allclose([r[key] for r in before], [r[key] for r in after], rtol=0, atol=0.011), key
+        
+        legacy_rps = requests_per_second(lambda: legacy(years))
+        vector_rps = requests_per_second(lambda: predictor.predict_any_city('Miami', coordinates, years))
+        print(f"{n:>6} {legacy_rps:>14.1f} {vector_rps:>14.1f} {vector_rps / legacy_rps:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""
+Load test: sequential vs concurrent upstream legs for /api/ml/sealevel/predict/any/<city>
+
+Injects random latency into a local fake OpenWeatherMap / Open-Meteo and
+compares the old sequential weather -> elevation chain with the
+LocationResolver, which adds a geocoding hedge for slow weather replies
+and a 1s deadline. Every city is new, so every request misses the
+elevation store; the median should match the sequential chain.
+
+Run from the backend folder:
+    python -m benchmarks.bench_prediction_fanout
+"""
+
+import os
+import random
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from benchmarks.fake_upstream import FakeUpstream
+
+REQUESTS = 200
+CONCURRENCY = 8
+DEADLINE = 1.0
+
+
+def slow_tail(base, tail, tail_probability):
+    """base seconds most of the time, tail seconds for a fraction of calls"""
+    return lambda: tail if random.random() < tail_probability else base * random.uniform(0.5, 1.5)
+
+
+def measure(handler):
+    latencies = []
+    
+    def timed(i):
+        start = time.perf_counter()
+        assert handler(f'city-{i}-{random.random()}') == 200
+        return time.perf_counter() - start
+    
+    with ThreadPoolExecutor(max_workers=CONCURRENCY) as pool:
+        latencies = list(pool.map(timed, range(REQUESTS)))
+    return np.percentile(latencies, 50) * 1000, np.percentile(latencies, 99) * 1000
+
+
+def main():
+    random.seed(0)
+    fake = FakeUpstream(latency={
+        'weather': slow_tail(0.08, 0.6, 0.02),
+        'elevation': slow_tail(0.08, 3.0, 0.05),
+        'search': slow_tail(0.08, 3.0, 0.05)
+    }).start()
+    os.environ.update({
+        'WEATHER_BASE_URL': fake.base_url,
+        'ELEVATION_BASE_URL': fake.base_url,
+        'GEOCODING_BASE_URL': fake.base_url,
+        'ELEVATION_DB_PATH': os.path.join(tempfile.mkdtemp(), 'elevation.sqlite3'),
+        'PREDICTION_DEADLINE': str(DEADLINE),
+        'UPSTREAM_RETRIES': '0'
+    })
+    
+    import app
+    app.startup.wait()
+    client = app.app.test_client()
+    
+    def sequential(city):
+        # The pre-fan-out route: weather, then elevation, each with its own timeout
+        status_code, weather = app.fetch_weather(city=city)
+        app.fetch_elevation(weather['coord']['lat'], weather['coord']['lon'])
+        return status_code
+    
+    def fanout(city):
+        return client.get(f'/api/ml/sealevel/predict/any/{city}').status_code
+    
+    print(f'{REQUESTS} requests, concurrency {CONCURRENCY}, deadline {DEADLINE}s')
+    print(f"{'path':<22} {'p50 ms':>8} {'p99 ms':>8}")
+    for name, handler in (('sequential', sequential), ('concurrent fan-out', fanout)):
+        p50, p99 = measure(handler)
+        print(f'{name:<22} {p50:>8.1f} {p99:>8.1f}')
+    
+    fake.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+"""
+Benchmark: projection table startup cost and predict_global lookup vs evaluation
+
+Run from the backend folder:
+    python -m benchmarks.bench_projection_table
+"""
+
+import os
+import tempfile
+import timeit
+
+from ml_models.projection_table import ProjectionTable, project, fingerprint
+from ml_models.sea_level_predictor import SeaLevelPredictor
+
+
+def best_ms(fn, number):
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number * 1000
+
+
+def main():
+    predictor = SeaLevelPredictor()
+    predictor.train()
+    evaluator = predictor.poly_evaluator
+    multipliers = predictor.scenario_multipliers
+    path = os.path.join(tempfile.mkdtemp(), 'projection_table.npz')
+    
+    key_ms = best_ms(lambda: fingerprint(predictor.historical_years, predictor.historical_levels,
+                                         evaluator, multipliers), 200)
+    build_ms = best_ms(lambda: ProjectionTable.build(evaluator, multipliers, 'k'), 50)
+    table = ProjectionTable.build(evaluator, multipliers, 'k')
+    save_ms = best_ms(lambda: table.save(path), 20)
+    load_ms = best_ms(lambda: ProjectionTable.load(path, 'k'), 50)
+    
+    print(f'table: {table.values.shape} float64, {table.values.nbytes / 1024:.1f} KiB, '
+          f'{os.path.getsize(path) / 1024:.1f} KiB on disk')
+    print(f'startup: fingerprint {key_ms:.3f} ms, build {build_ms:.3f} ms, '
+          f'save {save_ms:.3f} ms, load {load_ms:.3f} ms')
+    
+    print(f"{'years':>6} {'evaluate ms':>12} {'lookup ms':>10}")
+    for n in (1, 100, 400):
+        years = list(range(2025, 2025 + n))
+        evaluate = best_ms(lambda: project(evaluator, years, 1.0), 2000)
+        lookup = best_ms(lambda: table.lookup(years, 'moderate'), 2000)
+        print(f'{n:>6} {evaluate:>12.4f} {lookup:>10.4f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""
+Benchmark: scalar DisasterRiskPredictor.assess_city_risk vs the NumPy batch scorer
+
+Also checks that both paths produce identical scores and levels.
+
+Run from the backend folder:
+    python -m benchmarks.bench_risk_batch
+"""
+
+import time
+
+import numpy as np
+
+from ml_models.disaster_risk_predictor import DisasterRiskPredictor, RISK_LEVELS, TERRAIN_TYPES
+
+
+def random_points(n, seed=0):
+    rng = np.random.default_rng(seed)
+    elevation = np.round(rng.uniform(-5, 1500, n), 1)
+    rainfall = np.round(rng.exponential(30, n), 1)
+    humidity = rng.integers(10, 100, n).astype(float)
+    # Exercise the zero -> default handling too
+    elevation[::97] = 0
+    rainfall[::13] = 0
+    return elevation, rainfall, humidity
+
+
+def check_agreement(predictor, n=20000):
+    elevation, rainfall, humidity = random_points(n, seed=1)
+    batch = predictor.score_batch(elevation, rainfall, humidity)
+    
+    for i in range(n):
+        scalar = predictor.assess_city_risk(
+            'x', elevation[i], {'rainfall': rainfall[i], 'humidity': humidity[i], 'temperature': 25}
+        )
+        flood, landslide = scalar['flood_risk'], scalar['landslide_risk']
+        assert flood['risk_score'] == round(float(batch['flood']['risk_score'][i]), 1)
+        assert flood['risk_level'] == RISK_LEVELS[batch['flood']['level'][i]]
+        assert flood['drainage_factor'] == round(float(batch['flood']['drainage_factor'][i]), 1)
+        assert landslide['risk_score'] == round(float(batch['landslide']['risk_score'][i]), 1)
+        assert landslide['risk_level'] == RISK_LEVELS[batch['landslide']['level'][i]]
+        assert landslide['details']['terrain_type'] == TERRAIN_TYPES[batch['landslide']['terrain'][i]]
+        assert scalar['combined_risk'] == round(float(batch['combined_risk'][i]), 1)
+    print(f'scalar and batch paths agree on {n} random points')
+
+
+def points_per_second(fn, n):
+    start = time.perf_counter()
+    fn()
+    return n / (time.perf_counter() - start)
+
+
+def main():
+    predictor = DisasterRiskPredictor()
+    check_agreement(predictor)
+    
+    print(f"{'points':>8} {'scalar pts/s':>14} {'batch pts/s':>14}")
+    for n in (10000, 100000, 1000000):
+        elevation, rainfall, humidity = random_points(n)
+        
+        scalar_n = min(n, 20000)
+        scalar = points_per_second(lambda: [
+            predictor.assess_city_risk('x', elevation[i], {'rainfall': rainfall[i], 'humidity': humidity[i]})
+            for i in range(scalar_n)
+        ], scalar_n)
+        batch = points_per_second(lambda: predictor.score_batch(elevation, rainfall, humidity), n)
+        print(f'{n:>8} {scalar:>14,.0f} {batch:>14,.0f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""
+Benchmark: /api/risk/raster throughput and peak memory for a 1000 x 1000 grid
+
+Builds synthetic SRTM3-sized tiles in a temp folder, streams the raster
+and reports peak Python-allocated memory (tracemalloc) while consuming it.
+
+Run from the backend folder:
+    python -m benchmarks.bench_risk_raster
+"""
+
+import os
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from ml_models.disaster_risk_predictor import DisasterRiskPredictor
+from services.elevation_tiles import ElevationTileStore, tile_name
+from services.risk_raster import iter_risk_chunks, encode_npy, encode_png
+
+BBOX = (-81.0, 25.0, -79.0, 27.0)
+SIZE = 1000
+
+
+def build_tiles(directory):
+    rng = np.random.default_rng(0)
+    for lat in (25, 26):
+        for lon in (-81, -80):
+            np.save(os.path.join(directory, tile_name(lat, lon)),
+                    (rng.random((1201, 1201)) * 600).astype(np.float32))
+
+
+def main():
+    directory = tempfile.mkdtemp()
+    build_tiles(directory)
+    predictor = DisasterRiskPredictor()
+    
+    print(f'{SIZE}x{SIZE} grid')
+    print(f"{'format':<8} {'budget MB':>10} {'seconds':>8} {'Mpts/s':>7} {'peak MB':>8} {'bytes out':>11}")
+    for encoder in (encode_npy, encode_png):
+        for budget_mb in (4, 16, 64):
+            store = ElevationTileStore(directory)
+            tracemalloc.start()
+            start = time.perf_counter()
+            chunks = iter_risk_chunks(store, predictor, BBOX, SIZE, SIZE, 'combined',
+                                      rainfall=40, memory_budget=budget_mb * 1024 * 1024)
+            size = sum(len(part) for part in encoder(chunks, SIZE, SIZE))
+            elapsed = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(f'{encoder.__name__[7:]:<8} {budget_mb:>10} {elapsed:>8.2f} '
+                  f'{SIZE * SIZE / elapsed / 1e6:>7.2f} {peak / 1e6:>8.1f} {size:>11,}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""
+Benchmark: how soon a fresh process answers /api/status, with a budget check
+
+python -X importtime attributes the cost of `import app` (with
+STARTUP_MODE=manual, so the background steps don't interleave) to the
+modules it pulls in. Separate runs in the default background mode time the
+import, the first /api/status reply and /api/ready turning 200.
+
+Exits non-zero if the median import exceeds --budget-ms or if any of the
+heavy modules is imported before the startup steps run. The test suite
+enforces the same budget (tests/test_startup.py, STARTUP_BUDGET_MS).
+
+Run from the backend folder:
+    python -m benchmarks.bench_startup [--budget-ms 400]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+HEAVY_MODULES = ('numpy', 'scipy', 'sklearn', 'pandas')
+
+CHILD = '''
+import json, time
+start = time.perf_counter()
+import app
+imported = time.perf_counter() - start
+client = app.app.test_client()
+assert client.get('/api/status').status_code == 200
+status = time.perf_counter() - start
+while client.get('/api/ready').status_code != 200:
+    time.sleep(0.005)
+print(json.dumps({'import': imported, 'status': status, 'ready': time.perf_counter() - start}))
+'''
+
+
+def import_profile():
+    """{module: (self_us, cumulative_us, depth)} for `import app` from -X importtime"""
+    env = dict(os.environ, STARTUP_MODE='manual')
+    stderr = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import app'],
+                            env=env, capture_output=True, text=True, check=True).stderr
+    profile = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        profile[name.strip()] = (int(self_us), int(cumulative_us), depth)
+    return profile
+
+
+def timed_start():
+    out = subprocess.run([sys.executable, '-c', CHILD], capture_output=True, text=True, check=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--budget-ms', type=float, default=400, help='Median import app budget')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=8, help='Heaviest direct imports to list')
+    args = parser.parse_args()
+    
+    profile = import_profile()
+    app_depth = profile['app'][2]
+    direct = [(name, cumulative) for name, (_, cumulative, depth) in profile.items() if depth == app_depth + 1]
+    
+    print(f"import app (manual mode): {profile['app'][1] / 1000:.0f} ms, "
+          f"{profile['app'][0] / 1000:.0f} ms in app itself")
+    print(f"{'direct import':<28} {'cumulative ms':>14}")
+    for name, cumulative in sorted(direct, key=lambda item: -item[1])[:args.top]:
+        print(f"{name:<28} {cumulative / 1000:>14.1f}")
+    
+    heavy = [name for name in HEAVY_MODULES if name in profile]
+    print(f"heavy modules on the import path: {', '.join(heavy) or 'none'}")
+    
+    results = [timed_start() for _ in range(args.runs)]
+    print(f"\n{'background mode':<16} {'median ms':>10} {'max ms':>8}")
+    for key, label in (('import', 'import app'), ('status', '/api/status'), ('ready', '/api/ready')):
+        values = [r[key] * 1000 for r in results]
+        print(f"{label:<16} {statistics.median(values):>10.0f} {max(values):>8.0f}")
+    
+    imported_ms = statistics.median(r['import'] * 1000 for r in results)
+    failures = []
+    if imported_ms > args.budget_ms:
+        failures.append(f'import app took {imported_ms:.0f} ms (budget {args.budget_ms:.0f} ms)')
+    if heavy:
+        failures.append(f'{", ".join(heavy)} imported before the startup steps')
+    
+    if failures:
+        print('\nOVER BUDGET: ' + '; '.join(failures))
+        sys.exit(1)
+    print(f'\nwithin budget ({imported_ms:.0f} / {args.budget_ms:.0f} ms)')
+
+
+if __name__ == '__main__':
+    main()
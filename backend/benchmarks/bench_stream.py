@@ -0,0 +1,154 @@
+"""
+Benchmark: 1000 concurrent /api/stream subscribers on one gunicorn worker
+
+Starts gunicorn with the shipped gunicorn.conf.py (one worker, GUNICORN_THREADS
+sized for a thread per subscriber, which also raises its stream cap) against the
+local fake upstream, opens SUBSCRIBERS Server-Sent Events connections spread
+over CITIES cities and reads the worker's /proc/<pid>/smaps_rollup before
+and after, so (after - before) / SUBSCRIBERS is the memory each open stream
+costs. Then the fake upstream's temperature changes and every subscriber
+must receive one patch, while the upstream is asked once per city per
+refresh however many subscribers follow it. Finally the clients disconnect
+and the server must drop every subscription.
+
+Linux only. Run from the backend folder:
+    python -m benchmarks.bench_stream
+"""
+
+import json
+import os
+import selectors
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.bench_workers import free_port, get, smaps_rollup, wait_ready, worker_pids
+from benchmarks.fake_upstream import FakeUpstream, fake_weather
+
+SUBSCRIBERS = 1000
+CITIES = 20
+INTERVAL = 2
+
+
+def open_stream(port, city):
+    sock = socket.create_connection(('127.0.0.1', port))
+    sock.sendall(f'GET /api/stream?cities={city} HTTP/1.1\r\nHost: localhost\r\nAccept: text/event-stream\r\n\r\n'
+                 .encode())
+    sock.setblocking(False)
+    return sock
+
+
+def read_until(sockets, buffers, done, timeout):
+    """Read every socket until done(buffer) holds for all of them; returns {sock: seconds it took}"""
+    selector = selectors.DefaultSelector()
+    for sock in sockets:
+        selector.register(sock, selectors.EVENT_READ)
+    start = time.perf_counter()
+    finished = {}
+    while len(finished) < len(sockets) and time.perf_counter() - start < timeout:
+        for key, _ in selector.select(timeout=0.5):
+            sock = key.fileobj
+            chunk = sock.recv(65536)
+            buffers[sock] += chunk
+            if sock not in finished and done(buffers[sock]):
+                finished[sock] = time.perf_counter() - start
+    selector.close()
+    return finished
+
+
+def main():
+    temperature = {'value': 27.0}
+    fake = FakeUpstream(weather=lambda params: dict(fake_weather(params), main=dict(
+        fake_weather(params)['main'], temp=temperature['value']))).start()
+    port = free_port()
+    base_url = f'http://127.0.0.1:{port}'
+    env = dict(
+        os.environ,
+        WEATHER_BASE_URL=fake.base_url,
+        ELEVATION_BASE_URL=fake.base_url,
+        ELEVATION_DB_PATH=os.path.join(tempfile.mkdtemp(), 'elevation.sqlite3'),
+        ALERT_INTERVAL=str(INTERVAL),
+        ALERT_JITTER='0',
+        ALERT_RATE='1000',
+        WEATHER_CACHE_TTL=str(INTERVAL / 4),
+        STREAM_KEEPALIVE='1',
+        # The warm-up stream plus SUBSCRIBERS, with the default reserve of threads left over
+        GUNICORN_THREADS=str(SUBSCRIBERS + 1 + 8),
+        # All subscribers come from one address and follow new cities at once
+        STREAM_WATCH_BURST=str(CITIES + 1),
+        STREAM_MAX_WATCHED=str(CITIES + 1)
+    )
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '--bind', f'127.0.0.1:{port}',
+         '--workers', '1', '--backlog', str(SUBSCRIBERS * 2), 'wsgi:app'],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    sockets = []
+    try:
+        wait_ready(base_url)
+        [worker] = worker_pids(server.pid)
+        # One stream first, so imports and per-thread warm-up are not counted per connection
+        warm = open_stream(port, 'Warmup')
+        read_until([warm], {warm: b''}, lambda buffer: b'event: snapshot' in buffer, 30)
+        before = smaps_rollup(worker)
+        
+        start = time.perf_counter()
+        sockets = [open_stream(port, f'City{i % CITIES}') for i in range(SUBSCRIBERS)]
+        buffers = {sock: b'' for sock in sockets}
+        snapshots = read_until(sockets, buffers, lambda buffer: b'event: snapshot' in buffer, 60)
+        connect_seconds = time.perf_counter() - start
+        after = smaps_rollup(worker)
+        stream = json.loads(get(f'{base_url}/api/stream/stats')[1])['stream']
+        
+        rss = (after['Rss'] - before['Rss']) / SUBSCRIBERS
+        uss = ((after['Private_Clean'] + after['Private_Dirty'])
+               - (before['Private_Clean'] + before['Private_Dirty'])) / SUBSCRIBERS
+        print(f'{len(snapshots)}/{SUBSCRIBERS} subscribers got their snapshot in {connect_seconds:.1f} s '
+              f'({CITIES} cities, server counts {stream["subscribers"]} subscribers, {stream["topics"]} topics)')
+        print(f'worker RSS {before["Rss"] / 1024:.1f} -> {after["Rss"] / 1024:.1f} MB: '
+              f'{rss:.1f} kB RSS, {uss:.1f} kB private per connection')
+        
+        # The worker is at its stream cap now; one more subscriber is turned away
+        extra = open_stream(port, 'City0')
+        replies = {extra: b''}
+        read_until([extra], replies, lambda buffer: b'\r\n\r\n' in buffer, 10)
+        extra.close()
+        status_line = replies[extra].split(b'\r\n')[0].decode()
+        print(f'subscriber {SUBSCRIBERS + 2} (over the cap): {status_line}')
+        
+        fake.reset_counters()
+        temperature['value'] = 33.0
+        changed = time.perf_counter()
+        patches = read_until(sockets, buffers, lambda buffer: b'event: patch' in buffer, 4 * INTERVAL)
+        arrivals = sorted(patches.values())
+        weather_calls = fake.requests
+        print(f'\ntemperature changed: {len(patches)}/{SUBSCRIBERS} subscribers patched, first after '
+              f'{arrivals[0]:.2f} s, last after {arrivals[-1]:.2f} s (refresh every {INTERVAL} s)')
+        print(f'upstream requests in those {time.perf_counter() - changed:.1f} s: {weather_calls} '
+              f'for {CITIES} cities and {SUBSCRIBERS} subscribers')
+        
+        for sock in sockets + [warm]:
+            sock.close()
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            stream = json.loads(get(f'{base_url}/api/stream/stats')[1])['stream']
+            if stream['subscribers'] == 0:
+                break
+            time.sleep(0.5)
+        watched = json.loads(get(f'{base_url}/api/alerts/watchlist')[1])['scheduler']['watched']
+        print(f'\nafter disconnecting: {stream["subscribers"]} subscribers, {watched} cities still watched, '
+              f'worker RSS {smaps_rollup(worker)["Rss"] / 1024:.1f} MB')
+    finally:
+        for sock in sockets:
+            sock.close()
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=30)
+        fake.stop()
+        os.unlink(env['ELEVATION_DB_PATH'])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""
+Benchmark: time-to-first-byte and peak memory of 10k-row prediction responses
+
+Compares format=json (one jsonify'd list of row dicts) with the streamed
+ndjson / stream formats and the columnar shape, for the global projection
+and a city prediction. Each case runs in a fresh interpreter so the peak RSS
+growth (ru_maxrss after the response minus before it) is not hidden by an
+earlier case's high-water mark. Upstreams point at a local fake server.
+
+Run from the backend folder:
+    python -m benchmarks.bench_streaming
+"""
+
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.fake_upstream import FakeUpstream
+
+ROWS = 10_000
+FORMATS = ('json', 'ndjson', 'stream', 'columnar')
+ROUTES = {
+    'global': f'/api/ml/sealevel/predict/global?start=2025&end={2025 + ROWS - 1}',
+    'city': f'/api/ml/sealevel/predict/any/Miami?start=2025&end={2025 + ROWS - 1}'
+}
+
+
+def child(url):
+    """Serve one request through the WSGI test client and report timings and memory"""
+    import app
+    app.startup.wait()
+    client = app.app.test_client()
+    
+    # Warm up imports, caches and the elevation store with a small request
+    client.get(url.split('?')[0] + '?years=2050')
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    
+    start = time.perf_counter()
+    response = client.get(url, buffered=False)
+    body = iter(response.response)
+    first = next(body)
+    ttfb = time.perf_counter() - start
+    size = len(first)
+    for chunk in body:
+        size += len(chunk)
+    total = time.perf_counter() - start
+    response.close()
+    
+    after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({'ttfb_ms': ttfb * 1000, 'total_ms': total * 1000, 'bytes': size, 'rss_kb': after - before}))
+
+
+def main():
+    fake = FakeUpstream().start()
+    env = dict(
+        os.environ,
+        WEATHER_BASE_URL=fake.base_url,
+        ELEVATION_BASE_URL=fake.base_url,
+        GEOCODING_BASE_URL=fake.base_url,
+        ELEVATION_DB_PATH=os.path.join(tempfile.mkdtemp(), 'elevation.sqlite3')
+    )
+    
+    print(f'{ROWS:,} rows per response')
+    print(f"{'route':<8} {'format':<9} {'TTFB ms':>8} {'total ms':>9} {'KB':>7} {'peak RSS +MB':>13}")
+    try:
+        for route, path in ROUTES.items():
+            for output_format in FORMATS:
+                url = f'{path}&format={output_format}'
+                out = subprocess.run([sys.executable, '-m', 'benchmarks.bench_streaming', '--child', url],
+                                     env=env, capture_output=True, text=True, check=True).stdout
+                result = json.loads(out.strip().splitlines()[-1])
+                print(f"{route:<8} {output_format:<9} {result['ttfb_ms']:>8.1f} {result['total_ms']:>9.1f} "
+                      f"{result['bytes'] / 1024:>7.0f} {result['rss_kb'] / 1024:>13.1f}")
+    finally:
+        fake.stop()
+
+
+if __name__ == '__main__':
+    if len(sys.argv) == 3 and sys.argv[1] == '--child':
+        child(sys.argv[2])
+    else:
+        main()
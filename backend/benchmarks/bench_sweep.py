@@ -0,0 +1,103 @@
+"""
+Benchmark: pathway sweeps (50 multipliers x 50 accelerations x 300 years x 100 cities)
+
+Compares Sweep.run (per-city affine terms, in-place ops, chunks sized to the
+memory cap) with the formula spelled out over the whole tensor followed by
+the reduction, checks that chunked and unchunked results agree, and
+times a repeated request against the sweep cache key.
+
+Run from the backend folder:
+    python -m benchmarks.bench_sweep
+"""
+
+import os
+
+# One core: keep BLAS from spreading work over threads
+for name in ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS'):
+    os.environ.setdefault(name, '1')
+
+import time  # noqa: E402
+
+import numpy as np  # noqa: E402
+
+from ml_models.projection_table import BASE_YEAR  # noqa: E402
+from ml_models.sea_level_predictor import SeaLevelPredictor  # noqa: E402
+
+YEARS = np.arange(2025, 2325)
+MULTIPLIERS = np.linspace(0.5, 2.0, 50)
+ACCELERATIONS = np.linspace(0.0, 0.2, 50)
+CITIES = 100
+
+
+def best_ms(fn, repeat=3):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000, float(np.median(times)) * 1000
+
+
+def naive(sweep):
+    """Full float64 tensor with np.where and np.percentile, as a straightforward version would"""
+    years = sweep.years.astype(float)
+    m = sweep.multipliers[:, None, None]
+    a = sweep.accelerations[None, :, None]
+    ramp = np.maximum(years - BASE_YEAR, 0) ** 1.5
+    rise = np.where(years > BASE_YEAR, sweep.base * m + ramp * a * m, sweep.base)
+    local = rise[None] * sweep.factors[:, None, None, None]
+    
+    elevation = sweep.elevations[:, None, None, None]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        risk = np.where(elevation > 0, np.minimum(100, local / (elevation * 1000) * 100),
+                        np.minimum(100, 80 + local / 10))
+    risk = np.where(sweep.coastal_distances[:, None, None, None] > 100, risk * 0.5, risk)
+    
+    if sweep.reduction == 'max':
+        return risk.max(axis=-1)
+    pathways = risk.reshape(risk.shape[0], -1, risk.shape[-1])
+    return np.percentile(pathways, sweep.percentiles, axis=1)
+
+
+def main():
+    predictor = SeaLevelPredictor()
+    predictor.train()
+    
+    rng = np.random.default_rng(0)
+    locations = [{'lat': float(lat), 'lon': float(lon), 'elevation': float(elevation)}
+                 for lat, lon, elevation in zip(rng.uniform(-60, 70, CITIES), rng.uniform(-180, 180, CITIES),
+                                                rng.uniform(-2, 40, CITIES))]
+    build = lambda **options: predictor.build_sweep(
+        MULTIPLIERS, ACCELERATIONS, YEARS, locations=locations, quantity='flooding_risk', **options
+    )
+    
+    sweeps = {
+        'max': build(reduction='max'),
+        'percentile': build(reduction='percentile', percentiles=[5, 50, 95]),
+    }
+    cells = sweeps['max'].cells
+    print(f'{cells / 1e6:.0f}M cells, naive tensor {cells * 8 / 2 ** 20:.0f} MB per copy')
+    
+    for reduction, sweep in sweeps.items():
+        error = np.nanmax(np.abs(sweep.run() - naive(sweep)))
+        print(f'max |run - naive| ({reduction}): {error:.3g}')
+    
+    print(f"\n{'reduction':<12} {'naive ms':>10} {'run ms':>10}")
+    for reduction, sweep in sweeps.items():
+        naive_ms, _ = best_ms(lambda: naive(sweep), repeat=1)
+        run_ms, _ = best_ms(sweep.run)
+        print(f'{reduction:<12} {naive_ms:>10.0f} {run_ms:>10.0f}')
+    
+    sweep = sweeps['max']
+    whole = sweep.run(memory_cap=2 ** 40)
+    chunked = sweep.run(memory_cap=2 ** 24)
+    print(f'\nchunked matches: {np.array_equal(whole, chunked)}')
+    print(f'chunks at the default cap: {len(sweep.plan(2 ** 28 // 24))}, at 16 MB: {len(sweep.plan(2 ** 24 // 24))}')
+    
+    # A repeated request rebuilds the sweep and hashes its inputs to find the cached result
+    key_ms, _ = best_ms(lambda: build(reduction='max').key(), repeat=7)
+    print(f'build + key (cache lookup): {key_ms:.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
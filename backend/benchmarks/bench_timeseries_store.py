@@ -0,0 +1,96 @@
+"""
+Benchmark: time-series ingest and query cost as a series grows
+
+Writes hourly synthetic tide-gauge CSVs, ingests them, and reports ingest
+time, peak growth of anonymous (non file-backed) resident memory and query
+latency. Mapped column pages are file-backed and reclaimable, so flat
+anonymous peaks across sizes mean neither ingest nor queries hold a whole
+series in memory. Linux only (reads /proc/self/status).
+
+Run from the backend folder:
+    python -m benchmarks.bench_timeseries_store
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+import timeit
+
+import numpy as np
+
+from services.timeseries_store import TimeSeriesStore, ingest_csv
+
+START = np.datetime64('1950-01-01T00:00', 's')
+
+
+def write_gauge_csv(path, rows, seed=0):
+    rng = np.random.default_rng(seed)
+    with open(path, 'w') as f:
+        f.write('time,level,uncertainty\n')
+        for offset in range(0, rows, 500_000):
+            n = min(500_000, rows - offset)
+            hours = np.arange(offset, offset + n)
+            times = (START + hours * 3600).astype('datetime64[m]').astype(str)
+            levels = 3.2 * hours / 8766 + 600 * np.sin(hours * 2 * np.pi / 12.42) + rng.normal(0, 20, n)
+            lines = np.char.add(np.char.add(np.char.add(times, ','), np.char.mod('%.1f', levels)), ',15.0\n')
+            f.write(''.join(lines.tolist()))
+
+
+def anon_rss_mb():
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('RssAnon:'):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def measure(fn):
+    """(result, seconds, peak anonymous RSS growth in MB) sampling every 5 ms"""
+    baseline = anon_rss_mb()
+    peak = [baseline]
+    done = threading.Event()
+    
+    def sample():
+        while not done.is_set():
+            peak[0] = max(peak[0], anon_rss_mb())
+            done.wait(0.005)
+    
+    sampler = threading.Thread(target=sample, daemon=True)
+    sampler.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    done.set()
+    sampler.join()
+    return result, elapsed, max(peak[0], anon_rss_mb()) - baseline
+
+
+def main():
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        print(f"{'rows':>10} {'ingest s':>9} {'ingest MB':>10} {'last-125 us':>12} {'year us':>9} {'1k-pt ms':>9} {'1k-pt MB':>9}")
+        for rows in (100_000, 1_000_000, 4_000_000):
+            path = os.path.join(tmp_dir, f'gauge_{rows}.csv')
+            write_gauge_csv(path, rows)
+            store = TimeSeriesStore(os.path.join(tmp_dir, 'store'))
+            
+            _, ingest_s, ingest_mb = measure(lambda: ingest_csv(path, store.path('gauge'), 'time', 'level', 'uncertainty', 'mm'))
+            series = store.series('gauge')
+            
+            last_us = min(timeit.repeat(lambda: series.query(last=125), number=200, repeat=5)) / 200 * 1e6
+            year_start = int(series.time[len(series) // 2])
+            year_us = min(timeit.repeat(lambda: series.query(year_start, year_start + 365 * 86400, points=1000),
+                                        number=20, repeat=5)) / 20 * 1e6
+            _, full_s, full_mb = measure(lambda: series.query(points=1000))
+            
+            print(f'{rows:>10,} {ingest_s:>9.2f} {ingest_mb:>10.1f} {last_us:>12.1f} {year_us:>9.1f} '
+                  f'{full_s * 1000:>9.1f} {full_mb:>9.2f}')
+            os.remove(path)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""
+Verify connection reuse and retries of the shared upstream client
+
+Points the app at a local fake upstream and counts new TCP connections for
+bare requests.get vs UpstreamClient, then checks that 5xx replies are retried.
+
+Run from the backend folder:
+    python -m benchmarks.bench_upstream_pool
+"""
+
+import os
+import tempfile
+import time
+
+import requests
+
+from benchmarks.fake_upstream import FakeUpstream
+
+CALLS = 200
+
+
+def main():
+    fake = FakeUpstream().start()
+    os.environ['WEATHER_BASE_URL'] = fake.base_url
+    os.environ['ELEVATION_BASE_URL'] = fake.base_url
+    os.environ['ELEVATION_DB_PATH'] = os.path.join(tempfile.mkdtemp(), 'elevation.sqlite3')
+    os.environ['UPSTREAM_BACKOFF'] = '0'
+    
+    import app
+    
+    start = time.perf_counter()
+    for i in range(CALLS):
+        requests.get(f'{fake.base_url}/weather', params={'q': f'city{i}'}, timeout=5)
+    bare_time = time.perf_counter() - start
+    bare_connections = fake.connections
+    
+    fake.reset_counters()
+    client = app.app.test_client()
+    start = time.perf_counter()
+    for i in range(CALLS):
+        # Distinct names so the weather cache never short-circuits the upstream
+        assert client.get(f'/api/weather/city{i}').status_code == 200
+    pooled_time = time.perf_counter() - start
+    pooled_connections = fake.connections
+    
+    print(f"{'client':<28} {'calls':>6} {'new conns':>10} {'ms/call':>8}")
+    print(f"{'requests.get':<28} {CALLS:>6} {bare_connections:>10} {bare_time / CALLS * 1000:>8.2f}")
+    print(f"{'/api/weather via upstream':<28} {CALLS:>6} {pooled_connections:>10} {pooled_time / CALLS * 1000:>8.2f}")
+    assert pooled_connections == 1, 'expected a single keep-alive connection'
+    
+    fake.reset_counters()
+    fake.fail_first = 2
+    response = client.get('/api/weather/retry-city')
+    print(f'after 2 injected 503s: status {response.status_code}, upstream requests {fake.requests}')
+    assert response.status_code == 200 and fake.requests == 3
+    
+    print(app.upstream.stats()['openweathermap'])
+    fake.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+"""
+Benchmark: per-worker memory under gunicorn, with and without preload_app
+
+Starts gunicorn -c gunicorn.conf.py with 1, 4 and 16 workers, sends each
+worker a few requests that touch the model, the coastal index, the
+gazetteer and the time-series store, then reads /proc/<pid>/smaps_rollup
+for every worker. RSS counts shared pages in full; USS is what a worker
+holds privately and PSS splits shared pages between the processes using
+them, so sum(PSS) is the real footprint of the whole server.
+
+Linux only. Run from the backend folder:
+    python -m benchmarks.bench_workers
+"""
+
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+WORKER_COUNTS = (1, 4, 16)
+REQUESTS_PER_WORKER = 8
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def smaps_rollup(pid):
+    """{'Rss', 'Pss', 'Private_Clean', 'Private_Dirty', ...} in kB"""
+    values = {}
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == 'kB':
+                values[parts[0].rstrip(':')] = int(parts[1])
+    return values
+
+
+def worker_pids(master_pid):
+    pids = []
+    for task in os.listdir(f'/proc/{master_pid}/task'):
+        with open(f'/proc/{master_pid}/task/{task}/children') as f:
+            pids.extend(int(pid) for pid in f.read().split())
+    return pids
+
+
+def get(url, data=None):
+    headers = {'Content-Type': 'application/json'} if data is not None else {}
+    request = urllib.request.Request(url, data=data, headers=headers)
+    with urllib.request.urlopen(request, timeout=30) as response:
+        return response.status, response.read()
+
+
+def wait_ready(base_url, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if get(f'{base_url}/api/ready')[0] == 200:
+                return
+        except OSError:
+            pass
+        time.sleep(0.1)
+    raise RuntimeError('server did not become ready')
+
+
+def exercise(base_url, count):
+    # Elevations are given, so nothing leaves the machine
+    batch = json.dumps({'cities': [{'lat': 25.7, 'lon': -80.2, 'elevation': 2}, {'lat': 52.4, 'lon': 4.9, 'elevation': 1}]}).encode()
+    for i in range(count):
+        get(f'{base_url}/api/ml/sealevel/predict/global?start=2025&end=2300')
+        get(f'{base_url}/api/ml/sealevel/predict/batch', batch)
+        get(f'{base_url}/api/sealevel/current?points=200')
+        get(f'{base_url}/api/gazetteer/search?q=sa{chr(97 + i % 26)}')
+
+
+def measure(workers, preload):
+    port = free_port()
+    base_url = f'http://127.0.0.1:{port}'
+    env = dict(os.environ, GUNICORN_PRELOAD='1' if preload else '0',
+               ELEVATION_DB_PATH=os.path.join(tempfile.gettempdir(), f'bench-workers-{port}.sqlite3'))
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '--bind', f'127.0.0.1:{port}',
+         '--workers', str(workers), '--threads', '1', 'wsgi:app'],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        wait_ready(base_url)
+        # Until every worker has booted the first ones answer everything
+        deadline = time.monotonic() + 60
+        while len(worker_pids(server.pid)) < workers and time.monotonic() < deadline:
+            time.sleep(0.1)
+        exercise(base_url, REQUESTS_PER_WORKER * workers)
+        
+        stats = [smaps_rollup(pid) for pid in worker_pids(server.pid)]
+        master = smaps_rollup(server.pid)
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=30)
+        os.unlink(env['ELEVATION_DB_PATH'])
+    
+    mb = lambda kb: kb / 1024
+    rss = sum(s['Rss'] for s in stats) / len(stats)
+    uss = sum(s['Private_Clean'] + s['Private_Dirty'] for s in stats) / len(stats)
+    total_pss = sum(s['Pss'] for s in stats) + master['Pss']
+    return mb(rss), mb(uss), mb(total_pss)
+
+
+def main():
+    print(f"{'preload':<8} {'workers':>7} {'RSS/worker MB':>14} {'USS/worker MB':>14} {'total PSS MB':>13}")
+    for preload in (False, True):
+        for workers in WORKER_COUNTS:
+            rss, uss, total_pss = measure(workers, preload)
+            print(f"{str(preload):<8} {workers:>7} {rss:>14.1f} {uss:>14.1f} {total_pss:>13.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+"""
+Local stand-in for OpenWeatherMap and Open-Meteo used by the benchmarks
+
+Serves /weather, /elevation and /search on 127.0.0.1, counts new TCP connections and
+requests, and can inject latency or a run of 5xx failures.
+"""
+
+import json
+import threading
+import zlib
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+
+class FakeUpstream:
+    def __init__(self, latency=None, fail_first=0, weather=None):
+        """
+        Args:
+            latency: Dict of path -> seconds (or a callable returning seconds) to sleep before answering
+            fail_first: Number of initial requests answered with 503
+            weather: Query params -> /weather reply; fake_weather unless given (and replaceable later)
+        """
+        self.latency = latency or {}
+        self.fail_first = fail_first
+        self.weather = weather or fake_weather
+        self.connections = 0
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+    
+    @property
+    def base_url(self):
+        return f'http://127.0.0.1:{self._server.server_address[1]}'
+    
+    def start(self):
+        self._thread.start()
+        return self
+    
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+    
+    def reset_counters(self):
+        with self._lock:
+            self.connections = 0
+            self.requests = 0
+    
+    def _handler(self):
+        upstream = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+            
+            def setup(self):
+                super().setup()
+                with upstream._lock:
+                    upstream.connections += 1
+            
+            def do_GET(self):
+                parts = urlsplit(self.path)
+                params = {k: v[0] for k, v in parse_qs(parts.query).items()}
+                path = parts.path.rsplit('/', 1)[-1]
+                
+                with upstream._lock:
+                    upstream.requests += 1
+                    failing = upstream.requests <= upstream.fail_first
+                
+                delay = upstream.latency.get(path, 0)
+                if callable(delay):
+                    delay = delay()
+                if delay:
+                    time.sleep(delay)
+                
+                if failing:
+                    self._send(503, {'message': 'injected failure'})
+                elif path == 'weather':
+                    self._send(200, upstream.weather(params))
+                elif path == 'elevation':
+                    self._send(200, {'elevation': [3.0]})
+                elif path == 'search':
+                    # Geocodes a name to the same place the fake /weather puts it
+                    coord = upstream.weather({'q': params.get('name', 'Nowhere')})['coord']
+                    self._send(200, {'results': [{'name': params.get('name', 'Nowhere'), 'latitude': coord['lat'],
+                                                  'longitude': coord['lon'], 'elevation': 3.0}]})
+                else:
+                    self._send(404, {'message': 'not found'})
+            
+            def _send(self, status, body):
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+            
+            def log_message(self, *args):
+                pass
+        
+        return Handler
+
+
+def fake_weather(params):
+    name = params.get('q', 'Coordsville')
+    # Distinct names land on distinct coordinates so elevation lookups do not collide
+    seed = zlib.crc32(name.encode())
+    lat = float(params.get('lat', (seed % 1200) / 10 - 60))
+    lon = float(params.get('lon', (seed // 1200 % 3600) / 10 - 180))
+    return {
+        'name': name,
+        'coord': {'lat': lat, 'lon': lon},
+        'sys': {'country': 'US', 'sunrise': 1700000000, 'sunset': 1700040000},
+        'weather': [{'description': 'clear sky', 'icon': '01d'}],
+        'main': {'temp': 27.0, 'feels_like': 29.0, 'temp_min': 26.0, 'temp_max': 28.0,
+                 'humidity': 70, 'pressure': 1012},
+        'wind': {'speed': 3.0},
+        'visibility': 10000
+    }
@@ -0,0 +1,42 @@
+"""
+Gunicorn settings for the API
+
+Run from the backend folder:
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+WEB_CONCURRENCY, GUNICORN_THREADS and BIND override the defaults;
+GUNICORN_PRELOAD=0 makes every worker build its own copy of the models.
+Set threads through GUNICORN_THREADS rather than --threads, so the
+per-worker stream cap below follows it.
+"""
+
+import os
+
+bind = os.getenv('BIND', '0.0.0.0:5000')
+workers = int(os.getenv('WEB_CONCURRENCY', 4))
+
+# Threads keep streamed responses from tying up a whole worker. Every open
+# /api/stream subscriber holds one thread for as long as it stays connected,
+# so a worker takes at most threads - STREAM_RESERVED_THREADS streams (the app
+# answers 503 + Retry-After beyond that) and keeps the rest for ordinary
+# requests. An idle stream costs about 32 kB of RSS, mostly its thread's stack.
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', 64))
+worker_connections = max(1000, threads + 64)
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 60))
+os.environ.setdefault('STREAM_MAX_OPEN', str(max(threads - int(os.getenv('STREAM_RESERVED_THREADS', 8)), 1)))
+
+# Build models and indexes once in the master; workers share them after fork
+preload_app = os.getenv('GUNICORN_PRELOAD', '1') != '0'
+
+
+def pre_fork(server, worker):
+    if server.cfg.preload_app:
+        import wsgi
+        wsgi.before_fork()
+
+
+def post_fork(server, worker):
+    if server.cfg.preload_app:
+        import wsgi
+        wsgi.after_fork()
@@ -0,0 +1,47 @@
+"""
+Nearest-coastline distance engine
+
+Coastline points are stored as an int16 (N, 2) array of lat/lon in
+hundredths of a degree (data/coastline.npy). The bundled file holds one
+point per 0.1 degree cell of the ocean/land boundary, placed at the mean
+of that cell's shoreline pixels in the NOAA GLOBE 30" ocean mask (public
+domain), so distances are good to a few km. Points are indexed in a
+KD-tree over unit vectors, which makes every query O(log n) and lets
+thousands of coordinates be answered in one call.
+"""
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def _unit_vectors(lats, lons):
+    lat = np.radians(np.asarray(lats, dtype=float))
+    lon = np.radians(np.asarray(lons, dtype=float))
+    cos_lat = np.cos(lat)
+    return np.stack([cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)], axis=-1)
+
+
+class CoastalIndex:
+    def __init__(self, points):
+        """
+        Args:
+            points: Array (N, 2) of coastline lat/lon in degrees
+        """
+        points = np.asarray(points, dtype=float)
+        self.size = len(points)
+        self._tree = cKDTree(_unit_vectors(points[:, 0], points[:, 1]))
+    
+    @classmethod
+    def load(cls, path):
+        """Index for a bundled int16 centi-degree coastline file"""
+        return cls(np.load(path, mmap_mode='r') / 100.0)
+    
+    def distances_km(self, lats, lons):
+        """Great-circle distance to the nearest coastline point for arrays of coordinates"""
+        chord, _ = self._tree.query(_unit_vectors(lats, lons))
+        return 2 * EARTH_RADIUS_KM * np.arcsin(np.minimum(1.0, chord / 2))
+    
+    def distance_km(self, lat, lon):
+        return float(self.distances_km([lat], [lon])[0])
@@ -0,0 +1,177 @@
+"""
+Threshold crossings: the first year a projection reaches a level
+
+The global curve is project()'s accelerated projection, which every city
+route scales: p(year) up to BASE_YEAR, m * p(year) + a * m * (year - BASE_YEAR)**1.5
+after it (without an acceleration, the plain trend m * p(year)). Every city
+quantity is min(cap, rise * scale + offset) with scale > 0, so a city
+threshold maps to a global rise threshold and all cities of a scenario are
+solved against the same curve.
+
+For a polynomial evaluator a crossing is a polynomial root: in t on the
+trend and before BASE_YEAR, in u = sqrt(year - BASE_YEAR) after it, where
+m * p(BASE_YEAR + u**2) + a * m * u**3 is again a polynomial. Thresholds
+only change the constant term, so all of them are solved together as
+batched companion-matrix eigenvalues. Every analytic answer is checked
+against the evaluator at whole years; other evaluators, and answers that
+fail the check (ties at a whole year, near-tangent roots), fall back to a
+bisection over whole years of the curve's running maximum, which is exact
+for any curve.
+"""
+
+import numpy as np
+from numpy.polynomial import Polynomial
+
+from .projection_table import BASE_YEAR, LAST_YEAR
+
+# Imaginary parts up to this (relative to the root's size) are rounding
+IMAG_TOLERANCE = 1e-9
+
+
+def global_thresholds(threshold, scale, offset, cap):
+    """Global rise at which min(cap, rise * scale + offset) reaches threshold; inf where it never does"""
+    scale, offset, cap = (np.asarray(values, dtype=float) for values in (scale, offset, cap))
+    return np.where(threshold <= cap, (threshold - offset) / scale, np.inf)
+
+
+class CrossingSolver:
+    def __init__(self, evaluator, multiplier=1.0, acceleration=None, start=BASE_YEAR, end=LAST_YEAR):
+        """
+        Args:
+            evaluator: Global trend (years array -> mm); a PolynomialEvaluator is solved analytically
+            multiplier: Scenario multiplier
+            acceleration: None for the trend m * p(year), or the coefficient of project()'s projection
+            start, end: Whole years bounding the search
+        """
+        if end < start:
+            raise ValueError('end must not be before start')
+        self.evaluator = evaluator
+        self.multiplier = float(multiplier)
+        self.acceleration = acceleration
+        self.start = int(start)
+        self.end = int(end)
+        self._pieces = self._polynomial_pieces() if hasattr(evaluator, 'coefficients') else None
+    
+    def rise(self, years):
+        """Global rise (mm) over an array of years, as project() or the trend computes it"""
+        years = np.asarray(years, dtype=float)
+        base = self.evaluator(years)
+        if self.acceleration is None:
+            return base * self.multiplier
+        years_from_now = years - BASE_YEAR
+        with np.errstate(invalid='ignore'):
+            acceleration = (years_from_now ** 1.5) * self.acceleration * self.multiplier
+        return np.where(years_from_now > 0, base * self.multiplier + acceleration, base)
+    
+    def solve(self, thresholds):
+        """
+        (crossing, year) arrays for global rise thresholds: the fractional year
+        the curve first reaches each threshold and the first whole year at or
+        above it, both NaN if that does not happen by end. A threshold already
+        reached at start gives start for both.
+        """
+        thresholds = np.asarray(thresholds, dtype=float)
+        crossing = np.full(thresholds.shape, np.nan)
+        year = np.full(thresholds.shape, np.nan)
+        finite = np.isfinite(thresholds)
+        
+        pending = finite.copy()
+        if self._pieces is not None and finite.any():
+            crossing[finite] = self._roots(thresholds[finite])
+            year[finite] = self._whole_years(crossing[finite], thresholds[finite])
+            pending[finite] = ~self._verified(year[finite], thresholds[finite])
+        
+        if pending.any():
+            crossing[pending], year[pending] = self._bisect(thresholds[pending])
+        return crossing, year
+    
+    def _polynomial_pieces(self):
+        """[(polynomial, v_low, v_high, v -> year, starts_with_step)] covering [start, end] in order"""
+        coefficients = Polynomial(self.evaluator.coefficients)
+        center, scale = self.evaluator.center, self.evaluator.scale
+        in_t = lambda year: (year - center) / scale
+        from_t = lambda t: center + scale * t
+        
+        if self.acceleration is None:
+            return [(coefficients * self.multiplier, in_t(self.start), in_t(self.end), from_t, False)]
+        
+        pieces = []
+        if self.start <= BASE_YEAR:
+            pieces.append((coefficients, in_t(self.start), in_t(min(self.end, BASE_YEAR)), from_t, False))
+        if self.end > BASE_YEAR:
+            # year = BASE_YEAR + u**2, so t = t0 + u**2 / scale
+            u_squared = Polynomial([in_t(BASE_YEAR), 0, 1 / scale])
+            future = (coefficients(u_squared) + Polynomial([0, 0, 0, self.acceleration])) * self.multiplier
+            pieces.append((future, np.sqrt(max(self.start - BASE_YEAR, 0)), np.sqrt(self.end - BASE_YEAR),
+                           lambda u: BASE_YEAR + u ** 2, self.start <= BASE_YEAR))
+        return pieces
+    
+    def _roots(self, thresholds):
+        """Earliest fractional year each threshold is reached on the polynomial pieces"""
+        # Reached at start is decided by the evaluator itself, so ties there are exact
+        crossing = np.where(self.rise(self.start) >= thresholds, float(self.start), np.nan)
+        for polynomial, low, high, to_year, starts_with_step in self._pieces:
+            open_ = np.isnan(crossing)
+            if not open_.any():
+                break
+            
+            # The accelerated projection steps up right after BASE_YEAR
+            if starts_with_step:
+                step = open_ & (polynomial(low) >= thresholds)
+                crossing[step] = BASE_YEAR
+                open_ &= ~step
+            
+            coefficients = polynomial.trim().coef
+            degree = len(coefficients) - 1
+            if degree < 1 or not open_.any():
+                continue
+            
+            # Monic companion matrices: only the constant term depends on the threshold
+            companion = np.zeros((open_.sum(), degree, degree))
+            companion[:, 1:, :-1] = np.eye(degree - 1)
+            companion[:, :, -1] = -coefficients[:-1] / coefficients[-1]
+            companion[:, 0, -1] = -(coefficients[0] - thresholds[open_]) / coefficients[-1]
+            roots = np.linalg.eigvals(companion)
+            
+            real = roots.real
+            valid = ((np.abs(roots.imag) <= IMAG_TOLERANCE * np.maximum(1, np.abs(real)))
+                     & (real > low) & (real <= high))
+            first = np.where(valid, real, np.inf).min(axis=1)
+            found = np.isfinite(first)
+            indices = np.flatnonzero(open_)[found]
+            crossing[indices] = to_year(first[found])
+        return crossing
+    
+    def _whole_years(self, crossing, thresholds):
+        """First whole year at or after each crossing that is at or above the threshold"""
+        year = np.ceil(crossing)
+        found = ~np.isnan(year)
+        # A step (at BASE_YEAR) is only reached in the year after it
+        short = found & (self.rise(np.where(found, year, self.start)) < thresholds)
+        year[short] += 1
+        year[year > self.end] = np.nan
+        return year
+    
+    def _verified(self, year, thresholds):
+        """Whether each whole year is the first at or above its threshold, or NaN is right"""
+        found = ~np.isnan(year)
+        at = np.where(found, year, self.end)
+        reached = self.rise(at) >= thresholds
+        before = self.rise(np.maximum(at - 1, self.start)) < thresholds
+        return np.where(found, reached & ((at == self.start) | before), ~reached)
+    
+    def _bisect(self, thresholds):
+        """Bisection over whole years of the running maximum: exact for any curve"""
+        years = np.arange(self.start, self.end + 1)
+        levels = self.rise(years)
+        index = np.searchsorted(np.maximum.accumulate(levels), thresholds)
+        found = index < len(years)
+        index = np.minimum(index, len(years) - 1)
+        year = np.where(found, years[index], np.nan).astype(float)
+        
+        # Linear between the whole years either side
+        previous = levels[np.maximum(index - 1, 0)]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            fraction = np.clip((thresholds - previous) / (levels[index] - previous), 0, 1)
+        crossing = np.where(index == 0, year, year - 1 + fraction)
+        return np.where(found, crossing, np.nan), year
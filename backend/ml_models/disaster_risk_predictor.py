@@ -3,6 +3,50 @@ Disaster Risk Predictor - Flood & Landslide Assessment
 Day 5: Complete Implementation
 """
 
+import numpy as np
+
+# Risk level codes used by the batch scorers: index into these tuples
+RISK_LEVELS = ('Low', 'Medium', 'High', 'Critical')
+RISK_COLORS = ('#00c851', '#ffa500', '#ff4444', '#cc0000')
+TERRAIN_TYPES = ('Flat', 'Rolling', 'Hilly', 'Mountainous')
+
+
+def _as_input_array(values, default, defaults=True):
+    """
+    Float array where missing (None/NaN) inputs take the default
+    
+    With defaults=True zero also takes the default, as in the scalar path;
+    gridded inputs pass defaults=False so that 0 m is scored as sea level.
+    """
+    values = np.asarray(values, dtype=float)
+    missing = np.isnan(values)
+    if defaults:
+        missing |= values == 0
+    return np.where(missing, default, values)
+
+
+def round_like_python(values, ndigits):
+    """
+    np.round that matches Python's round() exactly
+    
+    np.round scales by 10**ndigits before rounding, which can break ties
+    differently from Python's exact decimal rounding; the few values sitting
+    next to a tie are re-rounded with round().
+    """
+    values = np.asarray(values, dtype=float)
+    rounded = np.round(values, ndigits)
+    scaled = values * 10 ** ndigits
+    near_tie = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    for i in np.flatnonzero(near_tie):
+        rounded.flat[i] = round(float(values.flat[i]), ndigits)
+    return rounded
+
+
+def risk_level_codes(scores):
+    """0-3 codes into RISK_LEVELS for >=20 / >=40 / >=70 thresholds"""
+    return np.digitize(scores, (20, 40, 70)).astype(np.int8)
+
+
 class DisasterRiskPredictor:
     def __init__(self):
         """Initialize the disaster risk predictor"""
@@ -59,7 +103,28 @@ class DisasterRiskPredictor:
             risk_level = 'Low'
             risk_color = '#00c851'
         
-        # Generate warnings based on conditions
+        warnings = self.flood_warnings(elevation, rainfall, humidity, flood_score)
+        actions = self.flood_actions(flood_score)
+        
+        return {
+            'risk_score': round(flood_score, 1),
+            'risk_level': risk_level,
+            'risk_color': risk_color,
+            'rainfall_factor': round(rainfall_factor, 1),
+            'elevation_factor': round(elevation_factor, 1),
+            'drainage_factor': round(drainage_factor, 1),
+            'warnings': warnings,
+            'actions': actions,
+            'details': {
+                'current_rainfall': round(rainfall, 1),
+                'elevation': round(elevation, 1),
+                'humidity': round(humidity, 1),
+                'city': city_name
+            }
+        }
+    
+    def flood_warnings(self, elevation, rainfall, humidity, flood_score):
+        """Warning messages for one scored location"""
         warnings = []
         
         if rainfall > 75:
@@ -80,7 +145,10 @@ class DisasterRiskPredictor:
         if flood_score >= 70:
             warnings.append('🚨 EXTREME FLOOD RISK - Immediate action required')
         
-        # Generate recommended actions
+        return warnings
+    
+    def flood_actions(self, flood_score):
+        """Recommended actions for a flood score"""
         actions = []
         
         if flood_score >= 70:
@@ -108,22 +176,7 @@ class DisasterRiskPredictor:
         else:
             actions.append('✓ Continue normal activities, stay informed of weather updates')
         
-        return {
-            'risk_score': round(flood_score, 1),
-            'risk_level': risk_level,
-            'risk_color': risk_color,
-            'rainfall_factor': round(rainfall_factor, 1),
-            'elevation_factor': round(elevation_factor, 1),
-            'drainage_factor': round(drainage_factor, 1),
-            'warnings': warnings,
-            'actions': actions,
-            'details': {
-                'current_rainfall': round(rainfall, 1),
-                'elevation': round(elevation, 1),
-                'humidity': round(humidity, 1),
-                'city': city_name
-            }
-        }
+        return actions
     
     def calculate_landslide_risk(self, city_name, elevation, rainfall):
         """
@@ -188,7 +241,27 @@ class DisasterRiskPredictor:
         else:
             terrain_type = 'Flat'
         
-        # Generate warnings
+        warnings = self.landslide_warnings(elevation, rainfall, landslide_score)
+        actions = self.landslide_actions(landslide_score)
+        
+        return {
+            'risk_score': round(landslide_score, 1),
+            'risk_level': risk_level,
+            'risk_color': risk_color,
+            'slope_factor': round(slope_factor, 1),
+            'rainfall_factor': round(rainfall_factor, 1),
+            'soil_factor': round(soil_factor, 1),
+            'warnings': warnings,
+            'actions': actions,
+            'details': {
+                'elevation': round(elevation, 1),
+                'current_rainfall': round(rainfall, 1),
+                'terrain_type': terrain_type
+            }
+        }
+    
+    def landslide_warnings(self, elevation, rainfall, landslide_score):
+        """Warning messages for one scored location"""
         warnings = []
         
         if elevation > 500 and rainfall > 60:
@@ -208,7 +281,10 @@ class DisasterRiskPredictor:
         if landslide_score >= 70:
             warnings.append('🚨 EXTREME LANDSLIDE RISK - Evacuate hillside areas')
         
-        # Generate actions
+        return warnings
+    
+    def landslide_actions(self, landslide_score):
+        """Recommended actions for a landslide score"""
         actions = []
         
         if landslide_score >= 70:
@@ -237,20 +313,94 @@ class DisasterRiskPredictor:
         else:
             actions.append('✓ No immediate action required - maintain awareness')
         
+        return actions
+    
+    def score_flood_batch(self, elevation, rainfall, humidity, defaults=True):
+        """
+        Flood scores for arrays of locations, without any text
+        
+        Args:
+            elevation: Elevations in meters
+            rainfall: Rainfall in mm/24h
+            humidity: Humidity percentages
+            defaults: Give zero inputs the scalar path's defaults; pass False
+                for measured grids, where only NaN means missing
+        
+        Returns dict of float arrays (risk_score and the three factors) plus
+        'level', int8 codes into RISK_LEVELS / RISK_COLORS
+        """
+        elevation = _as_input_array(elevation, 50.0, defaults)
+        rainfall = _as_input_array(rainfall, 0.0, defaults)
+        humidity = _as_input_array(humidity, 70.0, defaults)
+        
+        rainfall_factor = np.minimum(100, (rainfall / 100) * 100)
+        elevation_factor = np.maximum(0, 100 - (elevation / 2))
+        drainage_factor = np.maximum(0, 100 - (humidity * 0.8))
+        
+        flood_score = (
+            rainfall_factor * 0.4 +
+            elevation_factor * 0.4 +
+            drainage_factor * 0.2
+        )
+        
         return {
-            'risk_score': round(landslide_score, 1),
-            'risk_level': risk_level,
-            'risk_color': risk_color,
-            'slope_factor': round(slope_factor, 1),
-            'rainfall_factor': round(rainfall_factor, 1),
-            'soil_factor': round(soil_factor, 1),
-            'warnings': warnings,
-            'actions': actions,
-            'details': {
-                'elevation': round(elevation, 1),
-                'current_rainfall': round(rainfall, 1),
-                'terrain_type': terrain_type
-            }
+            'risk_score': flood_score,
+            'level': risk_level_codes(flood_score),
+            'rainfall_factor': rainfall_factor,
+            'elevation_factor': elevation_factor,
+            'drainage_factor': drainage_factor
+        }
+    
+    def score_landslide_batch(self, elevation, rainfall, defaults=True):
+        """
+        Landslide scores for arrays of locations, without any text
+        
+        Returns dict of float arrays (risk_score and the three factors) plus
+        'level' codes into RISK_LEVELS and 'terrain' codes into TERRAIN_TYPES;
+        defaults as in score_flood_batch
+        """
+        elevation = _as_input_array(elevation, 50.0, defaults)
+        rainfall = _as_input_array(rainfall, 0.0, defaults)
+        
+        slope_factor = np.select(
+            [elevation > 500, elevation > 200, elevation > 100],
+            [np.minimum(100, elevation / 10), np.minimum(80, elevation / 15), np.minimum(60, elevation / 20)],
+            default=np.maximum(0, elevation / 30)
+        )
+        rainfall_factor = np.minimum(100, (rainfall / 80) * 100)
+        soil_factor = np.maximum(0, 100 - (rainfall * 0.8))
+        
+        landslide_score = (
+            slope_factor * 0.5 +
+            rainfall_factor * 0.35 +
+            (100 - soil_factor) * 0.15
+        )
+        
+        return {
+            'risk_score': landslide_score,
+            'level': risk_level_codes(landslide_score),
+            'terrain': np.digitize(elevation, (100, 200, 500), right=True).astype(np.int8),
+            'slope_factor': slope_factor,
+            'rainfall_factor': rainfall_factor,
+            'soil_factor': soil_factor
+        }
+    
+    def score_batch(self, elevation, rainfall, humidity, defaults=True):
+        """
+        Flood, landslide and combined scores for arrays of locations
+        
+        combined follows assess_city_risk, which weights the 1-decimal scores
+        """
+        flood = self.score_flood_batch(elevation, rainfall, humidity, defaults)
+        landslide = self.score_landslide_batch(elevation, rainfall, defaults)
+        combined = (round_like_python(flood['risk_score'], 1) * 0.6 +
+                    round_like_python(landslide['risk_score'], 1) * 0.4)
+        
+        return {
+            'flood': flood,
+            'landslide': landslide,
+            'combined_risk': combined,
+            'combined_level': risk_level_codes(combined)
         }
     
     def assess_city_risk(self, city_name, elevation, current_weather):
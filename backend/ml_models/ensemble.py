@@ -0,0 +1,119 @@
+"""
+Monte Carlo uncertainty for global sea level projections
+
+Every draw is one plausible trajectory built from:
+- trend coefficients refitted to a residual bootstrap of the historical
+  levels (all draws are solved at once against the evaluator's
+  centered/scaled basis),
+- an acceleration coefficient ~ N(ACCELERATION, ACCELERATION_SD), floored at 0,
+- a scenario multiplier ~ N(multiplier, multiplier * MULTIPLIER_SD).
+Trajectories use the same formula as projection_table.project and are
+summarized as percentiles per year. The same seed always gives the same
+ensemble, however the years are blocked.
+
+Summaries run in the calling process. A process pool was slower at every
+size measured: spawning workers and shipping the draws to them costs
+more than the parallel sorts save (200k draws x 300 years took 0.59 s on
+one process and 1.14 s on four), and gunicorn already spreads requests
+over one process per core.
+"""
+
+import numpy as np
+
+from .projection_table import BASE_YEAR, ACCELERATION
+
+DEFAULT_DRAWS = 10000
+DEFAULT_PERCENTILES = (5, 17, 50, 83, 95)
+ACCELERATION_SD = 0.02
+MULTIPLIER_SD = 0.1
+
+# Years evaluated together; a (YEAR_BLOCK, draws) block stays in cache
+YEAR_BLOCK = 32
+
+
+def sorted_percentiles(values, percentiles):
+    """
+    np.percentile(values, percentiles, axis=-1) with the default linear method.
+    Sorts values in place: one sort is much faster than the multi-kth
+    partition np.percentile uses. Returns shape (len(percentiles),) + values.shape[:-1].
+    """
+    n = values.shape[-1]
+    position = np.asarray(percentiles, dtype=float) / 100 * (n - 1)
+    lower = np.floor(position).astype(np.int64)
+    upper = np.minimum(lower + 1, n - 1)
+    fraction = position - lower
+    
+    values.sort(axis=-1)
+    below, above = values[..., lower], values[..., upper]
+    return np.moveaxis(below + (above - below) * fraction, -1, 0)
+
+
+class EnsembleDraws:
+    def __init__(self, coefficients, acceleration, multiplier, center, scale):
+        """
+        Args:
+            coefficients: Array (draws, degree + 1) in powers of t = (year - center) / scale
+            acceleration: Array (draws,) of acceleration coefficients
+            multiplier: Array (draws,) of scenario multipliers
+        """
+        self.coefficients = coefficients
+        self.acceleration = acceleration
+        self.multiplier = multiplier
+        self.center = center
+        self.scale = scale
+        
+        # After BASE_YEAR a trajectory is (basis @ coefficients) * multiplier +
+        # ramp * acceleration * multiplier, so one matrix product over the basis
+        # extended with the ramp column evaluates all draws; before it the ramp
+        # weight is zero and the multiplier is not applied
+        self._future = np.column_stack([coefficients * multiplier[:, None], acceleration * multiplier]).T
+        self._past = np.column_stack([coefficients, np.zeros(len(multiplier))]).T
+    
+    def __len__(self):
+        return len(self.multiplier)
+    
+    @classmethod
+    def sample(cls, years, levels, evaluator, multiplier, draws=DEFAULT_DRAWS, seed=0):
+        """Draw the ensemble parameters around a fitted PolynomialEvaluator"""
+        rng = np.random.default_rng(seed)
+        
+        t = (np.asarray(years, dtype=float) - evaluator.center) / evaluator.scale
+        basis = np.vander(t, len(evaluator.coefficients), increasing=True)
+        fitted = basis @ np.array(evaluator.coefficients)
+        
+        # Residuals are inflated for the degrees of freedom the fit used up
+        n, p = basis.shape
+        residuals = (np.asarray(levels, dtype=float) - fitted) * np.sqrt(n / max(n - p, 1))
+        resampled = fitted + residuals[rng.integers(0, n, size=(draws, n))]
+        coefficients = resampled @ np.linalg.pinv(basis).T
+        
+        acceleration = np.maximum(rng.normal(ACCELERATION, ACCELERATION_SD, draws), 0.0)
+        multipliers = rng.normal(multiplier, abs(multiplier) * MULTIPLIER_SD, draws)
+        return cls(coefficients, acceleration, multipliers, evaluator.center, evaluator.scale)
+    
+    def trajectories(self, years):
+        """Array (len(years), draws) of projected levels in mm"""
+        years = np.asarray(years, dtype=float)
+        t = (years - self.center) / self.scale
+        future = years > BASE_YEAR
+        ramp = np.where(future, np.maximum(years - BASE_YEAR, 0) ** 1.5, 0.0)
+        basis = np.column_stack([np.vander(t, self.coefficients.shape[1], increasing=True), ramp])
+        
+        if future.all():
+            return basis @ self._future
+        paths = np.empty((len(years), len(self)))
+        paths[future] = basis[future] @ self._future
+        paths[~future] = basis[~future] @ self._past
+        return paths
+    
+    def summarize(self, years, percentiles=DEFAULT_PERCENTILES):
+        """(mean, percentile_values) with shapes (len(years),) and (len(percentiles), len(years))"""
+        years = np.asarray(years, dtype=float)
+        mean = np.empty(len(years))
+        values = np.empty((len(percentiles), len(years)))
+        for start in range(0, len(years), YEAR_BLOCK):
+            block = slice(start, start + YEAR_BLOCK)
+            paths = self.trajectories(years[block])
+            mean[block] = paths.mean(axis=1)
+            values[:, block] = sorted_percentiles(paths, percentiles)
+        return mean, values
@@ -0,0 +1,185 @@
+"""
+Versioned on-disk artifact for the sea level trend model
+
+Training (sklearn) happens once, in the training CLI or when the training
+data changes; the artifact keeps everything serving needs as plain JSON:
+
+    version       ARTIFACT_VERSION the file was written with
+    data_hash     SHA-256 of the training years/levels and polynomial degree
+    polynomial    exported Horner coefficients with their centering/scaling
+    linear        slope and intercept of the linear baseline model
+    metrics       R² / RMSE of both models on the training data
+    trained_at    ISO timestamp
+
+Loading it is a json.load, so workers start without importing sklearn.
+
+Train from the backend folder with:
+    python -m ml_models.train_model [--force]
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from datetime import datetime, timezone
+
+import numpy as np
+
+from .polynomial import PolynomialEvaluator
+
+ARTIFACT_VERSION = 1
+DEFAULT_DEGREE = 2
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'sea_level_model.json')
+
+
+def data_hash(years, levels, degree=DEFAULT_DEGREE):
+    """Hash of everything a fit depends on"""
+    digest = hashlib.sha256()
+    digest.update(np.ascontiguousarray(years, dtype=np.float64).tobytes())
+    digest.update(np.ascontiguousarray(levels, dtype=np.float64).tobytes())
+    digest.update(f'degree={degree}'.encode())
+    return digest.hexdigest()
+
+
+def _metrics(y, predicted):
+    residual = y - predicted
+    total = np.sum((y - y.mean()) ** 2)
+    return float(1 - np.sum(residual ** 2) / total), float(np.sqrt(np.mean(residual ** 2)))
+
+
+def fit_sklearn(years, levels, degree=DEFAULT_DEGREE):
+    """
+    Fit the linear baseline and the polynomial model; returns
+    (linear_model, poly_features, poly_model). sklearn is imported here so
+    that serving never pays for it.
+    """
+    from sklearn.linear_model import LinearRegression
+    from sklearn.preprocessing import PolynomialFeatures
+    
+    X = np.asarray(years).reshape(-1, 1)
+    y = np.asarray(levels, dtype=float)
+    linear_model = LinearRegression().fit(X, y)
+    poly_features = PolynomialFeatures(degree=degree)
+    poly_model = LinearRegression().fit(poly_features.fit_transform(X), y)
+    return linear_model, poly_features, poly_model
+
+
+class ModelArtifact:
+    def __init__(self, evaluator, linear, data_hash, metrics, degree=DEFAULT_DEGREE, trained_at=None,
+                 training_period=None, training_points=None):
+        """
+        Args:
+            evaluator: PolynomialEvaluator used for serving
+            linear: (slope, intercept) of the linear baseline
+            data_hash: data_hash() of the training set
+            metrics: {'linear_r2', 'poly_r2', 'linear_rmse', 'poly_rmse', ...}
+        """
+        self.evaluator = evaluator
+        self.linear = tuple(float(v) for v in linear)
+        self.data_hash = data_hash
+        self.metrics = dict(metrics)
+        self.degree = degree
+        self.trained_at = trained_at or datetime.now(timezone.utc).isoformat()
+        self.training_period = training_period
+        self.training_points = training_points
+    
+    @classmethod
+    def fit(cls, years, levels, degree=DEFAULT_DEGREE):
+        """Fit both models with sklearn and export them"""
+        years = np.asarray(years)
+        y = np.asarray(levels, dtype=float)
+        X = years.reshape(-1, 1)
+        
+        linear_model, poly_features, poly_model = fit_sklearn(years, levels, degree)
+        X_poly = poly_features.transform(X)
+        evaluator = PolynomialEvaluator.from_sklearn(poly_features, poly_model, years)
+        
+        linear_r2, linear_rmse = _metrics(y, linear_model.predict(X))
+        poly_r2, poly_rmse = _metrics(y, poly_model.predict(X_poly))
+        
+        return cls(
+            evaluator,
+            (linear_model.coef_[0], linear_model.intercept_),
+            data_hash(years, levels, degree),
+            {
+                'linear_r2': round(linear_r2, 4),
+                'poly_r2': round(poly_r2, 4),
+                'linear_rmse': round(linear_rmse, 2),
+                'poly_rmse': round(poly_rmse, 2),
+                'export_max_error_mm': evaluator.max_error
+            },
+            degree=degree,
+            training_period=[int(years[0]), int(years[-1])],
+            training_points=len(years)
+        )
+    
+    def to_dict(self):
+        return {
+            'version': ARTIFACT_VERSION,
+            'data_hash': self.data_hash,
+            'degree': self.degree,
+            'polynomial': self.evaluator.to_dict(),
+            'linear': {'slope': self.linear[0], 'intercept': self.linear[1]},
+            'metrics': self.metrics,
+            'training_period': self.training_period,
+            'training_points': self.training_points,
+            'trained_at': self.trained_at
+        }
+    
+    @classmethod
+    def from_dict(cls, data):
+        if data.get('version') != ARTIFACT_VERSION:
+            raise ValueError(f"Unsupported model artifact version {data.get('version')!r}")
+        return cls(
+            PolynomialEvaluator.from_dict(data['polynomial']),
+            (data['linear']['slope'], data['linear']['intercept']),
+            data['data_hash'],
+            data['metrics'],
+            degree=data['degree'],
+            trained_at=data['trained_at'],
+            training_period=data.get('training_period'),
+            training_points=data.get('training_points')
+        )
+    
+    def save(self, path):
+        """Write atomically so a concurrently starting worker never reads half a file"""
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(self.to_dict(), f, indent=2)
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+    
+    @classmethod
+    def load_or_train(cls, path, years, levels, degree=DEFAULT_DEGREE, force=False):
+        """
+        Artifact at path when it matches the training data, otherwise a fresh
+        fit (saved back to path when possible). Returns (artifact, trained).
+        """
+        expected = data_hash(years, levels, degree)
+        if not force and path and os.path.exists(path):
+            try:
+                artifact = cls.load(path)
+                if artifact.data_hash == expected:
+                    return artifact, False
+            except (ValueError, KeyError, json.JSONDecodeError):
+                pass
+        
+        artifact = cls.fit(years, levels, degree)
+        if path:
+            try:
+                artifact.save(path)
+            except OSError:
+                # Read-only deployments still serve the fresh fit from memory
+                pass
+        return artifact, True
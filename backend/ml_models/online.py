@@ -0,0 +1,141 @@
+"""
+Incremental refits of the polynomial trend as observations arrive
+
+NormalEquations keeps the sufficient statistics of a least-squares
+polynomial fit in a fixed centered/scaled basis t = (year - center) / scale:
+
+    gram      X^T X   (degree + 1, degree + 1)
+    moment    X^T y   (degree + 1,)
+    n, sum_y, sum_yy
+
+Adding observations is a rank-k update of those arrays (O(degree^2) per
+observation, however many came before), a refit is a (degree + 1)-sized
+solve, and R² / RMSE follow from the same statistics; the linear baseline
+is the leading 2 x 2 block. Instances are never modified: add() returns a
+new one, so readers never see a half-applied update.
+
+IncrementalBackend serves the artifact like ArtifactBackend and then moves
+the coefficients with every SeaLevelPredictor.observe().
+"""
+
+from datetime import datetime, timezone
+
+import numpy as np
+
+from .model_artifact import DEFAULT_DEGREE
+from .polynomial import PolynomialEvaluator
+from .sea_level_predictor import ArtifactBackend
+
+
+class NormalEquations:
+    def __init__(self, gram, moment, n, sum_y, sum_yy, center, scale):
+        self.gram = gram
+        self.moment = moment
+        self.n = n
+        self.sum_y = sum_y
+        self.sum_yy = sum_yy
+        self.center = center
+        self.scale = scale
+    
+    @property
+    def degree(self):
+        return len(self.moment) - 1
+    
+    @classmethod
+    def empty(cls, degree, center, scale):
+        return cls(np.zeros((degree + 1, degree + 1)), np.zeros(degree + 1), 0, 0.0, 0.0, float(center), float(scale))
+    
+    @classmethod
+    def from_data(cls, years, levels, degree=DEFAULT_DEGREE, center=None, scale=None):
+        """Statistics of a data set, in the basis PolynomialEvaluator.from_sklearn would pick unless given"""
+        years = np.asarray(years, dtype=float)
+        if center is None:
+            center = (years.max() + years.min()) / 2
+            scale = (years.max() - years.min()) / 2 or 1.0
+        return cls.empty(degree, center, scale).add(years, levels)
+    
+    def add(self, years, levels):
+        """New NormalEquations including the observations"""
+        years = np.atleast_1d(np.asarray(years, dtype=float))
+        levels = np.atleast_1d(np.asarray(levels, dtype=float))
+        basis = np.vander((years - self.center) / self.scale, self.degree + 1, increasing=True)
+        return NormalEquations(
+            self.gram + basis.T @ basis,
+            self.moment + basis.T @ levels,
+            self.n + len(levels),
+            self.sum_y + float(levels.sum()),
+            self.sum_yy + float(levels @ levels),
+            self.center,
+            self.scale
+        )
+    
+    def solve(self, degree=None):
+        """Least-squares coefficients in powers of t, for degree (default: all) from the leading block"""
+        size = (self.degree if degree is None else degree) + 1
+        if self.n < size:
+            raise ValueError(f'A degree {size - 1} fit needs at least {size} observations')
+        return np.linalg.solve(self.gram[:size, :size], self.moment[:size])
+    
+    def evaluator(self):
+        return PolynomialEvaluator(self.solve(), self.center, self.scale)
+    
+    def fit_metrics(self, coefficients):
+        """(r2, rmse) of coefficients (powers of t) on the observations"""
+        size = len(coefficients)
+        gram, moment = self.gram[:size, :size], self.moment[:size]
+        sse = max(self.sum_yy - 2 * coefficients @ moment + coefficients @ gram @ coefficients, 0.0)
+        sst = self.sum_yy - self.sum_y ** 2 / self.n
+        return float(1 - sse / sst), float(np.sqrt(sse / self.n))
+
+
+class IncrementalBackend(ArtifactBackend):
+    """
+    ArtifactBackend whose coefficients then follow new observations through
+    update() without a full refit. load() starts from the artifact (so
+    serving matches the default backend until the first update) and
+    accumulates the training data in the artifact's basis.
+    """
+    
+    def __init__(self, artifact_path=None, degree=DEFAULT_DEGREE):
+        super().__init__(artifact_path, degree)
+        self.equations = None
+        self._fit = None  # (metrics, trained_at) after the first update, replaced as a whole
+    
+    @property
+    def model_type(self):
+        return f'Polynomial Regression (degree {self.degree}, incremental)'
+    
+    @property
+    def metrics(self):
+        return self._fit[0] if self._fit else super().metrics
+    
+    @property
+    def trained_at(self):
+        return self._fit[1] if self._fit else super().trained_at
+    
+    @property
+    def observations(self):
+        return self.equations.n
+    
+    def load(self, years, levels, force=False):
+        evaluator = super().load(years, levels, force=force)
+        self.equations = NormalEquations.from_data(years, levels, self.degree, evaluator.center, evaluator.scale)
+        self._fit = None
+        return evaluator
+    
+    def update(self, years, levels):
+        """Add observations and return the refitted evaluator"""
+        equations = self.equations.add(years, levels)
+        evaluator = equations.evaluator()
+        poly_r2, poly_rmse = equations.fit_metrics(equations.solve())
+        linear_r2, linear_rmse = equations.fit_metrics(equations.solve(1))
+        metrics = {
+            'linear_r2': round(linear_r2, 4),
+            'poly_r2': round(poly_r2, 4),
+            'linear_rmse': round(linear_rmse, 2),
+            'poly_rmse': round(poly_rmse, 2)
+        }
+        
+        self.equations = equations
+        self._fit = (metrics, datetime.now(timezone.utc).isoformat())
+        return evaluator
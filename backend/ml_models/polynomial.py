@@ -0,0 +1,94 @@
+"""
+Closed-form polynomial evaluator for the sea level trend models
+sklearn is only needed to fit; serving evaluates the exported coefficients
+"""
+
+from math import comb
+
+import numpy as np
+
+# Maximum absolute difference (mm) allowed between the exported polynomial
+# and the sklearn model it was exported from, checked over EXPORT_CHECK_YEARS
+TOLERANCE_MM = 1e-6
+EXPORT_CHECK_YEARS = np.arange(1800, 2501, dtype=float)
+
+
+class PolynomialEvaluator:
+    """
+    Polynomial in a centered/scaled year, evaluated with Horner's rule
+    
+    p(year) = c0 + c1*t + c2*t**2 + ...   with   t = (year - center) / scale
+    
+    Working in t keeps every term close to 1 instead of mixing 1 and 2000**2,
+    which is what made the raw sklearn coefficients badly conditioned.
+    """
+    
+    def __init__(self, coefficients, center, scale):
+        self.coefficients = tuple(float(c) for c in coefficients)
+        self.center = float(center)
+        self.scale = float(scale)
+        # Horner walks from the highest power down
+        self._horner = self.coefficients[::-1]
+    
+    @classmethod
+    def from_sklearn(cls, poly_features, model, years):
+        """Export a fitted PolynomialFeatures + LinearRegression pair"""
+        years = np.asarray(years, dtype=float).ravel()
+        center = (years.max() + years.min()) / 2
+        scale = (years.max() - years.min()) / 2 or 1.0
+        
+        powers = poly_features.powers_[:, 0]
+        raw = np.zeros(powers.max() + 1)
+        for power, coef in zip(powers, np.ravel(model.coef_)):
+            raw[power] += coef
+        raw[0] += float(np.ravel(model.intercept_)[0])
+        
+        # Substitute year = center + scale * t and collect powers of t
+        degree = len(raw) - 1
+        shifted = [
+            sum(raw[k] * comb(k, j) * center ** (k - j) for k in range(j, degree + 1)) * scale ** j
+            for j in range(degree + 1)
+        ]
+        
+        evaluator = cls(shifted, center, scale)
+        evaluator.max_error = evaluator.compare(poly_features, model, EXPORT_CHECK_YEARS)
+        if evaluator.max_error > TOLERANCE_MM:
+            raise ValueError(
+                f'Exported polynomial differs from sklearn by {evaluator.max_error:.3g} mm '
+                f'(tolerance {TOLERANCE_MM} mm)'
+            )
+        return evaluator
+    
+    def __call__(self, years):
+        """Evaluate over an array of years"""
+        t = (np.asarray(years, dtype=float) - self.center) / self.scale
+        result = np.full(t.shape, self._horner[0])
+        for coef in self._horner[1:]:
+            result = result * t + coef
+        return result
+    
+    def predict_one(self, year):
+        """Evaluate a single year without touching NumPy"""
+        t = (year - self.center) / self.scale
+        result = self._horner[0]
+        for coef in self._horner[1:]:
+            result = result * t + coef
+        return result
+    
+    def compare(self, poly_features, model, years):
+        """Maximum absolute difference against the sklearn model over years"""
+        years = np.asarray(years, dtype=float).reshape(-1, 1)
+        expected = model.predict(poly_features.transform(years))
+        return float(np.max(np.abs(self(years.ravel()) - expected)))
+    
+    @classmethod
+    def from_dict(cls, data):
+        """Inverse of to_dict"""
+        return cls(data['coefficients'], data['center'], data['scale'])
+    
+    def to_dict(self):
+        return {
+            'coefficients': list(self.coefficients),
+            'center': self.center,
+            'scale': self.scale
+        }
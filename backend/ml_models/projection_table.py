@@ -0,0 +1,147 @@
+"""
+Precomputed global sea level projections for every (scenario, year)
+
+predict_global only depends on the year and the scenario multiplier, so the
+whole supported range is evaluated once into a contiguous array and serving
+becomes an index lookup. Tables are cached on disk under a fingerprint of
+everything they depend on and rebuilt when any of it changes.
+"""
+
+import hashlib
+import json
+import os
+
+import numpy as np
+
+TABLE_VERSION = 1
+FIRST_YEAR = 1900
+LAST_YEAR = 2300
+COLUMNS = ('prediction', 'lower_bound', 'upper_bound', 'uncertainty')
+
+# Acceleration model shared with SeaLevelPredictor.predict_global
+BASE_YEAR = 2024
+ACCELERATION = 0.08
+
+
+def project(evaluator, years, multiplier):
+    """
+    Scenario-adjusted projection columns for an array of years
+    
+    Returns an array of shape (len(years), len(COLUMNS)); this is the one
+    implementation used both to fill tables and for years outside them.
+    """
+    years = np.asarray(years)
+    base = evaluator(years)
+    years_from_now = years - BASE_YEAR
+    
+    # Sea level rise is accelerating (~0.08mm/year²) after the base year
+    future = years_from_now > 0
+    with np.errstate(invalid='ignore'):
+        acceleration = (years_from_now ** 1.5) * ACCELERATION * multiplier
+    prediction = np.where(future, base * multiplier + acceleration, base)
+    
+    # Uncertainty increases with time
+    uncertainty = 5 + (years_from_now * 0.5)
+    
+    return np.stack([prediction, prediction - uncertainty, prediction + uncertainty, uncertainty], axis=1)
+
+
+def fingerprint(historical_years, historical_levels, evaluator, scenario_multipliers,
+                first_year=FIRST_YEAR, last_year=LAST_YEAR):
+    """Hash of the training data, coefficients and settings a table was built from"""
+    digest = hashlib.sha256()
+    digest.update(np.ascontiguousarray(historical_years, dtype=np.float64).tobytes())
+    digest.update(np.ascontiguousarray(historical_levels, dtype=np.float64).tobytes())
+    digest.update(json.dumps({
+        'version': TABLE_VERSION,
+        'polynomial': evaluator.to_dict(),
+        'scenarios': scenario_multipliers,
+        'range': [first_year, last_year],
+        'acceleration': [BASE_YEAR, ACCELERATION]
+    }, sort_keys=True).encode())
+    return digest.hexdigest()
+
+
+class ProjectionTable:
+    def __init__(self, values, scenarios, first_year, key):
+        """
+        Args:
+            values: Array (len(scenarios), n_years, len(COLUMNS))
+            scenarios: Scenario names in the order of the first axis
+            first_year: Year stored at index 0 of the second axis
+            key: Fingerprint the table was built for
+        """
+        self.values = np.ascontiguousarray(values, dtype=np.float64)
+        self.scenarios = list(scenarios)
+        self.first_year = int(first_year)
+        self.last_year = self.first_year + self.values.shape[1] - 1
+        self.key = key
+        self._scenario_index = {name: i for i, name in enumerate(self.scenarios)}
+    
+    @classmethod
+    def build(cls, evaluator, scenario_multipliers, key, first_year=FIRST_YEAR, last_year=LAST_YEAR):
+        years = np.arange(first_year, last_year + 1)
+        values = np.stack([project(evaluator, years, multiplier)
+                           for multiplier in scenario_multipliers.values()])
+        return cls(values, scenario_multipliers.keys(), first_year, key)
+    
+    def lookup(self, years, scenario):
+        """
+        Rows for integral years within the table, or None so the caller computes them.
+        Unknown scenarios return None as well.
+        """
+        index = self._scenario_index.get(scenario)
+        if index is None:
+            return None
+        
+        years = np.asarray(years)
+        if years.size == 0:
+            return self.values[index, :0]
+        if not np.all(np.mod(years, 1) == 0):
+            return None
+        if years.min() < self.first_year or years.max() > self.last_year:
+            return None
+        return self.values[index, years.astype(np.int64) - self.first_year]
+    
+    def save(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Write then rename so concurrent workers never read a half-written table
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, values=self.values, meta=np.array(json.dumps({
+                'version': TABLE_VERSION,
+                'key': self.key,
+                'scenarios': self.scenarios,
+                'first_year': self.first_year
+            })))
+        os.replace(tmp_path, path)
+    
+    @classmethod
+    def load(cls, path, key):
+        """Table stored at path if it was built for key, otherwise None"""
+        try:
+            with np.load(path) as data:
+                meta = json.loads(str(data['meta']))
+                if meta.get('version') != TABLE_VERSION or meta.get('key') != key:
+                    return None
+                return cls(data['values'], meta['scenarios'], meta['first_year'], key)
+        except (OSError, ValueError, KeyError):
+            return None
+    
+    @classmethod
+    def load_or_build(cls, path, evaluator, scenario_multipliers, key):
+        """Cached table when it is still valid, otherwise a freshly built (and saved) one"""
+        if path:
+            table = cls.load(path, key)
+            if table is not None:
+                return table
+        
+        table = cls.build(evaluator, scenario_multipliers, key)
+        if path:
+            try:
+                table.save(path)
+            except OSError:
+                pass
+        return table
@@ -1,20 +1,132 @@
 """
-Machine Learning Sea Level Prediction Model
-Uses Linear Regression and Polynomial Regression for predictions
+Sea level prediction engine
+
+One SeaLevelPredictor per process backs every sea level route. The global
+trend comes from a pluggable model backend (by default the polynomial stored
+in the model artifact; serving does not import sklearn), scenario projections
+come from the precomputed projection table, and city results are scaled by
+elevation and distance to the coast. The scalar (predict_city,
+predict_any_city), batch (predict_columns, predict_cities) and grid
+(predict_grid) entry points all read that shared state, and the crossing
+entry points (predict_crossings, rank_cities_by_crossing) invert them.
+
+Everything derived from the coefficients lives in one ServingModel that is
+replaced, never modified: train() and observe() build the next one aside
+and publish it with a single assignment, so in-flight requests finish on
+the model they started with and never wait for an update.
+
+With an ObservationLog, observe() only appends to the log and sync()
+applies whatever batches the log holds beyond the ones already applied.
+train() replays the whole log, so observations survive a restart, and
+worker processes sharing the log apply the same batches in the same order
+and so serve the same coefficients.
 """
 
+import hashlib
+import json
+import threading
+import time
+
 import numpy as np
-from sklearn.linear_model import LinearRegression
-from sklearn.preprocessing import PolynomialFeatures
-from sklearn.metrics import r2_score, mean_squared_error
-import math
+
+from services.streaming import CHUNK_ROWS, chunked
+from .model_artifact import DEFAULT_DEGREE, ModelArtifact
+from .ensemble import DEFAULT_DRAWS, DEFAULT_PERCENTILES, EnsembleDraws
+from .sweep import QUANTITIES, Sweep, city_terms
+from .crossing import CrossingSolver, global_thresholds
+from .projection_table import ProjectionTable, COLUMNS, ACCELERATION, BASE_YEAR, LAST_YEAR, project, fingerprint
+
+# Coarse fallback used only when no coastline index is available
+COASTAL_REGIONS = (
+    ((25, 45), (-80, -70), 5),
+    ((25, 50), (-125, -115), 5),
+    ((35, 60), (-10, 30), 10),
+    ((0, 40), (100, 140), 10),
+    ((-20, 25), (40, 100), 10),
+)
+
+
+class ArtifactBackend:
+    """
+    Default model backend: the polynomial trend saved in the model artifact,
+    refitted with sklearn only when the artifact is missing or stale.
+    
+    A backend provides load(years, levels, force) returning an evaluator
+    (years array -> global rise in mm, plus predict_one() and to_dict()),
+    and exposes model_type, metrics, trained_at and trained.
+    """
+    
+    def __init__(self, artifact_path=None, degree=DEFAULT_DEGREE):
+        self.artifact_path = artifact_path
+        self.degree = degree
+        self.artifact = None
+        self.trained = False
+    
+    @property
+    def model_type(self):
+        return f'Polynomial Regression (degree {self.degree})'
+    
+    @property
+    def metrics(self):
+        return {name: self.artifact.metrics[name] for name in ('linear_r2', 'poly_r2', 'linear_rmse', 'poly_rmse')}
+    
+    @property
+    def trained_at(self):
+        return self.artifact.trained_at
+    
+    def load(self, years, levels, force=False):
+        self.artifact, self.trained = ModelArtifact.load_or_train(
+            self.artifact_path, years, levels, degree=self.degree, force=force
+        )
+        return self.artifact.evaluator
+
+
+class ServingModel:
+    """
+    One published set of coefficients and everything derived from them: the
+    evaluator, the projection table, the data it was fitted to and the
+    crossing solvers built for it
+    """
+    
+    def __init__(self, evaluator, projection_table, years, levels, version):
+        self.evaluator = evaluator
+        self.projection_table = projection_table
+        self.years = years
+        self.levels = levels
+        self.version = version
+        self.crossing_solvers = {}
+
 
 class SeaLevelPredictor:
-    def __init__(self):
-        self.linear_model = LinearRegression()
-        self.poly_model = None
-        self.poly_features = PolynomialFeatures(degree=2)
+    def __init__(self, table_path=None, artifact_path=None, coastal_index=None, backend=None,
+                 observation_log=None):
+        """
+        Args:
+            table_path: Optional .npz file caching the projection table between runs
+            artifact_path: Optional model artifact (JSON) for the default backend; fitted and written on first use
+            coastal_index: Optional CoastalIndex for distance to the coast; COASTAL_REGIONS otherwise
+            backend: Model backend (see ArtifactBackend); defaults to ArtifactBackend(artifact_path)
+            observation_log: Optional ObservationLog persisting observe() batches (incremental backends)
+        """
+        self.backend = backend or ArtifactBackend(artifact_path)
+        self.coastal_index = coastal_index
+        self.table_path = table_path
+        self.observation_log = observation_log
         self.is_trained = False
+        self._model = None  # ServingModel currently published
+        self._update_lock = threading.Lock()  # serializes train() / observe() / sync(); readers never take it
+        self._training_data = None  # (years, levels) train() fits, without observations
+        self._buffers = None  # growable (years, levels) arrays backing the histories once observations arrive
+        self._log_batch = 0  # last ObservationLog batch applied
+        self._synced_at = 0.0
+        self._swap_listeners = []
+        self._available_cities = None
+        # Scenario adjustments
+        self.scenario_multipliers = {
+            'optimistic': 0.85,  # Strong climate action
+            'moderate': 1.0,     # Current trajectory
+            'pessimistic': 1.35  # High emissions
+        }
         
         # Historical global sea level data (mm above 1900 baseline)
         self.historical_years = np.array([
@@ -55,83 +167,229 @@ class SeaLevelPredictor:
             'Seattle': {'factor': 1.3, 'elevation': 52, 'vulnerability': 'moderate'},
             'Barcelona': {'factor': 1.3, 'elevation': 12, 'vulnerability': 'high'},
             'Lisbon': {'factor': 1.3, 'elevation': 111, 'vulnerability': 'low'},
+            'Delhi': {'factor': 1.0, 'elevation': 216, 'vulnerability': 'low'},
         }
     
-    def train(self):
-        """Train the models on historical data"""
-        X = self.historical_years.reshape(-1, 1)
-        y = self.historical_levels
-        
-        # Train linear regression
-        self.linear_model.fit(X, y)
+    @property
+    def poly_evaluator(self):
+        """Global trend evaluator of the published model"""
+        return self._model.evaluator if self._model else None
+    
+    @property
+    def projection_table(self):
+        return self._model.projection_table if self._model else None
+    
+    @property
+    def model_version(self):
+        """Increases every time a new model is published"""
+        return self._model.version if self._model else 0
+    
+    def on_model_swap(self, callback):
+        """Call callback(model) after each newly published model, e.g. to drop caches keyed by coefficients"""
+        self._swap_listeners.append(callback)
+    
+    def train(self, force=False):
+        """
+        Load the global trend from the backend, then reuse the cached projection
+        table unless the data or coefficients changed, and replay the
+        observation log if there is one. Returns the model metrics.
+        """
+        with self._update_lock:
+            if self._training_data is None:
+                self._training_data = (self.historical_years, self.historical_levels)
+            years, levels = self._training_data
+            self.historical_years, self.historical_levels = years, levels
+            self._buffers = None
+            self._log_batch = 0
+            evaluator = self.backend.load(years, levels, force=force)
+            
+            replayed = self._apply_logged()
+            if replayed is not None:
+                self._publish_observed(replayed)
+            else:
+                key = fingerprint(years, levels, evaluator, self.scenario_multipliers)
+                table = ProjectionTable.load_or_build(self.table_path, evaluator, self.scenario_multipliers, key)
+                self._publish(evaluator, table, years, levels)
         
-        # Train polynomial regression
-        X_poly = self.poly_features.fit_transform(X)
-        self.poly_model = LinearRegression()
-        self.poly_model.fit(X_poly, y)
+        return self.backend.metrics
+    
+    def observe(self, years, levels):
+        """
+        Add observations with an incremental refit (the backend needs update(),
+        see online.IncrementalBackend) and publish the new model. Only the
+        projection table and what hangs off the coefficients are rebuilt; the
+        table is kept in memory rather than rewritten on every update.
+        With an observation log the batch is logged first and applied by
+        sync(), together with any batch another process logged before it.
+        Returns the new model version.
+        """
+        if not hasattr(self.backend, 'update'):
+            raise ValueError(f'{self.backend.model_type} does not support incremental updates')
+        years = np.atleast_1d(np.asarray(years, dtype=float))
+        levels = np.atleast_1d(np.asarray(levels, dtype=float))
+        if len(years) != len(levels) or not len(years):
+            raise ValueError('years and levels must be non-empty and of equal length')
+        if not (np.all(np.isfinite(years)) and np.all(np.isfinite(levels))):
+            raise ValueError('years and levels must be finite numbers')
         
-        self.is_trained = True
+        if not self.is_trained:
+            self.train()
+        if self.observation_log is not None:
+            self.observation_log.append(years, levels)
+            return self.sync()
         
-        # Calculate model accuracy
-        linear_pred = self.linear_model.predict(X)
-        poly_pred = self.poly_model.predict(X_poly)
+        with self._update_lock:
+            evaluator = self.backend.update(years, levels)
+            self._extend_history(years, levels)
+            self._publish_observed(evaluator)
         
-        linear_r2 = r2_score(y, linear_pred)
-        poly_r2 = r2_score(y, poly_pred)
+        return self.model_version
+    
+    def sync(self, min_interval=0.0):
+        """
+        Apply observation log batches logged since the last sync (by any
+        process) and return the model version. Skipped if the last sync was
+        less than min_interval seconds ago or another update is running.
+        """
+        if self.observation_log is None or not self.is_trained or not hasattr(self.backend, 'update'):
+            return self.model_version
+        if time.monotonic() - self._synced_at < min_interval:
+            return self.model_version
+        if not self._update_lock.acquire(blocking=min_interval == 0):
+            return self.model_version
+        try:
+            self._synced_at = time.monotonic()
+            evaluator = self._apply_logged()
+            if evaluator is not None:
+                self._publish_observed(evaluator)
+        finally:
+            self._update_lock.release()
+        return self.model_version
+    
+    def _apply_logged(self):
+        """Feed logged batches after _log_batch to the backend, one update each; the last evaluator, or None"""
+        if self.observation_log is None or not hasattr(self.backend, 'update'):
+            return None
+        evaluator = None
+        for batch, years, levels in self.observation_log.since(self._log_batch):
+            evaluator = self.backend.update(years, levels)
+            self._extend_history(years, levels)
+            self._log_batch = batch
+        return evaluator
+    
+    def _extend_history(self, years, levels):
+        """
+        Append to historical_years / historical_levels in amortized O(len(years)):
+        they become views of buffers that double when full. Published models
+        keep their shorter views, which appends never write into.
+        """
+        count, added = len(self.historical_years), len(years)
+        if self._buffers is None or count + added > len(self._buffers[0]):
+            capacity = max(2 * (count + added), 64)
+            buffers = (np.empty(capacity), np.empty(capacity))
+            buffers[0][:count] = self.historical_years
+            buffers[1][:count] = self.historical_levels
+            self._buffers = buffers
         
-        return {
-            'linear_r2': round(linear_r2, 4),
-            'poly_r2': round(poly_r2, 4),
-            'linear_rmse': round(math.sqrt(mean_squared_error(y, linear_pred)), 2),
-            'poly_rmse': round(math.sqrt(mean_squared_error(y, poly_pred)), 2)
-        }
+        self._buffers[0][count:count + added] = years
+        self._buffers[1][count:count + added] = levels
+        self.historical_years = self._buffers[0][:count + added]
+        self.historical_levels = self._buffers[1][:count + added]
+    
+    def _publish_observed(self, evaluator):
+        """Publish an incrementally refitted evaluator over the extended history"""
+        # Keyed by the coefficients alone: hashing the data would grow with it
+        key = hashlib.sha256(json.dumps(evaluator.to_dict(), sort_keys=True).encode()).hexdigest()
+        table = ProjectionTable.build(evaluator, self.scenario_multipliers, key)
+        self._publish(evaluator, table, self.historical_years, self.historical_levels)
+    
+    def _publish(self, evaluator, table, years, levels):
+        model = ServingModel(evaluator, table, years, levels, self.model_version + 1)
+        self._model = model
+        self.is_trained = True
+        for callback in self._swap_listeners:
+            callback(model)
     
     def predict_global(self, target_years, scenario='moderate'):
         """Predict global sea level for target years"""
+        columns = self.predict_global_columns(target_years, scenario)
+        rows = np.column_stack([columns[name] for name in COLUMNS])
+        
+        return [
+            {
+                'year': int(year),
+                'prediction': rows[i, 0],
+                'lower_bound': rows[i, 1],
+                'upper_bound': rows[i, 2],
+                'uncertainty': rows[i, 3]
+            }
+            for i, year in enumerate(columns['year'])
+        ]
+    
+    def predict_global_columns(self, target_years, scenario='moderate'):
+        """
+        Columnar form of predict_global: {'year', 'prediction', 'lower_bound',
+        'upper_bound', 'uncertainty'} as 1-D arrays, rounded like the rows
+        """
         if not self.is_trained:
             self.train()
         
-        target_years = np.array(target_years).reshape(-1, 1)
+        target_years = np.array(target_years).ravel()
+        rows = np.round(self._projection(self._model, target_years, scenario), 2)
         
-        # Get base predictions from polynomial model (more accurate)
-        X_poly = self.poly_features.transform(target_years)
-        base_predictions = self.poly_model.predict(X_poly)
+        columns = {name: rows[:, i] for i, name in enumerate(COLUMNS)}
+        columns['year'] = target_years
+        return columns
+    
+    def predict_global_ensemble(self, target_years, scenario='moderate', draws=DEFAULT_DRAWS, seed=0,
+                                percentiles=DEFAULT_PERCENTILES):
+        """
+        Monte Carlo form of predict_global_columns: {'year', 'mean',
+        'percentiles': {percentile: column}} from `draws` seeded trajectories
+        (see ensemble.py), rounded like the table columns. Needs a polynomial
+        backend evaluator.
+        """
+        if not self.is_trained:
+            self.train()
+        model = self._model
         
-        # Apply scenario adjustments
-        scenario_multipliers = {
-            'optimistic': 0.85,  # Strong climate action
-            'moderate': 1.0,     # Current trajectory
-            'pessimistic': 1.35  # High emissions
-        }
+        target_years = np.array(target_years).ravel()
+        multiplier = self.scenario_multipliers.get(scenario, 1.0)
+        ensemble = EnsembleDraws.sample(model.years, model.levels, model.evaluator, multiplier, draws, seed)
+        mean, values = ensemble.summarize(target_years, percentiles)
         
-        multiplier = scenario_multipliers.get(scenario, 1.0)
+        return {
+            'year': target_years,
+            'mean': np.round(mean, 2),
+            'percentiles': {percentile: np.round(values[i], 2) for i, percentile in enumerate(percentiles)}
+        }
+    
+    def build_sweep(self, multipliers, accelerations, target_years, locations=None, names=None, **options):
+        """
+        Sweep (see sweep.py) of continuous multiplier x acceleration pathways.
+        locations are coordinate dicts classified like predict_grid; options
+        are the Sweep quantity / reduction arguments.
+        """
+        if not self.is_trained:
+            self.train()
+        evaluator = self.poly_evaluator
         
-        # Calculate predictions with scenario adjustment
-        predictions = []
-        for i, year in enumerate(target_years.flatten()):
-            base_pred = base_predictions[i]
-            
-            # Add acceleration factor for future years
-            years_from_now = year - 2024
-            if years_from_now > 0:
-                # Sea level rise is accelerating (~0.08mm/year²)
-                acceleration = (years_from_now ** 1.5) * 0.08 * multiplier
-                adjusted_pred = base_pred * multiplier + acceleration
-            else:
-                adjusted_pred = base_pred
-            
-            # Calculate confidence interval
-            uncertainty = 5 + (years_from_now * 0.5)  # Uncertainty increases with time
-            
-            predictions.append({
-                'year': int(year),
-                'prediction': round(adjusted_pred, 2),
-                'lower_bound': round(adjusted_pred - uncertainty, 2),
-                'upper_bound': round(adjusted_pred + uncertainty, 2),
-                'uncertainty': round(uncertainty, 2)
-            })
+        years = np.asarray(target_years)
+        cities = None
+        if locations:
+            elevations = [loc.get('elevation', 50) for loc in locations]
+            coastal = self._estimate_coastal_distances(
+                [loc.get('lat', 0) for loc in locations], [loc.get('lon', 0) for loc in locations]
+            )
+            cities = {
+                'names': names or [f"{loc.get('lat', 0):.4f},{loc.get('lon', 0):.4f}" for loc in locations],
+                'factors': [self._classify_location(e, d)[1] for e, d in zip(elevations, coastal)],
+                'elevations': elevations,
+                'coastal_distances': coastal
+            }
         
-        return predictions
+        return Sweep(evaluator(years), years, multipliers, accelerations, cities=cities,
+                     model_key=evaluator.to_dict(), **options)
     
     def predict_city(self, city_name, target_years, scenario='moderate'):
         """Predict sea level rise for specific city"""
@@ -199,55 +457,432 @@ class SeaLevelPredictor:
             'vulnerability': vulnerability
         }
     
-    def get_available_cities(self):
-        """Get list of cities with sea level data"""
-        return sorted(list(self.city_factors.keys()))
+    def predict_cities(self, cities, target_years, scenario='moderate'):
+        """
+        Vectorized predict_city over many cities at once
+        
+        cities holds names from city_factors or dicts with 'name', 'elevation'
+        and optionally 'factor' / 'vulnerability'. Arrays are shaped
+        (len(cities), len(target_years)).
+        """
+        global_columns = self.predict_global_columns(target_years, scenario)
+        global_rise = global_columns['prediction']
+        uncertainty = global_columns['uncertainty']
+        
+        city_data, factors, elevations, risk_multiplier = self._city_table(cities)
+        factors, elevations, risk_multiplier = factors[:, None], elevations[:, None], risk_multiplier[:, None]
+        
+        adjusted_rise = (global_rise[None, :] * factors) * risk_multiplier
+        with np.errstate(divide='ignore', invalid='ignore'):
+            flooding_risk = np.where(
+                elevations > 0,
+                np.minimum(100, (adjusted_rise / (elevations * 1000)) * 100),
+                np.minimum(100, 80 + (adjusted_rise / 10))
+            )
+        
+        return {
+            'cities': city_data,
+            'years': global_columns['year'].tolist(),
+            'global_rise': global_rise,
+            'local_rise': adjusted_rise,
+            'flooding_risk': flooding_risk,
+            'impact_percentage': np.minimum(50, flooding_risk * 0.4),
+            'lower_bound': adjusted_rise - uncertainty,
+            'upper_bound': adjusted_rise + uncertainty
+        }
     
     def compare_cities(self, cities, target_year, scenario='moderate'):
         """Compare sea level predictions for multiple cities"""
-        comparisons = []
+        # Unknown names are skipped; explicit location dicts are always compared
+        cities = [city for city in cities if isinstance(city, dict) or city in self.city_factors]
+        if not cities:
+            return []
         
-        for city in cities:
-            if city in self.city_factors:
-                result = self.predict_city(city, [target_year], scenario)
-                if result['predictions']:
-                    pred = result['predictions'][0]
-                    comparisons.append({
-                        'city': city,
-                        'local_rise': pred['local_rise'],
-                        'flooding_risk': pred['flooding_risk'],
-                        'vulnerability': pred['vulnerability'],
-                        'elevation': result['elevation']
-                    })
+        grid = self.predict_cities(cities, [target_year], scenario)
+        local_rise = np.round(grid['local_rise'][:, 0], 2).tolist()
+        flooding_risk = np.round(grid['flooding_risk'][:, 0], 2).tolist()
+        
+        comparisons = [
+            {
+                'city': data['name'],
+                'local_rise': local_rise[i],
+                'flooding_risk': flooding_risk[i],
+                'vulnerability': data['vulnerability'],
+                'elevation': data['elevation']
+            }
+            for i, data in enumerate(grid['cities'])
+        ]
         
         # Sort by flooding risk (highest first)
         comparisons.sort(key=lambda x: x['flooding_risk'], reverse=True)
         
         return comparisons
     
-    def get_model_info(self):
-        """Get information about the trained model"""
+    def rank_cities_by_crossing(self, cities, threshold, scenario='moderate', quantity='flooding_risk',
+                                start_year=BASE_YEAR, end_year=LAST_YEAR):
+        """
+        compare_cities ranked by when each city reaches threshold instead of by
+        its value in one year: earliest first, cities that do not reach it by
+        end_year last. Uses predict_cities' accelerated projection, unrounded.
+        """
         if not self.is_trained:
-            metrics = self.train()
-        else:
-            X = self.historical_years.reshape(-1, 1)
-            y = self.historical_levels
-            X_poly = self.poly_features.transform(X)
-            
-            linear_pred = self.linear_model.predict(X)
-            poly_pred = self.poly_model.predict(X_poly)
-            
-            metrics = {
-                'linear_r2': round(r2_score(y, linear_pred), 4),
-                'poly_r2': round(r2_score(y, poly_pred), 4),
-                'linear_rmse': round(math.sqrt(mean_squared_error(y, linear_pred)), 2),
-                'poly_rmse': round(math.sqrt(mean_squared_error(y, poly_pred)), 2)
+            self.train()
+        if quantity not in QUANTITIES:
+            raise ValueError(f'quantity must be one of {", ".join(QUANTITIES)}')
+        
+        cities = [city for city in cities if isinstance(city, dict) or city in self.city_factors]
+        if not cities:
+            return []
+        
+        city_data, factors, elevations, risk_multiplier = self._city_table(cities)
+        terms = city_terms(quantity, factors * risk_multiplier, elevations, np.zeros(len(cities)))
+        solver = self._crossing_solver(self._model, scenario, ACCELERATION, start_year, end_year)
+        crossing, year = solver.solve(global_thresholds(threshold, *terms))
+        
+        rankings = [
+            {
+                'city': data['name'],
+                'year': None if np.isnan(year[i]) else int(year[i]),
+                'crossing': None if np.isnan(crossing[i]) else round(float(crossing[i]), 2),
+                'vulnerability': data['vulnerability'],
+                'elevation': data['elevation']
             }
+            for i, data in enumerate(city_data)
+        ]
+        
+        # Earliest crossing first
+        rankings.sort(key=lambda x: (x['year'] is None, x['crossing'] or 0))
+        
+        return rankings
+    
+    def get_model_info(self):
+        """Get information about the trained model"""
+        metrics = self.train() if not self.is_trained else self.backend.metrics
         
         return {
-            'model_type': 'Polynomial Regression (degree 2)',
+            'model_type': self.backend.model_type,
             'training_data_points': len(self.historical_years),
-            'training_period': f"{self.historical_years[0]}-{self.historical_years[-1]}",
+            'training_period': f"{self.historical_years[0]:g}-{self.historical_years[-1]:g}",
             'metrics': metrics,
-            'available_cities': len(self.city_factors)
-        }
\ No newline at end of file
+            'available_cities': len(self.city_factors),
+            'trained_at': self.backend.trained_at
+        }
+    
+    def get_available_cities(self):
+        """Sorted names of the cities with sea level data"""
+        if self._available_cities is None:
+            self._available_cities = sorted(self.city_factors)
+        return self._available_cities
+    
+    def predict_any_city(self, city_name, coordinates, target_years, scenario='moderate'):
+        if not self.is_trained:
+            self.train()
+        
+        lat = coordinates.get('lat', 0)
+        lon = coordinates.get('lon', 0)
+        elevation = coordinates.get('elevation', 50)
+        
+        coastal_distance = self._estimate_coastal_distance(lat, lon)
+        vulnerability, factor = self._classify_location(elevation, coastal_distance)
+        
+        columns = self.predict_columns(coordinates, target_years, [scenario], factor=factor,
+                                       coastal_distance=coastal_distance)
+        predictions = self._rows_from_columns(columns, 0, vulnerability)
+        
+        return {
+            'city': city_name,
+            'predictions': predictions,
+            'city_factor': round(factor, 2),
+            'elevation': elevation,
+            'vulnerability': vulnerability
+        }
+    
+    def predict_any_city_scenarios(self, city_name, coordinates, target_years, scenarios):
+        """Predict several scenarios for one city from a single vectorized evaluation"""
+        if not self.is_trained:
+            self.train()
+        
+        lat = coordinates.get('lat', 0)
+        lon = coordinates.get('lon', 0)
+        coastal_distance = self._estimate_coastal_distance(lat, lon)
+        vulnerability, factor = self._classify_location(coordinates.get('elevation', 50), coastal_distance)
+        
+        columns = self.predict_columns(coordinates, target_years, scenarios, factor=factor,
+                                       coastal_distance=coastal_distance)
+        
+        return {
+            'city': city_name,
+            'scenarios': {
+                scenario: self._rows_from_columns(columns, i, vulnerability)
+                for i, scenario in enumerate(columns['scenarios'])
+            },
+            'city_factor': round(factor, 2),
+            'elevation': columns['elevation'],
+            'vulnerability': vulnerability
+        }
+    
+    def classify(self, coordinates):
+        """(coastal_distance, vulnerability, factor) for a coordinate dict"""
+        coastal_distance = self._estimate_coastal_distance(coordinates.get('lat', 0), coordinates.get('lon', 0))
+        vulnerability, factor = self._classify_location(coordinates.get('elevation', 50), coastal_distance)
+        return coastal_distance, vulnerability, factor
+    
+    def iter_scenario_columns(self, coordinates, target_years, scenario, factor, coastal_distance,
+                              chunk_rows=CHUNK_ROWS):
+        """
+        Rounded {'year', 'global_rise', 'local_rise', 'flooding_risk'} columns for
+        consecutive slices of target_years, computed as the caller consumes them
+        """
+        for years in chunked(target_years, chunk_rows):
+            columns = self.predict_columns(coordinates, years, [scenario], factor=factor,
+                                           coastal_distance=coastal_distance)
+            yield {
+                'year': columns['years'],
+                'global_rise': np.round(columns['global_rise'][0], 2),
+                'local_rise': np.round(columns['local_rise'][0], 2),
+                'flooding_risk': np.round(columns['flooding_risk'][0], 2)
+            }
+    
+    def predict_columns(self, coordinates, target_years, scenarios, factor=None, coastal_distance=None):
+        """
+        Evaluate every (scenario, year) pair in one pass.
+        
+        Returns columnar NumPy arrays of shape (len(scenarios), len(target_years));
+        rows are only built when a caller serializes them.
+        """
+        if not self.is_trained:
+            self.train()
+        
+        elevation = coordinates.get('elevation', 50)
+        if coastal_distance is None:
+            coastal_distance = self._estimate_coastal_distance(coordinates.get('lat', 0), coordinates.get('lon', 0))
+        if factor is None:
+            factor = self._classify_location(elevation, coastal_distance)[1]
+        
+        years = np.asarray(target_years)
+        global_rise = self._global_rise(self._model, years, scenarios)
+        local_rise = global_rise * factor
+        
+        if elevation > 0:
+            flooding_risk = np.minimum(100, (local_rise / (elevation * 1000)) * 100)
+        else:
+            flooding_risk = np.minimum(100, 80 + (local_rise / 10))
+        
+        if coastal_distance > 100:
+            flooding_risk = flooding_risk * 0.5
+        
+        return {
+            'years': years,
+            'scenarios': list(scenarios),
+            'global_rise': global_rise,
+            'local_rise': local_rise,
+            'flooding_risk': flooding_risk,
+            'elevation': elevation
+        }
+    
+    def predict_global_crossing(self, threshold, scenarios, start_year=BASE_YEAR, end_year=LAST_YEAR):
+        """
+        First year predict_global reaches threshold (mm) per scenario:
+        {scenario: (crossing, year)}, fractional and whole years, NaN if not by end_year
+        """
+        if not self.is_trained:
+            self.train()
+        model = self._model
+        
+        results = {}
+        for scenario in scenarios:
+            solver = self._crossing_solver(model, scenario, ACCELERATION, start_year, end_year)
+            crossing, year = solver.solve([threshold])
+            results[scenario] = (crossing[0], year[0])
+        return results
+    
+    def predict_crossings(self, locations, threshold, scenarios, quantity='flooding_risk',
+                          start_year=BASE_YEAR, end_year=LAST_YEAR):
+        """
+        Inverse of predict_grid: the first year each location's quantity
+        ('global_rise', 'local_rise' or 'flooding_risk') reaches threshold,
+        solved directly rather than scanned (see crossing.py).
+        
+        crossing (fractional year) and year (first whole year) have shape
+        (len(locations), len(scenarios)), NaN where threshold is not reached
+        by end_year. Values are unrounded.
+        """
+        if not self.is_trained:
+            self.train()
+        if quantity not in QUANTITIES:
+            raise ValueError(f'quantity must be one of {", ".join(QUANTITIES)}')
+        
+        raw_elevations, coastal, classes = self._classify_locations(locations)
+        factors = np.array([factor for _, factor in classes], dtype=float)
+        targets = global_thresholds(threshold, *city_terms(quantity, factors, raw_elevations, coastal))
+        
+        model = self._model
+        crossing = np.empty((len(locations), len(scenarios)))
+        year = np.empty((len(locations), len(scenarios)))
+        for i, scenario in enumerate(scenarios):
+            solver = self._crossing_solver(model, scenario, ACCELERATION, start_year, end_year)
+            crossing[:, i], year[:, i] = solver.solve(targets)
+        
+        return {
+            'scenarios': list(scenarios),
+            'crossing': crossing,
+            'year': year,
+            'elevations': raw_elevations,
+            'factors': factors.tolist(),
+            'vulnerabilities': [vulnerability for vulnerability, _ in classes]
+        }
+    
+    def predict_grid(self, locations, target_years, scenarios):
+        """
+        Evaluate a whole (city, scenario, year) grid in one pass.
+        
+        locations is a list of coordinate dicts ('lat', 'lon', 'elevation').
+        local_rise and flooding_risk have shape
+        (len(locations), len(scenarios), len(target_years)).
+        """
+        if not self.is_trained:
+            self.train()
+        
+        raw_elevations, coastal, classes = self._classify_locations(locations)
+        factors = np.array([factor for _, factor in classes], dtype=float)
+        
+        years = np.asarray(target_years)
+        global_rise = self._global_rise(self._model, years, scenarios)
+        local_rise = global_rise[None, :, :] * factors[:, None, None]
+        
+        elevation = np.array(raw_elevations, dtype=float)[:, None, None]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            flooding_risk = np.where(
+                elevation > 0,
+                np.minimum(100, (local_rise / (elevation * 1000)) * 100),
+                np.minimum(100, 80 + (local_rise / 10))
+            )
+        flooding_risk = np.where(coastal[:, None, None] > 100, flooding_risk * 0.5, flooding_risk)
+        
+        return {
+            'years': years,
+            'scenarios': list(scenarios),
+            'global_rise': global_rise,
+            'local_rise': local_rise,
+            'flooding_risk': flooding_risk,
+            'elevations': raw_elevations,
+            'factors': factors.tolist(),
+            'vulnerabilities': [vulnerability for vulnerability, _ in classes]
+        }
+    
+    def grid_city_result(self, grid, index, city_name):
+        """Serialize one city of a predict_grid result like predict_any_city_scenarios"""
+        columns = {
+            'years': grid['years'],
+            'global_rise': grid['global_rise'],
+            'local_rise': grid['local_rise'][index],
+            'flooding_risk': grid['flooding_risk'][index],
+            'elevation': grid['elevations'][index]
+        }
+        vulnerability = grid['vulnerabilities'][index]
+        
+        return {
+            'city': city_name,
+            'scenarios': {
+                scenario: self._rows_from_columns(columns, i, vulnerability)
+                for i, scenario in enumerate(grid['scenarios'])
+            },
+            'city_factor': round(grid['factors'][index], 2),
+            'elevation': grid['elevations'][index],
+            'vulnerability': vulnerability
+        }
+    
+    def _classify_location(self, elevation, coastal_distance):
+        if elevation <= 5 or coastal_distance < 10:
+            return 'critical', 1.8
+        elif elevation <= 15 or coastal_distance < 50:
+            return 'high', 1.5
+        elif elevation <= 30 or coastal_distance < 100:
+            return 'moderate', 1.2
+        return 'low', 0.9
+    
+    def _projection(self, model, years, scenario):
+        """Unrounded project() rows for years under model: table lookup for supported years, direct evaluation otherwise"""
+        rows = model.projection_table.lookup(years, scenario)
+        if rows is None:
+            rows = project(model.evaluator, years, self.scenario_multipliers.get(scenario, 1.0))
+        return rows
+    
+    def _global_rise(self, model, years, scenarios):
+        """
+        The accelerated global projection every entry point scales, unrounded:
+        shape (len(scenarios), len(years))
+        """
+        return np.stack([self._projection(model, years, scenario)[:, 0] for scenario in scenarios])
+    
+    def _crossing_solver(self, model, scenario, acceleration, start_year, end_year):
+        """CrossingSolver for a scenario's curve under model, kept as long as that model is"""
+        multiplier = self.scenario_multipliers.get(scenario, 1.0)
+        key = (multiplier, acceleration, int(start_year), int(end_year))
+        solver = model.crossing_solvers.get(key)
+        if solver is None:
+            if len(model.crossing_solvers) >= 64:
+                model.crossing_solvers.clear()
+            solver = model.crossing_solvers[key] = CrossingSolver(
+                model.evaluator, multiplier, acceleration, start_year, end_year
+            )
+        return solver
+    
+    def _classify_locations(self, locations):
+        """(elevations, coastal_distances, [(vulnerability, factor)]) for coordinate dicts"""
+        elevations = [loc.get('elevation', 50) for loc in locations]
+        coastal = self._estimate_coastal_distances(
+            [loc.get('lat', 0) for loc in locations], [loc.get('lon', 0) for loc in locations]
+        )
+        return elevations, coastal, [self._classify_location(e, d) for e, d in zip(elevations, coastal)]
+    
+    def _city_table(self, cities):
+        """(city_data, factors, elevations, risk_multiplier) for predict_cities-style city lists"""
+        default = {'factor': 1.0, 'elevation': 50, 'vulnerability': 'moderate'}
+        city_data = []
+        for city in cities:
+            if isinstance(city, dict):
+                city_data.append({'name': city['name'], **default, **city})
+            else:
+                city_data.append({'name': city, **self.city_factors.get(city, default)})
+        
+        factors = np.array([data['factor'] for data in city_data], dtype=float)
+        elevations = np.array([data['elevation'] for data in city_data], dtype=float)
+        risk_multiplier = np.select(
+            [elevations <= 5, elevations <= 15, elevations <= 30], [1.5, 1.2, 1.0], default=0.8
+        )
+        return city_data, factors, elevations, risk_multiplier
+    
+    @staticmethod
+    def _rows_from_columns(columns, scenario_index, vulnerability):
+        global_rise = np.round(columns['global_rise'][scenario_index], 2).tolist()
+        local_rise = np.round(columns['local_rise'][scenario_index], 2).tolist()
+        flooding_risk = np.round(columns['flooding_risk'][scenario_index], 2).tolist()
+        elevation = columns['elevation']
+        
+        return [
+            {
+                'year': year,
+                'global_rise': global_rise[i],
+                'local_rise': local_rise[i],
+                'elevation': elevation,
+                'flooding_risk': flooding_risk[i],
+                'vulnerability': vulnerability
+            }
+            for i, year in enumerate(columns['years'].tolist())
+        ]
+    
+    def _estimate_coastal_distance(self, lat, lon):
+        if self.coastal_index is not None:
+            return self.coastal_index.distance_km(lat, lon)
+        
+        for (lat_min, lat_max), (lon_min, lon_max), distance in COASTAL_REGIONS:
+            if lat_min <= lat <= lat_max and lon_min <= lon <= lon_max:
+                return distance
+        return 200
+    
+    def _estimate_coastal_distances(self, lats, lons):
+        """Batch form of _estimate_coastal_distance"""
+        if self.coastal_index is not None:
+            return self.coastal_index.distances_km(lats, lons)
+        return np.array([self._estimate_coastal_distance(lat, lon) for lat, lon in zip(lats, lons)], dtype=float)
@@ -0,0 +1,34 @@
+"""
+Train the sea level trend model and write its artifact
+
+Run from the backend folder:
+    python -m ml_models.train_model            # retrain only if the training data changed
+    python -m ml_models.train_model --force    # always retrain
+"""
+
+import argparse
+import os
+
+from .model_artifact import DEFAULT_PATH, ModelArtifact
+from .sea_level_predictor import SeaLevelPredictor
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Train the sea level model artifact')
+    parser.add_argument('--artifact', default=os.getenv('MODEL_ARTIFACT_PATH', DEFAULT_PATH))
+    parser.add_argument('--force', action='store_true', help='Retrain even if the artifact matches the data')
+    args = parser.parse_args()
+    
+    predictor = SeaLevelPredictor()
+    artifact, trained = ModelArtifact.load_or_train(
+        args.artifact, predictor.historical_years, predictor.historical_levels, force=args.force
+    )
+    
+    state = 'trained' if trained else 'up to date'
+    print(f'✅ {args.artifact}: {state} (data {artifact.data_hash[:12]}, trained {artifact.trained_at})')
+    for name, value in artifact.metrics.items():
+        print(f'   {name}: {value}')
+
+
+if __name__ == '__main__':
+    main()
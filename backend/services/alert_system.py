@@ -0,0 +1,329 @@
+"""
+Background weather and disaster-risk refresh for a watch-list of cities
+
+AlertScheduler refreshes every watched city on its own cadence: after each
+refresh the next one is due interval * (1 +/- jitter) later, so cities
+added together drift apart instead of hitting the upstream in lockstep. A
+token bucket spaces the upstream calls (rate per second, bursts of burst).
+The latest result per city lives in a dict, so request-time reads are one
+lookup; on_refresh hears of every refresh, and an alert is recorded (and
+on_alert called) only when a city's risk level changes from its previous
+refresh.
+
+The clock, sleep and random source are injectable: a test drives
+run_pending() with a fake clock whose sleep() advances it, and a stub
+refresh function in place of the upstream.
+"""
+
+import heapq
+import itertools
+import random
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+
+# (level, lowest combined_risk) from the top, graded as DisasterRiskPredictor.assess_city_risk does
+RISK_LEVELS = (('critical', 70), ('high', 40), ('moderate', 20), ('low', float('-inf')))
+LEVEL_RANK = {level: rank for rank, (level, _) in enumerate(reversed(RISK_LEVELS))}
+SEVERITIES = {'critical': 'emergency', 'high': 'warning', 'moderate': 'watch', 'low': 'clear'}
+
+
+def risk_level(data):
+    """Level name of a refresh result's assess_city_risk() assessment"""
+    score = data['risk']['combined_risk']
+    return next(level for level, lowest in RISK_LEVELS if score >= lowest)
+
+
+class TokenBucket:
+    def __init__(self, rate, burst=1, clock=time.monotonic):
+        """
+        Args:
+            rate: Tokens added per second
+            burst: Tokens the bucket holds, i.e. calls allowed back to back
+            clock: Monotonic clock, injectable for tests
+        """
+        if rate <= 0 or burst < 1:
+            raise ValueError('rate must be positive and burst at least 1')
+        self.rate = rate
+        self.burst = burst
+        self._clock = clock
+        self._tokens = float(burst)
+        self._updated = clock()
+        self._lock = threading.Lock()
+    
+    def reserve(self):
+        """Take a token and return the seconds to wait before using it (0 if one was available)"""
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return max(0.0, -self._tokens / self.rate)
+    
+    def take(self, tokens=1):
+        """Take tokens if the bucket holds them and return 0; otherwise take none and return the seconds until it will"""
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0.0
+            return (tokens - self._tokens) / self.rate
+
+
+class AlertScheduler:
+    def __init__(self, refresh, interval=600, jitter=0.1, rate=1.0, burst=5, max_watched=200, history=500,
+                 key=str, level=risk_level, on_refresh=None, on_alert=None, clock=time.monotonic, sleep=None,
+                 rng=None):
+        """
+        Args:
+            refresh: city -> {'risk': assessment, ...} (None if the city has no data); calls the upstream
+            interval: Seconds between refreshes of one city
+            jitter: Each interval is stretched or shrunk by up to this fraction at random
+            rate, burst: Token bucket for refresh() calls
+            max_watched: Watch-list size limit
+            history: Alerts kept
+            key: Normalizes a city name into its watch-list and store key
+            level: assessment -> level name; alerts fire when it changes
+            on_refresh: Called with (key, snapshot) after every refresh, outside the scheduler's lock
+            on_alert: Called with each new alert, outside the scheduler's lock
+            clock: Monotonic clock, injectable for tests
+            sleep: Waits out the rate limit; defaults to waiting on stop()
+            rng: random.Random for the jitter
+        """
+        if interval <= 0 or not 0 <= jitter < 1:
+            raise ValueError('interval must be positive and jitter in [0, 1)')
+        self.refresh = refresh
+        self.interval = interval
+        self.jitter = jitter
+        self.max_watched = max_watched
+        self._key = key
+        self._level = level
+        self._on_refresh = on_refresh
+        self._on_alert = on_alert
+        self._clock = clock
+        self._sleep = sleep or (lambda seconds: self._stopping.wait(seconds))
+        self._rng = rng or random.Random()
+        self._bucket = TokenBucket(rate, burst, clock)
+        
+        self._watched = {}  # key -> city name as given
+        self._store = {}  # key -> latest snapshot, replaced as a whole
+        self._due = []  # heap of (due, sequence, key); stale entries are skipped
+        self._sequence = {}  # key -> sequence of its live heap entry
+        self._counter = itertools.count()
+        self._alerts = deque(maxlen=history)
+        self._alert_ids = itertools.count(1)
+        
+        self.refreshes = 0
+        self.errors = 0
+        self.throttled_seconds = 0.0
+        self._reset_threading()
+    
+    def _reset_threading(self):
+        self._lock = threading.Lock()
+        self._bucket._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = None
+    
+    def watch(self, city):
+        """Add a city, due for refresh now; False if it was already watched"""
+        key = self._key(city)
+        with self._lock:
+            if key in self._watched:
+                return False
+            if len(self._watched) >= self.max_watched:
+                raise ValueError(f'At most {self.max_watched} cities can be watched')
+            self._watched[key] = city
+            self._schedule(key, self._clock())
+        self._wake.set()
+        return True
+    
+    def unwatch(self, city):
+        """Remove a city and its stored result; False if it was not watched"""
+        key = self._key(city)
+        with self._lock:
+            if self._watched.pop(key, None) is None:
+                return False
+            self._sequence.pop(key, None)
+            self._store.pop(key, None)
+        return True
+    
+    def watched(self):
+        with self._lock:
+            return list(self._watched.values())
+    
+    def get(self, city, max_age=None):
+        """Latest snapshot of a watched city, or None if it has none (or it is older than max_age seconds)"""
+        snapshot = self._store.get(self._key(city))
+        if snapshot is None or snapshot['refreshed'] is None:
+            return None
+        if max_age is not None and self.age(snapshot) > max_age:
+            return None
+        return snapshot
+    
+    def age(self, snapshot):
+        """Seconds since a snapshot was refreshed"""
+        return self._clock() - snapshot['refreshed']
+    
+    def snapshots(self):
+        with self._lock:
+            return [self._store.get(key) or self._empty(city) for key, city in self._watched.items()]
+    
+    def alerts(self, city=None, limit=None):
+        """Recorded alerts, newest first, optionally for one city"""
+        with self._lock:
+            alerts = list(reversed(self._alerts))
+        if city is not None:
+            key = self._key(city)
+            alerts = [alert for alert in alerts if alert['key'] == key]
+        return alerts[:limit]
+    
+    def next_due(self):
+        """Clock time the next refresh is due, or None with nothing watched"""
+        with self._lock:
+            self._drop_stale()
+            return self._due[0][0] if self._due else None
+    
+    def stats(self):
+        next_due = self.next_due()
+        return {
+            'running': self._thread is not None and self._thread.is_alive(),
+            'watched': len(self._watched),
+            'interval': self.interval,
+            'jitter': self.jitter,
+            'rate': self._bucket.rate,
+            'burst': self._bucket.burst,
+            'refreshes': self.refreshes,
+            'errors': self.errors,
+            'alerts': len(self._alerts),
+            'throttled_seconds': round(self.throttled_seconds, 3),
+            'next_due_in': None if next_due is None else round(max(next_due - self._clock(), 0), 3)
+        }
+    
+    def run_pending(self):
+        """Refresh every city due by now, waiting on the rate limit before each call; returns the count"""
+        refreshed = 0
+        while not self._stopping.is_set():
+            with self._lock:
+                self._drop_stale()
+                if not self._due or self._due[0][0] > self._clock():
+                    break
+                _, _, key = heapq.heappop(self._due)
+                del self._sequence[key]
+                city = self._watched[key]
+            
+            wait = self._bucket.reserve()
+            if wait > 0:
+                self.throttled_seconds += wait
+                self._sleep(wait)
+            self._refresh(key, city)
+            refreshed += 1
+        return refreshed
+    
+    def _refresh(self, key, city):
+        try:
+            data, error = self.refresh(city), None
+            if data is None:
+                error = f'No data for {city}'
+        except Exception as e:
+            data, error = None, str(e)
+        now = self._clock()
+        
+        alert = None
+        with self._lock:
+            if self._watched.get(key) is None:
+                return
+            self.refreshes += 1
+            previous = self._store.get(key) or self._empty(city)
+            if data is None:
+                self.errors += 1
+                # Keep serving the last good result; the error says why it is getting old
+                self._store[key] = dict(previous, error=error)
+            else:
+                level = self._level(data)
+                self._store[key] = {
+                    'city': city,
+                    'data': data,
+                    'level': level,
+                    'refreshed': now,
+                    'refreshed_at': datetime.now(timezone.utc).isoformat(),
+                    'error': None
+                }
+                if level != previous['level']:
+                    alert = self._record_alert(key, data, previous['level'], level)
+            self._schedule(key, now + self.interval * (1 + self._rng.uniform(-self.jitter, self.jitter)))
+            snapshot = self._store[key]
+        
+        if self._on_refresh is not None:
+            self._on_refresh(key, snapshot)
+        if alert is not None and self._on_alert is not None:
+            self._on_alert(alert)
+    
+    def _record_alert(self, key, data, previous, level):
+        rank, previous_rank = LEVEL_RANK.get(level, 0), LEVEL_RANK.get(previous, 0)
+        # A city's first result only alerts above the lowest level
+        if previous is None and rank == 0:
+            return None
+        alert = {
+            'id': f'ALERT-{next(self._alert_ids):06d}',
+            'key': key,
+            'city': data['risk'].get('city', self._watched[key]),
+            'previous_level': previous,
+            'level': level,
+            'direction': 'raised' if rank > previous_rank else 'lowered',
+            'severity': SEVERITIES.get(level, 'watch'),
+            'combined_risk': data['risk'].get('combined_risk'),
+            'created_at': datetime.now(timezone.utc).isoformat()
+        }
+        self._alerts.append(alert)
+        return alert
+    
+    def _schedule(self, key, due):
+        sequence = next(self._counter)
+        self._sequence[key] = sequence
+        heapq.heappush(self._due, (due, sequence, key))
+    
+    def _drop_stale(self):
+        while self._due and self._sequence.get(self._due[0][2]) != self._due[0][1]:
+            heapq.heappop(self._due)
+    
+    @staticmethod
+    def _empty(city):
+        return {'city': city, 'data': None, 'level': None, 'refreshed': None, 'refreshed_at': None, 'error': None}
+    
+    def start(self):
+        """Refresh on a daemon thread until stop(); a no-op while that thread runs"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name='alert-scheduler', daemon=True)
+        self._thread.start()
+    
+    def restart(self):
+        """
+        Start afresh in a forked worker, which inherits neither the parent's
+        thread nor safe locks. The parent should stop() before forking, so no
+        refresh is caught halfway through.
+        """
+        self._reset_threading()
+        self.start()
+    
+    def stop(self, timeout=None):
+        self._stopping.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+    
+    def _run(self):
+        while not self._stopping.is_set():
+            # Cleared before the pass, so a watch() during it still wakes the wait below
+            self._wake.clear()
+            try:
+                self.run_pending()
+            except Exception as e:
+                print(f'❌ Alert scheduler pass failed: {e}')
+            next_due = self.next_due()
+            self._wake.wait(None if next_due is None else max(next_due - self._clock(), 0))
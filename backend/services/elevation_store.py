@@ -0,0 +1,116 @@
+"""
+Persistent terrain elevation store keyed by geohash
+Terrain does not change, so every looked-up point is fetched once and kept on disk
+"""
+
+import os
+import sqlite3
+import threading
+
+_GEOHASH_ALPHABET = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+
+def geohash_encode(lat, lon, precision=7):
+    """Standard base32 geohash; precision 7 is a ~150m x 150m cell"""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True
+    
+    while len(chars) < precision:
+        if even:
+            mid = (lon_range[0] + lon_range[1]) / 2
+            if lon >= mid:
+                bits = (bits << 1) | 1
+                lon_range[0] = mid
+            else:
+                bits <<= 1
+                lon_range[1] = mid
+        else:
+            mid = (lat_range[0] + lat_range[1]) / 2
+            if lat >= mid:
+                bits = (bits << 1) | 1
+                lat_range[0] = mid
+            else:
+                bits <<= 1
+                lat_range[1] = mid
+        even = not even
+        bit_count += 1
+        
+        if bit_count == 5:
+            chars.append(_GEOHASH_ALPHABET[bits])
+            bits = 0
+            bit_count = 0
+    
+    return ''.join(chars)
+
+
+class ElevationStore:
+    def __init__(self, path, precision=7):
+        """
+        Args:
+            path: SQLite file; created on first use
+            precision: Geohash length used to quantize coordinates
+        """
+        self.path = path
+        self.precision = precision
+        self._lock = threading.Lock()
+        
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        self._conn = self._connect()
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS elevations (geohash TEXT PRIMARY KEY, elevation REAL NOT NULL)'
+        )
+        self._conn.commit()
+        
+        # Warm the whole table into memory so lookups never touch disk
+        self._elevations = dict(self._conn.execute('SELECT geohash, elevation FROM elevations'))
+    
+    def _connect(self):
+        return sqlite3.connect(self.path, check_same_thread=False)
+    
+    def reopen(self):
+        """
+        Replace the SQLite connection; a forked worker calls this so it never
+        shares the parent's handle. The warmed table is kept.
+        """
+        self._lock = threading.Lock()
+        self._conn = self._connect()
+    
+    def key(self, lat, lon):
+        return geohash_encode(lat, lon, self.precision)
+    
+    def lookup(self, lat, lon):
+        """Stored elevation in meters, or None if this cell was never filled"""
+        return self._elevations.get(self.key(lat, lon))
+    
+    def put(self, lat, lon, elevation):
+        key = self.key(lat, lon)
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO elevations (geohash, elevation) VALUES (?, ?)', (key, float(elevation))
+            )
+            self._conn.commit()
+            self._elevations[key] = float(elevation)
+    
+    def get(self, lat, lon, fetch):
+        """
+        Stored elevation, falling back to fetch(lat, lon) on a miss.
+        A successful fetch is persisted; None is returned if the fetch fails.
+        """
+        elevation = self.lookup(lat, lon)
+        if elevation is not None:
+            return elevation
+        
+        elevation = fetch(lat, lon)
+        if elevation is not None:
+            self.put(lat, lon, elevation)
+        return elevation
+    
+    def __len__(self):
+        return len(self._elevations)
@@ -0,0 +1,117 @@
+"""
+Local elevation tile store for gridded sampling
+
+Tiles are 1 x 1 degree float32 .npy arrays named after their south-west
+corner like SRTM (N25W081.npy covers 25..26N, 81..80W). Row 0 is the
+northern edge and edges are shared with the neighbouring tile, so an
+SRTM3 tile is 1201 x 1201. Tiles are memory-mapped, never fully loaded.
+"""
+
+import os
+import re
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+_TILE_NAME = re.compile(r'^([NS])(\d{2})([EW])(\d{3})\.npy$')
+
+
+def tile_name(lat_floor, lon_floor):
+    return (f"{'N' if lat_floor >= 0 else 'S'}{abs(lat_floor):02d}"
+            f"{'E' if lon_floor >= 0 else 'W'}{abs(lon_floor):03d}.npy")
+
+
+class ElevationTileStore:
+    def __init__(self, directory, max_open_tiles=64):
+        """
+        Args:
+            directory: Folder holding the .npy tiles
+            max_open_tiles: Memory maps kept open (least recently used are dropped)
+        """
+        self.directory = directory
+        self.max_open_tiles = max_open_tiles
+        self._tiles = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def _tile(self, lat_floor, lon_floor):
+        """Memory-mapped tile, or None if there is no tile for this cell"""
+        key = (lat_floor, lon_floor)
+        with self._lock:
+            if key in self._tiles:
+                self._tiles.move_to_end(key)
+                return self._tiles[key]
+        
+        path = os.path.join(self.directory, tile_name(lat_floor, lon_floor))
+        tile = np.load(path, mmap_mode='r') if os.path.exists(path) else None
+        
+        with self._lock:
+            self._tiles[key] = tile
+            while len(self._tiles) > self.max_open_tiles:
+                self._tiles.popitem(last=False)
+        return tile
+    
+    def tiles(self):
+        """(lat_floor, lon_floor) of every tile in the directory"""
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        cells = []
+        for name in names:
+            match = _TILE_NAME.match(name)
+            if match:
+                ns, lat, ew, lon = match.groups()
+                cells.append((int(lat) * (1 if ns == 'N' else -1), int(lon) * (1 if ew == 'E' else -1)))
+        return cells
+    
+    def coverage(self, bbox):
+        """Fraction (0-1) of a (min_lon, min_lat, max_lon, max_lat) box that lies on tiles, by degree area"""
+        min_lon, min_lat, max_lon, max_lat = bbox
+        covered = 0.0
+        for lat, lon in self.tiles():
+            height = min(max_lat, lat + 1) - max(min_lat, lat)
+            width = min(max_lon, lon + 1) - max(min_lon, lon)
+            if height > 0 and width > 0:
+                covered += height * width
+        return min(1.0, covered / ((max_lat - min_lat) * (max_lon - min_lon)))
+    
+    def sample(self, lats, lons):
+        """
+        Nearest-sample elevations for equally shaped lat/lon arrays.
+        Points without a tile (or on a tile's no-data value) come back as NaN.
+        """
+        lats = np.asarray(lats, dtype=float)
+        lons = np.asarray(lons, dtype=float)
+        result = np.full(lats.shape, np.nan, dtype=np.float32)
+        
+        lat_floor = np.floor(lats).astype(np.int32)
+        lon_floor = np.floor(lons).astype(np.int32)
+        cells = lat_floor.ravel() * 1000 + lon_floor.ravel()
+        
+        flat_result = result.ravel()
+        flat_lats = lats.ravel()
+        flat_lons = lons.ravel()
+        
+        # Group points by tile with one sort instead of a scan per tile
+        order = np.argsort(cells, kind='stable')
+        _, starts = np.unique(cells[order], return_index=True)
+        ends = np.append(starts[1:], len(order))
+        
+        for start, end in zip(starts, ends):
+            idx = order[start:end]
+            cell_lat = int(lat_floor.flat[idx[0]])
+            cell_lon = int(lon_floor.flat[idx[0]])
+            tile = self._tile(cell_lat, cell_lon)
+            if tile is None:
+                continue
+            
+            size = tile.shape[0] - 1
+            rows = np.rint((cell_lat + 1 - flat_lats[idx]) * size).astype(np.int64)
+            cols = np.rint((flat_lons[idx] - cell_lon) * size).astype(np.int64)
+            values = np.asarray(tile[rows, cols], dtype=np.float32)
+            # SRTM marks voids with -32768
+            values[values <= -32768] = np.nan
+            flat_result[idx] = values
+        
+        return flat_result.reshape(lats.shape)
@@ -0,0 +1,197 @@
+"""
+Offline city gazetteer with exact and prefix lookup
+
+The bundled source (data/gazetteer.csv.gz) lists every GeoNames city with
+15,000+ inhabitants (CC BY 4.0, via the geonamescache package) with up to
+ten Latin-script aliases each. It is compiled once into a directory of
+.npy arrays that are memory-mapped at startup:
+    
+    keys.npy        sorted, normalized names and aliases (fixed-width bytes)
+    key_city.npy    city row for every key
+                    (cities are stored most populous first, so row order is rank)
+    key_exact.npy   whether the key is the city's own name rather than an alias
+    name.npy, country.npy, state.npy, lat.npy, lon.npy, elevation.npy, population.npy
+
+Lookups are binary searches over keys.npy, so exact matches and prefix
+autocomplete cost microseconds without loading the table into Python objects.
+A city's own name outranks any alias: aliases are noisy (Dayton, OH lists
+"Venice"), so a more populous alias match must not shadow a real name.
+"""
+
+import csv
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import unicodedata
+
+import numpy as np
+
+GAZETTEER_VERSION = 2
+KEY_WIDTH = 64
+CITY_COLUMNS = ('name', 'country', 'state', 'lat', 'lon', 'elevation', 'population')
+
+
+def normalize_name(name):
+    """Case-, diacritic-, hyphen- and whitespace-insensitive form of a place name"""
+    decomposed = unicodedata.normalize('NFKD', name)
+    stripped = ''.join(c for c in decomposed if not unicodedata.combining(c))
+    return ' '.join(stripped.casefold().replace('-', ' ').replace('_', ' ').split())
+
+
+def _encode_key(name):
+    return normalize_name(name).encode('utf-8')[:KEY_WIDTH]
+
+
+def _source_digest(source_path):
+    digest = hashlib.sha256()
+    with open(source_path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    digest.update(f'v{GAZETTEER_VERSION}'.encode())
+    return digest.hexdigest()
+
+
+def read_source(source_path):
+    """Rows of the gazetteer CSV (plain or .gz) as dicts"""
+    opener = gzip.open if source_path.endswith('.gz') else open
+    with opener(source_path, 'rt', encoding='utf-8', newline='') as f:
+        yield from csv.DictReader(f)
+
+
+def build_index(source_path, index_dir):
+    """Compile a gazetteer CSV into the memory-mappable arrays in index_dir"""
+    columns = {column: [] for column in CITY_COLUMNS}
+    keys = []
+    key_city = []
+    key_exact = []
+    
+    rows = sorted(read_source(source_path), key=lambda row: -int(row.get('population') or 0))
+    for i, row in enumerate(rows):
+        columns['name'].append(row['name'])
+        columns['country'].append(row.get('country', ''))
+        columns['state'].append(row.get('state', ''))
+        columns['lat'].append(float(row['lat']))
+        columns['lon'].append(float(row['lon']))
+        columns['elevation'].append(float(row['elevation']) if row.get('elevation') else np.nan)
+        columns['population'].append(int(row.get('population') or 0))
+        
+        name_key = _encode_key(row['name'])
+        city_keys = {name_key}
+        city_keys.update(_encode_key(alias) for alias in (row.get('aliases') or '').split('|') if alias)
+        city_keys.discard(b'')
+        keys.extend(city_keys)
+        key_city.extend([i] * len(city_keys))
+        key_exact.extend(key == name_key for key in city_keys)
+    
+    keys = np.array(keys, dtype=f'S{KEY_WIDTH}')
+    order = np.argsort(keys, kind='stable')
+    
+    os.makedirs(index_dir, exist_ok=True)
+    np.save(os.path.join(index_dir, 'keys.npy'), keys[order])
+    np.save(os.path.join(index_dir, 'key_city.npy'), np.array(key_city, dtype=np.int32)[order])
+    np.save(os.path.join(index_dir, 'key_exact.npy'), np.array(key_exact, dtype=bool)[order])
+    np.save(os.path.join(index_dir, 'name.npy'), np.array([n.encode('utf-8') for n in columns['name']]))
+    np.save(os.path.join(index_dir, 'country.npy'), np.array(columns['country'], dtype='S2'))
+    np.save(os.path.join(index_dir, 'state.npy'), np.array(columns['state'], dtype='S3'))
+    np.save(os.path.join(index_dir, 'lat.npy'), np.array(columns['lat'], dtype=np.float32))
+    np.save(os.path.join(index_dir, 'lon.npy'), np.array(columns['lon'], dtype=np.float32))
+    np.save(os.path.join(index_dir, 'elevation.npy'), np.array(columns['elevation'], dtype=np.float32))
+    np.save(os.path.join(index_dir, 'population.npy'), np.array(columns['population'], dtype=np.int64))
+
+
+class Gazetteer:
+    def __init__(self, index_dir):
+        """Memory-map a compiled index directory"""
+        self.index_dir = index_dir
+        # Plain ndarray views of the maps skip np.memmap's per-access overhead
+        load = lambda name: np.asarray(np.load(os.path.join(index_dir, f'{name}.npy'), mmap_mode='r'))
+        self.keys = load('keys')
+        self.key_city = load('key_city')
+        self.key_exact = load('key_exact')
+        self.columns = {column: load(column) for column in CITY_COLUMNS}
+    
+    @classmethod
+    def open(cls, source_path, index_root):
+        """
+        Gazetteer for source_path, compiling it under index_root on first use.
+        Each source version gets its own directory, created by an atomic rename,
+        so concurrent workers never see a half-built index.
+        """
+        index_dir = os.path.join(index_root, _source_digest(source_path)[:16])
+        if not os.path.exists(os.path.join(index_dir, 'keys.npy')):
+            os.makedirs(index_root, exist_ok=True)
+            tmp_dir = tempfile.mkdtemp(dir=index_root, prefix='.build-')
+            try:
+                build_index(source_path, tmp_dir)
+                os.rename(tmp_dir, index_dir)
+            except OSError:
+                # Another worker finished first
+                if not os.path.exists(os.path.join(index_dir, 'keys.npy')):
+                    raise
+            finally:
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+        return cls(index_dir)
+    
+    def __len__(self):
+        return len(self.columns['name'])
+    
+    def record(self, i):
+        return self.records([i])[0]
+    
+    def records(self, rows):
+        """City dicts for an array of row numbers, gathered column by column"""
+        rows = np.asarray(rows, dtype=np.intp)
+        columns = {column: self.columns[column][rows].tolist() for column in CITY_COLUMNS}
+        return [
+            {
+                'name': name.decode('utf-8'),
+                'country': country.decode(),
+                'state': state.decode() or None,
+                'lat': round(lat, 5),
+                'lon': round(lon, 5),
+                'elevation': None if elevation != elevation else round(elevation, 1),
+                'population': population
+            }
+            for name, country, state, lat, lon, elevation, population in zip(*(columns[c] for c in CITY_COLUMNS))
+        ]
+    
+    def _key_range(self, key, prefix=False):
+        lo = np.searchsorted(self.keys, key, side='left')
+        hi = np.searchsorted(self.keys, key + b'\xff' if prefix else key, side='right')
+        return lo, hi
+    
+    def _ranked(self, lo, hi, country, limit, aliases=True):
+        # Rows are in population order, so sorting row numbers ranks the cities;
+        # name matches come first, then the cities matched only by an alias
+        cities, exact = self.key_city[lo:hi], self.key_exact[lo:hi]
+        if country:
+            in_country = self.columns['country'][cities] == country.upper().encode()
+            cities, exact = cities[in_country], exact[in_country]
+        ranked = np.sort(cities[exact])
+        if aliases and len(ranked) < limit:
+            # setdiff1d also drops a city's alias keys when its name matched
+            ranked = np.concatenate((ranked, np.setdiff1d(cities[~exact], ranked)))
+        return self.records(ranked[:limit])
+    
+    def lookup(self, name, country=None, aliases=True):
+        """
+        City whose name matches exactly, else the one whose alias does, most
+        populous first; None if neither. With aliases=False only names count.
+        """
+        key = _encode_key(name)
+        if not key:
+            return None
+        lo, hi = self._key_range(key)
+        matches = self._ranked(lo, hi, country, 1, aliases)
+        return matches[0] if matches else None
+    
+    def search(self, prefix, limit=10, country=None):
+        """Cities with a name or alias starting with prefix, name matches first, then most populous"""
+        key = _encode_key(prefix)
+        if not key or limit <= 0:
+            return []
+        lo, hi = self._key_range(key, prefix=True)
+        return self._ranked(lo, hi, country, limit)
@@ -0,0 +1,186 @@
+"""
+Concurrent city resolution for the prediction endpoints
+
+The weather lookup (name -> coordinates) runs first; its reply is usually
+cached, and the elevation store usually already knows its coordinates, so
+most resolutions make no upstream call at all. The place-elevation lookup
+(Open-Meteo geocoding, name -> elevation) only starts when it can matter:
+as a hedge once the weather leg has taken longer than hedge_after, when
+the weather leg fails, or on a store miss when there is no elevation API.
+Everything runs under one overall deadline, and a leg that misses it is
+replaced by a default instead of holding the request.
+
+The two legs geocode the name independently and can pick different places
+of the same name. The geocoded elevation is only used for (and stored under)
+the weather coordinates when the geocoded point lies within max_place_km of
+them; otherwise it is stored under its own coordinates and the elevation at
+the weather coordinates is looked up instead.
+
+Cities whose name is in the local gazetteer skip both legs; only a missing
+elevation is fetched, and only if the elevation store does not already have
+it. An alias-only match is not trusted offline (aliases are noisy), so
+those names take the network path like any unknown city.
+"""
+
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout, wait
+
+
+def _distance_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance in km (haversine, mean Earth radius)"""
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * 6371.0 * math.asin(math.sqrt(a))
+
+
+class LocationResolver:
+    def __init__(self, fetch_weather, fetch_place, elevation_store, fetch_elevation=None, deadline=6.0,
+                 default_elevation=50, max_workers=16, gazetteer=None, max_place_km=5.0, hedge_after=0.25):
+        """
+        Args:
+            fetch_weather: city -> (status_code, weather json)
+            fetch_place: city -> {'lat', 'lon', 'elevation'} or None
+            elevation_store: ElevationStore consulted before any elevation call
+            fetch_elevation: (lat, lon) -> elevation or None, tried on a store miss
+            deadline: Seconds the whole resolution may take
+            default_elevation: Elevation used when no source answers in time
+            max_workers: Threads shared by all in-flight resolutions
+            gazetteer: Optional Gazetteer answering known city names without the network
+            max_place_km: How far the geocoded place may lie from the weather coordinates
+                          for its elevation to count as theirs
+            hedge_after: Seconds the weather leg may take before geocoding starts alongside it
+        """
+        self.fetch_weather = fetch_weather
+        self.fetch_place = fetch_place
+        self.elevation_store = elevation_store
+        self.fetch_elevation = fetch_elevation
+        self.deadline = deadline
+        self.default_elevation = default_elevation
+        self.gazetteer = gazetteer
+        self.max_place_km = max_place_km
+        self.hedge_after = hedge_after
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='upstream')
+    
+    def submit(self, fn, *args):
+        return self._executor.submit(fn, *args)
+    
+    def resolve(self, city, deadline=None):
+        """
+        Returns (status_code, result). On success result has 'name', 'weather',
+        'coordinates' ({'lat', 'lon', 'elevation'}) and 'elevation_source'.
+        """
+        expires_at = time.monotonic() + (self.deadline if deadline is None else deadline)
+        
+        if self.gazetteer is not None:
+            place = self.gazetteer.lookup(city, aliases=False)
+            if place is not None:
+                return 200, self._resolve_known(place, expires_at)
+        
+        weather_future = self._executor.submit(self.fetch_weather, city)
+        place_future = None
+        if not wait([weather_future], timeout=min(self.hedge_after, self._remaining(expires_at))).done:
+            # Weather is slow: geocode alongside it in case it misses the deadline
+            place_future = self._executor.submit(self.fetch_place, city)
+        
+        try:
+            status_code, weather = weather_future.result(timeout=self._remaining(expires_at))
+        except FutureTimeout:
+            status_code, weather = 504, None
+        except Exception:
+            status_code, weather = 502, None
+        
+        if status_code == 404:
+            return 404, None
+        
+        if status_code == 200:
+            name = weather['name']
+            lat = weather['coord']['lat']
+            lon = weather['coord']['lon']
+            elevation = self.elevation_store.lookup(lat, lon)
+            if elevation is not None:
+                return 200, self._result(name, weather, lat, lon, elevation, 'store')
+            if place_future is None and self.fetch_elevation is None:
+                place_future = self._executor.submit(self.fetch_place, city)
+        else:
+            # Weather leg failed or is late; the geocoding leg can still locate the city
+            if place_future is None:
+                place_future = self._executor.submit(self.fetch_place, city)
+            place = self._wait(place_future, expires_at)
+            if place is None:
+                return status_code, None
+            return 200, self._result(city, None, place['lat'], place['lon'], place['elevation'], 'geocoding')
+        
+        if place_future is not None:
+            place = self._wait(place_future, expires_at)
+            if place is not None and self._keep_place(place, lat, lon):
+                return 200, self._result(name, weather, lat, lon, place['elevation'], 'geocoding')
+            if not place_future.done():
+                # Fill the store whenever the late leg finishes so the next request hits it
+                place_future.add_done_callback(lambda f: self._store_place(f, lat, lon))
+                return 200, self._result(name, weather, lat, lon, self.default_elevation, 'default')
+        
+        if self.fetch_elevation is not None:
+            # Ask for the elevation at the weather coordinates themselves
+            elevation_future = self._executor.submit(self.elevation_store.get, lat, lon, self.fetch_elevation)
+            elevation = self._wait(elevation_future, expires_at)
+            if elevation is not None:
+                return 200, self._result(name, weather, lat, lon, elevation, 'elevation')
+        
+        return 200, self._result(name, weather, lat, lon, self.default_elevation, 'default')
+    
+    def _resolve_known(self, place, expires_at):
+        lat, lon = place['lat'], place['lon']
+        if place['elevation'] is not None:
+            return self._result(place['name'], None, lat, lon, place['elevation'], 'gazetteer')
+        
+        elevation = self.elevation_store.lookup(lat, lon)
+        if elevation is not None:
+            return self._result(place['name'], None, lat, lon, elevation, 'store')
+        
+        if self.fetch_elevation is not None:
+            elevation_future = self._executor.submit(self.elevation_store.get, lat, lon, self.fetch_elevation)
+            elevation = self._wait(elevation_future, expires_at)
+            if elevation is not None:
+                return self._result(place['name'], None, lat, lon, elevation, 'elevation')
+        
+        return self._result(place['name'], None, lat, lon, self.default_elevation, 'default')
+    
+    def _wait(self, future, expires_at):
+        try:
+            return future.result(timeout=self._remaining(expires_at))
+        except Exception:
+            return None
+    
+    def _store_place(self, future, lat, lon):
+        try:
+            place = future.result()
+        except Exception:
+            return
+        if place is not None:
+            self._keep_place(place, lat, lon)
+    
+    def _keep_place(self, place, lat, lon):
+        """
+        Store the geocoded elevation under the place's own coordinates, and
+        under (lat, lon) too if the place is within max_place_km of them;
+        returns whether it is
+        """
+        self.elevation_store.put(place['lat'], place['lon'], place['elevation'])
+        if _distance_km(place['lat'], place['lon'], lat, lon) > self.max_place_km:
+            return False
+        self.elevation_store.put(lat, lon, place['elevation'])
+        return True
+    
+    @staticmethod
+    def _remaining(expires_at):
+        return max(0.0, expires_at - time.monotonic())
+    
+    @staticmethod
+    def _result(name, weather, lat, lon, elevation, source):
+        return {
+            'name': name,
+            'weather': weather,
+            'coordinates': {'lat': lat, 'lon': lon, 'elevation': elevation},
+            'elevation_source': source
+        }
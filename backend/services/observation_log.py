@@ -0,0 +1,72 @@
+"""
+Persistent, append-only log of sea level observations
+
+Every POST /api/ml/sealevel/observations batch is written here before it
+reaches the model, so observations survive a restart and every worker
+process applies the same batches in the same order (see
+SeaLevelPredictor.sync). Batch numbers only ever grow.
+"""
+
+import os
+import sqlite3
+import threading
+
+import numpy as np
+
+
+class ObservationLog:
+    def __init__(self, path):
+        """
+        Args:
+            path: SQLite file shared by all workers; created on first use
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        self._conn = self._connect()
+        # WAL lets workers read the log while another one appends to it
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('CREATE TABLE IF NOT EXISTS batches (id INTEGER PRIMARY KEY AUTOINCREMENT)')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS observations ('
+            'id INTEGER PRIMARY KEY, batch INTEGER NOT NULL, year REAL NOT NULL, level REAL NOT NULL)'
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS observations_batch ON observations (batch)')
+        self._conn.commit()
+    
+    def _connect(self):
+        return sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+    
+    def reopen(self):
+        """Replace the SQLite connection; a forked worker calls this so it never shares the parent's handle"""
+        self._lock = threading.Lock()
+        self._conn = self._connect()
+    
+    def append(self, years, levels):
+        """Store one batch atomically and return its number"""
+        with self._lock, self._conn:
+            batch = self._conn.execute('INSERT INTO batches DEFAULT VALUES').lastrowid
+            self._conn.executemany(
+                'INSERT INTO observations (batch, year, level) VALUES (?, ?, ?)',
+                [(batch, float(year), float(level)) for year, level in zip(years, levels)]
+            )
+        return batch
+    
+    def since(self, batch):
+        """[(batch, years, levels)] of every batch after `batch`, oldest first"""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT batch, year, level FROM observations WHERE batch > ? ORDER BY id', (batch,)
+            ).fetchall()
+        
+        batches = []
+        for number, year, level in rows:
+            if not batches or batches[-1][0] != number:
+                batches.append((number, [], []))
+            batches[-1][1].append(year)
+            batches[-1][2].append(level)
+        return [(number, np.array(years), np.array(levels)) for number, years, levels in batches]
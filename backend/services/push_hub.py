@@ -0,0 +1,229 @@
+"""
+Server-Sent Events fan-out of per-topic state as JSON merge patches
+
+Every topic (a watched city, the sea level summary) has one current state,
+computed once no matter how many clients follow it. publish() diffs a new
+state against the current one, encodes the difference as one SSE frame and
+appends that same bytes object to each subscriber's queue. Subscribers get
+a snapshot event per topic first, then patch events: RFC 7386 merge
+patches, where changed keys carry their new value, nested dicts are
+patched recursively and removed keys are null.
+
+A subscriber whose queue fills up (a stalled client) has it emptied and is
+sent fresh snapshots instead, so a slow connection holds at most max_queue
+frames. Snapshots and patches are queued under the hub's lock, so frames
+reach each subscriber in publish order.
+"""
+
+import json
+import threading
+from collections import deque
+
+_MISSING = object()
+
+
+def merge_patch(old, new):
+    """Merge patch turning dict old into dict new; {} when they are equal"""
+    patch = {key: None for key in old if key not in new}
+    for key, value in new.items():
+        previous = old.get(key, _MISSING)
+        if isinstance(value, dict) and isinstance(previous, dict):
+            nested = merge_patch(previous, value)
+            if nested:
+                patch[key] = nested
+        elif previous is _MISSING or previous != value:
+            patch[key] = value
+    return patch
+
+
+def sse_frame(event, data):
+    """One SSE event; compact JSON never contains a newline, so data fits on one line"""
+    return f'event: {event}\ndata: {json.dumps(data, separators=(",", ":"))}\n\n'.encode()
+
+
+KEEPALIVE_FRAME = b': keepalive\n\n'
+
+
+class Subscription:
+    def __init__(self, hub, topics, max_queue):
+        self.topics = topics
+        self.max_queue = max_queue
+        self.closed = False
+        self.resync = False
+        self.dropped = 0
+        self._hub = hub
+        self._frames = deque()
+        self._ready = threading.Event()
+    
+    def push(self, frame):
+        """Queue a frame (called under the hub's lock); a full queue is emptied and marked for resync"""
+        if len(self._frames) >= self.max_queue:
+            self.dropped += len(self._frames)
+            self._frames.clear()
+            self.resync = True
+        else:
+            self._frames.append(frame)
+        self._ready.set()
+    
+    def frames(self, keepalive=15):
+        """Yield SSE frames until close(), with a keepalive comment after keepalive seconds of silence"""
+        while not self.closed:
+            if not self._ready.wait(keepalive):
+                yield KEEPALIVE_FRAME
+                continue
+            # Cleared before draining, so a frame pushed meanwhile sets it again
+            self._ready.clear()
+            if self.resync:
+                self._hub.resync(self)
+            while self._frames and not self.closed:
+                yield self._frames.popleft()
+    
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self._ready.set()
+            self._hub.unsubscribe(self)
+
+
+class PushHub:
+    def __init__(self, max_queue=256, max_subscribers=None, on_first=None, on_last=None):
+        """
+        Args:
+            max_queue: Frames a subscriber may have waiting before it is resynced
+            max_subscribers: Open subscriptions allowed at once; subscribe() raises ValueError beyond it
+            on_first: Called with a topic when it gains its first subscriber; it may publish the
+                      topic's first state. An exception fails the subscribe.
+            on_last: Called with a topic when its last subscriber leaves
+        """
+        self.max_queue = max_queue
+        self.max_subscribers = max_subscribers
+        self._on_first = on_first
+        self._on_last = on_last
+        self._states = {}  # topic -> current state
+        self._snapshots = {}  # topic -> encoded snapshot frame of the current state
+        self._subscribers = {}  # topic -> set of Subscription
+        self._open = 0  # subscriptions not yet closed
+        # Topics open and close (on_first / on_last) one at a time; _lock guards states and queues
+        self._membership = threading.Lock()
+        self._lock = threading.Lock()
+        self.published = 0
+        self.patches = 0
+        self.resyncs = 0
+    
+    def subscribe(self, topics, prelude=None):
+        """
+        New Subscription to topics, queued with prelude (an SSE frame) and the
+        snapshot of every topic that already has a state
+        """
+        topics = list(dict.fromkeys(topics))
+        subscription = Subscription(self, topics, self.max_queue)
+        
+        with self._membership:
+            if self.max_subscribers is not None and self._open >= self.max_subscribers:
+                raise ValueError(f'At most {self.max_subscribers} open streams')
+            opened = []
+            try:
+                for topic in topics:
+                    if not self._subscribers.get(topic) and self._on_first is not None:
+                        self._on_first(topic)
+                        opened.append(topic)
+            except Exception:
+                for topic in opened:
+                    if self._on_last is not None:
+                        self._on_last(topic)
+                raise
+            
+            with self._lock:
+                if prelude is not None:
+                    subscription.push(prelude)
+                for topic in topics:
+                    self._subscribers.setdefault(topic, set()).add(subscription)
+                    if topic in self._states:
+                        subscription.push(self._snapshot(topic))
+            self._open += 1
+        return subscription
+    
+    def unsubscribe(self, subscription):
+        """Drop a subscription from its topics (Subscription.close() calls this once)"""
+        with self._membership:
+            self._open -= 1
+            with self._lock:
+                last = []
+                for topic in subscription.topics:
+                    subscribers = self._subscribers.get(topic)
+                    if subscribers is None:
+                        continue
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._subscribers[topic]
+                        last.append(topic)
+            for topic in last:
+                if self._on_last is not None:
+                    self._on_last(topic)
+    
+    def publish(self, topic, state):
+        """Make state the topic's current state and push the change (or a first snapshot) to its subscribers"""
+        with self._lock:
+            previous = self._states.get(topic)
+            if previous is None:
+                self._states[topic] = state
+                self._snapshots.pop(topic, None)
+                frame = self._snapshot(topic)
+            else:
+                patch = merge_patch(previous, state)
+                if not patch:
+                    return False
+                self._states[topic] = state
+                self._snapshots.pop(topic, None)
+                frame = sse_frame('patch', {'topic': topic, 'patch': patch})
+                self.patches += 1
+            self.published += 1
+            for subscription in self._subscribers.get(topic, ()):
+                subscription.push(frame)
+        return True
+    
+    def send(self, topic, event, data):
+        """Push a one-off event (not part of the topic's state) to the topic's subscribers"""
+        frame = sse_frame(event, {'topic': topic, event: data})
+        with self._lock:
+            for subscription in self._subscribers.get(topic, ()):
+                subscription.push(frame)
+    
+    def state(self, topic):
+        return self._states.get(topic)
+    
+    def discard(self, topic):
+        """Forget a topic's state, e.g. once nothing keeps it up to date"""
+        with self._lock:
+            self._states.pop(topic, None)
+            self._snapshots.pop(topic, None)
+    
+    def resync(self, subscription):
+        """Replace a subscriber's dropped frames with snapshots of its topics"""
+        with self._lock:
+            subscription._frames.clear()
+            subscription.resync = False
+            for topic in subscription.topics:
+                if topic in self._states:
+                    subscription.push(self._snapshot(topic))
+            self.resyncs += 1
+    
+    def _snapshot(self, topic):
+        frame = self._snapshots.get(topic)
+        if frame is None:
+            frame = self._snapshots[topic] = sse_frame('snapshot', {'topic': topic, 'state': self._states[topic]})
+        return frame
+    
+    def stats(self):
+        with self._lock:
+            subscriptions = set().union(*self._subscribers.values()) if self._subscribers else set()
+            return {
+                'topics': len(self._states),
+                'subscribers': len(subscriptions),
+                'max_subscribers': self.max_subscribers,
+                'subscriptions': {topic: len(subscribers) for topic, subscribers in self._subscribers.items()},
+                'published': self.published,
+                'patches': self.patches,
+                'resyncs': self.resyncs,
+                'queued_frames': sum(len(subscription._frames) for subscription in subscriptions)
+            }
@@ -0,0 +1,88 @@
+"""
+Serialized-response cache for endpoints whose payload only changes with the dataset
+
+Each entry keeps the encoded body and a strong ETag for one dataset version.
+A request carrying that version is answered from the stored bytes (or with a
+304 by the caller) and the payload builder only runs when the version changes.
+"""
+
+import hashlib
+import threading
+import time
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class CachedBody:
+    version: object
+    body: bytes
+    etag: str
+    built_at: float
+
+
+class ResponseCache:
+    def __init__(self, serialize, timer=time.time):
+        """
+        Args:
+            serialize: payload -> str or bytes (normally the Flask app's JSON encoder)
+            timer: Wall clock used for built_at, injectable for tests
+        """
+        self._serialize = serialize
+        self._timer = timer
+        self._entries = {}
+        self._lock = threading.Lock()  # held while building
+        self._stats_lock = threading.Lock()  # counters only, so hits never wait on a build
+        self.hits = 0
+        self.not_modified = 0
+        self.builds = 0
+    
+    def get(self, key, version, build):
+        """
+        Cached body for key at version, calling build(built_at) -> payload
+        to produce it when the stored version differs
+        """
+        entry = self._entries.get(key)
+        if entry is not None and entry.version == version:
+            self._count_hit()
+            return entry
+        
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.version == version:
+                self._count_hit()
+                return entry
+            
+            built_at = self._timer()
+            body = self._serialize(build(built_at))
+            if isinstance(body, str):
+                body = body.encode('utf-8')
+            etag = hashlib.sha256(body).hexdigest()[:32]
+            entry = CachedBody(version, body, etag, built_at)
+            self._entries[key] = entry
+            with self._stats_lock:
+                self.builds += 1
+            return entry
+    
+    def _count_hit(self):
+        with self._stats_lock:
+            self.hits += 1
+    
+    def record_not_modified(self):
+        with self._stats_lock:
+            self.not_modified += 1
+    
+    def invalidate(self, key=None):
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+    
+    def stats(self):
+        with self._stats_lock:
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'not_modified': self.not_modified,
+                'builds': self.builds
+            }
@@ -0,0 +1,118 @@
+"""
+Gridded flood / landslide risk over a bounding box, produced in row chunks
+
+Only one chunk of rows is alive at a time, so memory depends on the chunk
+budget rather than on the raster size. Encoders stream the chunks as a
+.npy file (float32 scores, NaN where there is no elevation) or an RGBA
+PNG coloured by risk level for use as a Mapbox image source.
+"""
+
+import io
+import struct
+import zlib
+
+import numpy as np
+
+from ml_models.disaster_risk_predictor import RISK_COLORS, risk_level_codes
+
+HAZARDS = ('flood', 'landslide', 'combined')
+
+# Roughly the bytes of temporaries per grid point while scoring a chunk
+_BYTES_PER_POINT = 200
+
+
+def rows_per_chunk(width, memory_budget):
+    return max(1, int(memory_budget // (width * _BYTES_PER_POINT)))
+
+
+def iter_risk_chunks(tile_store, predictor, bbox, width, height, hazard='flood',
+                     rainfall=0.0, humidity=70.0, memory_budget=16 * 1024 * 1024):
+    """
+    Yield float32 score arrays of shape (rows, width), north to south.
+    
+    Args:
+        tile_store: ElevationTileStore sampled at pixel centres
+        predictor: DisasterRiskPredictor providing the batch scorers
+        bbox: (min_lon, min_lat, max_lon, max_lat)
+        hazard: 'flood', 'landslide' or 'combined'
+        rainfall, humidity: Uniform weather applied to every pixel
+        memory_budget: Approximate bytes of working memory per chunk
+    """
+    min_lon, min_lat, max_lon, max_lat = bbox
+    dx = (max_lon - min_lon) / width
+    dy = (max_lat - min_lat) / height
+    lons = min_lon + (np.arange(width) + 0.5) * dx
+    step = rows_per_chunk(width, memory_budget)
+    
+    for start in range(0, height, step):
+        stop = min(height, start + step)
+        lats = max_lat - (np.arange(start, stop) + 0.5) * dy
+        grid_lats, grid_lons = np.meshgrid(lats, lons, indexing='ij')
+        
+        elevation = tile_store.sample(grid_lats, grid_lons)
+        missing = np.isnan(elevation)
+        if missing.all():
+            # No tile under this chunk: nothing to score
+            yield np.full(elevation.shape, np.nan, dtype=np.float32)
+            continue
+        rain = np.full(elevation.shape, rainfall)
+        
+        # Sampled elevations are measurements: 0 m is sea level, not a missing value
+        if hazard == 'flood':
+            scores = predictor.score_flood_batch(elevation, rain, np.full(elevation.shape, humidity),
+                                                 defaults=False)['risk_score']
+        elif hazard == 'landslide':
+            scores = predictor.score_landslide_batch(elevation, rain, defaults=False)['risk_score']
+        else:
+            scores = predictor.score_batch(elevation, rain, np.full(elevation.shape, humidity),
+                                           defaults=False)['combined_risk']
+        
+        scores = scores.astype(np.float32)
+        scores[missing] = np.nan
+        yield scores
+
+
+def encode_npy(chunks, width, height):
+    """Stream a (height, width) float32 .npy file from row chunks"""
+    header = io.BytesIO()
+    np.lib.format.write_array_header_1_0(
+        header, {'descr': '<f4', 'fortran_order': False, 'shape': (height, width)}
+    )
+    yield header.getvalue()
+    for chunk in chunks:
+        yield chunk.astype('<f4', copy=False).tobytes()
+
+
+def _png_chunk(kind, data):
+    body = kind + data
+    return struct.pack('>I', len(data)) + body + struct.pack('>I', zlib.crc32(body) & 0xffffffff)
+
+
+def _level_palette(alpha):
+    palette = np.zeros((len(RISK_COLORS) + 1, 4), dtype=np.uint8)
+    for i, color in enumerate(RISK_COLORS):
+        palette[i] = [int(color[1:3], 16), int(color[3:5], 16), int(color[5:7], 16), alpha]
+    # Last entry is transparent no-data
+    return palette
+
+
+def encode_png(chunks, width, height, alpha=160):
+    """Stream an RGBA PNG, one colour per risk level, transparent where there is no data"""
+    palette = _level_palette(alpha)
+    compressor = zlib.compressobj(6)
+    
+    yield b'\x89PNG\r\n\x1a\n'
+    yield _png_chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 6, 0, 0, 0))
+    
+    for chunk in chunks:
+        codes = risk_level_codes(np.nan_to_num(chunk, nan=0)).astype(np.intp)
+        codes[np.isnan(chunk)] = len(palette) - 1
+        rgba = palette[codes].reshape(chunk.shape[0], width * 4)
+        # Every scanline starts with filter type 0
+        rows = np.hstack([np.zeros((chunk.shape[0], 1), dtype=np.uint8), rgba])
+        data = compressor.compress(rows.tobytes())
+        if data:
+            yield _png_chunk(b'IDAT', data)
+    
+    yield _png_chunk(b'IDAT', compressor.flush())
+    yield _png_chunk(b'IEND', b'')
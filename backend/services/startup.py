@@ -0,0 +1,81 @@
+"""
+Background initialization for the API process
+
+The heavy components (NumPy/SciPy models, memory-mapped datasets, the
+gazetteer index) are built by named steps on a worker thread, so the process
+answers liveness checks as soon as Flask is importable. Routes that need a
+component check is_ready(name) and answer 503 until its step has finished.
+"""
+
+import threading
+import time
+
+
+class Startup:
+    def __init__(self):
+        self._steps = []
+        self._components = {}
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self._thread = None
+        self.started_at = None
+        self.finished_at = None
+    
+    def add(self, name, init):
+        """Register init() as the step that makes component `name` available; steps run in order"""
+        self._steps.append((name, init))
+        self._components[name] = {'state': 'pending', 'seconds': None, 'error': None}
+    
+    def start(self, background=True):
+        """Run every step, on a daemon thread or (background=False) before returning"""
+        with self._lock:
+            if self.started_at is not None:
+                return
+            self.started_at = time.time()
+        
+        if background:
+            self._thread = threading.Thread(target=self._run, name='startup', daemon=True)
+            self._thread.start()
+        else:
+            self._run()
+    
+    def _run(self):
+        for name, init in self._steps:
+            self._update(name, state='loading')
+            began = time.perf_counter()
+            try:
+                init()
+            except Exception as e:
+                self._update(name, state='failed', seconds=round(time.perf_counter() - began, 3), error=str(e))
+                print(f"❌ Startup step '{name}' failed: {e}")
+            else:
+                self._update(name, state='ready', seconds=round(time.perf_counter() - began, 3))
+        self.finished_at = time.time()
+        self._done.set()
+    
+    def _update(self, name, **fields):
+        with self._lock:
+            self._components[name] = dict(self._components[name], **fields)
+    
+    def is_ready(self, *names):
+        """True once the named components (all of them if none are given) initialized successfully"""
+        components = self._components
+        return all(components[name]['state'] == 'ready' for name in (names or components))
+    
+    def state(self, name):
+        return self._components[name]['state']
+    
+    def wait(self, timeout=None):
+        """Block until every step has run; True if they all succeeded"""
+        return self._done.wait(timeout) and self.is_ready()
+    
+    def status(self):
+        with self._lock:
+            components = {name: dict(info) for name, info in self._components.items()}
+        finished_at = self.finished_at
+        return {
+            'ready': all(info['state'] == 'ready' for info in components.values()),
+            'started': self.started_at is not None,
+            'startup_seconds': round(finished_at - self.started_at, 3) if finished_at else None,
+            'components': components
+        }
@@ -0,0 +1,96 @@
+"""
+Incremental JSON encoders for long prediction responses
+
+Rows are produced one chunk of columns at a time (a dict of equal-length
+1-D arrays), so a 10k-year response never holds its full list of row dicts
+or its full encoded body. Two wire formats are supported:
+    
+    ndjson         one JSON object per line, optionally led by a header object
+    json_document  an ordinary JSON document whose RowStream members are
+                   written out as arrays while their chunks are computed
+"""
+
+import json
+
+CHUNK_ROWS = 1024
+
+
+class RowStream:
+    def __init__(self, chunks, constants=None):
+        """
+        Args:
+            chunks: Iterable of {field: 1-D array or list} column dicts, evaluated lazily
+            constants: Fields repeated on every row (e.g. elevation, vulnerability)
+        """
+        self.chunks = chunks
+        self.constants = constants or {}
+    
+    def rows(self, columns):
+        """Row dicts for one chunk"""
+        names = list(columns)
+        values = [column.tolist() if hasattr(column, 'tolist') else list(column) for column in columns.values()]
+        return [dict(zip(names, row), **self.constants) for row in zip(*values)]
+
+
+def chunked(values, chunk_rows=CHUNK_ROWS):
+    """Slices of a sequence (list, range or array) of at most chunk_rows items"""
+    for start in range(0, len(values), chunk_rows):
+        yield values[start:start + chunk_rows]
+
+
+def ndjson(stream, header=None):
+    """Yield NDJSON text: the optional header object, then one line per row"""
+    try:
+        if header is not None:
+            yield json.dumps(header, separators=(',', ':')) + '\n'
+        for columns in stream.chunks:
+            yield ''.join(json.dumps(row, separators=(',', ':')) + '\n' for row in stream.rows(columns))
+    except Exception as e:
+        # Headers are long gone; report the failure in-band and end the stream
+        yield json.dumps({'status': 'error', 'message': str(e)}) + '\n'
+
+
+def json_document(document):
+    """Yield the JSON text of document, expanding each RowStream into an array as it is computed"""
+    # The document is walked rather than serialized with placeholders, so no
+    # string in it (a city name, a scenario key) can be mistaken for a stream
+    pending = []
+    for part in _document_parts(document):
+        if isinstance(part, RowStream):
+            if pending:
+                yield ''.join(pending)
+                pending = []
+            separator = '['
+            for columns in part.chunks:
+                rows = part.rows(columns)
+                if rows:
+                    yield separator + json.dumps(rows, separators=(',', ':'))[1:-1]
+                    separator = ','
+            pending.append('[]' if separator == '[' else ']')
+        else:
+            pending.append(part)
+    if pending:
+        yield ''.join(pending)
+
+
+def _document_parts(obj):
+    """JSON text of obj in pieces, with each RowStream yielded as itself"""
+    if isinstance(obj, RowStream):
+        yield obj
+    elif isinstance(obj, dict):
+        yield '{'
+        for i, (key, value) in enumerate(obj.items()):
+            # Encoded as json.dumps encodes keys (non-string keys become strings)
+            yield (',' if i else '') + json.dumps({key: 0}, separators=(',', ':'))[1:-2]
+            yield from _document_parts(value)
+        yield '}'
+    elif isinstance(obj, (list, tuple)):
+        yield '['
+        for i, item in enumerate(obj):
+            if i:
+                yield ','
+            yield from _document_parts(item)
+        yield ']'
+    else:
+        yield json.dumps(obj, separators=(',', ':'))
+
@@ -0,0 +1,339 @@
+"""
+Columnar on-disk store for historical time series (sea level, CO2, ...)
+
+Each series lives in its own directory of .npy columns that are memory-mapped
+on open:
+
+    time.npy          int64 seconds since 1970-01-01 UTC, ascending
+    value.npy         float64 measurement
+    uncertainty.npy   float64, only when the source has one
+    meta.json         units, source label, row count and source digest
+
+CSV ingest streams the file in chunks straight into the mapped columns, and
+range / downsampling queries binary-search the time column and reduce only
+the rows inside the range, so memory stays flat as series grow to millions
+of rows.
+
+Ingest a local dataset from the backend folder with:
+    python -m services.timeseries_store ingest co2 mlo_weekly.csv --time-column date --value-column co2 --units ppm
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import uuid
+
+import numpy as np
+
+STORE_VERSION = 1
+CHUNK_ROWS = 65536
+
+
+def _year_start(years):
+    """Epoch seconds at 1 January of each (integer) year"""
+    return (np.asarray(years, dtype=np.int64) - 1970).astype('datetime64[Y]').astype('datetime64[s]').astype(np.int64)
+
+
+def parse_times(values):
+    """
+    Epoch seconds for an array of time strings. All values must share one
+    format: ISO dates/datetimes (1993-01-15, 1993-01-15T12:00),
+    compact dates (19930115) or decimal years (1993.042).
+    """
+    values = np.asarray(values, dtype=str)
+    if not len(values):
+        return np.empty(0, dtype=np.int64)
+    
+    first = values[0]
+    if '-' in first[1:] or 'T' in first:
+        return values.astype('datetime64[s]').astype(np.int64)
+    
+    if len(first) == 8 and first.isdigit():
+        compact = values.astype(np.int64)
+        months = ((compact // 10000 - 1970) * 12 + compact // 100 % 100 - 1).astype('datetime64[M]')
+        days = months.astype('datetime64[D]') + (compact % 100 - 1)
+        return days.astype('datetime64[s]').astype(np.int64)
+    
+    decimal_years = values.astype(np.float64)
+    years = np.floor(decimal_years)
+    start = _year_start(years)
+    length = _year_start(years + 1) - start
+    return start + np.round((decimal_years - years) * length).astype(np.int64)
+
+
+def decimal_years(seconds):
+    """Inverse of the decimal-year branch of parse_times"""
+    seconds = np.asarray(seconds, dtype=np.int64)
+    years = seconds.astype('datetime64[s]').astype('datetime64[Y]').astype(np.int64) + 1970
+    start = _year_start(years)
+    return years + (seconds - start) / (_year_start(years + 1) - start)
+
+
+def iso_dates(seconds):
+    return np.asarray(seconds, dtype=np.int64).astype('datetime64[s]').astype('datetime64[D]').astype(str)
+
+
+def _file_digest(path, spec):
+    digest = hashlib.sha256(json.dumps(spec, sort_keys=True).encode())
+    digest.update(f'v{STORE_VERSION}'.encode())
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _read_header(reader, *names):
+    header = next(reader)
+    return [header.index(name) if name else None for name in names]
+
+
+def _count_rows(path, value_column):
+    with open(path, newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        value_index, = _read_header(reader, value_column)
+        return sum(1 for row in reader if row and row[value_index].strip())
+
+
+def _iter_chunks(path, time_column, value_column, uncertainty_column):
+    """(times, values, uncertainties) arrays per CHUNK_ROWS rows, skipping rows without a value"""
+    with open(path, newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        time_index, value_index, uncertainty_index = _read_header(reader, time_column, value_column, uncertainty_column)
+        
+        times, values, uncertainties = [], [], []
+        for row in reader:
+            if not row or not row[value_index].strip():
+                continue
+            times.append(row[time_index].strip())
+            values.append(row[value_index])
+            if uncertainty_index is not None:
+                uncertainties.append(row[uncertainty_index].strip() or 'nan')
+            if len(times) == CHUNK_ROWS:
+                yield _chunk_arrays(times, values, uncertainties, uncertainty_index)
+                times, values, uncertainties = [], [], []
+        if times:
+            yield _chunk_arrays(times, values, uncertainties, uncertainty_index)
+
+
+def _chunk_arrays(times, values, uncertainties, uncertainty_index):
+    return (
+        parse_times(times),
+        np.array(values, dtype=np.float64),
+        np.array(uncertainties, dtype=np.float64) if uncertainty_index is not None else None
+    )
+
+
+def ingest_csv(path, directory, time_column='time', value_column='value', uncertainty_column=None,
+               units='', source=''):
+    """
+    Write one series from a CSV file into directory (replacing it).
+    Two streaming passes: one to count rows, one to fill the mapped columns.
+    """
+    spec = {
+        'time_column': time_column,
+        'value_column': value_column,
+        'uncertainty_column': uncertainty_column,
+        'units': units,
+        'source': source
+    }
+    digest = _file_digest(path, spec)
+    rows = _count_rows(path, value_column)
+    
+    parent = os.path.dirname(os.path.abspath(directory))
+    os.makedirs(parent, exist_ok=True)
+    build_dir = tempfile.mkdtemp(dir=parent, prefix='.build-')
+    try:
+        names = ['time', 'value'] + (['uncertainty'] if uncertainty_column else [])
+        dtypes = [np.int64, np.float64, np.float64]
+        arrays = [
+            np.lib.format.open_memmap(os.path.join(build_dir, f'{name}.npy'), mode='w+', dtype=dtype, shape=(rows,))
+            for name, dtype in zip(names, dtypes)
+        ]
+        
+        offset = 0
+        ordered = True
+        previous = np.iinfo(np.int64).min
+        for chunk in _iter_chunks(path, time_column, value_column, uncertainty_column):
+            n = len(chunk[0])
+            for array, column in zip(arrays, chunk):
+                array[offset:offset + n] = column
+            if n:
+                ordered &= bool(chunk[0][0] >= previous and np.all(np.diff(chunk[0]) >= 0))
+                previous = chunk[0][-1]
+            offset += n
+        
+        if not ordered:
+            # Rare for gauge and altimetry exports; this is the only step that holds a full column
+            order = np.argsort(arrays[0], kind='stable')
+            for array in arrays:
+                array[:] = array[order]
+        
+        for array in arrays:
+            array.flush()
+        del arrays
+        
+        meta = dict(spec, rows=rows, digest=digest, store_version=STORE_VERSION,
+                    columns=names, source_file=os.path.basename(path))
+        with open(os.path.join(build_dir, 'meta.json'), 'w') as f:
+            json.dump(meta, f, indent=2)
+        
+        # Swap the finished directory in; readers that already mapped the old files keep them
+        retired = None
+        if os.path.exists(directory):
+            retired = os.path.join(parent, f'.retired-{uuid.uuid4().hex}')
+            os.rename(directory, retired)
+        os.rename(build_dir, directory)
+        if retired:
+            shutil.rmtree(retired, ignore_errors=True)
+    finally:
+        shutil.rmtree(build_dir, ignore_errors=True)
+    return meta
+
+
+class Series:
+    def __init__(self, directory):
+        self.directory = directory
+        with open(os.path.join(directory, 'meta.json')) as f:
+            self.meta = json.load(f)
+        load = lambda name: np.asarray(np.load(os.path.join(directory, f'{name}.npy'), mmap_mode='r'))
+        self.time = load('time')
+        self.value = load('value')
+        self.uncertainty = load('uncertainty') if 'uncertainty' in self.meta['columns'] else None
+    
+    @property
+    def version(self):
+        return self.meta['digest']
+    
+    def __len__(self):
+        return len(self.time)
+    
+    def bounds(self, start=None, end=None, last=None):
+        """Row slice for start <= time <= end (epoch seconds), optionally only its last rows"""
+        lo = 0 if start is None else int(np.searchsorted(self.time, start, side='left'))
+        hi = len(self.time) if end is None else int(np.searchsorted(self.time, end, side='right'))
+        if last is not None:
+            lo = max(lo, hi - last)
+        return lo, hi
+    
+    def query(self, start=None, end=None, last=None, points=None):
+        """
+        Columns {'time', 'value'[, 'uncertainty']} for a time range. With points,
+        a range holding more rows is averaged into at most that many equal-time buckets.
+        """
+        lo, hi = self.bounds(start, end, last)
+        columns = {'time': self.time[lo:hi], 'value': self.value[lo:hi]}
+        if self.uncertainty is not None:
+            columns['uncertainty'] = self.uncertainty[lo:hi]
+        
+        if points is None or hi - lo <= points:
+            return {name: np.array(column) for name, column in columns.items()}
+        
+        time = columns['time']
+        # Integer edges keep searchsorted from casting the whole time column to float
+        edges = np.linspace(time[0], time[-1], points + 1)[1:-1].astype(np.int64)
+        starts = np.unique(np.concatenate(([0], np.searchsorted(time, edges, side='left'))))
+        counts = np.diff(np.append(starts, len(time)))
+        reduced = {name: _bucket_sums(column, starts) / counts for name, column in columns.items()}
+        reduced['time'] = np.round(reduced['time']).astype(np.int64)
+        return reduced
+
+
+def _bucket_sums(column, starts):
+    """
+    np.add.reduceat(column, starts) computed CHUNK_ROWS rows at a time, so a
+    mapped column is never converted or copied as a whole
+    """
+    sums = np.zeros(len(starts))
+    for offset in range(0, len(column), CHUNK_ROWS):
+        block = column[offset:offset + CHUNK_ROWS]
+        first = np.searchsorted(starts, offset, side='right') - 1
+        last = np.searchsorted(starts, offset + len(block), side='left')
+        local = np.maximum(starts[first:last] - offset, 0)
+        sums[first:last] += np.add.reduceat(block, local, dtype=np.float64)
+    return sums
+
+
+class TimeSeriesStore:
+    def __init__(self, root):
+        self.root = root
+        self._series = {}
+    
+    def path(self, name):
+        return os.path.join(self.root, name)
+    
+    def names(self):
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(n for n in os.listdir(self.root)
+                      if not n.startswith('.') and os.path.exists(os.path.join(self.root, n, 'meta.json')))
+    
+    def series(self, name):
+        """Open series, re-mapped when an ingest has replaced it on disk; None if missing"""
+        meta_path = os.path.join(self.path(name), 'meta.json')
+        try:
+            mtime = os.stat(meta_path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+        
+        cached = self._series.get(name)
+        if cached is None or cached[0] != mtime:
+            cached = (mtime, Series(self.path(name)))
+            self._series[name] = cached
+        return cached[1]
+    
+    def ensure(self, name, path, **spec):
+        """
+        Ingest a bundled default: when name is missing, or when it was loaded from
+        a file of the same name that has since changed. A series ingested from
+        another file is left alone.
+        """
+        series = self.series(name)
+        full_spec = {
+            'time_column': spec.get('time_column', 'time'),
+            'value_column': spec.get('value_column', 'value'),
+            'uncertainty_column': spec.get('uncertainty_column'),
+            'units': spec.get('units', ''),
+            'source': spec.get('source', '')
+        }
+        if series is None or (series.meta['source_file'] == os.path.basename(path)
+                              and series.version != _file_digest(path, full_spec)):
+            ingest_csv(path, self.path(name), **full_spec)
+        return self.series(name)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Manage the historical time-series store')
+    parser.add_argument('--root', default=os.getenv('TIMESERIES_DIR', os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'timeseries')))
+    commands = parser.add_subparsers(dest='command', required=True)
+    
+    ingest = commands.add_parser('ingest', help='Load a CSV file as a series (replaces it)')
+    ingest.add_argument('name')
+    ingest.add_argument('csv')
+    ingest.add_argument('--time-column', default='time')
+    ingest.add_argument('--value-column', default='value')
+    ingest.add_argument('--uncertainty-column')
+    ingest.add_argument('--units', default='')
+    ingest.add_argument('--source', default='')
+    
+    commands.add_parser('list', help='Show stored series')
+    args = parser.parse_args()
+    
+    store = TimeSeriesStore(args.root)
+    if args.command == 'ingest':
+        meta = ingest_csv(args.csv, store.path(args.name), args.time_column, args.value_column,
+                          args.uncertainty_column, args.units, args.source)
+        print(f"✅ {args.name}: {meta['rows']:,} rows")
+    else:
+        for name in store.names():
+            series = store.series(name)
+            first, last = iso_dates([series.time[0], series.time[-1]]) if len(series) else ('-', '-')
+            print(f"{name:<16} {len(series):>12,} rows  {first} .. {last}  {series.meta['units']}  {series.meta['source']}")
+
+
+if __name__ == '__main__':
+    main()
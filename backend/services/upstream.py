@@ -0,0 +1,147 @@
+"""
+Shared HTTP client for all upstream APIs
+One pooled keep-alive session per host, retries with backoff, per-upstream latency histograms
+"""
+
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Upper bucket bounds in milliseconds; the last bucket catches everything slower
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class LatencyHistogram:
+    def __init__(self, buckets=LATENCY_BUCKETS_MS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self._lock = threading.Lock()
+    
+    def observe(self, seconds, error=False):
+        ms = seconds * 1000
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if ms <= bound:
+                index = i
+                break
+        
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.total_ms += ms
+            self.max_ms = max(self.max_ms, ms)
+            if error:
+                self.errors += 1
+    
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-th observation"""
+        if not self.count:
+            return None
+        target = q * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return self.buckets[i] if i < len(self.buckets) else self.max_ms
+        return self.max_ms
+    
+    def snapshot(self):
+        with self._lock:
+            return {
+                'count': self.count,
+                'errors': self.errors,
+                'mean_ms': round(self.total_ms / self.count, 2) if self.count else None,
+                'max_ms': round(self.max_ms, 2),
+                'p50_ms': self.quantile(0.5),
+                'p95_ms': self.quantile(0.95),
+                'p99_ms': self.quantile(0.99),
+                'buckets_ms': {
+                    **{f'<={bound}': self.counts[i] for i, bound in enumerate(self.buckets)},
+                    f'>{self.buckets[-1]}': self.counts[-1]
+                }
+            }
+
+
+class UpstreamClient:
+    def __init__(self, pool_connections=4, pool_maxsize=20, retries=2, backoff_factor=0.3,
+                 retry_statuses=(500, 502, 503, 504)):
+        """
+        Args:
+            pool_connections: Connection pools cached per session
+            pool_maxsize: Keep-alive connections kept per host
+            retries: Retries on connection errors, read timeouts and retry_statuses
+            backoff_factor: Sleep backoff_factor * 2**(n-1) seconds before retry n
+            retry_statuses: HTTP statuses that are retried
+        """
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.retry = Retry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            status=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=retry_statuses,
+            allowed_methods=frozenset(['GET']),
+            raise_on_status=False
+        )
+        self._sessions = {}
+        self._histograms = {}
+        self._lock = threading.Lock()
+    
+    def session_for(self, url):
+        """Pooled session for the url's scheme + host, created on first use"""
+        parts = urlsplit(url)
+        origin = f'{parts.scheme}://{parts.netloc}'
+        session = self._sessions.get(origin)
+        if session is None:
+            with self._lock:
+                session = self._sessions.get(origin)
+                if session is None:
+                    session = requests.Session()
+                    adapter = HTTPAdapter(
+                        pool_connections=self.pool_connections,
+                        pool_maxsize=self.pool_maxsize,
+                        max_retries=self.retry
+                    )
+                    session.mount(f'{parts.scheme}://', adapter)
+                    self._sessions[origin] = session
+        return session
+    
+    def histogram(self, name):
+        histogram = self._histograms.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(name, LatencyHistogram())
+        return histogram
+    
+    def get(self, name, url, **kwargs):
+        """
+        GET through the pooled session for url, recording latency under name.
+        Exceptions from requests propagate after retries are exhausted.
+        """
+        start = time.perf_counter()
+        try:
+            response = self.session_for(url).get(url, **kwargs)
+        except requests.RequestException:
+            self.histogram(name).observe(time.perf_counter() - start, error=True)
+            raise
+        self.histogram(name).observe(time.perf_counter() - start, error=response.status_code >= 500)
+        return response
+    
+    def stats(self):
+        return {name: histogram.snapshot() for name, histogram in sorted(self._histograms.items())}
+    
+    def close(self):
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
@@ -0,0 +1,109 @@
+import os
+import shutil
+import sys
+
+import pytest
+
+# Tests import the backend packages (services, ml_models, app) the way app.py does
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+
+@pytest.fixture(scope='session', autouse=True)
+def data_env(tmp_path_factory):
+    """
+    Point every file the app writes at a throwaway directory, for the app
+    module and for any app process a test starts, so the suite never writes
+    into backend/data. The bundled model artifact is copied over so that
+    startup still loads it instead of fitting.
+    """
+    data_dir = tmp_path_factory.mktemp('data')
+    artifact = data_dir / 'sea_level_model.json'
+    shutil.copyfile(os.path.join(BACKEND_DIR, 'data', 'sea_level_model.json'), artifact)
+    env = {
+        'ELEVATION_DB_PATH': str(data_dir / 'elevation.sqlite3'),
+        'GAZETTEER_INDEX_DIR': str(data_dir / 'gazetteer'),
+        'TIMESERIES_DIR': str(data_dir / 'timeseries'),
+        'MODEL_ARTIFACT_PATH': str(artifact),
+        'PROJECTION_TABLE_PATH': str(data_dir / 'projection_table.npz'),
+        'OBSERVATIONS_DB_PATH': str(data_dir / 'observations.sqlite3'),
+        'ELEVATION_TILE_DIR': str(data_dir / 'elevation_tiles'),
+    }
+    saved = {name: os.environ.get(name) for name in env}
+    os.environ.update(env)
+    yield env
+    for name, value in saved.items():
+        if value is None:
+            os.environ.pop(name, None)
+        else:
+            os.environ[name] = value
+
+
+@pytest.fixture(scope='session')
+def backend(data_env):
+    """The app module, imported without running its startup steps and writing only under data_env"""
+    os.environ['STARTUP_MODE'] = 'manual'
+    import app
+    return app
+
+
+class FakeTimer:
+    """Stands in for time.monotonic; tests move it by setting now"""
+    def __init__(self):
+        self.now = 0.0
+    
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def timer():
+    return FakeTimer()
+
+
+@pytest.fixture
+def client(backend):
+    return backend.app.test_client()
+
+
+@pytest.fixture(scope='session')
+def sea_level_predictor(backend):
+    """A trained SeaLevelPredictor that writes nothing to disk"""
+    from ml_models.sea_level_predictor import SeaLevelPredictor
+    predictor = SeaLevelPredictor()
+    predictor.train()
+    return predictor
+
+
+@pytest.fixture
+def models_ready(backend, sea_level_predictor, monkeypatch):
+    monkeypatch.setattr(backend, 'ml_predictor', sea_level_predictor)
+    monkeypatch.setattr(backend.startup, 'is_ready', lambda name: True)
+    return sea_level_predictor
+
+
+class OfflineUpstream:
+    """Stands in for UpstreamClient when no upstream is reachable"""
+    def __init__(self):
+        self.calls = []
+    
+    def get(self, name, url, params=None, timeout=None):
+        import requests
+        self.calls.append(name)
+        raise requests.ConnectionError(f'{name} is offline in tests')
+
+
+@pytest.fixture
+def timeseries_ready(backend, monkeypatch, tmp_path):
+    """Time-series store ingested into tmp_path, with an empty response cache and no live CO2 feed"""
+    monkeypatch.setattr(backend, 'upstream', OfflineUpstream())
+    backend.co2_cache.clear()
+    backend.co2_failures.clear()
+    monkeypatch.setattr(backend, 'TIMESERIES_DIR', str(tmp_path / 'timeseries'))
+    monkeypatch.setattr(backend, 'timeseries', backend.timeseries)
+    monkeypatch.setattr(backend.startup, 'is_ready', lambda name: True)
+    backend.init_timeseries()
+    backend.response_cache.invalidate()
+    yield backend.timeseries
+    backend.response_cache.invalidate()
@@ -0,0 +1,178 @@
+import os
+import random
+import time
+
+import pytest
+
+from services.alert_system import AlertScheduler, TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+    
+    def __call__(self):
+        return self.now
+    
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class StubUpstream:
+    """Scripted combined_risk per city (the last value repeats); records when each call happened"""
+    def __init__(self, clock, risks=None):
+        self.clock = clock
+        self.risks = risks or {}
+        self.calls = []
+    
+    def refresh(self, city):
+        self.calls.append((self.clock(), city))
+        script = self.risks.get(city, [10.0])
+        risk = script.pop(0) if len(script) > 1 else script[0]
+        if risk is None:
+            raise RuntimeError('upstream down')
+        return {'risk': {'city': city, 'combined_risk': risk}}
+
+
+def scheduler_for(upstream, clock, **kwargs):
+    options = dict(interval=100, jitter=0.2, rate=1000, burst=1000, clock=clock, sleep=clock.sleep,
+                   rng=random.Random(0))
+    options.update(kwargs)
+    return AlertScheduler(upstream.refresh, **options)
+
+
+def run_until(scheduler, clock, seconds):
+    while clock.now < seconds:
+        scheduler.run_pending()
+        clock.now = max(clock.now, scheduler.next_due())
+
+
+def test_token_bucket_waits():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2, burst=3, clock=clock)
+    assert [bucket.reserve() for _ in range(3)] == [0, 0, 0]
+    # Each further token is half a second behind the previous one
+    assert bucket.reserve() == pytest.approx(0.5)
+    assert bucket.reserve() == pytest.approx(1.0)
+    clock.now = 1.0
+    assert bucket.reserve() == pytest.approx(0.5)
+    clock.now = 10.0
+    # Refills up to burst, no further
+    assert [bucket.reserve() for _ in range(4)] == [0, 0, 0, pytest.approx(0.5)]
+
+
+def test_token_bucket_take_is_all_or_nothing():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=0.5, burst=3, clock=clock)
+    assert bucket.take(2) == 0
+    assert bucket.take(2) == pytest.approx(2.0)
+    clock.now = 2.0
+    assert bucket.take(2) == 0
+    assert bucket.take() == pytest.approx(2.0)
+
+
+def test_rate_limit_spaces_refreshes():
+    clock = FakeClock()
+    upstream = StubUpstream(clock)
+    scheduler = scheduler_for(upstream, clock, rate=2, burst=3)
+    for i in range(7):
+        scheduler.watch(f'city-{i}')
+    assert scheduler.run_pending() == 7
+    assert [at for at, _ in upstream.calls] == pytest.approx([0, 0, 0, 0.5, 1.0, 1.5, 2.0])
+    # Sleeping advances the clock, so each call past the burst waits half a second
+    assert scheduler.throttled_seconds == pytest.approx(4 * 0.5)
+
+
+def test_jittered_rescheduling():
+    clock = FakeClock()
+    upstream = StubUpstream(clock)
+    scheduler = scheduler_for(upstream, clock)
+    for i in range(20):
+        scheduler.watch(f'city-{i}')
+    run_until(scheduler, clock, 2000)
+    
+    by_city = {}
+    for at, city in upstream.calls:
+        by_city.setdefault(city, []).append(at)
+    gaps = [b - a for times in by_city.values() for a, b in zip(times, times[1:])]
+    assert all(80 <= gap <= 120 for gap in gaps)
+    assert max(gaps) - min(gaps) > 20
+    # Cities watched together no longer refresh in lockstep
+    assert len({times[1] for times in by_city.values()}) == 20
+
+
+def test_no_jitter_keeps_the_interval():
+    clock = FakeClock()
+    upstream = StubUpstream(clock)
+    scheduler = scheduler_for(upstream, clock, jitter=0)
+    scheduler.watch('Mumbai')
+    run_until(scheduler, clock, 500)
+    assert [at for at, _ in upstream.calls] == [0, 100, 200, 300, 400]
+
+
+def test_alerts_fire_only_on_level_changes():
+    clock = FakeClock()
+    # low, low, high, high, moderate, (error), moderate, critical
+    upstream = StubUpstream(clock, {'Mumbai': [10.0, 15.0, 45.0, 50.0, 25.0, None, 30.0, 80.0]})
+    fired = []
+    scheduler = scheduler_for(upstream, clock, jitter=0, on_alert=fired.append)
+    scheduler.watch('Mumbai')
+    run_until(scheduler, clock, 800)
+    
+    assert scheduler.refreshes == 8
+    assert scheduler.errors == 1
+    changes = [(alert['previous_level'], alert['level'], alert['direction']) for alert in scheduler.alerts()]
+    assert changes == [
+        ('moderate', 'critical', 'raised'),
+        ('high', 'moderate', 'lowered'),
+        ('low', 'high', 'raised')
+    ]
+    assert [alert['id'] for alert in fired] == ['ALERT-000001', 'ALERT-000002', 'ALERT-000003']
+    assert scheduler.get('Mumbai')['level'] == 'critical'
+
+
+def test_first_result_alerts_only_above_low():
+    clock = FakeClock()
+    upstream = StubUpstream(clock, {'Quiet': [5.0], 'Stormy': [75.0]})
+    scheduler = scheduler_for(upstream, clock)
+    scheduler.watch('Quiet')
+    scheduler.watch('Stormy')
+    scheduler.run_pending()
+    assert [(alert['city'], alert['previous_level'], alert['level']) for alert in scheduler.alerts()] == [
+        ('Stormy', None, 'critical')
+    ]
+
+
+def test_watch_list_limit():
+    clock = FakeClock()
+    scheduler = scheduler_for(StubUpstream(clock), clock, max_watched=2)
+    assert scheduler.watch('a') and scheduler.watch('b')
+    assert not scheduler.watch('a')
+    with pytest.raises(ValueError):
+        scheduler.watch('c')
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason='needs os.fork')
+def test_restart_after_fork():
+    scheduler = AlertScheduler(lambda city: {'risk': {'city': city, 'combined_risk': 50.0}}, interval=60)
+    scheduler.start()
+    scheduler.watch('Mumbai')
+    # What a preloading gunicorn master does: stop before forking, restart in the worker
+    scheduler.stop()
+    assert not scheduler.stats()['running']
+    
+    pid = os.fork()
+    if pid == 0:
+        ok = False
+        try:
+            scheduler.restart()
+            scheduler.watch('Lagos')
+            deadline = time.monotonic() + 5
+            while time.monotonic() < deadline and scheduler.get('Lagos') is None:
+                time.sleep(0.01)
+            ok = scheduler.get('Lagos') is not None and scheduler.stats()['running']
+        finally:
+            os._exit(0 if ok else 1)
+    _, status = os.waitpid(pid, 0)
+    assert os.waitstatus_to_exitcode(status) == 0
+    assert scheduler.get('Lagos') is None
@@ -0,0 +1,38 @@
+import pytest
+
+
+@pytest.fixture
+def token(backend, monkeypatch):
+    monkeypatch.setattr(backend, 'ALERT_WATCHLIST_TOKEN', 'secret')
+    yield 'secret'
+    for city in backend.alert_scheduler.watched():
+        backend.alert_scheduler.unwatch(city)
+
+
+def test_watch_list_changes_are_disabled_without_a_token(backend, client, monkeypatch):
+    monkeypatch.setattr(backend, 'ALERT_WATCHLIST_TOKEN', None)
+    assert client.post('/api/alerts/watchlist', json={'cities': ['Mumbai']}).status_code == 403
+    assert client.delete('/api/alerts/watchlist/Mumbai').status_code == 403
+    assert backend.alert_scheduler.watched() == []
+
+
+def test_watch_list_changes_need_the_token(backend, client, token):
+    wrong = {'Authorization': 'Bearer guess'}
+    assert client.post('/api/alerts/watchlist', json={'cities': ['Mumbai']}).status_code == 401
+    assert client.post('/api/alerts/watchlist', json={'cities': ['Mumbai']}, headers=wrong).status_code == 401
+    assert backend.alert_scheduler.watched() == []
+    
+    headers = {'Authorization': f'Bearer {token}'}
+    response = client.post('/api/alerts/watchlist', json={'cities': ['Mumbai']}, headers=headers)
+    assert response.status_code == 200
+    assert response.get_json()['added'] == ['Mumbai']
+    
+    assert client.delete('/api/alerts/watchlist/Mumbai', headers=wrong).status_code == 401
+    assert client.delete('/api/alerts/watchlist/Mumbai', headers=headers).status_code == 200
+    assert backend.alert_scheduler.watched() == []
+
+
+def test_watch_list_is_readable_without_a_token(client):
+    response = client.get('/api/alerts/watchlist')
+    assert response.status_code == 200
+    assert response.get_json()['cities'] == []
@@ -0,0 +1,48 @@
+import pytest
+
+MIAMI = {'name': 'Miami', 'lat': 25.77, 'lon': -80.19, 'elevation': 2}
+OSLO = {'name': 'Oslo', 'lat': 59.91, 'lon': 10.75, 'elevation': 23}
+
+
+def post(client, body):
+    return client.post('/api/ml/sealevel/predict/batch', json=body)
+
+
+def test_batch_predicts_every_city_and_scenario(client, models_ready):
+    response = post(client, {'cities': [MIAMI, OSLO, MIAMI], 'years': [2050, 2100],
+                             'scenarios': ['optimistic', 'pessimistic']})
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['count'] == 3 and body['failed'] == 0 and body['unique_locations'] == 2
+    assert body['results'][0]['data'] == body['results'][2]['data']
+
+
+@pytest.mark.parametrize('body', [[], 'x', 3])
+def test_body_must_be_an_object(client, models_ready, body):
+    response = post(client, body)
+    assert response.status_code == 400
+    assert 'JSON object' in response.get_json()['message']
+
+
+@pytest.mark.parametrize('scenarios', ['moderate', ['moderate', 'extreme'], [1], {'moderate': 1}])
+def test_scenarios_must_be_a_list_of_known_names(client, models_ready, scenarios):
+    response = post(client, {'cities': [MIAMI], 'scenarios': scenarios})
+    assert response.status_code == 400
+    assert 'scenarios' in response.get_json()['message']
+
+
+def test_years_are_capped(backend, client, models_ready, monkeypatch):
+    monkeypatch.setattr(backend, 'MAX_PREDICTION_YEARS', 10)
+    response = post(client, {'cities': [MIAMI], 'years': list(range(2030, 2041))})
+    assert response.status_code == 400
+    assert 'At most 10 years' in response.get_json()['message']
+    
+    assert post(client, {'cities': [MIAMI], 'years': '2030'}).status_code == 400
+
+
+def test_cities_years_and_scenarios_together_are_capped(backend, client, models_ready, monkeypatch):
+    monkeypatch.setattr(backend, 'BATCH_MAX_CELLS', 11)
+    response = post(client, {'cities': [MIAMI, OSLO], 'years': [2030, 2040, 2050],
+                             'scenarios': ['moderate', 'optimistic']})
+    assert response.status_code == 400
+    assert post(client, {'cities': [MIAMI, OSLO], 'years': [2030, 2040, 2050]}).status_code == 200
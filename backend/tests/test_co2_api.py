@@ -0,0 +1,72 @@
+def test_old_co2_record_is_flagged_stale(client, timeseries_ready):
+    data = client.get('/api/climate/co2/current').get_json()['data']
+    # The bundled weekly record ends in December 2001
+    assert data['date'] == '2001-12-29'
+    assert data['current_co2'] == 371.5
+    assert data['stale'] is True
+    assert data['data_age_days'] > 365
+
+
+def test_staleness_follows_the_threshold(backend, client, timeseries_ready, monkeypatch):
+    monkeypatch.setattr(backend, 'CO2_STALE_DAYS', 10 ** 6)
+    data = client.get('/api/climate/co2/current?start=1990-01-01&end=1991-01-01').get_json()['data']
+    assert data['date'].startswith('1990-12')
+    assert data['stale'] is False
+
+
+WEEKLY_CSV = """# NOAA GML weekly Mauna Loa CO2
+# missing weeks are -999.99
+year,month,day,decimal,average,ndays,1 year ago,10 years ago,increase since 1800
+2026,9,20,2026.7192,423.81,7,421.02,400.11,142.39
+2026,9,27,2026.7384,-999.99,0,420.75,400.02,-999.99
+2026,10,4,2026.7575,424.12,6,420.91,400.35,142.70
+"""
+
+
+class StubResponse:
+    def __init__(self, status_code, text):
+        self.status_code = status_code
+        self.text = text
+
+
+class WeeklyUpstream:
+    def __init__(self, status_code=200):
+        self.status_code = status_code
+        self.calls = []
+    
+    def get(self, name, url, params=None, timeout=None):
+        self.calls.append(url)
+        return StubResponse(self.status_code, WEEKLY_CSV)
+
+
+def test_live_reading_is_served_over_the_bundled_record(backend, client, timeseries_ready, monkeypatch):
+    upstream = WeeklyUpstream()
+    monkeypatch.setattr(backend, 'upstream', upstream)
+    data = client.get('/api/climate/co2/current').get_json()['data']
+    assert data['date'] == '2026-10-04'
+    assert data['current_co2'] == 424.12
+    # The missing week is dropped
+    assert [point['date'] for point in data['recent_data']] == ['2026-09-20', '2026-10-04']
+    assert data['source'] == backend.CO2_SOURCE
+    
+    client.get('/api/climate/co2/current')
+    assert len(upstream.calls) == 1
+
+
+def test_bundled_record_is_the_fallback_and_retried_later(backend, client, timeseries_ready, monkeypatch):
+    upstream = WeeklyUpstream(status_code=503)
+    monkeypatch.setattr(backend, 'upstream', upstream)
+    assert client.get('/api/climate/co2/current').get_json()['data']['date'] == '2001-12-29'
+    client.get('/api/climate/co2/current')
+    # Backs off for CO2_RETRY_SECONDS rather than retrying every request
+    assert len(upstream.calls) == 1
+    
+    upstream.status_code = 200
+    backend.co2_failures.clear()
+    assert client.get('/api/climate/co2/current').get_json()['data']['date'] == '2026-10-04'
+
+
+def test_date_ranges_come_from_the_bundled_record(backend, client, timeseries_ready, monkeypatch):
+    monkeypatch.setattr(backend, 'upstream', WeeklyUpstream())
+    data = client.get('/api/climate/co2/current?last=4').get_json()['data']
+    assert data['date'] == '2001-12-29'
@@ -0,0 +1,50 @@
+import os
+
+import numpy as np
+import pytest
+
+from ml_models.coastal_index import EARTH_RADIUS_KM, CoastalIndex
+
+COASTLINE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'coastline.npy')
+
+
+def haversine_scan(points, lats, lons):
+    """Distance to every coastline point, keeping the nearest"""
+    lat1, lon1 = np.radians(np.asarray(lats))[:, None], np.radians(np.asarray(lons))[:, None]
+    lat2, lon2 = np.radians(points[:, 0])[None], np.radians(points[:, 1])[None]
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return (2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))).min(axis=1)
+
+
+@pytest.fixture(scope='module')
+def bundled():
+    return CoastalIndex.load(COASTLINE_PATH)
+
+
+def test_distances_match_a_full_scan():
+    rng = np.random.default_rng(0)
+    points = np.column_stack([rng.uniform(-80, 80, 3000), rng.uniform(-180, 180, 3000)])
+    index = CoastalIndex(points)
+    # Includes queries across the antimeridian and near the poles
+    lats = np.concatenate([rng.uniform(-90, 90, 500), [89.9, -89.9, 0.0]])
+    lons = np.concatenate([rng.uniform(-180, 180, 500), [0.0, 90.0, 179.99]])
+    np.testing.assert_allclose(index.distances_km(lats, lons), haversine_scan(points, lats, lons), atol=1e-6)
+
+
+def test_bundled_coastline_matches_a_full_scan(bundled):
+    points = np.load(COASTLINE_PATH) / 100.0
+    rng = np.random.default_rng(1)
+    lats, lons = rng.uniform(-60, 70, 50), rng.uniform(-180, 180, 50)
+    np.testing.assert_allclose(bundled.distances_km(lats, lons), haversine_scan(points, lats, lons), atol=1e-6)
+
+
+def test_known_places(bundled):
+    # Miami Beach is on the coast, Denver and Ulaanbaatar are far inland
+    assert bundled.distance_km(25.79, -80.13) < 10
+    assert bundled.distance_km(39.74, -104.99) > 800
+    assert bundled.distance_km(47.92, 106.92) > 1000
+
+
+def test_single_and_batch_lookups_agree(bundled):
+    lats, lons = [25.77, 52.37, 28.61], [-80.19, 4.90, 77.21]
+    assert [bundled.distance_km(lat, lon) for lat, lon in zip(lats, lons)] == bundled.distances_km(lats, lons).tolist()
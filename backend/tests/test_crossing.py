@@ -0,0 +1,113 @@
+import numpy as np
+import pytest
+
+from ml_models.crossing import CrossingSolver, global_thresholds
+from ml_models.polynomial import PolynomialEvaluator
+from ml_models.projection_table import ACCELERATION, BASE_YEAR
+
+EVALUATOR = PolynomialEvaluator([120.0, 60.0, 15.0], 2000, 50)
+# A trend that dips before rising, so the running maximum matters
+WAVY = PolynomialEvaluator([100.0, -40.0, 10.0, 30.0], 2050, 60)
+START, END = 2000, 2300
+CASES = [
+    pytest.param(EVALUATOR, 1.0, None, id='trend'),
+    pytest.param(EVALUATOR, 1.5, ACCELERATION, id='accelerated'),
+    pytest.param(EVALUATOR, 0.5, ACCELERATION, id='accelerated-low'),
+    pytest.param(WAVY, 1.0, None, id='wavy-trend'),
+    pytest.param(WAVY, 1.2, ACCELERATION, id='wavy-accelerated'),
+]
+
+
+class Opaque:
+    """The same curve without coefficients, so the solver can only bisect"""
+    def __init__(self, evaluator):
+        self.evaluator = evaluator
+    
+    def __call__(self, years):
+        return self.evaluator(years)
+
+
+def scan(solver, thresholds):
+    """First whole year at or above each threshold, evaluating every year"""
+    years = np.arange(solver.start, solver.end + 1)
+    reached = solver.rise(years)[None, :] >= np.asarray(thresholds)[:, None]
+    return np.where(reached.any(axis=1), years[reached.argmax(axis=1)], np.nan)
+
+
+def thresholds_for(solver):
+    """Levels between whole years, exactly at whole years, already reached and never reached"""
+    years = np.arange(solver.start, solver.end + 1)
+    levels = solver.rise(years)
+    between = np.linspace(levels.min(), levels.max(), 97)
+    at_whole_years = levels[::7]
+    return np.concatenate([between, at_whole_years, [levels[0] - 1, levels.max() + 1, np.inf]])
+
+
+@pytest.mark.parametrize('evaluator, multiplier, acceleration', CASES)
+def test_solve_matches_a_whole_year_scan(evaluator, multiplier, acceleration):
+    solver = CrossingSolver(evaluator, multiplier, acceleration, START, END)
+    thresholds = thresholds_for(solver)
+    _, year = solver.solve(thresholds)
+    np.testing.assert_array_equal(year, scan(solver, thresholds))
+
+
+@pytest.mark.parametrize('evaluator, multiplier, acceleration', CASES)
+def test_analytic_solve_matches_bisection(evaluator, multiplier, acceleration, monkeypatch):
+    analytic = CrossingSolver(evaluator, multiplier, acceleration, START, END)
+    bisected = CrossingSolver(Opaque(evaluator), multiplier, acceleration, START, END)
+    assert analytic._pieces is not None and bisected._pieces is None
+    
+    fallbacks = []
+    bisect = analytic._bisect
+    monkeypatch.setattr(analytic, '_bisect', lambda thresholds: fallbacks.extend(thresholds) or bisect(thresholds))
+    thresholds = thresholds_for(analytic)
+    crossing, year = analytic.solve(thresholds)
+    # Only ties and near-tangent roots fall back
+    assert len(fallbacks) < len(thresholds) / 10
+    expected_crossing, expected_year = bisected.solve(thresholds)
+    np.testing.assert_array_equal(year, expected_year)
+    # Bisection interpolates linearly between whole years; the roots lie in the same year
+    found = ~np.isnan(crossing)
+    np.testing.assert_array_equal(found, ~np.isnan(expected_crossing))
+    assert np.all(np.abs(crossing[found] - expected_crossing[found]) < 1)
+
+
+@pytest.mark.parametrize('evaluator, multiplier, acceleration', CASES)
+def test_analytic_crossings_are_roots(evaluator, multiplier, acceleration):
+    solver = CrossingSolver(evaluator, multiplier, acceleration, START, END)
+    levels = solver.rise(np.arange(START, END + 1))
+    thresholds = np.linspace(levels[0] + 1, levels.max() - 1, 50)
+    crossing, year = solver.solve(thresholds)
+    
+    # Away from the step at BASE_YEAR the curve passes through the threshold at the crossing
+    smooth = crossing != BASE_YEAR
+    np.testing.assert_allclose(solver.rise(crossing[smooth]), thresholds[smooth], rtol=1e-9)
+    assert np.all(crossing <= year) and np.all(year - crossing < 2)
+
+
+def test_ties_at_whole_years_resolve_to_that_year():
+    solver = CrossingSolver(EVALUATOR, 1.5, ACCELERATION, START, END)
+    years = np.arange(2030, 2300, 13)
+    _, year = solver.solve(solver.rise(years))
+    np.testing.assert_array_equal(year, years)
+
+
+def test_step_after_the_base_year_is_reached_the_year_after():
+    solver = CrossingSolver(EVALUATOR, 2.0, ACCELERATION, START, END)
+    before, after = solver.rise([BASE_YEAR, BASE_YEAR + 1])
+    crossing, year = solver.solve([(before + after) / 2])
+    assert year[0] == BASE_YEAR + 1
+    assert BASE_YEAR <= crossing[0] <= BASE_YEAR + 1
+
+
+def test_thresholds_outside_the_curve():
+    solver = CrossingSolver(EVALUATOR, 1.0, ACCELERATION, START, END)
+    crossing, year = solver.solve([-1e6, 1e9, np.inf])
+    assert crossing[0] == year[0] == START
+    assert np.isnan(crossing[1:]).all() and np.isnan(year[1:]).all()
+
+
+def test_global_thresholds_respect_the_cap():
+    thresholds = global_thresholds(60.0, [0.5, 2.0, 1.0, 1.0], [0.0, 40.0, 80.0, 0.0], [100.0, 100.0, 100.0, 50.0])
+    # A city capped below the threshold never reaches it
+    np.testing.assert_array_equal(thresholds, [120.0, 10.0, -20.0, np.inf])
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from ml_models.disaster_risk_predictor import (
+    RISK_LEVELS, TERRAIN_TYPES, DisasterRiskPredictor, risk_level_codes, round_like_python
+)
+
+
+@pytest.fixture(scope='module')
+def predictor():
+    return DisasterRiskPredictor()
+
+
+def random_points(n, seed=1):
+    rng = np.random.default_rng(seed)
+    elevation = np.round(rng.uniform(-5, 1500, n), 1)
+    rainfall = np.round(rng.exponential(30, n), 1)
+    humidity = rng.integers(10, 100, n).astype(float)
+    # Zero inputs take the scalar path's defaults
+    elevation[::97] = 0
+    rainfall[::13] = 0
+    humidity[::29] = 0
+    return elevation, rainfall, humidity
+
+
+def test_batch_scores_match_assess_city_risk(predictor):
+    elevation, rainfall, humidity = random_points(3000)
+    batch = predictor.score_batch(elevation, rainfall, humidity)
+    
+    for i in range(len(elevation)):
+        scalar = predictor.assess_city_risk(
+            'x', elevation[i], {'rainfall': rainfall[i], 'humidity': humidity[i], 'temperature': 25}
+        )
+        flood, landslide = scalar['flood_risk'], scalar['landslide_risk']
+        assert flood['risk_score'] == round(float(batch['flood']['risk_score'][i]), 1), i
+        assert flood['risk_level'] == RISK_LEVELS[batch['flood']['level'][i]], i
+        assert flood['drainage_factor'] == round(float(batch['flood']['drainage_factor'][i]), 1), i
+        assert landslide['risk_score'] == round(float(batch['landslide']['risk_score'][i]), 1), i
+        assert landslide['risk_level'] == RISK_LEVELS[batch['landslide']['level'][i]], i
+        assert landslide['details']['terrain_type'] == TERRAIN_TYPES[batch['landslide']['terrain'][i]], i
+        assert scalar['combined_risk'] == round(float(batch['combined_risk'][i]), 1), i
+
+
+def test_missing_inputs_take_the_scalar_defaults(predictor):
+    # NaN is missing like the scalar path's falsy zero
+    missing = predictor.score_batch([np.nan, 0.0], [np.nan, 0.0], [np.nan, 0.0])
+    scalar = predictor.assess_city_risk('x', 0, {'rainfall': 0, 'humidity': 0})
+    for i in range(2):
+        assert scalar['flood_risk']['risk_score'] == round(float(missing['flood']['risk_score'][i]), 1)
+        assert scalar['combined_risk'] == round(float(missing['combined_risk'][i]), 1)
+
+
+def test_risk_levels_split_at_the_thresholds(predictor):
+    scores = np.array([0, 19.99, 20, 39.99, 40, 69.99, 70, 100])
+    codes = risk_level_codes(scores)
+    assert [RISK_LEVELS[code] for code in codes] == [
+        predictor.get_risk_level_info(score)['level'] for score in scores
+    ]
+
+
+def test_round_like_python_breaks_ties_like_round():
+    # Ties that np.round's scaling gets wrong
+    values = np.array([0.125, 2.675, 1.005, 0.285, 12.345, -2.675, 7.0, 3.14159])
+    assert round_like_python(values, 2).tolist() == [round(float(value), 2) for value in values]
+    assert round_like_python(values, 1).tolist() == [round(float(value), 1) for value in values]
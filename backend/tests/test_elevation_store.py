@@ -0,0 +1,62 @@
+import pytest
+
+from services.elevation_store import ElevationStore, geohash_encode
+
+
+class CountingFetch:
+    def __init__(self, elevation=12.5):
+        self.elevation = elevation
+        self.calls = []
+    
+    def __call__(self, lat, lon):
+        self.calls.append((lat, lon))
+        return self.elevation
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / 'elevation.sqlite3')
+
+
+def test_geohash_matches_the_reference_encoding():
+    assert geohash_encode(57.64911, 10.40744, precision=11) == 'u4pruydqqvj'
+    assert geohash_encode(57.64911, 10.40744) == 'u4pruyd'
+    assert geohash_encode(-25.382708, -49.265506, precision=8) == '6gkzwgjz'
+
+
+def test_each_cell_is_fetched_once(path):
+    store = ElevationStore(path)
+    fetch = CountingFetch()
+    assert store.get(25.7617, -80.1918, fetch) == 12.5
+    # A few metres away is the same ~150 m cell
+    assert store.get(25.76171, -80.19181, fetch) == 12.5
+    assert len(fetch.calls) == 1
+    
+    store.get(25.80, -80.19, fetch)
+    assert len(fetch.calls) == 2 and len(store) == 2
+
+
+def test_elevations_survive_a_restart(path):
+    ElevationStore(path).get(52.37, 4.90, CountingFetch(-2.0))
+    
+    restarted = ElevationStore(path)
+    fetch = CountingFetch()
+    assert restarted.lookup(52.37, 4.90) == -2.0
+    assert restarted.get(52.37, 4.90, fetch) == -2.0
+    assert fetch.calls == []
+
+
+def test_failed_fetches_are_not_stored(path):
+    store = ElevationStore(path)
+    assert store.get(10.0, 10.0, CountingFetch(None)) is None
+    assert store.lookup(10.0, 10.0) is None
+    assert len(ElevationStore(path)) == 0
+
+
+def test_reopened_store_keeps_writing(path):
+    store = ElevationStore(path)
+    store.put(1.0, 2.0, 3.0)
+    store.reopen()
+    store.put(4.0, 5.0, 6.0)
+    assert ElevationStore(path).lookup(4.0, 5.0) == 6.0
+    assert store.lookup(1.0, 2.0) == 3.0
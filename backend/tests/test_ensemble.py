@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from ml_models.ensemble import DEFAULT_PERCENTILES, EnsembleDraws, sorted_percentiles
+from ml_models.polynomial import PolynomialEvaluator
+from ml_models.projection_table import BASE_YEAR
+
+HISTORICAL_YEARS = np.arange(1880, 2021)
+YEARS = np.arange(1990, 2301)
+
+
+@pytest.fixture(scope='module')
+def fitted():
+    rng = np.random.default_rng(1)
+    t = (HISTORICAL_YEARS - 1950) / 70
+    levels = 90 + 80 * t + 25 * t ** 2 + rng.normal(0, 6, len(t))
+    coefficients = np.polynomial.polynomial.polyfit(t, levels, 2)
+    return levels, PolynomialEvaluator(coefficients, 1950, 70)
+
+
+def sample(fitted, draws=2000, seed=0):
+    levels, evaluator = fitted
+    return EnsembleDraws.sample(HISTORICAL_YEARS, levels, evaluator, 1.2, draws, seed)
+
+
+def test_same_seed_reproduces_the_ensemble(fitted):
+    first = sample(fitted).summarize(YEARS)
+    again = sample(fitted).summarize(YEARS)
+    other = sample(fitted, seed=1).summarize(YEARS)
+    assert all(np.array_equal(a, b) for a, b in zip(first, again))
+    assert not np.array_equal(first[1], other[1])
+
+
+def test_summarize_matches_np_percentile(fitted):
+    ensemble = sample(fitted)
+    mean, values = ensemble.summarize(YEARS)
+    paths = ensemble.trajectories(YEARS)
+    np.testing.assert_allclose(mean, paths.mean(axis=1), atol=1e-9)
+    np.testing.assert_allclose(values, np.percentile(paths, DEFAULT_PERCENTILES, axis=1), atol=1e-9)
+
+
+def test_splitting_the_years_does_not_change_the_summary(fitted):
+    ensemble = sample(fitted)
+    mean, values = ensemble.summarize(YEARS)
+    # Pieces that do not line up with YEAR_BLOCK
+    pieces = [ensemble.summarize(piece) for piece in np.array_split(YEARS, 7)]
+    assert np.array_equal(mean, np.concatenate([piece_mean for piece_mean, _ in pieces]))
+    assert np.array_equal(values, np.concatenate([piece_values for _, piece_values in pieces], axis=1))
+
+
+def test_multiplier_only_applies_after_the_base_year(fitted):
+    _, evaluator = fitted
+    ensemble = sample(fitted)
+    past = YEARS[YEARS <= BASE_YEAR]
+    # Before BASE_YEAR every draw is a bootstrap refit of the same trend
+    np.testing.assert_allclose(ensemble.summarize(past)[0], evaluator(past), atol=1.0)
+
+
+def test_sorted_percentiles_interpolates_linearly():
+    values = np.array([[4.0, 1.0, 3.0, 2.0]])
+    np.testing.assert_allclose(sorted_percentiles(values.copy(), (0, 50, 100, 25)),
+                               np.percentile(values, (0, 50, 100, 25), axis=1))
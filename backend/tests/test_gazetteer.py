@@ -0,0 +1,66 @@
+import os
+
+import pytest
+
+from services.elevation_store import ElevationStore
+from services.gazetteer import Gazetteer
+from services.location_resolver import LocationResolver
+
+SOURCE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'gazetteer.csv.gz')
+
+
+@pytest.fixture(scope='module')
+def gazetteer(tmp_path_factory):
+    return Gazetteer.open(SOURCE, str(tmp_path_factory.mktemp('gazetteer')))
+
+
+def test_name_outranks_more_populous_alias(gazetteer):
+    # Dayton, OH (135k) lists "Venice" among its aliases; Venice, IT (51k) is the name
+    venice = gazetteer.lookup('Venice')
+    assert (venice['name'], venice['country']) == ('Venice', 'IT')
+    assert gazetteer.lookup('venice', aliases=False)['country'] == 'IT'
+    assert gazetteer.lookup('Venice', country='US')['name'] == 'Venice'
+
+
+def test_alias_only_match(gazetteer):
+    assert gazetteer.lookup('Bombay')['name'] == 'Mumbai'
+    assert gazetteer.lookup('Bombay', aliases=False) is None
+
+
+def test_search_lists_name_matches_first(gazetteer):
+    cities = gazetteer.search('Venice', limit=50)
+    names = [(city['name'], city['country']) for city in cities]
+    assert names[0] == ('Venice', 'IT')
+    assert names.index(('Dayton', 'US')) > max(i for i, (name, _) in enumerate(names) if name == 'Venice')
+    assert len({(city['lat'], city['lon']) for city in cities}) == len(cities)
+
+
+class StubWeather:
+    def __init__(self):
+        self.calls = []
+    
+    def __call__(self, city):
+        self.calls.append(city)
+        return 200, {'name': 'Mumbai', 'coord': {'lat': 19.07, 'lon': 72.88}}
+
+
+def resolver(gazetteer, tmp_path, fetch_weather):
+    store = ElevationStore(str(tmp_path / 'elevation.sqlite3'))
+    return LocationResolver(fetch_weather, lambda city: None, store, deadline=2, gazetteer=gazetteer)
+
+
+def test_resolver_answers_names_offline(gazetteer, tmp_path):
+    fetch_weather = StubWeather()
+    status_code, location = resolver(gazetteer, tmp_path, fetch_weather).resolve('Venice')
+    assert status_code == 200
+    assert location['name'] == 'Venice'
+    assert location['coordinates']['lat'] == pytest.approx(45.437, abs=1e-3)
+    assert fetch_weather.calls == []
+
+
+def test_resolver_does_not_trust_alias_only_hits(gazetteer, tmp_path):
+    fetch_weather = StubWeather()
+    status_code, location = resolver(gazetteer, tmp_path, fetch_weather).resolve('Bombay')
+    assert status_code == 200
+    assert fetch_weather.calls == ['Bombay']
+    assert location['elevation_source'] == 'default'
@@ -0,0 +1,127 @@
+import threading
+import time
+
+import pytest
+
+from services.elevation_store import ElevationStore
+from services.location_resolver import LocationResolver
+
+# OpenWeatherMap and Open-Meteo geocoding can pick different places of the same name
+VENICE_IT = {'lat': 45.4371, 'lon': 12.3326}
+VENICE_FL = {'lat': 27.0998, 'lon': -82.4543, 'elevation': 4.0}
+MESTRE = {'lat': 45.4906, 'lon': 12.2381, 'elevation': 3.0}  # about 9 km from Venice's centre
+VENICE_LIDO = {'lat': 45.42, 'lon': 12.36, 'elevation': 2.0}  # about 3 km away
+
+
+def fetch_weather(city):
+    return 200, {'name': 'Venice', 'coord': VENICE_IT}
+
+
+def slow_weather(city):
+    time.sleep(0.1)
+    return fetch_weather(city)
+
+
+class FetchElevation:
+    def __init__(self, elevation=1.0):
+        self.elevation = elevation
+        self.calls = []
+    
+    def __call__(self, lat, lon):
+        self.calls.append((lat, lon))
+        return self.elevation
+
+
+class FetchPlace:
+    def __init__(self, place):
+        self.place = place
+        self.calls = 0
+    
+    def __call__(self, city):
+        self.calls += 1
+        return self.place
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ElevationStore(str(tmp_path / 'elevation.sqlite3'))
+
+
+def resolve(store, place, fetch_elevation=None, weather=fetch_weather):
+    resolver = LocationResolver(weather, lambda city: place, store, fetch_elevation=fetch_elevation,
+                                deadline=2, hedge_after=0.02)
+    return resolver.resolve('Venice')
+
+
+def test_geocoding_is_not_called_when_weather_answers_in_time(store):
+    fetch_place = FetchPlace(VENICE_LIDO)
+    fetch_elevation = FetchElevation()
+    resolver = LocationResolver(fetch_weather, fetch_place, store, fetch_elevation=fetch_elevation, deadline=2)
+    
+    status_code, location = resolver.resolve('Venice')
+    assert location['elevation_source'] == 'elevation'
+    assert fetch_elevation.calls == [(VENICE_IT['lat'], VENICE_IT['lon'])]
+    
+    status_code, location = resolver.resolve('Venice')
+    assert location['elevation_source'] == 'store'
+    assert len(fetch_elevation.calls) == 1
+    assert fetch_place.calls == 0
+
+
+def test_slow_weather_starts_geocoding_as_a_hedge(store):
+    fetch_place = FetchPlace(VENICE_LIDO)
+    resolver = LocationResolver(slow_weather, fetch_place, store, fetch_elevation=FetchElevation(), deadline=2,
+                                hedge_after=0.02)
+    status_code, location = resolver.resolve('Venice')
+    assert location['elevation_source'] == 'geocoding'
+    assert fetch_place.calls == 1
+
+
+def test_nearby_geocoded_elevation_is_used_and_stored(store):
+    status_code, location = resolve(store, VENICE_LIDO)
+    assert status_code == 200
+    assert location['elevation_source'] == 'geocoding'
+    assert location['coordinates'] == dict(VENICE_IT, elevation=2.0)
+    assert store.lookup(VENICE_IT['lat'], VENICE_IT['lon']) == 2.0
+    
+    status_code, location = resolve(store, None)
+    assert location['elevation_source'] == 'store'
+
+
+@pytest.mark.parametrize('place', [VENICE_FL, MESTRE])
+def test_distant_geocoded_elevation_is_not_attributed_to_the_weather_coordinates(store, place):
+    fetch_elevation = FetchElevation()
+    status_code, location = resolve(store, place, fetch_elevation, weather=slow_weather)
+    assert status_code == 200
+    assert location['elevation_source'] == 'elevation'
+    assert location['coordinates']['elevation'] == 1.0
+    assert fetch_elevation.calls == [(VENICE_IT['lat'], VENICE_IT['lon'])]
+    # Kept under the place it belongs to
+    assert store.lookup(place['lat'], place['lon']) == place['elevation']
+    assert store.lookup(VENICE_IT['lat'], VENICE_IT['lon']) == 1.0
+
+
+def test_distant_place_without_elevation_api_falls_back_to_default(store):
+    status_code, location = resolve(store, VENICE_FL)
+    assert location['elevation_source'] == 'default'
+    assert store.lookup(VENICE_IT['lat'], VENICE_IT['lon']) is None
+
+
+def test_late_geocoding_leg_only_fills_the_store_for_the_same_place(store):
+    release = threading.Event()
+    
+    def slow_place(place):
+        def fetch(city):
+            release.wait(5)
+            return place
+        return fetch
+    
+    for place, expected in ((VENICE_FL, None), (VENICE_LIDO, 2.0)):
+        resolver = LocationResolver(fetch_weather, slow_place(place), store, deadline=0.2)
+        release.clear()
+        status_code, location = resolver.resolve('Venice')
+        assert location['elevation_source'] == 'default'
+        release.set()
+        resolver._executor.shutdown(wait=True)
+        assert store.lookup(place['lat'], place['lon']) == place['elevation']
+        assert store.lookup(VENICE_IT['lat'], VENICE_IT['lon']) == expected
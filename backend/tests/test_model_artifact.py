@@ -0,0 +1,74 @@
+import json
+
+import numpy as np
+import pytest
+
+from ml_models.model_artifact import ARTIFACT_VERSION, ModelArtifact, data_hash
+from ml_models.sea_level_predictor import SeaLevelPredictor
+
+YEARS = np.array([1900, 1920, 1940, 1960, 1980, 2000, 2010, 2020, 2024])
+LEVELS = np.array([0, 15, 40, 70, 120, 205, 245, 282, 305])
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / 'sea_level_model.json')
+
+
+def forbid_fitting(monkeypatch):
+    def fit(*args, **kwargs):
+        raise AssertionError('the artifact should have been loaded, not refitted')
+    monkeypatch.setattr(ModelArtifact, 'fit', classmethod(fit))
+
+
+def test_saved_artifact_is_loaded_instead_of_refitted(path, monkeypatch):
+    artifact, trained = ModelArtifact.load_or_train(path, YEARS, LEVELS)
+    assert trained
+    
+    forbid_fitting(monkeypatch)
+    loaded, trained = ModelArtifact.load_or_train(path, YEARS, LEVELS)
+    assert not trained
+    assert loaded.to_dict() == artifact.to_dict()
+    years = np.arange(1800, 2301)
+    assert np.array_equal(loaded.evaluator(years), artifact.evaluator(years))
+
+
+@pytest.mark.parametrize('change', [
+    lambda data: {**data, 'data_hash': data_hash(YEARS, LEVELS + 1)},
+    lambda data: {**data, 'version': ARTIFACT_VERSION + 1},
+    lambda data: {key: value for key, value in data.items() if key != 'polynomial'},
+])
+def test_stale_or_unreadable_artifacts_are_refitted(path, change):
+    artifact, _ = ModelArtifact.load_or_train(path, YEARS, LEVELS)
+    with open(path, 'w') as f:
+        json.dump(change(artifact.to_dict()), f)
+    
+    refitted, trained = ModelArtifact.load_or_train(path, YEARS, LEVELS)
+    assert trained
+    assert refitted.evaluator.coefficients == artifact.evaluator.coefficients
+    assert ModelArtifact.load(path).data_hash == data_hash(YEARS, LEVELS)
+
+
+def test_corrupt_file_is_refitted(path):
+    with open(path, 'w') as f:
+        f.write('{"version": 1, "data_')
+    _, trained = ModelArtifact.load_or_train(path, YEARS, LEVELS)
+    assert trained
+
+
+def test_force_refits(path):
+    ModelArtifact.load_or_train(path, YEARS, LEVELS)
+    _, trained = ModelArtifact.load_or_train(path, YEARS, LEVELS, force=True)
+    assert trained
+
+
+def test_predictor_warm_starts_from_its_artifact(path, monkeypatch):
+    cold = SeaLevelPredictor(artifact_path=path)
+    metrics = cold.train()
+    assert cold.backend.trained
+    
+    forbid_fitting(monkeypatch)
+    warm = SeaLevelPredictor(artifact_path=path)
+    assert warm.train() == metrics
+    assert not warm.backend.trained
+    assert warm.predict_global([2050, 2100]) == cold.predict_global([2050, 2100])
@@ -0,0 +1,90 @@
+import numpy as np
+import pytest
+
+from ml_models.online import IncrementalBackend, NormalEquations
+from ml_models.sea_level_predictor import SeaLevelPredictor
+from services.observation_log import ObservationLog
+
+
+def monthly(predictor, months, seed=0):
+    """Readings continuing the fitted trend with gauge noise"""
+    rng = np.random.default_rng(seed)
+    years = predictor.historical_years[-1] + np.arange(1, months + 1) / 12
+    return years, predictor.poly_evaluator(years) + rng.normal(0, 3, months)
+
+
+def full_refit(years, levels, evaluator):
+    """Least squares over all the data at once, in the evaluator's basis"""
+    t = (np.asarray(years, dtype=float) - evaluator.center) / evaluator.scale
+    basis = np.vander(t, len(evaluator.coefficients), increasing=True)
+    return np.linalg.lstsq(basis, levels, rcond=None)[0]
+
+
+def incremental_predictor(log=None):
+    predictor = SeaLevelPredictor(backend=IncrementalBackend(), observation_log=log)
+    predictor.train()
+    return predictor
+
+
+@pytest.fixture
+def log(tmp_path):
+    return ObservationLog(str(tmp_path / 'observations.sqlite3'))
+
+
+def test_incremental_fit_matches_a_full_refit():
+    predictor = incremental_predictor()
+    for seed in range(5):
+        predictor.observe(*monthly(predictor, 40, seed))
+    
+    evaluator = predictor.poly_evaluator
+    expected = full_refit(predictor.historical_years, predictor.historical_levels, evaluator)
+    np.testing.assert_allclose(evaluator.coefficients, expected, rtol=1e-9, atol=1e-9)
+    assert predictor.backend.observations == len(predictor.historical_years) == 19 + 200
+    
+    refit = NormalEquations.from_data(predictor.historical_years, predictor.historical_levels,
+                                      center=evaluator.center, scale=evaluator.scale)
+    assert predictor.backend.metrics['poly_rmse'] == round(refit.fit_metrics(refit.solve())[1], 2)
+
+
+def test_published_models_keep_their_history():
+    predictor = incremental_predictor()
+    predictor.observe(*monthly(predictor, 3))
+    first = predictor._model
+    years = first.years.copy()
+    for seed in range(1, 40):
+        predictor.observe(*monthly(predictor, 3, seed))
+    assert np.array_equal(first.years, years)
+    assert len(predictor._model.years) == 19 + 120
+
+
+def test_observations_survive_a_restart(log):
+    predictor = incremental_predictor(log)
+    for seed in range(3):
+        predictor.observe(*monthly(predictor, 12, seed))
+    
+    restarted = incremental_predictor(log)
+    assert restarted.poly_evaluator.coefficients == predictor.poly_evaluator.coefficients
+    assert np.array_equal(restarted.historical_years, predictor.historical_years)
+
+
+def test_workers_sharing_a_log_serve_the_same_model(log):
+    workers = [incremental_predictor(log) for _ in range(3)]
+    for i in range(6):
+        receiver = workers[i % 3]
+        receiver.observe(*monthly(receiver, 5, seed=i))
+    
+    for worker in workers:
+        worker.sync()
+    coefficients = {worker.poly_evaluator.coefficients for worker in workers}
+    assert len(coefficients) == 1
+    assert all(len(worker.historical_years) == 19 + 30 for worker in workers)
+
+
+def test_sync_is_throttled(log):
+    reader = incremental_predictor(log)
+    writer = incremental_predictor(log)
+    reader.sync()
+    version = reader.model_version
+    writer.observe(*monthly(writer, 5))
+    assert reader.sync(min_interval=60) == version
+    assert reader.sync() == version + 1
@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from ml_models.model_artifact import fit_sklearn
+from ml_models.polynomial import EXPORT_CHECK_YEARS, TOLERANCE_MM, PolynomialEvaluator
+
+
+@pytest.fixture(scope='module')
+def exported(sea_level_predictor):
+    """The predictor's evaluator and the sklearn models fitted to the same data"""
+    _, poly_features, poly_model = fit_sklearn(sea_level_predictor.historical_years,
+                                               sea_level_predictor.historical_levels)
+    return sea_level_predictor.poly_evaluator, poly_features, poly_model
+
+
+def test_evaluator_matches_sklearn(exported):
+    evaluator, poly_features, poly_model = exported
+    assert evaluator.compare(poly_features, poly_model, EXPORT_CHECK_YEARS) <= TOLERANCE_MM
+    
+    years = np.array([1880.0, 2024.0, 2100.0, 2300.0])
+    expected = poly_model.predict(poly_features.transform(years.reshape(-1, 1)))
+    np.testing.assert_allclose(evaluator(years), expected, rtol=0, atol=TOLERANCE_MM)
+
+
+@pytest.mark.parametrize('degree', [1, 2, 3])
+def test_from_sklearn_exports_every_degree(sea_level_predictor, degree):
+    years, levels = sea_level_predictor.historical_years, sea_level_predictor.historical_levels
+    _, poly_features, poly_model = fit_sklearn(years, levels, degree)
+    evaluator = PolynomialEvaluator.from_sklearn(poly_features, poly_model, years)
+    assert len(evaluator.coefficients) == degree + 1
+    assert evaluator.max_error <= TOLERANCE_MM
+
+
+def test_predict_one_matches_the_array_path(exported):
+    evaluator, _, _ = exported
+    years = [1900, 2024, 2050.5, 2300]
+    assert [evaluator.predict_one(year) for year in years] == pytest.approx(evaluator(years).tolist(), rel=1e-15)
+
+
+def test_dict_round_trip(exported):
+    evaluator, _, _ = exported
+    restored = PolynomialEvaluator.from_dict(evaluator.to_dict())
+    assert restored.coefficients == evaluator.coefficients
+    assert np.array_equal(restored(EXPORT_CHECK_YEARS), evaluator(EXPORT_CHECK_YEARS))
@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+from ml_models.polynomial import PolynomialEvaluator
+from ml_models.projection_table import FIRST_YEAR, LAST_YEAR, ProjectionTable, fingerprint, project
+
+EVALUATOR = PolynomialEvaluator([120.0, 60.0, 15.0], 2000, 50)
+SCENARIOS = {'optimistic': 0.7, 'moderate': 1.0, 'pessimistic': 1.5}
+YEARS = np.arange(1880, 2021)
+LEVELS = EVALUATOR(YEARS)
+
+
+@pytest.fixture(scope='module')
+def table():
+    return ProjectionTable.build(EVALUATOR, SCENARIOS, fingerprint(YEARS, LEVELS, EVALUATOR, SCENARIOS))
+
+
+@pytest.mark.parametrize('scenario', SCENARIOS)
+def test_lookup_matches_project(table, scenario):
+    years = np.array([FIRST_YEAR, 1990, 2024, 2025, 2100, LAST_YEAR])
+    np.testing.assert_array_equal(table.lookup(years, scenario), project(EVALUATOR, years, SCENARIOS[scenario]))
+
+
+def test_lookup_leaves_other_years_to_the_caller(table):
+    assert table.lookup([FIRST_YEAR - 1, 2000], 'moderate') is None
+    assert table.lookup([2000, LAST_YEAR + 1], 'moderate') is None
+    assert table.lookup([2050.5], 'moderate') is None
+    assert table.lookup([2050], 'unknown') is None
+    assert table.lookup([], 'moderate').shape == (0, 4)
+
+
+def test_saved_table_loads_only_for_its_key(table, tmp_path):
+    path = str(tmp_path / 'projection_table.npz')
+    table.save(path)
+    loaded = ProjectionTable.load(path, table.key)
+    assert loaded.scenarios == table.scenarios
+    assert np.array_equal(loaded.values, table.values)
+    
+    refit = PolynomialEvaluator([121.0, 60.0, 15.0], 2000, 50)
+    assert ProjectionTable.load(path, fingerprint(YEARS, LEVELS, refit, SCENARIOS)) is None
+    assert ProjectionTable.load(str(tmp_path / 'missing.npz'), table.key) is None
+
+
+def test_fingerprint_tracks_the_training_data_and_scenarios():
+    key = fingerprint(YEARS, LEVELS, EVALUATOR, SCENARIOS)
+    assert fingerprint(YEARS, LEVELS.copy(), EVALUATOR, dict(SCENARIOS)) == key
+    assert fingerprint(YEARS, LEVELS + 1, EVALUATOR, SCENARIOS) != key
+    assert fingerprint(YEARS, LEVELS, EVALUATOR, {**SCENARIOS, 'moderate': 1.1}) != key
+
+
+def test_load_or_build_rebuilds_a_stale_table(table, tmp_path):
+    path = str(tmp_path / 'projection_table.npz')
+    ProjectionTable.load_or_build(path, EVALUATOR, SCENARIOS, table.key)
+    assert ProjectionTable.load(path, table.key) is not None
+    
+    scenarios = {**SCENARIOS, 'extreme': 2.0}
+    key = fingerprint(YEARS, LEVELS, EVALUATOR, scenarios)
+    rebuilt = ProjectionTable.load_or_build(path, EVALUATOR, scenarios, key)
+    assert rebuilt.scenarios == list(scenarios)
+    assert ProjectionTable.load(path, key).scenarios == list(scenarios)
+
+
+def test_predictor_table_covers_its_scenarios(sea_level_predictor):
+    years = np.array([1990, 2024, 2050, 2100, 2300])
+    for scenario, multiplier in sea_level_predictor.scenario_multipliers.items():
+        rows = sea_level_predictor.projection_table.lookup(years, scenario)
+        np.testing.assert_array_equal(rows, project(sea_level_predictor.poly_evaluator, years, multiplier))
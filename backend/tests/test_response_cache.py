@@ -0,0 +1,59 @@
+import json
+import threading
+
+import pytest
+
+from services.response_cache import ResponseCache
+
+
+def test_builds_once_per_version():
+    cache = ResponseCache(json.dumps, timer=lambda: 100.0)
+    calls = []
+    build = lambda built_at: calls.append(built_at) or {'n': len(calls)}
+    
+    first = cache.get('key', 1, build)
+    assert cache.get('key', 1, build) is first
+    assert first.body == b'{"n": 1}' and first.built_at == 100.0
+    
+    second = cache.get('key', 2, build)
+    assert second.etag != first.etag
+    assert calls == [100.0, 100.0]
+    assert cache.stats() == {'entries': 1, 'hits': 1, 'not_modified': 0, 'builds': 2}
+
+
+def test_concurrent_hits_are_all_counted():
+    cache = ResponseCache(json.dumps)
+    cache.get('key', 1, lambda built_at: {})
+    
+    def hit():
+        for _ in range(2000):
+            cache.get('key', 1, lambda built_at: {})
+            cache.record_not_modified()
+    
+    threads = [threading.Thread(target=hit) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    stats = cache.stats()
+    assert stats['hits'] == stats['not_modified'] == 16000
+
+
+@pytest.mark.parametrize('path, name', [('/api/sealevel/current', 'sea_level'), ('/api/climate/co2/current', 'co2')])
+def test_revalidation_answers_304_without_querying(backend, client, timeseries_ready, monkeypatch, path, name):
+    series = timeseries_ready.series(name)
+    queries = []
+    query = series.query
+    monkeypatch.setattr(series, 'query', lambda *args, **kwargs: queries.append(args) or query(*args, **kwargs))
+    
+    response = client.get(path)
+    assert response.status_code == 200
+    etag = response.headers['ETag']
+    assert len(queries) == 1
+    
+    revalidated = client.get(path, headers={'If-None-Match': etag})
+    assert revalidated.status_code == 304
+    assert revalidated.headers['ETag'] == etag
+    assert client.get(path).data == response.data
+    assert len(queries) == 1
+    assert backend.response_cache.stats()['not_modified'] >= 1
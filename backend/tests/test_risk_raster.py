@@ -0,0 +1,79 @@
+import io
+
+import numpy as np
+import pytest
+
+from ml_models.disaster_risk_predictor import DisasterRiskPredictor
+from services.elevation_tiles import ElevationTileStore
+from services.risk_raster import iter_risk_chunks
+
+# One SRTM-style tile over Miami (25..26N, 81..80W), rising from 0 m in the west to 120 m in the east
+TILE = 'N25W081.npy'
+
+
+@pytest.fixture
+def tiles(tmp_path):
+    np.save(tmp_path / TILE, np.tile(np.linspace(0, 120, 121, dtype=np.float32), (121, 1)))
+    (tmp_path / 'README.txt').write_text('not a tile')
+    return ElevationTileStore(str(tmp_path))
+
+
+def test_tiles_and_coverage(tiles, tmp_path):
+    assert tiles.tiles() == [(25, -81)]
+    assert tiles.coverage((-81, 25, -80, 26)) == 1.0
+    assert tiles.coverage((-80.5, 25.5, -79.5, 26.5)) == pytest.approx(0.25)
+    assert tiles.coverage((10, 40, 11, 41)) == 0
+    assert ElevationTileStore(str(tmp_path / 'missing')).coverage((-81, 25, -80, 26)) == 0
+
+
+class CountingPredictor(DisasterRiskPredictor):
+    def __init__(self):
+        super().__init__()
+        self.scored = 0
+    
+    def score_flood_batch(self, elevation, *args, **kwargs):
+        self.scored += elevation.size
+        return super().score_flood_batch(elevation, *args, **kwargs)
+
+
+def test_chunks_without_tiles_are_not_scored(tiles):
+    predictor = CountingPredictor()
+    # Northern half over the tile, southern half off it; one row per chunk
+    chunks = list(iter_risk_chunks(tiles, predictor, (-81, 24, -80, 26), 4, 4, memory_budget=1))
+    raster = np.vstack(chunks)
+    assert np.isfinite(raster[:2]).all()
+    assert np.isnan(raster[2:]).all()
+    assert predictor.scored == 8
+
+
+def test_sea_level_pixels_score_at_least_as_high_as_higher_ground(tmp_path):
+    # 3 x 3 tile: the three pixel centres below land on the 0 m, 1 m and 60 m columns
+    np.save(tmp_path / TILE, np.tile(np.array([0, 1, 60], dtype=np.float32), (3, 1)))
+    tiles = ElevationTileStore(str(tmp_path))
+    for hazard in ('flood', 'combined'):
+        raster = np.vstack(list(iter_risk_chunks(tiles, DisasterRiskPredictor(), (-81, 25.5, -80, 26), 3, 1,
+                                                 hazard=hazard, rainfall=20)))
+        assert raster[0, 0] >= raster[0, 1] > raster[0, 2]
+
+
+@pytest.fixture
+def raster_client(backend, client, tiles, monkeypatch):
+    monkeypatch.setattr(backend.startup, 'is_ready', lambda name: True)
+    monkeypatch.setattr(backend, 'elevation_tiles', tiles)
+    monkeypatch.setattr(backend, 'disaster_predictor', DisasterRiskPredictor())
+    return client
+
+
+def test_raster_without_coverage_is_not_found(raster_client):
+    response = raster_client.get('/api/risk/raster?bbox=10,40,11,41&width=8&height=8')
+    assert response.status_code == 404
+    assert response.get_json()['coverage'] == 0
+
+
+def test_raster_reports_partial_coverage(raster_client):
+    response = raster_client.get('/api/risk/raster?bbox=-81,24,-80,26&width=8&height=8')
+    assert response.status_code == 200
+    assert response.headers['X-Raster-Coverage'] == '0.5000'
+    raster = np.load(io.BytesIO(response.data))
+    assert raster.shape == (8, 8)
+    assert np.isfinite(raster[:4]).all() and np.isnan(raster[4:]).all()
@@ -0,0 +1,90 @@
+import numpy as np
+import pytest
+
+from ml_models.projection_table import ACCELERATION, BASE_YEAR
+
+YEARS = [1990, 2024, 2025, 2030, 2050, 2100, 2250, 2400]
+COORDINATES = {'lat': 25.77, 'lon': -80.19, 'elevation': 2}
+
+
+@pytest.mark.parametrize('scenario', ['optimistic', 'moderate', 'pessimistic'])
+def test_every_entry_point_follows_the_global_projection(sea_level_predictor, scenario):
+    predictor = sea_level_predictor
+    global_rise = predictor.predict_global_columns(YEARS, scenario)['prediction']
+    
+    city = predictor.predict_city('Miami', YEARS, scenario)['predictions']
+    assert [row['global_rise'] for row in city] == global_rise.tolist()
+    
+    any_city = predictor.predict_any_city('Miami', COORDINATES, YEARS, scenario)
+    # Unrounded before the city rounds it
+    np.testing.assert_allclose([row['global_rise'] for row in any_city['predictions']], global_rise, atol=0.0051)
+    
+    grid = predictor.predict_grid([COORDINATES], YEARS, [scenario])
+    columns = predictor.predict_columns(COORDINATES, YEARS, [scenario])
+    assert np.array_equal(grid['global_rise'], columns['global_rise'])
+    assert np.array_equal(grid['local_rise'][0], columns['local_rise'])
+    assert np.array_equal(grid['flooding_risk'][0], columns['flooding_risk'])
+
+
+def test_acceleration_only_applies_after_the_base_year(sea_level_predictor):
+    columns = sea_level_predictor.predict_columns(COORDINATES, [1990, 2024, 2100], ['optimistic', 'pessimistic'])
+    trend = sea_level_predictor.poly_evaluator(np.array([1990, 2024]))
+    np.testing.assert_allclose(columns['global_rise'][:, :2], [trend, trend])
+    assert columns['global_rise'][1, 2] > 1.35 * trend[1]
+
+
+def test_predict_cities_matches_predict_city(sea_level_predictor):
+    predictor = sea_level_predictor
+    names = ['Miami', 'Venice', 'Delhi', 'Unknown City']
+    grid = predictor.predict_cities(names, YEARS, 'pessimistic')
+    assert grid['years'] == YEARS
+    for i, name in enumerate(names):
+        rows = predictor.predict_city(name, YEARS, 'pessimistic')['predictions']
+        for key in ('local_rise', 'flooding_risk', 'impact_percentage', 'lower_bound', 'upper_bound'):
+            assert np.round(grid[key][i], 2).tolist() == [row[key] for row in rows], (name, key)
+
+
+def per_year_loop(predictor, coordinates, target_years, scenario):
+    """predict_any_city one year at a time in plain Python, as it was before it was vectorized"""
+    elevation = coordinates['elevation']
+    coastal_distance = predictor._estimate_coastal_distance(coordinates['lat'], coordinates['lon'])
+    _, factor = predictor._classify_location(elevation, coastal_distance)
+    multiplier = predictor.scenario_multipliers[scenario]
+    
+    rows = []
+    for year in target_years:
+        global_rise = predictor.poly_evaluator.predict_one(year)
+        if year > BASE_YEAR:
+            global_rise = global_rise * multiplier + (year - BASE_YEAR) ** 1.5 * ACCELERATION * multiplier
+        local_rise = global_rise * factor
+        if elevation > 0:
+            flooding_risk = min(100, (local_rise / (elevation * 1000)) * 100)
+        else:
+            flooding_risk = min(100, 80 + (local_rise / 10))
+        if coastal_distance > 100:
+            flooding_risk *= 0.5
+        rows.append({'year': year, 'global_rise': global_rise, 'local_rise': local_rise,
+                     'flooding_risk': flooding_risk})
+    return rows
+
+
+@pytest.mark.parametrize('coordinates', [COORDINATES, {'lat': 28.61, 'lon': 77.21, 'elevation': 216},
+                                         {'lat': 52.37, 'lon': 4.90, 'elevation': -2}])
+@pytest.mark.parametrize('scenario', ['optimistic', 'moderate', 'pessimistic'])
+def test_predict_any_city_matches_a_per_year_loop(sea_level_predictor, coordinates, scenario):
+    years = list(range(1990, 2301, 7))
+    expected = per_year_loop(sea_level_predictor, coordinates, years, scenario)
+    rows = sea_level_predictor.predict_any_city('City', coordinates, years, scenario)['predictions']
+    assert [row['year'] for row in rows] == years
+    for key in ('global_rise', 'local_rise', 'flooding_risk'):
+        # The rows are rounded to 2 dp
+        np.testing.assert_allclose([row[key] for row in rows], [row[key] for row in expected], atol=0.0051,
+                                   err_msg=key)
+
+
+def test_scenarios_share_one_evaluation(sea_level_predictor):
+    scenarios = ['optimistic', 'moderate', 'pessimistic']
+    together = sea_level_predictor.predict_any_city_scenarios('Miami', COORDINATES, YEARS, scenarios)
+    for scenario in scenarios:
+        alone = sea_level_predictor.predict_any_city('Miami', COORDINATES, YEARS, scenario)
+        assert together['scenarios'][scenario] == alone['predictions']
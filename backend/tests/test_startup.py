@@ -0,0 +1,44 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# Median `import app` plus the first /api/status reply in a fresh process;
+# benchmarks/bench_startup.py breaks the time down by module
+STARTUP_BUDGET_MS = float(os.getenv('STARTUP_BUDGET_MS', 400))
+RUNS = 3
+HEAVY_MODULES = ('numpy', 'scipy', 'sklearn', 'pandas')
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = '''
+import json, sys, time
+start = time.perf_counter()
+import app
+imported = time.perf_counter() - start
+response = app.app.test_client().get('/api/status')
+first_request = time.perf_counter() - start
+heavy = [name for name in %r if name in sys.modules]
+print(json.dumps({'import': imported, 'first_request': first_request, 'status': response.status_code, 'heavy': heavy}))
+''' % (HEAVY_MODULES,)
+
+
+def fresh_start(mode):
+    env = dict(os.environ, STARTUP_MODE=mode)
+    out = subprocess.run([sys.executable, '-c', CHILD], cwd=BACKEND_DIR, env=env, capture_output=True, text=True,
+                         check=True, timeout=60).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def test_import_and_first_request_within_budget():
+    runs = [fresh_start('background') for _ in range(RUNS)]
+    assert all(run['status'] == 200 for run in runs)
+    elapsed_ms = statistics.median(run['first_request'] for run in runs) * 1000
+    assert elapsed_ms <= STARTUP_BUDGET_MS, (
+        f'import app + first /api/status took {elapsed_ms:.0f} ms (budget {STARTUP_BUDGET_MS:.0f} ms)'
+    )
+
+
+def test_heavy_modules_wait_for_the_startup_steps():
+    assert fresh_start('manual')['heavy'] == []
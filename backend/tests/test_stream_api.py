@@ -0,0 +1,59 @@
+import pytest
+
+from services.ttl_cache import TTLCache
+
+
+@pytest.fixture
+def streams(backend, monkeypatch):
+    """Stream endpoint with its startup components marked ready and fresh per-client limits"""
+    monkeypatch.setattr(backend.startup, 'is_ready', lambda name: True)
+    monkeypatch.setattr(backend, 'stream_clients', TTLCache(maxsize=16, ttl=60))
+    opened = []
+    
+    def open_stream(cities):
+        response = backend.app.test_client().get(f'/api/stream?cities={cities}')
+        opened.append(response)
+        return response
+    
+    yield open_stream
+    for response in opened:
+        response.close()
+    assert backend.push_hub.stats()['subscribers'] == 0
+    assert backend.alert_scheduler.watched() == []
+
+
+def test_streams_per_worker_are_capped(backend, streams, monkeypatch):
+    monkeypatch.setattr(backend.push_hub, 'max_subscribers', 2)
+    first, second = streams('Mumbai'), streams('Mumbai')
+    assert (first.status_code, second.status_code) == (200, 200)
+    
+    refused = streams('Mumbai')
+    assert refused.status_code == 503
+    assert refused.headers['Retry-After'] == str(backend.STREAM_RETRY_AFTER)
+    
+    # Closing a stream frees its slot, even though nothing was read from it
+    first.close()
+    assert streams('Mumbai').status_code == 200
+
+
+def test_new_cities_are_rate_limited_per_client(backend, streams, monkeypatch):
+    monkeypatch.setattr(backend, 'STREAM_WATCH_RATE', 0.5)
+    monkeypatch.setattr(backend, 'STREAM_WATCH_BURST', 2)
+    assert streams('Mumbai,Lagos').status_code == 200
+    
+    limited = streams('Jakarta')
+    assert limited.status_code == 429
+    assert limited.headers['Retry-After'] == '2'
+    assert 'jakarta' not in backend.alert_scheduler.watched()
+    
+    # Following a city that is already watched costs nothing
+    assert streams('Lagos').status_code == 200
+
+
+def test_streams_hold_a_share_of_the_watch_list(backend, streams, monkeypatch):
+    monkeypatch.setattr(backend, 'STREAM_MAX_WATCHED', 1)
+    assert streams('Mumbai').status_code == 200
+    full = streams('Lagos')
+    assert full.status_code == 503
+    assert 'Retry-After' in full.headers
+    assert backend.alert_scheduler.watched() == ['mumbai']
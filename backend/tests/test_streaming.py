@@ -0,0 +1,68 @@
+import json
+
+import numpy as np
+
+from services.streaming import RowStream, chunked, json_document, ndjson
+
+
+def stream_of(years, constants=None):
+    return RowStream(({'year': chunk, 'level': chunk * 0.5} for chunk in chunked(np.asarray(years), 2)), constants)
+
+
+def test_json_document_matches_json_dumps():
+    document = {
+        'status': 'success',
+        'data': {'scenario': 'moderate', 'predictions': stream_of([2030, 2031, 2032], {'city': 'Miami'}), 'empty': {}},
+        'list': [1, 2.5, None, True, 'a"b\n', []],
+        3: 'non-string key'
+    }
+    expected = {
+        'status': 'success',
+        'data': {
+            'scenario': 'moderate',
+            'predictions': [
+                {'year': 2030, 'level': 1015.0, 'city': 'Miami'},
+                {'year': 2031, 'level': 1015.5, 'city': 'Miami'},
+                {'year': 2032, 'level': 1016.0, 'city': 'Miami'}
+            ],
+            'empty': {}
+        },
+        'list': [1, 2.5, None, True, 'a"b\n', []],
+        3: 'non-string key'
+    }
+    assert ''.join(json_document(document)) == json.dumps(expected, separators=(',', ':'))
+
+
+def test_empty_stream_is_an_empty_array():
+    assert json.loads(''.join(json_document({'rows': RowStream(iter([]))}))) == {'rows': []}
+
+
+def test_user_strings_that_look_like_stream_markers():
+    # Control characters and digits in names and keys are ordinary data
+    tricky = '\x000\x00'
+    document = {tricky: {'city': tricky, f'\x001\x00': stream_of([2030])}, 'name': '\\u0000 0 \\u0000'}
+    body = ''.join(json_document(document))
+    assert json.loads(body) == {
+        tricky: {'city': tricky, '\x001\x00': [{'year': 2030, 'level': 1015.0}]},
+        'name': '\\u0000 0 \\u0000'
+    }
+
+
+def test_rows_are_yielded_chunk_by_chunk():
+    parts = list(json_document({'predictions': stream_of(range(2030, 2036))}))
+    # Opening text, one part per chunk of rows, then the closing bracket and brace
+    assert len(parts) == 5
+    assert json.loads(''.join(parts))['predictions'][-1] == {'year': 2035, 'level': 1017.5}
+
+
+def test_ndjson_header_rows_and_in_band_error():
+    def failing():
+        yield {'year': [2030]}
+        raise ValueError('model unavailable')
+    
+    lines = ''.join(ndjson(RowStream(failing()), {'status': 'success'})).splitlines()
+    assert [json.loads(line) for line in lines] == [
+        {'status': 'success'},
+        {'year': 2030},
+        {'status': 'error', 'message': 'model unavailable'}
+    ]
@@ -0,0 +1,128 @@
+import numpy as np
+import pytest
+
+from ml_models.polynomial import PolynomialEvaluator
+from ml_models.projection_table import ACCELERATION, BASE_YEAR, project
+from ml_models.sweep import Sweep
+
+EVALUATOR = PolynomialEvaluator([120.0, 60.0, 15.0], 2000, 50)
+YEARS = np.arange(2020, 2101, 5)
+MULTIPLIERS = [0.5, 1.0, 1.5, 2.0]
+ACCELERATIONS = [0.0, 0.05, 0.08, 0.2]
+# Inland, low-lying coastal and below sea level
+CITIES = {
+    'names': ['a', 'b', 'c'],
+    'factors': [1.0, 1.5, 1.2],
+    'elevations': [25.0, 2.0, -1.0],
+    'coastal_distances': [150.0, 5.0, 1.0]
+}
+
+
+def sweep(**options):
+    options.setdefault('cities', CITIES)
+    return Sweep(EVALUATOR(YEARS), YEARS, MULTIPLIERS, ACCELERATIONS, model_key=EVALUATOR.to_dict(), **options)
+
+
+def brute_force(quantity):
+    """The (cities, multipliers, accelerations, years) tensor one cell at a time, as predict_grid scores a city"""
+    tensor = np.empty((len(CITIES['names']), len(MULTIPLIERS), len(ACCELERATIONS), len(YEARS)))
+    for c, (factor, elevation, distance) in enumerate(zip(CITIES['factors'], CITIES['elevations'],
+                                                          CITIES['coastal_distances'])):
+        for i, m in enumerate(MULTIPLIERS):
+            for j, a in enumerate(ACCELERATIONS):
+                for k, year in enumerate(YEARS):
+                    base = float(EVALUATOR(np.array([year]))[0])
+                    rise = base * m + (year - BASE_YEAR) ** 1.5 * a * m if year > BASE_YEAR else base
+                    local = rise * factor
+                    if quantity == 'local_rise':
+                        tensor[c, i, j, k] = local
+                        continue
+                    if elevation > 0:
+                        risk = min(100, local / (elevation * 1000) * 100)
+                    else:
+                        risk = min(100, 80 + local / 10)
+                    tensor[c, i, j, k] = risk * 0.5 if distance > 100 else risk
+    return tensor
+
+
+@pytest.mark.parametrize('quantity', ['local_rise', 'flooding_risk'])
+def test_full_tensor_matches_a_brute_force_evaluation(quantity):
+    result = sweep(quantity=quantity, reduction='none').run()
+    np.testing.assert_allclose(result, brute_force(quantity), rtol=1e-12)
+
+
+def test_global_rise_follows_project():
+    result = Sweep(EVALUATOR(YEARS), YEARS, [1.0, 1.5], [ACCELERATION], reduction='none').run()
+    for i, multiplier in enumerate([1.0, 1.5]):
+        np.testing.assert_allclose(result[0, i, 0], project(EVALUATOR, YEARS, multiplier)[:, 0], rtol=1e-12)
+
+
+def test_first_year_over_and_max_reductions():
+    expected = brute_force('flooding_risk')
+    threshold = 45.0
+    first = sweep(quantity='flooding_risk', reduction='first_year_over', threshold=threshold).run()
+    
+    over = expected >= threshold
+    np.testing.assert_array_equal(np.isnan(first), ~over.any(axis=-1))
+    crossed = ~np.isnan(first)
+    assert crossed.any() and not crossed.all()
+    np.testing.assert_array_equal(first[crossed], YEARS[over.argmax(axis=-1)][crossed])
+    
+    maximum = sweep(quantity='flooding_risk', reduction='max').run()
+    np.testing.assert_allclose(maximum, expected.max(axis=-1), rtol=1e-12)
+
+
+def test_mean_and_percentile_reductions_run_over_all_pathways():
+    expected = brute_force('local_rise').reshape(len(CITIES['names']), -1, len(YEARS))
+    percentiles = [5, 50, 95]
+    result = sweep(quantity='local_rise', reduction='percentile', percentiles=percentiles).run()
+    np.testing.assert_allclose(result, np.percentile(expected, percentiles, axis=1), rtol=1e-12)
+    
+    mean = sweep(quantity='local_rise', reduction='mean').run()
+    np.testing.assert_allclose(mean, expected.mean(axis=1), rtol=1e-12)
+
+
+@pytest.mark.parametrize('reduction, options', [
+    ('none', {}), ('max', {}), ('first_year_over', {'threshold': 45.0}),
+    ('mean', {}), ('percentile', {'percentiles': [10, 90]})
+])
+def test_chunking_under_the_memory_cap_does_not_change_the_result(reduction, options):
+    subject = sweep(quantity='flooding_risk', reduction=reduction, **options)
+    whole = subject.run()
+    for budget_cells in (1, 7, 40, 200):
+        chunks = subject.plan(budget_cells)
+        assert len(chunks) > 1
+        # Summing a differently shaped block may round the mean's last bit differently
+        np.testing.assert_allclose(subject.run(memory_cap=budget_cells * 8 * 3), whole, rtol=1e-14, atol=0)
+
+
+def test_plan_covers_every_cell_once_within_the_budget():
+    subject = sweep(quantity='flooding_risk', reduction='max')
+    seen = np.zeros(subject.shape, dtype=int)
+    budget_cells = 40
+    for cities, multipliers, years in subject.plan(budget_cells):
+        block = seen[cities, multipliers, :, years]
+        # A chunk never splits the years the reduction runs over
+        assert block.shape[-1] == len(YEARS)
+        assert block.size <= max(budget_cells, len(ACCELERATIONS) * len(YEARS))
+        seen[cities, multipliers, :, years] += 1
+    assert np.all(seen == 1)
+
+
+def test_cache_key_is_stable_and_tracks_every_input():
+    key = sweep(quantity='flooding_risk', reduction='max').key()
+    assert sweep(quantity='flooding_risk', reduction='max').key() == key
+    # Lists and arrays of the same values hash alike
+    assert Sweep(EVALUATOR(YEARS), list(YEARS), np.array(MULTIPLIERS), tuple(ACCELERATIONS), cities=CITIES,
+                 quantity='flooding_risk', reduction='max', model_key=EVALUATOR.to_dict()).key() == key
+    
+    refit = PolynomialEvaluator([121.0, 60.0, 15.0], 2000, 50)
+    changed = [
+        sweep(quantity='local_rise', reduction='max'),
+        sweep(quantity='flooding_risk', reduction='first_year_over', threshold=45.0),
+        sweep(quantity='flooding_risk', reduction='max', cities={**CITIES, 'elevations': [25.0, 3.0, -1.0]}),
+        Sweep(EVALUATOR(YEARS), YEARS, MULTIPLIERS, ACCELERATIONS, cities=CITIES, quantity='flooding_risk',
+              reduction='max', model_key=refit.to_dict()),
+    ]
+    keys = {key} | {other.key() for other in changed}
+    assert len(keys) == len(changed) + 1
@@ -0,0 +1,45 @@
+import pytest
+
+from services.ttl_cache import TTLCache
+
+
+def test_hits_and_misses(timer):
+    cache = TTLCache(maxsize=4, ttl=60, timer=timer)
+    assert cache.get('a') is None
+    cache.set('a', 1)
+    assert cache.get('a') == 1
+    assert cache.get('b', 'default') == 'default'
+    assert (cache.hits, cache.misses) == (1, 2)
+    assert cache.stats()['hit_rate'] == pytest.approx(1 / 3, abs=1e-4)
+
+
+def test_entries_expire_after_ttl(timer):
+    cache = TTLCache(maxsize=4, ttl=60, timer=timer)
+    cache.set('a', 1)
+    timer.now = 59.9
+    assert cache.get('a') == 1
+    timer.now = 60.0
+    assert cache.get('a') is None
+    assert cache.expirations == 1
+    assert len(cache) == 0
+    
+    # Storing again restarts the TTL
+    cache.set('a', 2)
+    timer.now = 100.0
+    assert cache.get('a') == 2
+
+
+def test_least_recently_used_entry_is_evicted(timer):
+    cache = TTLCache(maxsize=2, ttl=60, timer=timer)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 3)
+    assert cache.get('b') is None
+    assert (cache.get('a'), cache.get('c')) == (1, 3)
+    assert cache.evictions == 1
+
+
+def test_maxsize_must_be_positive():
+    with pytest.raises(ValueError):
+        TTLCache(maxsize=0)
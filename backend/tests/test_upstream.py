@@ -0,0 +1,64 @@
+import pytest
+import requests
+
+from benchmarks.fake_upstream import FakeUpstream
+from services.upstream import LatencyHistogram, UpstreamClient
+
+
+@pytest.fixture
+def fake():
+    fake = FakeUpstream().start()
+    yield fake
+    fake.stop()
+
+
+@pytest.fixture
+def upstream():
+    upstream = UpstreamClient(backoff_factor=0)
+    yield upstream
+    upstream.close()
+
+
+def test_calls_reuse_one_keep_alive_connection(fake, upstream):
+    for i in range(20):
+        response = upstream.get('openweathermap', f'{fake.base_url}/weather', params={'q': f'city{i}'}, timeout=5)
+        assert response.status_code == 200
+    assert fake.requests == 20
+    assert fake.connections == 1
+    assert upstream.session_for(f'{fake.base_url}/elevation') is upstream.session_for(f'{fake.base_url}/weather')
+
+
+def test_5xx_replies_are_retried(fake, upstream):
+    fake.fail_first = 2
+    response = upstream.get('openweathermap', f'{fake.base_url}/weather', params={'q': 'Miami'}, timeout=5)
+    assert response.status_code == 200
+    assert fake.requests == 3
+    assert upstream.stats()['openweathermap']['errors'] == 0
+
+
+def test_exhausted_retries_return_the_last_reply(fake, upstream):
+    fake.fail_first = 10
+    response = upstream.get('openweathermap', f'{fake.base_url}/weather', params={'q': 'Miami'}, timeout=5)
+    assert response.status_code == 503
+    assert fake.requests == 3
+    assert upstream.stats()['openweathermap']['errors'] == 1
+
+
+def test_connection_errors_are_counted_and_raised(fake, upstream):
+    url = f'{fake.base_url}/weather'
+    fake.stop()
+    with pytest.raises(requests.ConnectionError):
+        upstream.get('open-meteo', url, timeout=1)
+    stats = upstream.stats()['open-meteo']
+    assert stats['count'] == stats['errors'] == 1
+
+
+def test_histogram_quantiles_are_bucket_bounds():
+    histogram = LatencyHistogram(buckets=(10, 100))
+    for seconds in [0.001] * 90 + [0.05] * 9 + [0.5]:
+        histogram.observe(seconds)
+    snapshot = histogram.snapshot()
+    assert snapshot['count'] == 100
+    assert (snapshot['p50_ms'], snapshot['p95_ms'], snapshot['p99_ms']) == (10, 100, 100)
+    assert snapshot['buckets_ms'] == {'<=10': 90, '<=100': 9, '>100': 1}
+    assert histogram.quantile(1.0) == snapshot['max_ms'] == 500
@@ -0,0 +1,91 @@
+import pytest
+
+from services.ttl_cache import TTLCache
+
+
+class StubResponse:
+    def __init__(self, status_code, body):
+        self.status_code = status_code
+        self._body = body
+    
+    def json(self):
+        return self._body
+
+
+class StubUpstream:
+    """Stands in for UpstreamClient: Atlantis is unknown, Flakyville's upstream fails"""
+    def __init__(self):
+        self.calls = []
+    
+    def get(self, name, url, params=None, timeout=None):
+        self.calls.append(params.get('q', (params.get('lat'), params.get('lon'))))
+        if params.get('q') == 'Atlantis':
+            return StubResponse(404, {'cod': '404', 'message': 'city not found'})
+        if params.get('q') == 'Flakyville':
+            return StubResponse(503, None)
+        return StubResponse(200, {
+            'name': params.get('q', 'Coordsville'),
+            'coord': {'lat': 19.08, 'lon': 72.88},
+            'sys': {'country': 'IN', 'sunrise': 1700000000, 'sunset': 1700040000},
+            'weather': [{'description': 'haze', 'icon': '50d'}],
+            'main': {'temp': 31.0, 'feels_like': 35.0, 'temp_min': 30.0, 'temp_max': 32.0,
+                     'humidity': 70, 'pressure': 1008},
+            'wind': {'speed': 4.0},
+            'visibility': 3000
+        })
+
+
+@pytest.fixture
+def upstream(backend, monkeypatch, timer):
+    stub = StubUpstream()
+    monkeypatch.setattr(backend, 'upstream', stub)
+    monkeypatch.setattr(backend, 'weather_cache', TTLCache(maxsize=16, ttl=300, timer=timer))
+    monkeypatch.setattr(backend, 'OPENWEATHER_API_KEY', 'test-key')
+    return stub
+
+
+def test_repeat_lookups_hit_the_cache(backend, upstream):
+    assert backend.fetch_weather(city='Mumbai')[0] == 200
+    # Case and whitespace variants share the entry
+    status_code, data = backend.fetch_weather(city='  mumbai ')
+    assert (status_code, data['name']) == (200, 'Mumbai')
+    assert upstream.calls == ['Mumbai']
+    assert (backend.weather_cache.hits, backend.weather_cache.misses) == (1, 1)
+
+
+def test_nearby_coordinates_share_an_entry(backend, upstream):
+    backend.fetch_weather(lat=19.0761, lon=72.8777)
+    backend.fetch_weather(lat=19.0759, lon=72.8781)
+    assert upstream.calls == [(19.08, 72.88)]
+
+
+def test_entries_expire_after_ttl(backend, upstream, timer):
+    backend.fetch_weather(city='Mumbai')
+    timer.now = 299
+    backend.fetch_weather(city='Mumbai')
+    assert len(upstream.calls) == 1
+    timer.now = 300
+    backend.fetch_weather(city='Mumbai')
+    assert len(upstream.calls) == 2
+
+
+def test_not_found_is_cached(backend, client, upstream):
+    for _ in range(3):
+        response = client.get('/api/weather/Atlantis')
+        assert response.status_code == 404
+    assert upstream.calls == ['Atlantis']
+
+
+def test_upstream_failures_are_not_cached(backend, client, upstream):
+    for _ in range(2):
+        assert client.get('/api/weather/Flakyville').status_code == 503
+    assert upstream.calls == ['Flakyville', 'Flakyville']
+
+
+def test_endpoint_serves_cached_weather(client, upstream):
+    first = client.get('/api/weather/Mumbai').get_json()
+    second = client.get('/api/weather/MUMBAI').get_json()
+    assert first['temperature'] == second['temperature'] == {
+        'current': 31.0, 'feels_like': 35.0, 'min': 30.0, 'max': 32.0
+    }
+    assert upstream.calls == ['Mumbai']
@@ -0,0 +1,22 @@
+"""
+WSGI entry point for production serving
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+With preload_app (the default in gunicorn.conf.py) the master imports this
+module once and the startup steps run before any worker is forked. The
+model, projection table and coastal KD-tree are then built a single time and
+shared copy-on-write by every worker, and the gazetteer and time-series
+columns are memory-mapped files whose pages all workers share anyway.
+"""
+
+import gc
+import os
+
+os.environ.setdefault('STARTUP_MODE', 'eager')
+
+from app import app, startup, before_fork, after_fork  # noqa: E402
+
+# Everything built so far lives as long as the process. Freezing it keeps the
+# workers' garbage collector from writing to (and so copying) the shared pages
+gc.freeze()
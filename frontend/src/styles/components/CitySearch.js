@@ -1,11 +1,12 @@
-import React, { useState } from 'react';
+import React, { useState, useRef } from 'react';
 import { Search, MapPin } from 'lucide-react';
+import { autocompleteCity } from '../services/api';
 
 const CitySearch = ({ onCitySelect, onSearch }) => {
   const [searchQuery, setSearchQuery] = useState('');
   const [searchResults, setSearchResults] = useState([]);
-  const [isSearching, setIsSearching] = useState(false);
   const [showResults, setShowResults] = useState(false);
+  const latestQuery = useRef('');
 
   const handleSearch = async (e) => {
     e.preventDefault();
@@ -13,15 +14,27 @@ const CitySearch = ({ onCitySelect, onSearch }) => {
       onSearch(searchQuery);
       setShowResults(false);
       setSearchQuery('');
+      latestQuery.current = '';
       setSearchResults([]);
     }
   };
 
-  const handleInputChange = (e) => {
-    setSearchQuery(e.target.value);
-    if (e.target.value.length === 0) {
+  const handleInputChange = async (e) => {
+    const query = e.target.value;
+    setSearchQuery(query);
+    latestQuery.current = query;
+    if (query.trim().length < 2) {
       setSearchResults([]);
       setShowResults(false);
+      return;
+    }
+
+    const result = await autocompleteCity(query.trim());
+    // Ignore answers for queries the user has already typed past
+    if (latestQuery.current !== query) return;
+    if (result.success) {
+      setSearchResults(result.data.results);
+      setShowResults(true);
     }
   };
 
@@ -29,6 +42,7 @@ const CitySearch = ({ onCitySelect, onSearch }) => {
     const cityName = `${city.name}${city.state ? ', ' + city.state : ''}, ${city.country}`;
     onCitySelect(cityName, city.lat, city.lon);
     setSearchQuery('');
+    latestQuery.current = '';
     setSearchResults([]);
     setShowResults(false);
   };
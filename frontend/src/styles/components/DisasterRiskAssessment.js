@@ -1,5 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import { Droplets, AlertTriangle, MapPin, TrendingUp, RefreshCw } from 'lucide-react';
+import { subscribeToUpdates } from '../services/api';
 
 const DisasterRiskAssessment = () => {
   const [searchTerm, setSearchTerm] = useState('');
@@ -11,9 +12,25 @@ const DisasterRiskAssessment = () => {
   const popularCities = ['Mumbai', 'Miami', 'Tokyo', 'Jakarta', 'Shanghai', 'Bangkok', 'Manila', 'Venice'];
 
   useEffect(() => {
-    if (selectedCity) {
-      fetchRiskAssessment(selectedCity);
-    }
+    if (!selectedCity) return undefined;
+    setLoading(true);
+    setError(null);
+
+    // The server pushes this city's assessment and every change to it; fetch once if streaming is unavailable
+    return subscribeToUpdates({ cities: [selectedCity] }, {
+      onUpdate: (name, state) => {
+        if (state.risk) {
+          setRiskData(state.risk);
+          setError(null);
+        } else if (state.error) {
+          setError(state.error);
+        }
+        setLoading(false);
+      },
+      onError: (closed) => {
+        if (closed) fetchRiskAssessment(selectedCity);
+      }
+    });
   }, [selectedCity]);
 
   const fetchRiskAssessment = async (city) => {
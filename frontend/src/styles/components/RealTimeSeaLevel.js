@@ -1,7 +1,7 @@
 import React, { useState, useEffect } from 'react';
 import { LineChart, Line, XAxis, YAxis, CartesianGrid, Tooltip, ResponsiveContainer } from 'recharts';
 import { Waves, RefreshCw, AlertCircle, TrendingUp } from 'lucide-react';
-import { getCurrentSeaLevel, getCurrentCO2 } from '../services/api';
+import { getCurrentSeaLevel, getCurrentCO2, subscribeToUpdates } from '../services/api';
 
 const RealTimeSeaLevel = () => {
   const [seaLevelData, setSeaLevelData] = useState(null);
@@ -11,7 +11,19 @@ const RealTimeSeaLevel = () => {
   const [lastUpdated, setLastUpdated] = useState(null);
 
   useEffect(() => {
-    fetchRealTimeData();
+    // Pushed by the server on connect and whenever it changes; fetch once if streaming is unavailable
+    return subscribeToUpdates({ sealevel: true }, {
+      onUpdate: (name, state) => {
+        setSeaLevelData(state.sea_level);
+        setCO2Data(state.co2);
+        setLastUpdated(new Date());
+        setError(null);
+        setLoading(false);
+      },
+      onError: (closed) => {
+        if (closed) fetchRealTimeData();
+      }
+    });
   }, []);
 
   const fetchRealTimeData = async () => {
@@ -162,8 +174,10 @@ const RealTimeSeaLevel = () => {
                 <div style={styles.statValue}>
                   {co2Data.current_co2} ppm
                 </div>
-                <div style={styles.statLabel}>Current CO₂ Level</div>
-                <div style={styles.statSource}>Mauna Loa Observatory</div>
+                <div style={styles.statLabel}>{co2Data.stale ? 'Latest CO₂ Reading' : 'Current CO₂ Level'}</div>
+                <div style={styles.statSource}>
+                  Mauna Loa Observatory{co2Data.stale && co2Data.date ? ` · as of ${co2Data.date}` : ''}
+                </div>
               </div>
             )}
           </div>
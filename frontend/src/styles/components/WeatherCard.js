@@ -1,7 +1,22 @@
-import React from 'react';
+import React, { useState, useEffect } from 'react';
 import { Cloud, Droplets, Wind, Eye, Sunrise, Sunset, Gauge } from 'lucide-react';
+import { subscribeToUpdates } from '../services/api';
 
 const WeatherCard = ({ weatherData, loading, error }) => {
+  const [liveWeather, setLiveWeather] = useState(null);
+  const subscribedCity = weatherData?.city;
+
+  // Weather the server pushes for the shown city replaces the fetched values as it changes
+  useEffect(() => {
+    setLiveWeather(null);
+    if (!subscribedCity) return undefined;
+    return subscribeToUpdates({ cities: [subscribedCity] }, {
+      onUpdate: (name, state) => {
+        if (state.weather) setLiveWeather(state.weather);
+      }
+    });
+  }, [subscribedCity]);
+
   if (loading) {
     return (
       <div style={styles.loadingCard}>
@@ -29,7 +44,8 @@ const WeatherCard = ({ weatherData, loading, error }) => {
     );
   }
 
-  const { city, country, weather, temperature, humidity, wind, visibility, sunrise, sunset, pressure } = weatherData;
+  const shown = liveWeather?.city === weatherData.city ? { ...weatherData, ...liveWeather } : weatherData;
+  const { city, country, weather, temperature, humidity, wind, visibility, sunrise, sunset, pressure } = shown;
 
   return (
     <div style={styles.container}>
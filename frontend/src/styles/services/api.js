@@ -86,6 +86,21 @@ export const searchCity = async (query) => {
   }
 };
 
+// Offline prefix autocomplete from the backend gazetteer
+export const autocompleteCity = async (query, limit = 8) => {
+  try {
+    const response = await api.get('/gazetteer/search', {
+      params: { q: query, limit }
+    });
+    return {
+      success: true,
+      data: response.data
+    };
+  } catch (error) {
+    return handleError(error);
+  }
+};
+
 export const getMapboxToken = async () => {
   try {
     const response = await api.get('/mapbox-token');
@@ -257,3 +272,66 @@ export const predictAnyCitySeaLevel = async (city, scenario, years) => {
   }
 };
 
+
+// ============================================
+// LIVE UPDATES (Server-Sent Events)
+// ============================================
+
+// RFC 7386 merge patch: null removes a key, nested objects are patched key by key
+const applyMergePatch = (target, patch) => {
+  if (patch === null || typeof patch !== 'object' || Array.isArray(patch)) {
+    return patch;
+  }
+  const result = target && typeof target === 'object' && !Array.isArray(target) ? { ...target } : {};
+  Object.entries(patch).forEach(([key, value]) => {
+    if (value === null) {
+      delete result[key];
+    } else {
+      result[key] = applyMergePatch(result[key], value);
+    }
+  });
+  return result;
+};
+
+// Pushed weather and risk for cities (and the sea level / CO2 summary with sealevel: true).
+// onUpdate(name, state) receives the full current state after every snapshot or patch, where
+// name is the city as given or 'sealevel'; onError(closed) is told when the stream drops,
+// closed meaning the browser gave up reconnecting. Returns a function that ends the subscription.
+export const subscribeToUpdates = ({ cities = [], sealevel = false }, { onUpdate, onAlert, onError } = {}) => {
+  const params = new URLSearchParams();
+  if (cities.length) params.set('cities', cities.join(','));
+  if (sealevel) params.set('sealevel', 'true');
+
+  const source = new EventSource(`${BASE_URL}/stream?${params.toString()}`);
+  const names = {};
+  const states = {};
+
+  const update = (topic, state) => {
+    states[topic] = state;
+    if (onUpdate) onUpdate(names[topic] ?? topic, state);
+  };
+
+  source.addEventListener('subscribed', (event) => {
+    const { topics } = JSON.parse(event.data);
+    Object.entries(topics).forEach(([name, topic]) => {
+      names[topic] = name;
+    });
+  });
+  source.addEventListener('snapshot', (event) => {
+    const { topic, state } = JSON.parse(event.data);
+    update(topic, state);
+  });
+  source.addEventListener('patch', (event) => {
+    const { topic, patch } = JSON.parse(event.data);
+    update(topic, applyMergePatch(states[topic], patch));
+  });
+  source.addEventListener('alert', (event) => {
+    const { topic, alert } = JSON.parse(event.data);
+    if (onAlert) onAlert(names[topic] ?? topic, alert);
+  });
+  source.onerror = () => {
+    if (onError) onError(source.readyState === EventSource.CLOSED);
+  };
+
+  return () => source.close();
+};